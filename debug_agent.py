@@ -1,41 +1,132 @@
 #!/usr/bin/env python3
 """
 Debug script to test discovery functions directly
+
+    python debug_agent.py                     # call the discovery/enrichment tools
+    python debug_agent.py --profile           # run the coordinator, profiled
+    python debug_agent.py --profile --exchanges NASDAQ TSX NYSE
+    python debug_agent.py --profile --firestore  # also save the report to Firestore
+    python debug_agent.py --virtual-time      # provider delays take no wall time
 """
+
+import argparse
 import asyncio
-from market_analyst.sub_agents.exchange_gapper_discovery.tools import discover_exchange_gappers
-from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import enrich_ticker_data
+
+from market_analyst.clock import run_virtual
+from market_analyst.sub_agents.exchange_gapper_discovery.tools import (
+    discover_exchange_gappers,
+)
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (
+    enrich_ticker_data,
+)
+
 
 async def test_discovery():
     """Test the discovery and enrichment functions directly"""
-    
+
     print("[DEBUG] Testing discovery functions...")
-    
+
     # Test NASDAQ discovery
     nasdaq_result = await discover_exchange_gappers("NASDAQ")
     print(f"[OK] NASDAQ discovery: {nasdaq_result}")
-    
-    # Test TSX discovery  
+
+    # Test TSX discovery
     tsx_result = await discover_exchange_gappers("TSX")
     print(f"[OK] TSX discovery: {tsx_result}")
-    
+
     # Test enrichment
     print("\n[DEBUG] Testing enrichment functions...")
     for ticker_data in nasdaq_result:
         enriched = await enrich_ticker_data(
-            ticker=ticker_data["ticker"],
-            exchange_id="NASDAQ", 
-            gapper_data=ticker_data
+            ticker=ticker_data["ticker"], exchange_id="NASDAQ", gapper_data=ticker_data
+        )
+        print(
+            f"[OK] Enriched {ticker_data['ticker']}: "
+            f"exchange_id={enriched['exchange_id']}"
         )
-        print(f"[OK] Enriched {ticker_data['ticker']}: exchange_id={enriched['exchange_id']}")
-        
+
     for ticker_data in tsx_result:
         enriched = await enrich_ticker_data(
-            ticker=ticker_data["ticker"],
-            exchange_id="TSX",
-            gapper_data=ticker_data
+            ticker=ticker_data["ticker"], exchange_id="TSX", gapper_data=ticker_data
+        )
+        print(
+            f"[OK] Enriched {ticker_data['ticker']}: "
+            f"exchange_id={enriched['exchange_id']}"
         )
-        print(f"[OK] Enriched {ticker_data['ticker']}: exchange_id={enriched['exchange_id']}")
+
+
+async def profile_coordinator(exchanges, firestore=False):
+    """Run the full coordinator once, profiled, and show where the reports went"""
+    from contextlib import nullcontext
+
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types as genai_types
+
+    from market_analyst.agent import root_agent
+    from market_analyst.firestore_sink import (
+        FirestoreReportSink,
+        default_client,
+        use_report_sink,
+    )
+
+    print(f"[DEBUG] Profiling a coordinator run for {', '.join(exchanges)}...")
+    runner = InMemoryRunner(agent=root_agent, app_name="debug_agent")
+    session = await runner.session_service.create_session(
+        app_name="debug_agent",
+        user_id="debug",
+        state={"exchanges": exchanges, "profile": True},
+    )
+    message = genai_types.Content(
+        role="user", parts=[genai_types.Part(text="Run the analysis.")]
+    )
+    sink = FirestoreReportSink(default_client()) if firestore else None
+    with use_report_sink(sink) if sink else nullcontext():
+        async for event in runner.run_async(
+            user_id="debug", session_id=session.id, new_message=message
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                print(
+                    f"[OK] {event.author} produced {len(event.content.parts[0].text)} "
+                    "characters of output"
+                )
+    if sink:
+        stats = await sink.flush()
+        print(
+            f"[OK] Firestore: {stats.reports_saved} report(s) saved, "
+            f"{stats.reports_failed} failed"
+        )
+    print(
+        "[OK] Render cpu.folded with flamegraph.pl or speedscope; see "
+        "allocations.txt for allocation hot spots"
+    )
+
 
 if __name__ == "__main__":
-    asyncio.run(test_discovery())
\ No newline at end of file
+    parser = argparse.ArgumentParser(
+        description="Debug the market analyst tools and pipeline."
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile a full coordinator run into logs/profiles/.",
+    )
+    parser.add_argument("--exchanges", nargs="+", default=["NASDAQ", "TSX"])
+    parser.add_argument(
+        "--firestore",
+        action="store_true",
+        help=(
+            "With --profile, save the report to Firestore (Application Default "
+            "Credentials, or FIRESTORE_EMULATOR_HOST)."
+        ),
+    )
+    parser.add_argument(
+        "--virtual-time",
+        action="store_true",
+        help="Run on a virtual-time event loop (see market_analyst/clock.py).",
+    )
+    args = parser.parse_args()
+    run = run_virtual if args.virtual_time else asyncio.run
+    if args.profile:
+        run(profile_coordinator(args.exchanges, firestore=args.firestore))
+    else:
+        run(test_discovery())
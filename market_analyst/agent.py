@@ -1,24 +1,56 @@
 # /market_analyst/agent.py
+import asyncio
+import logging
 import uuid
-from datetime import datetime, timezone
-from typing import AsyncGenerator, List, Dict, Any, cast
+from collections.abc import AsyncGenerator
+from typing import Any, cast
 
 from google.adk.agents import BaseAgent, ParallelAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event
-from google.adk.tools import FunctionTool
-from google.adk.tools import ToolContext
 from google.genai import types as genai_types
 
-from market_analyst.sub_agents.exchange_gapper_discovery.agent import ExchangeGapperDiscovery
-from market_analyst.sub_agents.ticker_enrichment_pipeline.agent import TickerEnrichmentPipeline
-from market_analyst.schemas import MarketAnalysisReport, ExchangeReport, MarketRegime, ObservedInstrument
-from market_analyst.tools import cluster_instruments
+from market_analyst.clock import get_clock
+from market_analyst.correlation import get_correlation
+from market_analyst.firestore_sink import get_report_sink
+from market_analyst.profiling import start_run_profiler
+from market_analyst.providers import parse_as_of
+from market_analyst.records import InstrumentRecord
+from market_analyst.schemas import ExchangeReport, MarketAnalysisReport, MarketRegime
+from market_analyst.screening import ScreeningConfig, screen_exchanges
+from market_analyst.structured_logging import bind_run_id, ensure_logging_configured
+from market_analyst.sub_agents.exchange_gapper_discovery.agent import (
+    ExchangeGapperDiscovery,
+)
+from market_analyst.sub_agents.ticker_enrichment_pipeline.agent import (
+    TickerEnrichmentPipeline,
+)
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (
+    EnrichedRecords,
+    IssuerDetailsCache,
+)
+from market_analyst.symbols import get_registry
+from market_analyst.tools import cluster_records
+
+logger = logging.getLogger(__name__)
+
+
+def _submit_to_sink(report: MarketAnalysisReport) -> "asyncio.Task[None] | None":
+    """
+    Hands the report to the report sink bound with `use_report_sink()`, if any,
+    and returns the background write.
+
+    `adk run`/`adk web` bind no sink. A host that wants the coordinator's reports
+    saved binds one around its runner (see `debug_agent.py --firestore`).
+    """
+    sink = get_report_sink()
+    return sink.submit(report) if sink is not None else None
+
 
 class MarketAnalysisCoordinator(BaseAgent):
     """
     Orchestrates the market analysis pipeline. This agent is STATELESS.
-    
+
     Uses BaseAgent for complex, programmatic control of the multi-stage pipeline
     according to ADK workflow orchestration patterns.
     """
@@ -29,34 +61,48 @@ class MarketAnalysisCoordinator(BaseAgent):
     ) -> AsyncGenerator[Event, None]:
         """
         Executes the three-stage market analysis pipeline:
-        1. Parallel gapper discovery across exchanges
-        2. Parallel ticker enrichment 
+        1. Parallel gapper discovery across exchanges, then screening of the candidates
+        2. Parallel ticker enrichment of the screened candidates
         3. Instrument clustering and final report generation
         """
 
+        # Runs started by `adk run`/`adk web` have no CLI main to set logging up.
+        ensure_logging_configured()
+
         # Parse input from user message if session state is empty
         if not ctx.session.state.get("exchanges"):
             try:
                 import json
+
                 # Get the latest user message
-                user_events = [e for e in ctx.session.events if e.content.role == "user"]
+                user_events = [
+                    e for e in ctx.session.events if e.content.role == "user"
+                ]
                 if user_events:
                     latest_user_event = user_events[-1]
                     if latest_user_event.content.parts:
                         user_text = latest_user_event.content.parts[0].text
                         # Try to parse as JSON
-                        if user_text.strip().startswith('{'):
+                        if user_text.strip().startswith("{"):
                             input_data = json.loads(user_text)
                             if isinstance(input_data, dict):
                                 # Update session state with parsed input
                                 ctx.session.state.update(input_data)
-                                # Input parsed successfully - no event needed for clean output
+                                # Input parsed successfully - no event needed for clean
+                                # output
             except (json.JSONDecodeError, IndexError, AttributeError) as e:
                 yield Event(
                     author=self.name,
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text=f"Warning: Could not parse user input as JSON: {str(e)}")
-                    ])
+                    content=genai_types.Content(
+                        parts=[
+                            genai_types.Part(
+                                text=(
+                                    "Warning: Could not parse user input as JSON: "
+                                    f"{str(e)}"
+                                )
+                            )
+                        ]
+                    ),
                 )
 
         run_type = ctx.session.state.get("run_type", "Pre-Market")
@@ -64,203 +110,351 @@ class MarketAnalysisCoordinator(BaseAgent):
 
         if not exchange_ids:
             yield Event(
-                author=self.name, 
-                content=genai_types.Content(parts=[
-                    genai_types.Part(text="Error: No exchanges provided in session state.")
-                ])
+                author=self.name,
+                content=genai_types.Content(
+                    parts=[
+                        genai_types.Part(
+                            text="Error: No exchanges provided in session state."
+                        )
+                    ]
+                ),
             )
             return
 
-        try:
-            # --- Stage 1: Discover Gappers in Parallel ---
-            discovery_agents = [ExchangeGapperDiscovery(exchange_id=eid) for eid in exchange_ids]
-            
-            # Fix: Cast to List[BaseAgent] to satisfy ParallelAgent type requirements
-            discovery_pipeline = ParallelAgent(
-                name="gapper_discovery_pipeline", 
-                sub_agents=cast(List[BaseAgent], discovery_agents)
+        # Every log line of this run, including those of sub-agent tasks, carries the
+        # invocation ID.
+        with bind_run_id(ctx.invocation_id):
+            logger.info(
+                "Market analysis run started",
+                extra={"exchanges": exchange_ids, "run_type": run_type},
+            )
+
+            # Opt-in profiling: "profile" in session state or MARKET_ANALYST_PROFILE=1.
+            profiler = start_run_profiler(
+                ctx.session.state, label="-".join(exchange_ids)
             )
-            
-            async for event in discovery_pipeline.run_async(ctx):
-                pass  # Silent - don't yield sub-agent events for clean output
-
-            # --- Fan-In #1: Collect Discovery Results ---
-            all_gappers_with_exchange: List[Dict[str, Any]] = []
-            exchange_reports_map: Dict[str, ExchangeReport] = {}
-
-            for exchange_id in exchange_ids:
-                discovery_result = ctx.session.state.get(f"discovery_{exchange_id}")
-                if not discovery_result:
-                    # Handle missing discovery results gracefully
+            report_write: asyncio.Task[None] | None = None
+
+            try:
+                # Historical runs carry an "as_of" point in time; live runs are stamped
+                # with the current time.
+                as_of = parse_as_of(ctx.session.state.get("as_of"))
+                analysis_timestamp_utc = (as_of or get_clock().now()).isoformat()
+
+                # --- Stage 1: Discover Gappers in Parallel ---
+                profiler.stage("discovery")
+                discovery_agents = [
+                    ExchangeGapperDiscovery(exchange_id=eid) for eid in exchange_ids
+                ]
+
+                # Fix: Cast to List[BaseAgent] to satisfy ParallelAgent type
+                # requirements
+                discovery_pipeline = ParallelAgent(
+                    name="gapper_discovery_pipeline",
+                    sub_agents=cast(list[BaseAgent], discovery_agents),
+                )
+
+                async for event in discovery_pipeline.run_async(ctx):
+                    pass  # Silent - don't yield sub-agent events for clean output
+
+                # --- Fan-In #1: Collect Discovery Results ---
+                discovered_gappers: dict[str, list[dict[str, Any]]] = {}
+                exchange_reports_map: dict[str, ExchangeReport] = {}
+
+                for exchange_id in exchange_ids:
+                    discovery_result = ctx.session.state.get(f"discovery_{exchange_id}")
+                    if not discovery_result:
+                        # Handle missing discovery results gracefully
+                        yield Event(
+                            author=self.name,
+                            content=genai_types.Content(
+                                parts=[
+                                    genai_types.Part(
+                                        text=(
+                                            "Warning: No discovery results for "
+                                            f"{exchange_id}"
+                                        )
+                                    )
+                                ]
+                            ),
+                        )
+                        continue
+
+                    # Validate discovery result structure
+                    if (
+                        "tickers" not in discovery_result
+                        or "market_regime" not in discovery_result
+                    ):
+                        yield Event(
+                            author=self.name,
+                            content=genai_types.Content(
+                                parts=[
+                                    genai_types.Part(
+                                        text=(
+                                            "Error: Invalid discovery result "
+                                            f"structure for {exchange_id}"
+                                        )
+                                    )
+                                ]
+                            ),
+                        )
+                        continue
+
+                    discovered_gappers[exchange_id] = discovery_result["tickers"]
+
+                    # Create exchange report with market regime data
+                    try:
+                        exchange_reports_map[exchange_id] = ExchangeReport(
+                            exchange_id=exchange_id,
+                            market_regime=MarketRegime(
+                                **discovery_result["market_regime"]
+                            ),
+                            observed_instruments=[],
+                        )
+                    except Exception as e:
+                        yield Event(
+                            author=self.name,
+                            content=genai_types.Content(
+                                parts=[
+                                    genai_types.Part(
+                                        text=(
+                                            "Error creating market regime for "
+                                            f"{exchange_id}: {str(e)}"
+                                        )
+                                    )
+                                ]
+                            ),
+                        )
+                        continue
+
+                # --- Screening: Only the strongest candidates go on to enrichment ---
+                profiler.stage("screening")
+                screening_config = ScreeningConfig(
+                    **ctx.session.state.get("screening", {})
+                )
+                screened = await screen_exchanges(
+                    discovered_gappers,
+                    as_of=ctx.session.state.get("as_of"),
+                    config=screening_config,
+                )
+                all_gappers_with_exchange: list[dict[str, Any]] = []
+                for exchange_id, (kept_gappers, screening_summary) in screened.items():
+                    all_gappers_with_exchange.extend(
+                        {**g, "exchange_id": exchange_id} for g in kept_gappers
+                    )
+                    if exchange_id in exchange_reports_map:
+                        exchange_reports_map[
+                            exchange_id
+                        ].screening_summary = screening_summary
+
+                # --- Stage 2: Enrich Gappers in Parallel ---
+                if not all_gappers_with_exchange:
+                    # Create an empty report if no gappers were found
+                    final_report_no_gappers = MarketAnalysisReport(
+                        report_id=str(uuid.uuid4()),
+                        analysis_timestamp_utc=analysis_timestamp_utc,
+                        run_type=run_type,
+                        exchange_reports=list(exchange_reports_map.values()),
+                    )
+                    report_write = _submit_to_sink(final_report_no_gappers)
                     yield Event(
                         author=self.name,
-                        content=genai_types.Content(parts=[
-                            genai_types.Part(text=f"Warning: No discovery results for {exchange_id}")
-                        ])
+                        content=genai_types.Content(
+                            parts=[
+                                genai_types.Part(
+                                    text=final_report_no_gappers.model_dump_json(
+                                        indent=2
+                                    )
+                                )
+                            ]
+                        ),
+                    )
+                    return
+
+                profiler.stage("enrichment")
+                # Intermediate results are keyed by symbol ID, so the same ticker on two
+                # exchanges cannot collide; cross-listings share one issuer-level fetch.
+                registry = get_registry()
+                symbol_ids = [
+                    registry.intern(g["exchange_id"], g["ticker"])
+                    for g in all_gappers_with_exchange
+                ]
+                issuer_cache = IssuerDetailsCache(registry)
+                # Records stay compact InstrumentRecords through clustering; they become
+                # ObservedInstruments only when the report is built.
+                enriched_records = EnrichedRecords()
+                enrichment_agents = [
+                    TickerEnrichmentPipeline(
+                        ticker=g["ticker"],
+                        exchange_id=g["exchange_id"],
+                        gapper_data=g,
+                        symbol_id=symbol_id,
+                        issuer_cache=issuer_cache,
+                        results=enriched_records,
                     )
-                    continue
-                
-                # Validate discovery result structure
-                if "tickers" not in discovery_result or "market_regime" not in discovery_result:
+                    for g, symbol_id in zip(all_gappers_with_exchange, symbol_ids)
+                ]
+
+                # Fix: Cast to List[BaseAgent] for ParallelAgent
+                enrichment_pipeline = ParallelAgent(
+                    name="enrichment_pipeline",
+                    sub_agents=cast(list[BaseAgent], enrichment_agents),
+                )
+
+                async for event in enrichment_pipeline.run_async(ctx):
+                    pass  # Silent - don't yield sub-agent events for clean output
+
+                # --- Fan-In #2: Collect Enrichment Results ---
+                records: list[InstrumentRecord] = []
+                for gapper, symbol_id in zip(all_gappers_with_exchange, symbol_ids):
+                    record = enriched_records.get(symbol_id)
+                    if record is not None:
+                        records.append(record)
+                    else:
+                        yield Event(
+                            author=self.name,
+                            content=genai_types.Content(
+                                parts=[
+                                    genai_types.Part(
+                                        text=(
+                                            "Warning: No enrichment data for "
+                                            f"{gapper['ticker']}"
+                                        )
+                                    )
+                                ]
+                            ),
+                        )
+
+                if not records:
                     yield Event(
                         author=self.name,
-                        content=genai_types.Content(parts=[
-                            genai_types.Part(text=f"Error: Invalid discovery result structure for {exchange_id}")
-                        ])
+                        content=genai_types.Content(
+                            parts=[
+                                genai_types.Part(
+                                    text=(
+                                        "Error: No instruments were successfully "
+                                        "enriched."
+                                    )
+                                )
+                            ]
+                        ),
                     )
-                    continue
+                    return
 
-                gappers_list = discovery_result["tickers"]
-                for gapper in gappers_list:
-                    all_gappers_with_exchange.append({**gapper, "exchange_id": exchange_id})
-                
-                # Create exchange report with market regime data
+                # --- Stage 3: Cluster Instruments ---
+                profiler.stage("clustering")
                 try:
-                    exchange_reports_map[exchange_id] = ExchangeReport(
-                        exchange_id=exchange_id,
-                        market_regime=MarketRegime(**discovery_result["market_regime"]),
-                        observed_instruments=[],
-                    )
+                    clustered_records = cluster_records(records, get_correlation())
                 except Exception as e:
                     yield Event(
                         author=self.name,
-                        content=genai_types.Content(parts=[
-                            genai_types.Part(text=f"Error creating market regime for {exchange_id}: {str(e)}")
-                        ])
+                        content=genai_types.Content(
+                            parts=[
+                                genai_types.Part(
+                                    text=f"Error during clustering: {str(e)}"
+                                )
+                            ]
+                        ),
                     )
-                    continue
-
-            # --- Stage 2: Enrich Gappers in Parallel ---
-            if not all_gappers_with_exchange:
-                # Create an empty report if no gappers were found
-                final_report_no_gappers = MarketAnalysisReport(
-                    report_id=str(uuid.uuid4()),
-                    analysis_timestamp_utc=datetime.now(timezone.utc).isoformat(),
-                    run_type=run_type,
-                    exchange_reports=list(exchange_reports_map.values()),
-                )
-                yield Event(
-                    author=self.name, 
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text=final_report_no_gappers.model_dump_json(indent=2))
-                    ])
-                )
-                return
-
-            enrichment_agents = [
-                TickerEnrichmentPipeline(
-                    ticker=g['ticker'],
-                    exchange_id=g['exchange_id'],
-                    gapper_data=g
-                ) for g in all_gappers_with_exchange
-            ]
-
-            # Fix: Cast to List[BaseAgent] for ParallelAgent
-            enrichment_pipeline = ParallelAgent(
-                name="enrichment_pipeline", 
-                sub_agents=cast(List[BaseAgent], enrichment_agents)
-            )
-            
-            async for event in enrichment_pipeline.run_async(ctx):
-                pass  # Silent - don't yield sub-agent events for clean output
-
-            # --- Fan-In #2: Collect Enrichment Results ---
-            enriched_instruments_dicts = []
-            for gapper in all_gappers_with_exchange:
-                enriched_data = ctx.session.state.get(f"enriched_{gapper['ticker']}")
-                if enriched_data:
-                    enriched_instruments_dicts.append(enriched_data)
-                else:
+                    return
+
+                # Map clustered records back to exchange reports; conversion validates
+                # them.
+                for record in clustered_records:
+                    if record.exchange_id in exchange_reports_map:
+                        try:
+                            observed_instrument = record.to_observed_instrument()
+                            exchange_reports_map[
+                                record.exchange_id
+                            ].observed_instruments.append(observed_instrument)
+                        except Exception as e:
+                            yield Event(
+                                author=self.name,
+                                content=genai_types.Content(
+                                    parts=[
+                                        genai_types.Part(
+                                            text=(
+                                                "Error creating ObservedInstrument "
+                                                f"for {record.ticker}: {str(e)}"
+                                            )
+                                        )
+                                    ]
+                                ),
+                            )
+                            continue
+
+                # --- Create and Yield Final Report ---
+                profiler.stage("report")
+                try:
+                    final_report = MarketAnalysisReport(
+                        report_id=str(uuid.uuid4()),
+                        analysis_timestamp_utc=analysis_timestamp_utc,
+                        run_type=run_type,
+                        exchange_reports=list(exchange_reports_map.values()),
+                    )
+                    report_write = _submit_to_sink(final_report)
+
                     yield Event(
                         author=self.name,
-                        content=genai_types.Content(parts=[
-                            genai_types.Part(text=f"Warning: No enrichment data for {gapper['ticker']}")
-                        ])
+                        content=genai_types.Content(
+                            parts=[
+                                genai_types.Part(
+                                    text=final_report.model_dump_json(indent=2)
+                                )
+                            ]
+                        ),
                     )
 
-            if not enriched_instruments_dicts:
-                yield Event(
-                    author=self.name,
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text="Error: No instruments were successfully enriched.")
-                    ])
-                )
-                return
-
-            # --- Stage 3: Cluster Instruments ---
-            cluster_tool = FunctionTool(cluster_instruments)
-            
-            # Fix: Create proper ToolContext from InvocationContext
-            # Note: This assumes InvocationContext can be used as ToolContext
-            # If not, we may need to extract specific properties
-            tool_context = cast(ToolContext, ctx)
-            
-            try:
-                cluster_result = await cluster_tool.run_async(
-                    args={"instruments": enriched_instruments_dicts}, 
-                    tool_context=tool_context
-                )
-                clustered_instruments = cluster_result.get("clustered_instruments", [])
-            except Exception as e:
-                yield Event(
-                    author=self.name,
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text=f"Error during clustering: {str(e)}")
-                    ])
-                )
-                return
-
-            # Map clustered instruments back to exchange reports
-            for instrument_data in clustered_instruments:
-                exchange_id = instrument_data.get("exchange_id")
-                if exchange_id and exchange_id in exchange_reports_map:
-                    try:
-                        observed_instrument = ObservedInstrument(**instrument_data)
-                        exchange_reports_map[exchange_id].observed_instruments.append(observed_instrument)
-                    except Exception as e:
-                        yield Event(
-                            author=self.name,
-                            content=genai_types.Content(parts=[
-                                genai_types.Part(text=f"Error creating ObservedInstrument for {instrument_data.get('ticker', 'unknown')}: {str(e)}")
-                            ])
-                        )
-                        continue
-
-            # --- Create and Yield Final Report ---
-            try:
-                final_report = MarketAnalysisReport(
-                    report_id=str(uuid.uuid4()),
-                    analysis_timestamp_utc=datetime.now(timezone.utc).isoformat(),
-                    run_type=run_type,
-                    exchange_reports=list(exchange_reports_map.values()),
-                )
+                except Exception as e:
+                    yield Event(
+                        author=self.name,
+                        content=genai_types.Content(
+                            parts=[
+                                genai_types.Part(
+                                    text=f"Error creating final report: {str(e)}"
+                                )
+                            ]
+                        ),
+                    )
 
-                yield Event(
-                    author=self.name,
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text=final_report.model_dump_json(indent=2))
-                    ])
-                )
-                
             except Exception as e:
+                # Catch-all error handler for unexpected issues
                 yield Event(
                     author=self.name,
-                    content=genai_types.Content(parts=[
-                        genai_types.Part(text=f"Error creating final report: {str(e)}")
-                    ])
+                    content=genai_types.Content(
+                        parts=[
+                            genai_types.Part(
+                                text=(
+                                    "Unexpected error in market analysis pipeline: "
+                                    f"{str(e)}"
+                                )
+                            )
+                        ]
+                    ),
                 )
+            finally:
+                # A failing profiler must never replace the run's own result or error.
+                try:
+                    profile_dir = profiler.stop()
+                except Exception as e:
+                    logger.warning(
+                        "Profiler failed to stop",
+                        extra={"error": f"{type(e).__name__}: {e}"},
+                    )
+                else:
+                    if profile_dir:
+                        logger.info(
+                            "Profile written", extra={"profile_dir": profile_dir}
+                        )
+                # The report event is already out; the run only ends once its write has
+                # finished (the sink logs failures), so a runner that closes its loop
+                # right after the run cannot drop it.
+                if report_write is not None:
+                    await report_write
 
-        except Exception as e:
-            # Catch-all error handler for unexpected issues
-            yield Event(
-                author=self.name,
-                content=genai_types.Content(parts=[
-                    genai_types.Part(text=f"Unexpected error in market analysis pipeline: {str(e)}")
-                ])
-            )
 
 # Create the root agent instance
 root_agent = MarketAnalysisCoordinator(
     name="market_analyst_coordinator",
     description="Orchestrates the market analysis pipeline with robust error handling.",
-)
\ No newline at end of file
+)
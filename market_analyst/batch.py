@@ -0,0 +1,382 @@
+# /market_analyst/batch.py
+"""
+Direct programmatic API for the market analysis pipeline.
+
+`analyze()` calls the same discovery, enrichment and clustering tools as
+MarketAnalysisCoordinator but without an ADK session: no events, no session
+state and no JSON round-trips between stages. Like the coordinator, it logs a
+warning and skips an exchange whose discovery fails or a ticker whose enrichment
+fails; the run itself fails only when every exchange or every ticker did. It is
+intended for bulk and offline workloads; interactive runs should keep using
+`root_agent`.
+
+Usage:
+    python -m market_analyst.batch --data-dir data/history --start 2025-01-02 \
+        --end 2025-03-31 --exchange-set NASDAQ,TSX --exchange-set NYSE \
+        --concurrency 32 --output reports.jsonl
+    python -m market_analyst.batch --start 2025-01-02 --end 2025-12-31 \
+        --exchange-set NASDAQ,TSX --virtual-time
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+import uuid
+from collections.abc import Iterable, Sequence
+from contextlib import nullcontext
+from datetime import UTC, date, datetime, timedelta
+from datetime import time as dt_time
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+
+from market_analyst.clock import get_clock, run_virtual
+from market_analyst.correlation import RollingCorrelation, get_correlation
+from market_analyst.firestore_sink import (
+    FirestoreReportSink,
+    get_report_sink,
+    use_report_sink,
+)
+from market_analyst.providers import MarketDataProvider, use_provider
+from market_analyst.schemas import (
+    AnalysisRequest,
+    ExchangeReport,
+    MarketAnalysisReport,
+    MarketRegime,
+)
+from market_analyst.screening import ScreeningConfig, screen_exchanges
+from market_analyst.structured_logging import bind_run_id, configure_logging
+from market_analyst.sub_agents.exchange_gapper_discovery.tools import (
+    discover_exchange_gappers,
+    get_market_regime,
+)
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (
+    IssuerDetailsCache,
+    enrich_ticker_record,
+)
+from market_analyst.tools import cluster_records
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BatchOutcome(BaseModel):
+    """The result of one batch job: either a report or the error that stopped it."""
+
+    request: AnalysisRequest
+    report: MarketAnalysisReport | None = None
+    error: str | None = None
+
+
+async def _discover(exchange_id: str, as_of: str | None) -> dict[str, Any]:
+    gappers, market_regime = await asyncio.gather(
+        discover_exchange_gappers(exchange_id, as_of=as_of),
+        get_market_regime(exchange_id, as_of=as_of),
+    )
+    return {"tickers": gappers, "market_regime": market_regime}
+
+
+def _succeeded(  # noqa: UP047 (PEP 695 syntax needs Python 3.12; we support 3.11)
+    outcomes: Sequence[T | BaseException],
+    message: str,
+    contexts: Sequence[dict[str, Any]],
+) -> list[tuple[int, T]]:
+    """
+    The (index, result) pairs of the gathered `outcomes` that are not exceptions.
+    Each failure is logged as `message` with its context; if every outcome
+    failed, the first error is raised.
+    """
+    succeeded: list[tuple[int, T]] = []
+    errors: list[Exception] = []
+    for i, (outcome, context) in enumerate(zip(outcomes, contexts)):
+        if not isinstance(outcome, BaseException):
+            succeeded.append((i, outcome))
+        elif isinstance(outcome, Exception):
+            error = f"{type(outcome).__name__}: {outcome}"
+            logger.warning(message, extra={**context, "error": error})
+            errors.append(outcome)
+        else:
+            raise outcome
+    if errors and not succeeded:
+        raise errors[0]
+    return succeeded
+
+
+async def analyze(
+    exchanges: Sequence[str],
+    run_type: str = "Pre-Market",
+    as_of: datetime | None = None,
+    provider: MarketDataProvider | None = None,
+    screening: ScreeningConfig | None = None,
+    correlation: RollingCorrelation | None = None,
+) -> MarketAnalysisReport:
+    """
+    Runs discovery, screening, enrichment and clustering for `exchanges`; returns
+    the report.
+
+    When `provider` is given it is bound for the duration of the run; otherwise the
+    provider active in the caller's context is used. `screening` overrides the
+    default ScreeningConfig. Intraday re-runs pass the `correlation` tracker they
+    keep updating bar by bar (or bind it with `use_correlation()`), so clustering
+    reads the current matrix instead of recomputing correlations. The report is
+    also submitted to the report sink bound with `use_report_sink()`, if any,
+    without waiting for the write.
+    """
+    # The report ID doubles as the correlation ID of the run's log lines.
+    report_id = str(uuid.uuid4())
+    with bind_run_id(report_id):
+        as_of_iso = as_of.isoformat() if as_of else None
+        # Stamped when the run starts, as the coordinator does.
+        analysis_timestamp_utc = (as_of or get_clock().now()).isoformat()
+        with use_provider(provider) if provider else nullcontext():
+            # --- Stage 1: Discover Gappers ---
+            outcomes = await asyncio.gather(
+                *(_discover(eid, as_of_iso) for eid in exchanges),
+                return_exceptions=True,
+            )
+            kept = _succeeded(
+                outcomes,
+                "Discovery failed, skipping exchange",
+                [{"exchange_id": eid} for eid in exchanges],
+            )
+            exchanges = [exchanges[i] for i, _ in kept]
+            discoveries = [discovery for _, discovery in kept]
+            exchange_reports: dict[str, ExchangeReport] = {}
+            for exchange_id, discovery in zip(exchanges, discoveries):
+                exchange_reports[exchange_id] = ExchangeReport(
+                    exchange_id=exchange_id,
+                    market_regime=MarketRegime(**discovery["market_regime"]),
+                    observed_instruments=[],
+                )
+
+            # --- Screening ---
+            screened = await screen_exchanges(
+                {
+                    exchange_id: discovery["tickers"]
+                    for exchange_id, discovery in zip(exchanges, discoveries)
+                },
+                as_of=as_of_iso,
+                config=screening,
+            )
+            gappers_with_exchange: list[dict[str, Any]] = []
+            for exchange_id, (kept_gappers, screening_summary) in screened.items():
+                exchange_reports[exchange_id].screening_summary = screening_summary
+                gappers_with_exchange.extend(
+                    {**g, "exchange_id": exchange_id} for g in kept_gappers
+                )
+
+            # --- Stage 2: Enrich Gappers ---
+            issuer_cache = IssuerDetailsCache()
+            enriched = await asyncio.gather(
+                *(
+                    enrich_ticker_record(
+                        ticker=g["ticker"],
+                        gapper_data=g,
+                        exchange_id=g["exchange_id"],
+                        as_of=as_of_iso,
+                        issuer_cache=issuer_cache,
+                    )
+                    for g in gappers_with_exchange
+                ),
+                return_exceptions=True,
+            )
+            contexts = [
+                {"ticker": g["ticker"], "exchange_id": g["exchange_id"]}
+                for g in gappers_with_exchange
+            ]
+            records = [
+                record
+                for _, record in _succeeded(
+                    enriched, "Enrichment failed, skipping ticker", contexts
+                )
+            ]
+
+        # --- Stage 3: Cluster Instruments ---
+        # Records stay compact until here; conversion to the canonical model validates
+        # them.
+        for record in cluster_records(
+            records, correlation if correlation is not None else get_correlation()
+        ):
+            exchange_reports[record.exchange_id].observed_instruments.append(
+                record.to_observed_instrument()
+            )
+
+        report = MarketAnalysisReport(
+            report_id=report_id,
+            analysis_timestamp_utc=analysis_timestamp_utc,
+            run_type=run_type,
+            exchange_reports=list(exchange_reports.values()),
+        )
+        sink = get_report_sink()
+        if sink is not None:
+            sink.submit(report)
+        return report
+
+
+async def run_batch(
+    requests: Iterable[AnalysisRequest],
+    max_concurrency: int = 16,
+    provider: MarketDataProvider | None = None,
+    screening: ScreeningConfig | None = None,
+    sink: FirestoreReportSink | None = None,
+) -> list[BatchOutcome]:
+    """
+    Runs many analysis requests concurrently; returns one outcome per request, in
+    order.
+
+    With a `sink`, every report is saved to it in the background while the next
+    jobs run; the sink is flushed before returning.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run_one(request: AnalysisRequest) -> BatchOutcome:
+        async with semaphore:
+            try:
+                report = await analyze(
+                    request.exchanges,
+                    request.run_type,
+                    request.as_of,
+                    provider,
+                    screening,
+                )
+                return BatchOutcome(request=request, report=report)
+            except Exception as e:
+                return BatchOutcome(request=request, error=f"{type(e).__name__}: {e}")
+
+    if sink is None:
+        return list(await asyncio.gather(*(_run_one(r) for r in requests)))
+    with use_report_sink(sink):
+        outcomes = list(await asyncio.gather(*(_run_one(r) for r in requests)))
+    await sink.flush()
+    return outcomes
+
+
+def build_requests(
+    start: date,
+    end: date,
+    exchange_sets: Sequence[Sequence[str]],
+    run_type: str = "Pre-Market",
+    run_time_utc: dt_time = dt_time(13, 0),
+    weekdays_only: bool = True,
+) -> list[AnalysisRequest]:
+    """Expands a date range and exchange sets into one request per (date, set)."""
+    requests: list[AnalysisRequest] = []
+    day = start
+    while day <= end:
+        if not weekdays_only or day.weekday() < 5:
+            as_of = datetime.combine(day, run_time_utc, tzinfo=UTC)
+            requests.extend(
+                AnalysisRequest(
+                    exchanges=list(exchanges), run_type=run_type, as_of=as_of
+                )
+                for exchanges in exchange_sets
+            )
+        day += timedelta(days=1)
+    return requests
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs (date, exchange-set) analysis jobs concurrently from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Run market analysis jobs in bulk without ADK sessions."
+    )
+    parser.add_argument("--start", required=True, type=date.fromisoformat)
+    parser.add_argument("--end", required=True, type=date.fromisoformat)
+    parser.add_argument(
+        "--exchange-set",
+        action="append",
+        required=True,
+        help=(
+            "Comma-separated exchanges analysed together in one job. Repeat for "
+            "several sets."
+        ),
+    )
+    parser.add_argument("--run-type", default="Pre-Market")
+    parser.add_argument(
+        "--data-dir",
+        help="Historical snapshot directory. Uses the mock provider if omitted.",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="Write reports as JSON lines to this file.")
+    parser.add_argument("--store", help="Save reports into this report store (SQLite).")
+    parser.add_argument(
+        "--firestore",
+        action="store_true",
+        help=(
+            "Save reports to Firestore (Application Default Credentials, or "
+            "FIRESTORE_EMULATOR_HOST)."
+        ),
+    )
+    parser.add_argument(
+        "--firestore-project", help="GCP project of the Firestore database."
+    )
+    parser.add_argument(
+        "--virtual-time",
+        action="store_true",
+        help=(
+            "Run on a virtual-time event loop: simulated provider latency takes no "
+            "wall time."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    provider: MarketDataProvider | None = None
+    if args.data_dir:
+        from market_analyst.providers import HistoricalMarketDataProvider
+
+        provider = HistoricalMarketDataProvider(args.data_dir)
+
+    exchange_sets = [
+        [e.strip() for e in s.split(",") if e.strip()] for s in args.exchange_set
+    ]
+    requests = build_requests(
+        args.start, args.end, exchange_sets, run_type=args.run_type
+    )
+
+    async def _run() -> list[BatchOutcome]:
+        sink = None
+        if args.firestore:
+            from market_analyst.firestore_sink import default_client
+
+            sink = FirestoreReportSink(default_client(args.firestore_project))
+        return await run_batch(
+            requests, max_concurrency=args.concurrency, provider=provider, sink=sink
+        )
+
+    started = time.perf_counter()
+    outcomes = run_virtual(_run()) if args.virtual_time else asyncio.run(_run())
+    elapsed = time.perf_counter() - started
+    reports = [o.report for o in outcomes if o.report is not None]
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for report in reports:
+                f.write(report.model_dump_json() + "\n")
+    if args.store:
+        from market_analyst.report_store import ReportStore
+
+        with ReportStore(args.store) as store:
+            store.save_many(reports)
+
+    failures = [o for o in outcomes if o.error is not None]
+    for outcome in failures:
+        as_of = (
+            outcome.request.as_of.date().isoformat()
+            if outcome.request.as_of
+            else "live"
+        )
+        print(f"[FAIL] {as_of} {','.join(outcome.request.exchanges)}: {outcome.error}")
+    rate = len(outcomes) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Ran {len(outcomes)} job(s) in {elapsed:.2f}s ({rate:.1f} jobs/s, "
+        f"{len(failures)} failed)"
+    )
+    return 0 if not failures else 1
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
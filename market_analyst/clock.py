@@ -0,0 +1,178 @@
+# /market_analyst/clock.py
+"""
+The clock of a run, and an event loop that runs in virtual time.
+
+Code that stamps or dates its output (the coordinator's analysis timestamp, the
+screening cache day, the simulated provider's trading day) asks `get_clock()`
+for the current time instead of calling `datetime.now()`. The default is the
+system clock; `use_clock()` binds another one for the current context.
+
+Simulated latency is plain `asyncio.sleep()` in the providers, and timeouts,
+hedge delays and load-test schedules read `loop.time()`. A
+VirtualTimeEventLoop makes all of them virtual at once: its `time()` is a
+counter that only moves when every task is waiting on a timer, and then jumps
+straight to the earliest one. A run against SimulatedMarketDataProvider with
+realistic latencies therefore takes as long as its CPU work, and its timing,
+ordering and timestamps are the same on every run.
+
+Real I/O is still polled, so the loop can serve sockets, but it never waits on
+them while a timer is pending: virtual time is meant for simulated providers.
+Work handed to threads (`asyncio.to_thread`) holds the clock until it returns,
+so it takes no virtual time rather than letting timers fire around it.
+
+`run_virtual()` is the `asyncio.run()` of virtual time, with a VirtualClock that
+starts at `start` and follows the loop:
+
+    start = datetime(2025, 8, 11, 12, tzinfo=timezone.utc)
+    report = run_virtual(coordinator_run(), start=start)
+
+`--virtual-time` on `market_analyst.batch`, `market_analyst.load_test`,
+`debug_agent.py` and `tests/validate_agent_behavior.py` runs them this way.
+"""
+
+import asyncio
+import contextvars
+import selectors
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Coroutine, Iterator
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
+from typing import (
+    Any,
+    TypeVar,
+    TypeVarTuple,
+)
+
+T = TypeVar("T")
+Ts = TypeVarTuple("Ts")
+
+
+class Clock(ABC):
+    """Source of the current UTC time."""
+
+    @abstractmethod
+    def now(self) -> datetime:
+        """Returns the current time, timezone-aware."""
+
+
+class SystemClock(Clock):
+    """The wall clock."""
+
+    def now(self) -> datetime:
+        return datetime.now(UTC)
+
+
+class VirtualClock(Clock):
+    """
+    `start` plus the time elapsed on `time_source` (a `loop.time`) since the
+    clock was created. Without a time source the clock stands still at `start`.
+    """
+
+    def __init__(self, start: datetime, time_source: Callable[[], float] | None = None):
+        if start.tzinfo is None:
+            raise ValueError("start must be timezone-aware")
+        self.start = start
+        self._time_source = time_source
+        self._origin = time_source() if time_source is not None else 0.0
+
+    def now(self) -> datetime:
+        if self._time_source is None:
+            return self.start
+        return self.start + timedelta(seconds=self._time_source() - self._origin)
+
+
+_SYSTEM_CLOCK = SystemClock()
+_active_clock: ContextVar[Clock] = ContextVar("clock", default=_SYSTEM_CLOCK)
+
+
+def get_clock() -> Clock:
+    """Returns the clock bound to the current context, the system clock by default."""
+    return _active_clock.get()
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """Binds `clock` for the current context, including tasks started from it."""
+    token = _active_clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _active_clock.reset(token)
+
+
+# --- Virtual-time event loop ---
+
+
+class _VirtualTimeSelector(selectors.DefaultSelector):
+    """
+    Polls real I/O without blocking and turns the wait for the next timer into a
+    jump of the clock.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.loop: VirtualTimeEventLoop | None = None
+
+    def select(
+        self, timeout: float | None = None
+    ) -> list[tuple[selectors.SelectorKey, int]]:
+        ready = super().select(0)
+        loop = self.loop
+        if ready or (timeout is not None and timeout <= 0) or loop is None:
+            return ready
+        if timeout is None or loop._threads_running:
+            # Nothing is scheduled, or a thread is still working: wait for real
+            # (threads wake the loop through its self-pipe when they finish).
+            return super().select(timeout)
+        loop._virtual_time += timeout
+        return ready
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    """
+    A selector event loop whose `time()` advances only by jumping to the next
+    scheduled timer.
+    """
+
+    def __init__(self) -> None:
+        selector = _VirtualTimeSelector()
+        self._virtual_time = 0.0
+        self._threads_running = 0
+        super().__init__(selector)
+        selector.loop = self
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def run_in_executor(
+        self,
+        executor: Executor | None,
+        func: Callable[[*Ts], T],
+        *args: *Ts,
+    ) -> "asyncio.Future[T]":
+        future = super().run_in_executor(executor, func, *args)
+        self._threads_running += 1
+        future.add_done_callback(self._thread_done)
+        return future
+
+    def _thread_done(self, _future: "asyncio.Future[Any]") -> None:
+        self._threads_running -= 1
+
+
+def run_virtual(  # noqa: UP047 (PEP 695 syntax needs Python 3.12; we support 3.11)
+    main: Coroutine[Any, Any, T],
+    start: datetime | None = None,
+    debug: bool | None = None,
+) -> T:
+    """
+    Runs `main` to completion on a VirtualTimeEventLoop, with a VirtualClock that
+    starts at `start` (the current time by default) bound for the whole run.
+    """
+    start = start or get_clock().now()
+    with asyncio.Runner(debug=debug, loop_factory=VirtualTimeEventLoop) as runner:
+        with use_clock(VirtualClock(start, runner.get_loop().time)):
+            # The runner snapshotted the context when it created the loop; hand it
+            # the one with the clock bound.
+            return runner.run(main, context=contextvars.copy_context())
@@ -0,0 +1,266 @@
+# /market_analyst/correlation.py
+"""
+Rolling pairwise return correlations maintained incrementally, bar by bar.
+
+Intraday re-clustering needs the correlation matrix of the active instrument set
+over the last `window` bars. Recomputing it from scratch on every bar costs
+O(n² · window); RollingCorrelation instead keeps per-pair running sums over the
+window and applies each new bar in O(n²):
+
+* the new bar's returns are added to the sums, and
+* the bar that falls out of the window (kept in a ring buffer) is subtracted,
+
+so the window is never rescanned. The sums are pairwise: a pair only counts the
+bars in which both symbols traded. Symbols that join mid-window therefore
+correlate over their shared bars, and a symbol that leaves frees its slot with
+one row/column reset.
+
+Symbols are keyed by registry symbol ID, like the TickStore, though any hashable
+key works. `cluster_ids()` turns the current matrix into correlation cluster IDs,
+and `tools.cluster_records()` uses it when a tracker is passed in. Intraday
+drivers bind their tracker with `use_correlation()`; both `batch.analyze()` and
+the ADK coordinator pick it up from there.
+"""
+
+from collections.abc import Hashable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import numpy as np
+
+
+class RollingCorrelation:
+    """
+    Sliding-window Pearson correlation of log returns for a changing set of symbols.
+
+    Feed one bar at a time with `update({key: close, ...})`. Symbols missing from
+    a bar simply contribute no return for that bar. Unknown keys join
+    automatically; `remove()` drops a symbol.
+    """
+
+    # Pairwise sums over the window; entry [i, j] only counts bars where both i and j
+    # have a return.
+    _count: np.ndarray
+    _sum: np.ndarray  # sum of x_i
+    _sum_sq: np.ndarray  # sum of x_i²
+    _sum_xy: np.ndarray  # sum of x_i · x_j
+    # Ring buffer of the bars in the window: returns (0 where missing) and presence
+    # masks.
+    _ring: np.ndarray
+    _ring_mask: np.ndarray
+    _last_close: np.ndarray
+
+    def __init__(
+        self, window: int = 30, min_periods: int = 10, initial_symbols: int = 64
+    ):
+        if window < 2:
+            raise ValueError("window must be at least 2 bars")
+        self.window = window
+        self.min_periods = max(2, min(min_periods, window))
+        self.bars = 0
+        self._slots: dict[Hashable, int] = {}
+        self._keys: list[Hashable | None] = []
+        self._free: list[int] = []
+        self._capacity = 0
+        self._work: np.ndarray | None = None
+        self._allocate(initial_symbols)
+
+    def _allocate(self, capacity: int) -> None:
+        n = len(self._keys)
+
+        def grow(
+            name: str,
+            shape: tuple[int, ...],
+            used: tuple[slice, ...],
+            fill: float = 0.0,
+        ) -> None:
+            array: np.ndarray = np.full(shape, fill)
+            if n:
+                array[used] = getattr(self, name)[used]
+            setattr(self, name, array)
+
+        pair, ring = (slice(0, n), slice(0, n)), (slice(None), slice(0, n))
+        grow("_count", (capacity, capacity), pair)
+        grow("_sum", (capacity, capacity), pair)
+        grow("_sum_sq", (capacity, capacity), pair)
+        grow("_sum_xy", (capacity, capacity), pair)
+        grow("_ring", (self.window, capacity), ring)
+        grow("_ring_mask", (self.window, capacity), ring)
+        grow("_last_close", (capacity,), (slice(0, n),), fill=np.nan)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    @property
+    def keys(self) -> list[Hashable]:
+        """Active symbols in slot order (the row order of `matrix()`)."""
+        return [key for key in self._keys if key is not None]
+
+    def add(self, key: Hashable) -> int:
+        """Adds a symbol (no-op if present) and returns its slot."""
+        slot = self._slots.get(key)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+        else:
+            slot = len(self._keys)
+            if slot == self._capacity:
+                self._allocate(self._capacity * 2)
+            self._keys.append(key)
+        self._slots[key] = slot
+        return slot
+
+    def remove(self, key: Hashable) -> None:
+        """Drops a symbol; its slot is cleared in O(n + window) for the next join."""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        for array in (self._count, self._sum, self._sum_sq, self._sum_xy):
+            array[slot, :] = 0.0
+            array[:, slot] = 0.0
+        self._ring[:, slot] = 0.0
+        self._ring_mask[:, slot] = 0.0
+        self._last_close[slot] = np.nan
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def update(self, closes: Mapping[Hashable, float]) -> None:
+        """Applies one bar of closing prices in O(n²)."""
+        for key in closes:
+            if key not in self._slots:
+                self.add(key)
+        n = len(self._keys)
+        close = np.full(n, np.nan)
+        slots = np.fromiter(
+            (self._slots[key] for key in closes), dtype=np.int64, count=len(closes)
+        )
+        close[slots] = np.fromiter(closes.values(), dtype=np.float64, count=len(closes))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.log(close / self._last_close[:n])
+        mask = np.isfinite(returns)
+        x = np.where(mask, returns, 0.0)
+        m = mask.astype(np.float64)
+        # A symbol that skips a bar keeps its previous close, so its next return spans
+        # the gap.
+        self._last_close[slots] = close[slots]
+
+        position = self.bars % self.window
+        if self.bars >= self.window:
+            # Add the new bar and retire the oldest one as a single rank-2 update.
+            values = np.stack((x, self._ring[position, :n]))
+            weights = np.stack((m, self._ring_mask[position, :n]))
+            signs = np.array([[1.0], [-1.0]])
+        else:
+            values, weights, signs = x[np.newaxis], m[np.newaxis], np.ones((1, 1))
+        signed_values, signed_weights = values * signs, weights * signs
+        self._count[:n, :n] += signed_weights.T @ weights
+        self._sum[:n, :n] += signed_values.T @ weights
+        self._sum_sq[:n, :n] += (signed_values * values).T @ weights
+        self._sum_xy[:n, :n] += signed_values.T @ values
+        self._ring[position, :n] = x
+        self._ring_mask[position, :n] = m
+        self.bars += 1
+
+    def matrix(self) -> tuple[list[Hashable], np.ndarray]:
+        """
+        Returns the active keys and their correlation matrix.
+
+        Pairs with fewer than `min_periods` shared bars, or with a constant
+        series, are NaN; the diagonal is 1 for every symbol with enough bars.
+        """
+        n = len(self._keys)
+        count, total, sum_sq = (
+            self._count[:n, :n],
+            self._sum[:n, :n],
+            self._sum_sq[:n, :n],
+        )
+        # Two reusable n x n work buffers; fresh temporaries of this size cost more in
+        # page faults than in arithmetic.
+        if self._work is None or self._work.shape[1] != n:
+            self._work = np.empty((2, n, n))
+        mean, variance = self._work
+        covariance = np.empty((n, n))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Centred sums over each pair's shared bars: S_xy - S_x·S_y/N and S_xx -
+            # S_x²/N.
+            np.divide(total, count, out=mean)
+            np.multiply(mean, total.T, out=covariance)
+            np.subtract(self._sum_xy[:n, :n], covariance, out=covariance)
+            np.multiply(mean, total, out=variance)
+            np.subtract(sum_sq, variance, out=variance)
+            # Add/subtract cancellation leaves residue of order 1e-12 · S_xx on a flat
+            # series.
+            np.copyto(variance, 0.0, where=variance <= 1e-12 * sum_sq)
+            np.multiply(variance, variance.T, out=mean)
+            np.sqrt(mean, out=mean)
+            np.divide(covariance, mean, out=covariance)
+        np.clip(covariance, -1.0, 1.0, out=covariance)
+        np.copyto(covariance, np.nan, where=count < self.min_periods)
+        if len(self._slots) == n:
+            return list(self._keys), covariance
+        active = np.array([key is not None for key in self._keys], dtype=bool)
+        return [self._keys[i] for i in np.flatnonzero(active)], covariance[
+            np.ix_(active, active)
+        ]
+
+    def correlation(self, a: Hashable, b: Hashable) -> float:
+        """Returns the correlation of two symbols (NaN if undefined or unknown)."""
+        keys, correlation = self.matrix()
+        try:
+            return float(correlation[keys.index(a), keys.index(b)])
+        except ValueError:
+            return float("nan")
+
+    def cluster_ids(self, threshold: float = 0.7) -> dict[Hashable, int]:
+        """
+        Groups symbols whose correlation is at least `threshold`, transitively.
+
+        Cluster IDs are numbered 0, 1, ... in order of each cluster's first
+        member in slot order, so they stay stable while the set is unchanged.
+        """
+        keys, correlation = self.matrix()
+        parent = list(range(len(keys)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        rows, cols = np.nonzero(np.triu(correlation >= threshold, k=1))
+        for i, j in zip(rows.tolist(), cols.tolist()):
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        labels: dict[int, int] = {}
+        return {
+            key: labels.setdefault(find(i), len(labels)) for i, key in enumerate(keys)
+        }
+
+
+_active_correlation: ContextVar[RollingCorrelation | None] = ContextVar(
+    "correlation", default=None
+)
+
+
+def get_correlation() -> RollingCorrelation | None:
+    """Returns the correlation tracker bound to the current context, if any."""
+    return _active_correlation.get()
+
+
+@contextmanager
+def use_correlation(tracker: RollingCorrelation) -> Iterator[RollingCorrelation]:
+    """Binds `tracker` for the current context; clustering reads its rolling matrix."""
+    token = _active_correlation.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _active_correlation.reset(token)
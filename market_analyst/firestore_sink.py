@@ -0,0 +1,338 @@
+# /market_analyst/firestore_sink.py
+"""
+Batched, asynchronous persistence of MarketAnalysisReport objects to Firestore.
+
+A report is stored as one document per report, per exchange report and per
+observed instrument:
+
+    market_analysis_reports/{report_id}
+    market_analysis_reports/{report_id}/exchange_reports/{exchange_id}
+    market_analysis_reports/{report_id}/instruments/{exchange_id}:{ticker}
+
+Document IDs are derived from the report ID, so saving a report again (a retry,
+or a re-run of the same job) overwrites the same documents instead of adding
+new ones. Exchange and instrument documents are grouped into write batches of up
+to 500 (the Firestore limit) and committed concurrently, with at most
+`max_in_flight` commits outstanding across all reports. The report document is
+committed last, only once every other batch of the report has succeeded, so
+readers that start from it never see a partial report.
+
+`submit()` only schedules the work and returns immediately: serialization runs
+in a worker thread and commits run in background tasks, off the run's critical
+path. The owner of the sink awaits `flush()` (or `close()`) before exiting.
+Failed commits are retried with exponential backoff; a report that still fails
+is logged and counted, never raised into the run that produced it.
+
+The coordinator and `market_analyst.batch` save every report to the sink bound
+with `use_report_sink()`. `AsyncClient` honours FIRESTORE_EMULATOR_HOST, so the
+same code runs against the local emulator; tests use InMemoryFirestore.
+"""
+
+import asyncio
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from pydantic import BaseModel
+
+from market_analyst.report_store import trading_date_of
+from market_analyst.schemas import MarketAnalysisReport
+
+logger = logging.getLogger(__name__)
+
+REPORTS_COLLECTION = "market_analysis_reports"
+# Firestore accepts at most 500 writes per batch.
+MAX_BATCH_WRITES = 500
+
+
+def instrument_document_id(exchange_id: str, ticker: str) -> str:
+    """The ID of an instrument document in its report ('/' is not allowed)."""
+    return f"{exchange_id}:{ticker}".replace("/", "-")
+
+
+def report_documents(
+    report: MarketAnalysisReport,
+) -> tuple[dict[str, Any], list[tuple[tuple[str, str], dict[str, Any]]]]:
+    """
+    Returns the report document and the (subcollection, document ID) -> data pairs
+    of its exchange and instrument documents.
+    """
+    trading_date = trading_date_of(report)
+    children: list[tuple[tuple[str, str], dict[str, Any]]] = []
+    instrument_count = 0
+    for position, exchange_report in enumerate(report.exchange_reports):
+        summary = exchange_report.screening_summary
+        children.append(
+            (
+                ("exchange_reports", exchange_report.exchange_id),
+                {
+                    "report_id": report.report_id,
+                    "trading_date": trading_date,
+                    "exchange_id": exchange_report.exchange_id,
+                    "position": position,
+                    "market_regime": exchange_report.market_regime.model_dump(),
+                    "screening_summary": summary.model_dump()
+                    if summary is not None
+                    else None,
+                    "instrument_count": len(exchange_report.observed_instruments),
+                },
+            )
+        )
+        for rank, instrument in enumerate(exchange_report.observed_instruments):
+            document = instrument.model_dump()
+            document.update(
+                report_id=report.report_id,
+                trading_date=trading_date,
+                run_type=report.run_type,
+                position=rank,
+            )
+            children.append(
+                (
+                    (
+                        "instruments",
+                        instrument_document_id(
+                            instrument.exchange_id, instrument.ticker
+                        ),
+                    ),
+                    document,
+                )
+            )
+            instrument_count += 1
+    report_document = {
+        "report_id": report.report_id,
+        "trading_date": trading_date,
+        "analysis_timestamp_utc": report.analysis_timestamp_utc,
+        "run_type": report.run_type,
+        "exchanges": [r.exchange_id for r in report.exchange_reports],
+        "instrument_count": instrument_count,
+    }
+    return report_document, children
+
+
+class SinkStats(BaseModel):
+    """Counters of a sink since it was created."""
+
+    reports_submitted: int = 0
+    reports_saved: int = 0
+    reports_failed: int = 0
+    documents_written: int = 0
+    batches_committed: int = 0
+    commit_retries: int = 0
+
+
+class FirestoreReportSink:
+    """
+    Saves reports to Firestore in bulk write batches, in the background.
+
+    `client` is a `google.cloud.firestore.AsyncClient` or anything with the same
+    `collection()`/`batch()` surface, such as InMemoryFirestore.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        collection: str = REPORTS_COLLECTION,
+        batch_size: int = MAX_BATCH_WRITES,
+        max_in_flight: int = 4,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 0.2,
+    ):
+        if not 0 < batch_size <= MAX_BATCH_WRITES:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_WRITES}")
+        self.client = client
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.stats = SinkStats()
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._pending: set[asyncio.Task[None]] = set()
+
+    def submit(self, report: MarketAnalysisReport) -> "asyncio.Task[None]":
+        """Schedules `report` to be saved and returns at once; call on the loop."""
+        self.stats.reports_submitted += 1
+        task = asyncio.ensure_future(self._save(report))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def save(self, report: MarketAnalysisReport) -> None:
+        """Saves `report` and waits until it is written (or has failed)."""
+        await self.submit(report)
+
+    async def flush(self) -> SinkStats:
+        """Waits until every submitted report is written or failed; returns counters."""
+        while self._pending:
+            await asyncio.gather(*list(self._pending))
+        return self.stats
+
+    async def close(self) -> SinkStats:
+        return await self.flush()
+
+    async def __aenter__(self) -> "FirestoreReportSink":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _save(self, report: MarketAnalysisReport) -> None:
+        try:
+            # Dumping a large report takes milliseconds of CPU; keep it off the event
+            # loop.
+            report_document, children = await asyncio.to_thread(
+                report_documents, report
+            )
+            report_ref = self.client.collection(self.collection).document(
+                report.report_id
+            )
+            writes = [
+                (report_ref.collection(sub).document(doc_id), data)
+                for (sub, doc_id), data in children
+            ]
+            batches = [
+                writes[i : i + self.batch_size]
+                for i in range(0, len(writes), self.batch_size)
+            ]
+            await asyncio.gather(*(self._commit(batch) for batch in batches))
+            # The report document goes last: its presence means the whole report is
+            # readable.
+            await self._commit([(report_ref, report_document)])
+        except Exception as e:
+            self.stats.reports_failed += 1
+            logger.error(
+                "Failed to save report to Firestore",
+                extra={
+                    "report_id": report.report_id,
+                    "error": f"{type(e).__name__}: {e}",
+                },
+            )
+            return
+        self.stats.reports_saved += 1
+        logger.debug(
+            "Report saved to Firestore",
+            extra={"report_id": report.report_id, "documents": len(writes) + 1},
+        )
+
+    async def _commit(self, writes: list[tuple[Any, dict[str, Any]]]) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            batch = self.client.batch()
+            for reference, data in writes:
+                batch.set(reference, data)
+            async with self._in_flight:
+                try:
+                    await batch.commit()
+                except Exception:
+                    if attempt == self.max_attempts:
+                        raise
+                    self.stats.commit_retries += 1
+                else:
+                    self.stats.batches_committed += 1
+                    self.stats.documents_written += len(writes)
+                    return
+            # Writes are idempotent sets, so a batch can be retried as a whole.
+            await asyncio.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+
+
+_active_report_sink: ContextVar[FirestoreReportSink | None] = ContextVar(
+    "report_sink", default=None
+)
+
+
+def get_report_sink() -> FirestoreReportSink | None:
+    """Returns the report sink bound to the current context, if any."""
+    return _active_report_sink.get()
+
+
+@contextmanager
+def use_report_sink(sink: FirestoreReportSink) -> Iterator[FirestoreReportSink]:
+    """Binds `sink` for the current context so finished reports are saved to it."""
+    token = _active_report_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _active_report_sink.reset(token)
+
+
+def default_client(project: str | None = None) -> Any:
+    """
+    A Firestore AsyncClient using Application Default Credentials, or the emulator
+    when configured.
+    """
+    from google.cloud import firestore
+
+    return firestore.AsyncClient(project=project)
+
+
+# --- In-memory fake ---
+
+
+class _FakeDocumentReference:
+    def __init__(self, client: "InMemoryFirestore", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "_FakeCollectionReference":
+        return _FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+
+class _FakeCollectionReference:
+    def __init__(self, client: "InMemoryFirestore", path: str):
+        self._client = client
+        self.path = path
+
+    def document(self, document_id: str) -> _FakeDocumentReference:
+        return _FakeDocumentReference(self._client, f"{self.path}/{document_id}")
+
+
+class _FakeWriteBatch:
+    def __init__(self, client: "InMemoryFirestore"):
+        self._client = client
+        self._writes: list[tuple[str, dict[str, Any]]] = []
+
+    def set(
+        self, reference: _FakeDocumentReference, document_data: dict[str, Any]
+    ) -> None:
+        self._writes.append((reference.path, document_data))
+
+    async def commit(self) -> None:
+        await self._client._commit(self._writes)
+
+
+class InMemoryFirestore:
+    """
+    The part of the Firestore AsyncClient API the sink uses, backed by a dict of
+    document path -> data. Commits take `commit_latency` seconds, and the next
+    `fail_commits` commits raise, to exercise batching, concurrency and retries.
+    """
+
+    def __init__(self, commit_latency: float = 0.0, fail_commits: int = 0):
+        self.commit_latency = commit_latency
+        self.fail_commits = fail_commits
+        self.documents: dict[str, dict[str, Any]] = {}
+        self.commits = 0
+        self.max_concurrent_commits = 0
+        self._concurrent = 0
+
+    def collection(self, name: str) -> _FakeCollectionReference:
+        return _FakeCollectionReference(self, name)
+
+    def batch(self) -> _FakeWriteBatch:
+        return _FakeWriteBatch(self)
+
+    async def _commit(self, writes: list[tuple[str, dict[str, Any]]]) -> None:
+        if len(writes) > MAX_BATCH_WRITES:
+            raise ValueError(f"a batch may contain at most {MAX_BATCH_WRITES} writes")
+        self._concurrent += 1
+        self.max_concurrent_commits = max(self.max_concurrent_commits, self._concurrent)
+        try:
+            await asyncio.sleep(self.commit_latency)
+            if self.fail_commits:
+                self.fail_commits -= 1
+                raise ConnectionError("simulated commit failure")
+            self.commits += 1
+            self.documents.update(writes)
+        finally:
+            self._concurrent -= 1
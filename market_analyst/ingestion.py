@@ -0,0 +1,514 @@
+# /market_analyst/ingestion.py
+"""
+Queue-driven ingestion of market analysis run requests.
+
+In production, runs are triggered by Pub/Sub messages. This module provides the
+consumer side plus two local stand-ins for the topic subscription:
+
+- `InMemoryRunQueue`: an asyncio queue, for tests and embedding.
+- `FileRunQueue`: a spool directory (one JSON file per message) that survives
+  restarts, for local development.
+
+`RunRequestConsumer` pulls requests, merges duplicates for the same
+(exchanges, run_type, window), runs them on a bounded worker pool, stops
+pulling while the data providers are saturated and acks a message only once a
+report has been produced for it.
+
+Usage:
+    python -m market_analyst.ingestion publish --spool-dir data/run_queue \
+        --exchanges NASDAQ TSX
+    python -m market_analyst.ingestion serve --spool-dir data/run_queue --workers 4 \
+        --store data/reports.sqlite3
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from market_analyst.schemas import AnalysisRequest, MarketAnalysisReport
+from market_analyst.structured_logging import configure_logging
+
+RunHandler = Callable[[AnalysisRequest], Awaitable[MarketAnalysisReport]]
+ReportCallback = Callable[[MarketAnalysisReport], Awaitable[None] | None]
+DedupKey = tuple[tuple[str, ...], str, int]
+
+
+class QueuedRunRequest(BaseModel):
+    """A run request as delivered by a queue, with its delivery metadata."""
+
+    message_id: str
+    request: AnalysisRequest
+    published_at: float
+    attempts: int = 0
+
+
+# --- Queues ---
+
+
+class RunRequestQueue(ABC):
+    """Minimal pull-subscription interface modelled on Pub/Sub."""
+
+    @abstractmethod
+    async def publish(self, request: AnalysisRequest) -> str:
+        """Publishes a request and returns its message ID."""
+
+    @abstractmethod
+    async def pull(self, max_messages: int, timeout: float) -> list[QueuedRunRequest]:
+        """Returns up to `max_messages` messages; waits `timeout`s at most for one."""
+
+    @abstractmethod
+    async def ack(self, message: QueuedRunRequest) -> None:
+        """Removes a message permanently."""
+
+    @abstractmethod
+    async def nack(self, message: QueuedRunRequest) -> None:
+        """Returns a message to the queue for redelivery."""
+
+    @abstractmethod
+    async def dead_letter(self, message: QueuedRunRequest) -> None:
+        """Moves a message that keeps failing out of the queue."""
+
+
+class InMemoryRunQueue(RunRequestQueue):
+    """An in-process queue with Pub/Sub-like ack semantics."""
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[QueuedRunRequest] = asyncio.Queue()
+        self.in_flight: dict[str, QueuedRunRequest] = {}
+        self.dead_letters: list[QueuedRunRequest] = []
+
+    async def publish(self, request: AnalysisRequest) -> str:
+        message = QueuedRunRequest(
+            message_id=str(uuid.uuid4()), request=request, published_at=time.time()
+        )
+        await self._queue.put(message)
+        return message.message_id
+
+    async def pull(self, max_messages: int, timeout: float) -> list[QueuedRunRequest]:
+        messages: list[QueuedRunRequest] = []
+        try:
+            messages.append(await asyncio.wait_for(self._queue.get(), timeout))
+        except TimeoutError:
+            return messages
+        while len(messages) < max_messages and not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+        for message in messages:
+            self.in_flight[message.message_id] = message
+        return messages
+
+    async def ack(self, message: QueuedRunRequest) -> None:
+        self.in_flight.pop(message.message_id, None)
+
+    async def nack(self, message: QueuedRunRequest) -> None:
+        self.in_flight.pop(message.message_id, None)
+        await self._queue.put(
+            message.model_copy(update={"attempts": message.attempts + 1})
+        )
+
+    async def dead_letter(self, message: QueuedRunRequest) -> None:
+        self.in_flight.pop(message.message_id, None)
+        self.dead_letters.append(message)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+class FileRunQueue(RunRequestQueue):
+    """
+    A spool-directory queue: `pending/`, `inflight/` and `dead/` hold one JSON file
+    per message.
+
+    A message is claimed by renaming it into `inflight/`, so a crash between pull
+    and ack leaves it there. `recover()` moves such messages back to `pending/`
+    for redelivery. Constructing a queue never does this, because other
+    publishers and consumers may share the spool. `serve` calls it at startup,
+    and only for messages whose claim is older than a lease.
+    """
+
+    def __init__(self, spool_dir: str, poll_interval: float = 0.25):
+        self.spool_dir = spool_dir
+        self.poll_interval = poll_interval
+        for sub_dir in ("pending", "inflight", "dead"):
+            os.makedirs(os.path.join(spool_dir, sub_dir), exist_ok=True)
+
+    def _path(self, sub_dir: str, message_id: str) -> str:
+        return os.path.join(self.spool_dir, sub_dir, f"{message_id}.json")
+
+    def _write(self, sub_dir: str, message: QueuedRunRequest) -> None:
+        path = self._path(sub_dir, message.message_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(message.model_dump_json())
+        os.replace(tmp_path, path)
+
+    def recover(self, min_age_seconds: float = 0.0) -> int:
+        """
+        Returns unacknowledged in-flight messages claimed at least `min_age_seconds`
+        ago to the pending directory, and returns how many were moved.
+        """
+        inflight_dir = os.path.join(self.spool_dir, "inflight")
+        cutoff = time.time() - min_age_seconds
+        recovered = 0
+        for name in os.listdir(inflight_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(inflight_dir, name)
+            try:
+                if os.path.getmtime(path) > cutoff:
+                    continue  # Still within its lease.
+                os.replace(path, os.path.join(self.spool_dir, "pending", name))
+            except FileNotFoundError:
+                continue  # Acked meanwhile.
+            recovered += 1
+        return recovered
+
+    async def publish(self, request: AnalysisRequest) -> str:
+        # Time-ordered IDs keep the spool roughly FIFO when listed by name.
+        message_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        self._write(
+            "pending",
+            QueuedRunRequest(
+                message_id=message_id, request=request, published_at=time.time()
+            ),
+        )
+        return message_id
+
+    def _claim(self, max_messages: int) -> list[QueuedRunRequest]:
+        pending_dir = os.path.join(self.spool_dir, "pending")
+        messages = []
+        for name in sorted(n for n in os.listdir(pending_dir) if n.endswith(".json")):
+            if len(messages) >= max_messages:
+                break
+            message_id = name[: -len(".json")]
+            try:
+                os.replace(
+                    os.path.join(pending_dir, name), self._path("inflight", message_id)
+                )
+                # A rename keeps the publish time; the lease runs from the claim.
+                os.utime(self._path("inflight", message_id))
+            except FileNotFoundError:
+                continue  # Claimed by another consumer.
+            with open(self._path("inflight", message_id), encoding="utf-8") as f:
+                messages.append(QueuedRunRequest.model_validate_json(f.read()))
+        return messages
+
+    async def pull(self, max_messages: int, timeout: float) -> list[QueuedRunRequest]:
+        deadline = time.monotonic() + timeout
+        while True:
+            messages = self._claim(max_messages)
+            if messages or time.monotonic() >= deadline:
+                return messages
+            await asyncio.sleep(self.poll_interval)
+
+    async def ack(self, message: QueuedRunRequest) -> None:
+        try:
+            os.remove(self._path("inflight", message.message_id))
+        except FileNotFoundError:
+            pass
+
+    async def nack(self, message: QueuedRunRequest) -> None:
+        self._write(
+            "pending", message.model_copy(update={"attempts": message.attempts + 1})
+        )
+        await self.ack(message)
+
+    async def dead_letter(self, message: QueuedRunRequest) -> None:
+        self._write("dead", message)
+        await self.ack(message)
+
+
+# --- Consumer ---
+
+
+class ConsumerStats(BaseModel):
+    """Counters describing what a consumer has done so far."""
+
+    received: int = 0
+    merged_duplicates: int = 0
+    runs_started: int = 0
+    runs_completed: int = 0
+    runs_failed: int = 0
+    dead_lettered: int = 0
+    backpressure_waits: int = 0
+
+
+class _RunGroup:
+    """One run and every message that asked for it."""
+
+    def __init__(self, request: AnalysisRequest, message: QueuedRunRequest):
+        self.request = request
+        self.messages = [message]
+
+
+async def _default_handler(request: AnalysisRequest) -> MarketAnalysisReport:
+    from market_analyst.batch import analyze
+
+    return await analyze(request.exchanges, request.run_type, request.as_of)
+
+
+class RunRequestConsumer:
+    """
+    Pulls run requests from a queue and executes them on a bounded worker pool.
+
+    - At most `max_workers` runs execute at once; the consumer only pulls as many
+      messages as it has free workers, so unprocessed work stays in the queue.
+    - Requests with the same exchanges, run type and `dedup_window_seconds`
+      bucket of their as_of time (or publish time for live runs) are merged into
+      one run while it is in flight, and acked together when it finishes.
+      Duplicates arriving within `dedup_window_seconds` after it completed are
+      acked without re-running.
+    - While `is_saturated()` returns True no new messages are pulled.
+    - Messages are acked only after the report has been produced and passed to
+      `on_report`; failed runs are nacked for redelivery, then dead-lettered
+      after `max_attempts`.
+    """
+
+    def __init__(
+        self,
+        queue: RunRequestQueue,
+        handler: RunHandler = _default_handler,
+        max_workers: int = 4,
+        dedup_window_seconds: int = 300,
+        max_attempts: int = 3,
+        is_saturated: Callable[[], bool] | None = None,
+        on_report: ReportCallback | None = None,
+        pull_timeout: float = 1.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.max_workers = max_workers
+        self.dedup_window_seconds = dedup_window_seconds
+        self.max_attempts = max_attempts
+        self.is_saturated = is_saturated or (lambda: False)
+        self.on_report = on_report
+        self.pull_timeout = pull_timeout
+        self.stats = ConsumerStats()
+        self._groups: dict[DedupKey, _RunGroup] = {}
+        self._completed: dict[DedupKey, float] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._slot_freed = asyncio.Event()
+        self._stopping = False
+
+    def dedup_key(self, message: QueuedRunRequest) -> DedupKey:
+        request = message.request
+        instant = request.as_of.timestamp() if request.as_of else message.published_at
+        return (
+            tuple(sorted(request.exchanges)),
+            request.run_type,
+            int(instant // self.dedup_window_seconds),
+        )
+
+    @property
+    def active_runs(self) -> int:
+        return len(self._groups)
+
+    async def _accept(self, message: QueuedRunRequest) -> None:
+        self.stats.received += 1
+        key = self.dedup_key(message)
+        group = self._groups.get(key)
+        if group is not None:
+            group.messages.append(message)
+            self.stats.merged_duplicates += 1
+            return
+        completed_at = self._completed.get(key)
+        if (
+            completed_at is not None
+            and time.monotonic() - completed_at < self.dedup_window_seconds
+        ):
+            self.stats.merged_duplicates += 1
+            await self.queue.ack(message)
+            return
+
+        group = _RunGroup(message.request, message)
+        self._groups[key] = group
+        self.stats.runs_started += 1
+        task = asyncio.create_task(self._execute(key, group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, key: DedupKey, group: _RunGroup) -> None:
+        try:
+            report = await self.handler(group.request)
+            if self.on_report is not None:
+                result = self.on_report(report)
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception:
+            self.stats.runs_failed += 1
+            del self._groups[key]
+            for message in group.messages:
+                if message.attempts + 1 >= self.max_attempts:
+                    self.stats.dead_lettered += 1
+                    await self.queue.dead_letter(message)
+                else:
+                    await self.queue.nack(message)
+        else:
+            self.stats.runs_completed += 1
+            del self._groups[key]
+            self._completed[key] = time.monotonic()
+            for message in group.messages:
+                await self.queue.ack(message)
+        finally:
+            self._slot_freed.set()
+
+    def _prune_completed(self) -> None:
+        cutoff = time.monotonic() - self.dedup_window_seconds
+        for key in [k for k, t in self._completed.items() if t < cutoff]:
+            del self._completed[key]
+
+    async def _wait_for_capacity(self) -> None:
+        while not self._stopping and (
+            self.active_runs >= self.max_workers or self.is_saturated()
+        ):
+            if self.active_runs < self.max_workers:
+                self.stats.backpressure_waits += 1
+            self._slot_freed.clear()
+            try:
+                await asyncio.wait_for(self._slot_freed.wait(), timeout=0.05)
+            except TimeoutError:
+                pass
+
+    async def run(self, stop_when_idle: bool = False) -> None:
+        """
+        Consumes messages until `stop()` is called (or the queue drains, with
+        `stop_when_idle`).
+        """
+        while not self._stopping:
+            await self._wait_for_capacity()
+            if self._stopping:
+                break
+            messages = await self.queue.pull(
+                self.max_workers - self.active_runs, timeout=self.pull_timeout
+            )
+            for message in messages:
+                await self._accept(message)
+            self._prune_completed()
+            if stop_when_idle and not messages and not self._tasks:
+                break
+        await self.drain()
+
+    async def drain(self) -> None:
+        """Waits for every in-flight run to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def stop(self) -> None:
+        """Stops pulling new messages; in-flight runs are allowed to finish."""
+        self._stopping = True
+        self._slot_freed.set()
+
+
+# --- Command Line Interface ---
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Publishes run requests to, or serves them from, a local spool-directory queue."""
+    parser = argparse.ArgumentParser(
+        description="Local run-request queue for the market analyst."
+    )
+    parser.add_argument("--spool-dir", default="data/run_queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    publish_cmd = commands.add_parser("publish", help="Publish one run request.")
+    publish_cmd.add_argument("--exchanges", nargs="+", required=True)
+    publish_cmd.add_argument("--run-type", default="Pre-Market")
+    publish_cmd.add_argument("--as-of", type=datetime.fromisoformat)
+
+    serve_cmd = commands.add_parser(
+        "serve", help="Consume run requests until interrupted."
+    )
+    serve_cmd.add_argument("--workers", type=int, default=4)
+    serve_cmd.add_argument("--max-provider-calls", type=int, default=64)
+    serve_cmd.add_argument(
+        "--data-dir",
+        help="Historical snapshot directory. Uses the mock provider if omitted.",
+    )
+    serve_cmd.add_argument(
+        "--store", help="Save produced reports into this report store (SQLite)."
+    )
+    serve_cmd.add_argument(
+        "--once", action="store_true", help="Exit when the queue is empty."
+    )
+    serve_cmd.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=600.0,
+        help=(
+            "At startup, redeliver in-flight messages claimed longer ago than this "
+            "(left by a crashed consumer)."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    queue = FileRunQueue(args.spool_dir)
+    if args.command == "publish":
+        request = AnalysisRequest(
+            exchanges=args.exchanges, run_type=args.run_type, as_of=args.as_of
+        )
+        print(asyncio.run(queue.publish(request)))
+        return 0
+
+    recovered = queue.recover(min_age_seconds=args.lease_seconds)
+    if recovered:
+        print(f"[OK] Redelivering {recovered} message(s) left in flight")
+
+    from market_analyst.batch import analyze
+    from market_analyst.providers import (
+        ConcurrencyLimitedProvider,
+        HistoricalMarketDataProvider,
+        get_provider,
+    )
+
+    base_provider = (
+        HistoricalMarketDataProvider(args.data_dir) if args.data_dir else get_provider()
+    )
+    provider = ConcurrencyLimitedProvider(
+        base_provider, max_in_flight=args.max_provider_calls
+    )
+    store = None
+    if args.store:
+        from market_analyst.report_store import ReportStore
+
+        store = ReportStore(args.store, batch_size=1)
+
+    async def _handler(request: AnalysisRequest) -> MarketAnalysisReport:
+        return await analyze(
+            request.exchanges, request.run_type, request.as_of, provider=provider
+        )
+
+    def _on_report(report: MarketAnalysisReport) -> None:
+        if store is not None:
+            store.add(report)
+        print(
+            f"[OK] {report.report_id} {report.run_type} {report.analysis_timestamp_utc}"
+        )
+
+    consumer = RunRequestConsumer(
+        queue,
+        handler=_handler,
+        max_workers=args.workers,
+        is_saturated=lambda: provider.saturated,
+        on_report=_on_report,
+    )
+    try:
+        asyncio.run(consumer.run(stop_when_idle=args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+    print(consumer.stats.model_dump_json())
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
@@ -0,0 +1,596 @@
+# /market_analyst/knowledge_index.py
+"""
+Precomputed BM25 retrieval over the day-trading knowledge base.
+
+`build_index()` splits every markdown file of docs/day_trading_knowledge_base
+into passages at its headings (long sections are split further at paragraph
+breaks), tokenizes them and writes a BM25 inverted index into a single binary
+file. Each posting holds its final BM25 weight, so a query just sums the
+postings of its terms and takes the top k. The file is memory-mapped on open:
+nothing is parsed besides a small JSON header, and queries take well under a
+millisecond. Run `tests/benchmark_knowledge_index.py` to measure.
+
+Rebuilds are incremental. Files whose content hash is unchanged keep their
+passages and term counts from the previous index, and only new or edited files
+are re-chunked and re-tokenized. Collection statistics (IDF, average passage
+length) are then recomputed for all postings. If nothing changed, the file is
+not rewritten at all.
+
+A build never overwrites an index file. Each one writes a new version next to
+`index_path` (`kb_index.bin.v1`, `.v2`, ...), and readers open the highest
+version. The file swap therefore works even where a mapped file cannot be
+replaced or deleted, as on Windows. Superseded versions are deleted when
+possible; a version that is still mapped is removed by a later build.
+`get_knowledge_index()` switches to a newer version on its next call.
+
+File layout: an 8-byte magic, the header length (uint64), the JSON header
+(terms, files, passages and array locations), then 8-byte aligned arrays.
+
+Usage:
+    python -m market_analyst.knowledge_index build
+    python -m market_analyst.knowledge_index search \
+        "opening range breakout stop placement" -k 3
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from market_analyst.structured_logging import configure_logging
+
+KB_ROOT = Path(__file__).resolve().parent.parent / "docs" / "day_trading_knowledge_base"
+DEFAULT_INDEX_PATH = os.path.join("data", "kb_index.bin")
+INDEX_PATH_ENV = "MARKET_ANALYST_KB_INDEX"
+
+_MAGIC = b"KBIDX\x00\x01\x00"
+_FORMAT_VERSION = 1
+_ALIGNMENT = 8
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or that "
+    "the their then there these "
+    "this to was were which while will with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased alphanumeric tokens without stopwords; plural endings are folded."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("ies"):
+            token = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def chunk_markdown(text: str, max_chars: int = 2000) -> list[tuple[str, str]]:
+    """
+    Splits markdown into (heading path, passage) pairs, one per section.
+
+    The heading path joins the enclosing headings with " > ". Headings inside
+    code fences are not section breaks. Sections longer than `max_chars` are
+    split at blank lines.
+    """
+    sections: list[tuple[str, list[str]]] = []
+    headings: list[tuple[int, str]] = []
+    lines: list[str] = []
+    in_fence = False
+    for line in text.splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            sections.append((" > ".join(h for _, h in headings), lines))
+            level = len(match.group(1))
+            headings = [h for h in headings if h[0] < level] + [(level, match.group(2))]
+            lines = []
+        lines.append(line)
+    sections.append((" > ".join(h for _, h in headings), lines))
+
+    passages = []
+    for heading, section_lines in sections:
+        body = "\n".join(section_lines).strip()
+        if not body or _HEADING.match(body) and "\n" not in body:
+            continue  # empty, or a heading directly followed by a sub-heading
+        for part in _split_long(body, max_chars):
+            passages.append((heading, part))
+    return passages
+
+
+def _split_long(body: str, max_chars: int) -> Iterator[str]:
+    if len(body) <= max_chars:
+        yield body
+        return
+    part: list[str] = []
+    size = 0
+    for paragraph in re.split(r"\n\s*\n", body):
+        if part and size + len(paragraph) > max_chars:
+            yield "\n\n".join(part)
+            part, size = [], 0
+        part.append(paragraph)
+        size += len(paragraph) + 2
+    if part:
+        yield "\n\n".join(part)
+
+
+class Passage(NamedTuple):
+    """One search hit."""
+
+    score: float
+    path: str
+    heading: str
+    category: str
+    text: str
+
+
+class BuildStats(BaseModel):
+    """What a (re)build did."""
+
+    files_indexed: int = 0
+    files_reused: int = 0
+    files_rebuilt: int = 0
+    files_removed: int = 0
+    passages: int = 0
+    terms: int = 0
+    written: bool = False
+
+
+class _Chunk(NamedTuple):
+    heading: str
+    text: str
+    term_counts: dict[str, int]
+
+
+class KnowledgeIndex:
+    """A memory-mapped BM25 index file.
+
+    Use `search()`; close it (or use it as a context manager) when done.
+    """
+
+    def __init__(self, path: str):
+        # `path` names the index; the file opened is its current version.
+        self.path = current_version(path) or path
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(_MAGIC)] != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a knowledge base index")
+        header_length = int.from_bytes(self._mmap[8:16], "little")
+        self.header: dict[str, Any] = json.loads(self._mmap[16 : 16 + header_length])
+        self.terms: list[str] = self.header["terms"]
+        self._term_ids = {term: i for i, term in enumerate(self.terms)}
+        arrays = {
+            name: np.frombuffer(
+                self._mmap, dtype=np.dtype(dtype), count=count, offset=offset
+            )
+            for name, (offset, dtype, count) in self.header["arrays"].items()
+        }
+        self._term_offsets = arrays["term_offsets"]
+        self._posting_chunks = arrays["posting_chunks"]
+        self._posting_counts = arrays["posting_counts"]
+        self._posting_weights = arrays["posting_weights"]
+        self._text_offsets = arrays["text_offsets"]
+        self._text = arrays["text"]
+        # Per passage: (path, heading, category).
+        self.passages: list[tuple[str, str, str]] = [
+            tuple(p) for p in self.header["passages"]
+        ]
+        self._categories = {
+            category: i
+            for i, category in enumerate(sorted({p[2] for p in self.passages}))
+        }
+        self._passage_categories = np.array(
+            [self._categories[p[2]] for p in self.passages], dtype=np.int32
+        )
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def close(self) -> None:
+        # The arrays are views of the mapping; drop them before unmapping.
+        self._term_offsets = None  # type: ignore[assignment]
+        self._posting_chunks = None  # type: ignore[assignment]
+        self._posting_counts = None  # type: ignore[assignment]
+        self._posting_weights = None  # type: ignore[assignment]
+        self._text_offsets = self._text = None  # type: ignore[assignment]
+        self._mmap.close()
+
+    def __enter__(self) -> "KnowledgeIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def passage_text(self, chunk_id: int) -> str:
+        start, end = (
+            int(self._text_offsets[chunk_id]),
+            int(self._text_offsets[chunk_id + 1]),
+        )
+        return self._text[start:end].tobytes().decode("utf-8")
+
+    def search(
+        self, query: str, k: int = 5, category: str | None = None
+    ) -> list[Passage]:
+        """Returns the `k` best BM25 passages for `query`, optionally by category."""
+        term_ids = {self._term_ids[t] for t in tokenize(query) if t in self._term_ids}
+        if not term_ids or k <= 0:
+            return []
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+            # A term has at most one posting per passage, so the fancy += cannot
+            # collide.
+            scores[self._posting_chunks[start:end]] += self._posting_weights[start:end]
+        if category is not None:
+            if category not in self._categories:
+                return []
+            scores[self._passage_categories != self._categories[category]] = 0.0
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [
+            Passage(float(scores[i]), *self.passages[i], self.passage_text(int(i)))
+            for i in top
+            if scores[i] > 0
+        ]
+
+    def _chunks_by_path(self) -> dict[str, list[_Chunk]]:
+        """Rebuilds each passage's term counts from postings for incremental builds."""
+        term_of_posting = np.repeat(
+            np.arange(len(self.terms)), np.diff(self._term_offsets)
+        )
+        order = np.argsort(self._posting_chunks, kind="stable")
+        bounds = np.searchsorted(
+            self._posting_chunks[order], np.arange(len(self.passages) + 1)
+        )
+        chunks: dict[str, list[_Chunk]] = {}
+        for chunk_id, (path, heading, _) in enumerate(self.passages):
+            postings = order[bounds[chunk_id] : bounds[chunk_id + 1]]
+            counts = {
+                self.terms[t]: int(c)
+                for t, c in zip(
+                    term_of_posting[postings], self._posting_counts[postings]
+                )
+            }
+            chunks.setdefault(path, []).append(
+                _Chunk(heading, self.passage_text(chunk_id), counts)
+            )
+        return chunks
+
+
+def _passage_term_counts(heading: str, text: str) -> dict[str, int]:
+    # The heading path is counted on top of the passage (which contains the innermost
+    # heading
+    # already), so the enclosing sections' titles also match.
+    return dict(Counter(tokenize(heading)) + Counter(tokenize(text)))
+
+
+def _manifest_categories(kb_root: Path) -> dict[str, str]:
+    manifest = kb_root / "manifest.json"
+    if not manifest.exists():
+        return {}
+    with open(manifest, encoding="utf-8") as f:
+        files = json.load(f).get("files", [])
+    return {entry["path"]: entry.get("category", "") for entry in files}
+
+
+def _versions(path: str) -> list[tuple[int, str]]:
+    """The versioned files of the index at `path`, oldest first."""
+    directory, name = os.path.split(path)
+    prefix = f"{name}.v"
+    try:
+        entries = os.listdir(directory or ".")
+    except FileNotFoundError:
+        return []
+    return sorted(
+        (int(entry[len(prefix) :]), os.path.join(directory, entry))
+        for entry in entries
+        if entry.startswith(prefix) and entry[len(prefix) :].isdigit()
+    )
+
+
+def current_version(path: str) -> str | None:
+    """The file holding the newest version of the index at `path`, or None."""
+    versions = _versions(path)
+    if versions:
+        return versions[-1][1]
+    # Indexes written before versioning live at `path` itself.
+    return path if os.path.exists(path) else None
+
+
+def _write_index(
+    path: str,
+    files: dict[str, dict[str, Any]],
+    chunks: list[tuple[str, _Chunk]],
+    settings: dict[str, Any],
+) -> int:
+    """Writes the next version of the index at `path`; returns the number of terms."""
+    k1, b = settings["k1"], settings["b"]
+    postings: dict[str, list[tuple[int, int]]] = {}
+    lengths = np.empty(len(chunks), dtype=np.float64)
+    for chunk_id, (_, chunk) in enumerate(chunks):
+        lengths[chunk_id] = sum(chunk.term_counts.values())
+        for term, count in chunk.term_counts.items():
+            postings.setdefault(term, []).append((chunk_id, count))
+    terms = sorted(postings)
+    term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum([len(postings[t]) for t in terms], out=term_offsets[1:])
+    posting_chunks = np.fromiter(
+        (c for t in terms for c, _ in postings[t]),
+        dtype=np.int32,
+        count=term_offsets[-1],
+    )
+    posting_counts = np.fromiter(
+        (n for t in terms for _, n in postings[t]),
+        dtype=np.int32,
+        count=term_offsets[-1],
+    )
+
+    # BM25 weight of every posting, with the IDF of its term.
+    average_length = float(lengths.mean()) if len(chunks) else 0.0
+    document_frequency = np.diff(term_offsets).astype(np.float64)
+    idf = np.log1p(
+        (len(chunks) - document_frequency + 0.5) / (document_frequency + 0.5)
+    )
+    tf = posting_counts.astype(np.float64)
+    norm = k1 * (1.0 - b + b * lengths[posting_chunks] / max(average_length, 1e-9))
+    posting_weights = (
+        np.repeat(idf, np.diff(term_offsets)) * tf * (k1 + 1.0) / (tf + norm)
+    ).astype(np.float32)
+
+    encoded = [chunk.text.encode("utf-8") for _, chunk in chunks]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=text_offsets[1:])
+    text = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    arrays = {
+        "term_offsets": term_offsets,
+        "posting_chunks": posting_chunks,
+        "posting_counts": posting_counts,
+        "posting_weights": posting_weights,
+        "text_offsets": text_offsets,
+        "text": text,
+    }
+    header: dict[str, Any] = {
+        "version": _FORMAT_VERSION,
+        "settings": settings,
+        "average_length": average_length,
+        "terms": terms,
+        "files": files,
+        "passages": [(p, chunk.heading, files[p]["category"]) for p, chunk in chunks],
+    }
+
+    # Array offsets depend on the header size and vice versa: lay out with a placeholder
+    # first.
+    def _layout(header_bytes: int) -> tuple[dict[str, Any], int]:
+        offset = _aligned(16 + header_bytes)
+        locations = {}
+        for name, array in arrays.items():
+            locations[name] = (offset, array.dtype.str, int(array.size))
+            offset = _aligned(offset + array.nbytes)
+        return locations, offset
+
+    header["arrays"], _ = _layout(0)
+    encoded_header = json.dumps(header).encode("utf-8")
+    while True:
+        header["arrays"], _ = _layout(len(encoded_header))
+        candidate = json.dumps(header).encode("utf-8")
+        if len(candidate) == len(encoded_header):
+            encoded_header = candidate
+            break
+        encoded_header = candidate
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    previous = _versions(path)
+    target = f"{path}.v{previous[-1][0] + 1 if previous else 1}"
+    temporary = f"{path}.tmp-{os.getpid()}"
+    with open(temporary, "wb") as f:
+        f.write(_MAGIC)
+        f.write(len(encoded_header).to_bytes(8, "little"))
+        f.write(encoded_header)
+        for name, array in arrays.items():
+            f.write(b"\x00" * (header["arrays"][name][0] - f.tell()))
+            f.write(array.tobytes())
+    # A fresh name, so no file that a reader may have mapped is replaced.
+    os.rename(temporary, target)
+    for stale in [p for _, p in previous] + ([path] if os.path.exists(path) else []):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass  # still mapped (Windows): a later build removes it
+    return len(terms)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def build_index(
+    kb_root: str | None = None,
+    index_path: str = DEFAULT_INDEX_PATH,
+    k1: float = 1.2,
+    b: float = 0.75,
+    max_chunk_chars: int = 2000,
+    full: bool = False,
+) -> BuildStats:
+    """
+    Builds or incrementally updates the index of `kb_root` at `index_path`.
+
+    Files with the same content hash as in the existing index are not re-read
+    into passages; `full=True` rebuilds everything. Changing k1, b or
+    `max_chunk_chars` also forces a full rebuild.
+    """
+    root = Path(kb_root) if kb_root else KB_ROOT
+    settings = {"k1": k1, "b": b, "max_chunk_chars": max_chunk_chars}
+    categories = _manifest_categories(root)
+
+    previous_files: dict[str, dict[str, Any]] = {}
+    previous_chunks: dict[str, list[_Chunk]] = {}
+    if not full and current_version(index_path):
+        try:
+            with KnowledgeIndex(index_path) as previous:
+                if (
+                    previous.header["version"] == _FORMAT_VERSION
+                    and previous.header["settings"] == settings
+                ):
+                    previous_files = previous.header["files"]
+                    previous_chunks = previous._chunks_by_path()
+        except (ValueError, KeyError, json.JSONDecodeError):
+            pass  # unreadable or from another version: rebuild from scratch
+
+    stats = BuildStats()
+    files: dict[str, dict[str, Any]] = {}
+    chunks: list[tuple[str, _Chunk]] = []
+    for file_path in sorted(root.rglob("*.md")):
+        relative = file_path.relative_to(root).as_posix()
+        content = file_path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        category = categories.get(relative) or (
+            relative.split("/")[0] if "/" in relative else "general"
+        )
+        files[relative] = {"sha256": digest, "category": category}
+        stats.files_indexed += 1
+        if (
+            previous_files.get(relative, {}).get("sha256") == digest
+            and relative in previous_chunks
+        ):
+            file_chunks = previous_chunks[relative]
+            stats.files_reused += 1
+        else:
+            file_chunks = [
+                _Chunk(heading, text, _passage_term_counts(heading, text))
+                for heading, text in chunk_markdown(
+                    content.decode("utf-8"), max_chunk_chars
+                )
+            ]
+            stats.files_rebuilt += 1
+        chunks.extend((relative, chunk) for chunk in file_chunks)
+    stats.files_removed = len(set(previous_files) - set(files))
+    stats.passages = len(chunks)
+
+    unchanged = (
+        stats.files_rebuilt == 0
+        and stats.files_removed == 0
+        and all(
+            previous_files[p]["category"] == f["category"] for p, f in files.items()
+        )
+    )
+    if unchanged and previous_files:
+        stats.terms = len({term for _, chunk in chunks for term in chunk.term_counts})
+        return stats
+    stats.terms = _write_index(index_path, files, chunks, settings)
+    stats.written = True
+    return stats
+
+
+_default_index: KnowledgeIndex | None = None
+
+
+def get_knowledge_index() -> KnowledgeIndex:
+    """
+    The shared index at $MARKET_ANALYST_KB_INDEX (default data/kb_index.bin),
+    built on first use if missing.
+
+    Moves to the newest version when a build has written one since the last call.
+    """
+    global _default_index
+    path = os.environ.get(INDEX_PATH_ENV, DEFAULT_INDEX_PATH)
+    latest = current_version(path)
+    if latest is None:
+        build_index(index_path=path)
+        latest = current_version(path)
+    if _default_index is None or _default_index.path != latest:
+        # The previous index is not closed: a caller may still hold it, and its mapping
+        # is freed with it.
+        _default_index = KnowledgeIndex(path)
+    return _default_index
+
+
+def search_knowledge_base(
+    query: str, top_k: int = 5, category: str | None = None
+) -> dict[str, Any]:
+    """
+    Searches the day-trading knowledge base and returns the most relevant passages.
+
+    Args:
+        query: What to look up, e.g. "gap and go entry criteria".
+        top_k: Maximum number of passages to return.
+        category: Optional manifest category to restrict the search to
+            (e.g. "strategies").
+
+    Returns:
+        A dict with "passages": a list of
+        {"path", "heading", "category", "score", "text"}.
+    """
+    return {
+        "passages": [
+            hit._asdict()
+            for hit in get_knowledge_index().search(query, top_k, category)
+        ]
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Builds or queries the knowledge base index from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Build or query the knowledge base retrieval index."
+    )
+    parser.add_argument(
+        "--index", default=os.environ.get(INDEX_PATH_ENV, DEFAULT_INDEX_PATH)
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser(
+        "build", help="Build or incrementally update the index."
+    )
+    build.add_argument(
+        "--kb",
+        help="Knowledge base directory (default: docs/day_trading_knowledge_base).",
+    )
+    build.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the existing index and rebuild everything.",
+    )
+    search = commands.add_parser("search", help="Print the best passages for a query.")
+    search.add_argument("query")
+    search.add_argument("-k", type=int, default=5)
+    search.add_argument("--category")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        stats = build_index(args.kb, args.index, full=args.full)
+        action = "written" if stats.written else "up to date"
+        print(
+            f"{args.index} {action}: {stats.passages} passages, {stats.terms} terms "
+            f"from {stats.files_indexed} files "
+            f"({stats.files_rebuilt} re-chunked, {stats.files_reused} reused, "
+            f"{stats.files_removed} removed)"
+        )
+        return 0
+    with KnowledgeIndex(args.index) as index:
+        for hit in index.search(args.query, args.k, args.category):
+            print(f"[{hit.score:6.2f}] {hit.path} :: {hit.heading}")
+            print("    " + hit.text[:300].replace("\n", "\n    "))
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
@@ -0,0 +1,491 @@
+# /market_analyst/load_test.py
+"""
+Concurrent-session load test for `root_agent`.
+
+Sessions are started open-loop: arrival times follow a fixed schedule (a linear
+ramp up to `rate` sessions per second, then constant) and do not wait for
+earlier sessions to finish, so a saturated instance shows up as growing latency
+and backlog rather than as a quietly reduced request rate. Every session runs
+the real MarketAnalysisCoordinator through an ADK Runner with an in-memory
+session service, against a stub provider whose latency and fan-out (gappers per
+exchange, i.e. ParallelAgent children) are configurable.
+
+The report covers throughput, session latency percentiles, event-loop lag (how
+late a 10 ms timer fires) and process memory per in-flight session, which is
+what Cloud Run concurrency has to be sized against.
+
+Usage:
+    python -m market_analyst.load_test --sessions 200 --rate 40 --ramp-seconds 5 \
+        --exchanges NASDAQ TSX --gappers 20 --latency-ms 50 --jitter 0.3
+    python -m market_analyst.load_test --sessions 20 --rate 5 --gappers 10 100 500 1000
+    python -m market_analyst.load_test --provider simulated --gappers 50 \
+        --server-error-rate 0.01 --timeout-rate 0.001 --rate-limit-rate 0.02 --resilient
+    python -m market_analyst.load_test --provider simulated --gappers 1000 \
+        --sessions 50 --virtual-time
+
+With --virtual-time the run is on a virtual-time event loop (market_analyst.clock):
+provider latency costs no wall time, and the latencies reported are the modelled
+ones. CPU time does not advance the virtual clock, so event-loop lag reads zero;
+measure it in a real-time run.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+from pydantic import BaseModel
+
+from market_analyst.agent import root_agent
+from market_analyst.clock import run_virtual
+from market_analyst.providers import (
+    FaultModel,
+    LatencyModel,
+    MarketDataProvider,
+    ResilientProvider,
+    SimulatedMarketDataProvider,
+    SimulationConfig,
+    use_provider,
+)
+from market_analyst.providers.mock import DEFAULT_TICKER_DETAILS
+from market_analyst.structured_logging import configure_logging
+
+APP_NAME = "market_analyst_load_test"
+
+_LOOP_LAG_INTERVAL = 0.01
+
+
+class StubLatencyProvider(MarketDataProvider):
+    """
+    Synthetic provider for load tests.
+
+    Returns `gappers_per_exchange` gappers for every exchange and the mock default
+    details for every ticker. Each call sleeps for a latency drawn from a
+    lognormal distribution with the given median and shape (`jitter`, the sigma
+    of the underlying normal); `jitter=0` gives a constant latency.
+    """
+
+    def __init__(
+        self,
+        gappers_per_exchange: int = 20,
+        latency_seconds: float = 0.05,
+        jitter: float = 0.0,
+        seed: int = 0,
+    ):
+        self.gappers_per_exchange = gappers_per_exchange
+        self.latency_seconds = latency_seconds
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+
+    async def _sleep(self) -> None:
+        if self.latency_seconds <= 0:
+            await asyncio.sleep(0)
+        elif self.jitter > 0:
+            await asyncio.sleep(
+                self._rng.lognormvariate(math.log(self.latency_seconds), self.jitter)
+            )
+        else:
+            await asyncio.sleep(self.latency_seconds)
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        await self._sleep()
+        # Exchange-prefixed tickers keep listings (and their enrichment agents) distinct
+        # across exchanges.
+        return [
+            {
+                "ticker": f"{exchange_id}-LT{i:05d}",
+                "gap_percent": 2.0 + i % 9,
+                "pre_market_volume": 250000 + i,
+                "relative_volume": 3.0,
+            }
+            for i in range(self.gappers_per_exchange)
+        ]
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._sleep()
+        return {"vix_ticker": "^VIX", "vix_value": 18.5, "adx_value": 28.1}
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._sleep()
+        return DEFAULT_TICKER_DETAILS
+
+
+class LoadTestResult(BaseModel):
+    """Outcome of one load-test run."""
+
+    sessions: int
+    completed: int
+    failed: int
+    gappers_per_exchange: int
+    elapsed_seconds: float
+    throughput_per_second: float
+    latency_p50_seconds: float
+    latency_p95_seconds: float
+    latency_p99_seconds: float
+    latency_max_seconds: float
+    start_delay_max_seconds: float
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    peak_in_flight: int
+    baseline_rss_mb: float
+    peak_rss_mb: float
+    memory_per_in_flight_session_kb: float
+    retained_per_session_kb: float
+    errors: dict[str, int]
+
+
+def arrival_offsets(
+    sessions: int, rate: float, ramp_seconds: float = 0.0
+) -> list[float]:
+    """
+    Open-loop arrival times (seconds from start) for `sessions` sessions.
+
+    The arrival rate rises linearly from 0 to `rate` over `ramp_seconds`, then
+    stays at `rate`.
+    """
+    offsets: list[float] = []
+    for i in range(sessions):
+        # Cumulative arrivals by time t: rate*t^2/(2*ramp) during the ramp, linear
+        # afterwards.
+        ramp_arrivals = rate * ramp_seconds / 2
+        if i < ramp_arrivals:
+            offsets.append(math.sqrt(2 * i * ramp_seconds / rate))
+        else:
+            offsets.append(ramp_seconds + (i - ramp_arrivals) / rate)
+    return offsets
+
+
+def _rss_bytes() -> int:
+    """
+    Current resident set size, falling back to the peak on platforms without
+    /proc, and to 0 (memory not measured) where `resource` is missing (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    return float(np.percentile(values, q)) if len(values) else 0.0
+
+
+class LoadTest:
+    """Drives open-loop concurrent sessions through an ADK Runner and measures them."""
+
+    def __init__(
+        self,
+        exchanges: Sequence[str] = ("NASDAQ", "TSX"),
+        provider: MarketDataProvider | None = None,
+        agent: BaseAgent = root_agent,
+        keep_sessions: bool = False,
+    ):
+        self.exchanges = list(exchanges)
+        self.provider = provider or StubLatencyProvider()
+        self.keep_sessions = keep_sessions
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(
+            app_name=APP_NAME, agent=agent, session_service=self.session_service
+        )
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._peak_rss = 0
+
+    async def _run_session(self, index: int) -> None:
+        # The stub's gapper count is the fan-out under test, so the screening cap is
+        # lifted.
+        state = {"exchanges": self.exchanges, "screening": {"top_n_per_exchange": None}}
+        session = await self.session_service.create_session(
+            app_name=APP_NAME, user_id=f"load-{index}", state=state
+        )
+        message = genai_types.Content(
+            role="user",
+            parts=[genai_types.Part(text=json.dumps({"exchanges": self.exchanges}))],
+        )
+        final_text = ""
+        async for event in self.runner.run_async(
+            user_id=f"load-{index}", session_id=session.id, new_message=message
+        ):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                final_text = event.content.parts[0].text
+        if not self.keep_sessions:
+            await self.session_service.delete_session(
+                app_name=APP_NAME, user_id=f"load-{index}", session_id=session.id
+            )
+        if not final_text.startswith("{"):
+            raise RuntimeError(final_text.split(":")[0] or "no report produced")
+
+    async def _monitor(self, lags: list[float], stop: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            scheduled = loop.time() + _LOOP_LAG_INTERVAL
+            await asyncio.sleep(_LOOP_LAG_INTERVAL)
+            lags.append(max(0.0, loop.time() - scheduled))
+            self._peak_rss = max(self._peak_rss, _rss_bytes())
+
+    async def run(
+        self, sessions: int, rate: float, ramp_seconds: float = 0.0
+    ) -> LoadTestResult:
+        """Starts `sessions` sessions on the open-loop schedule and awaits them all."""
+        loop = asyncio.get_running_loop()
+        latencies: list[float] = []
+        start_delays: list[float] = []
+        errors: dict[str, int] = {}
+        lags: list[float] = []
+        baseline_rss = self._peak_rss = _rss_bytes()
+        stop_monitor = asyncio.Event()
+        monitor = asyncio.create_task(self._monitor(lags, stop_monitor))
+
+        async def _timed(index: int, scheduled_at: float) -> None:
+            start_delays.append(loop.time() - scheduled_at)
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                await self._run_session(index)
+                latencies.append(loop.time() - scheduled_at)
+            except Exception as e:
+                key = f"{type(e).__name__}: {e}"
+                errors[key] = errors.get(key, 0) + 1
+            finally:
+                self._in_flight -= 1
+
+        with use_provider(self.provider):
+            started = loop.time()
+            tasks = []
+            for index, offset in enumerate(
+                arrival_offsets(sessions, rate, ramp_seconds)
+            ):
+                delay = started + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(_timed(index, started + offset)))
+            await asyncio.gather(*tasks)
+            elapsed = loop.time() - started
+
+        stop_monitor.set()
+        await monitor
+        final_rss = _rss_bytes()
+        peak_rss = max(self._peak_rss, final_rss)
+        return LoadTestResult(
+            sessions=sessions,
+            completed=len(latencies),
+            failed=sessions - len(latencies),
+            gappers_per_exchange=getattr(
+                getattr(self.provider, "inner", self.provider),
+                "gappers_per_exchange",
+                0,
+            ),
+            elapsed_seconds=elapsed,
+            throughput_per_second=len(latencies) / elapsed if elapsed > 0 else 0.0,
+            latency_p50_seconds=_percentile(latencies, 50),
+            latency_p95_seconds=_percentile(latencies, 95),
+            latency_p99_seconds=_percentile(latencies, 99),
+            latency_max_seconds=max(latencies, default=0.0),
+            start_delay_max_seconds=max(start_delays, default=0.0),
+            loop_lag_p50_ms=_percentile(lags, 50) * 1000,
+            loop_lag_p99_ms=_percentile(lags, 99) * 1000,
+            loop_lag_max_ms=max(lags, default=0.0) * 1000,
+            peak_in_flight=self._peak_in_flight,
+            baseline_rss_mb=baseline_rss / 1e6,
+            peak_rss_mb=peak_rss / 1e6,
+            memory_per_in_flight_session_kb=(peak_rss - baseline_rss)
+            / max(self._peak_in_flight, 1)
+            / 1024,
+            retained_per_session_kb=(final_rss - baseline_rss)
+            / max(sessions, 1)
+            / 1024,
+            errors=errors,
+        )
+
+
+def _print_result(result: LoadTestResult) -> None:
+    print(
+        f"gappers/exchange={result.gappers_per_exchange:<5} "
+        f"completed={result.completed}/{result.sessions} "
+        f"throughput={result.throughput_per_second:.1f}/s "
+        f"latency p50={result.latency_p50_seconds:.3f}s "
+        f"p95={result.latency_p95_seconds:.3f}s "
+        f"p99={result.latency_p99_seconds:.3f}s "
+        f"loop lag p99={result.loop_lag_p99_ms:.1f}ms "
+        f"max={result.loop_lag_max_ms:.1f}ms "
+        f"peak in-flight={result.peak_in_flight} "
+        f"mem/in-flight session={result.memory_per_in_flight_session_kb:.0f}KiB "
+        f"retained/session={result.retained_per_session_kb:.1f}KiB"
+    )
+    for error, count in result.errors.items():
+        print(f"  [FAIL x{count}] {error}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs one load test per requested fan-out and prints a line per run."""
+    parser = argparse.ArgumentParser(
+        description="Load-test root_agent with concurrent in-memory sessions."
+    )
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument(
+        "--rate", type=float, default=20.0, help="Target session arrivals per second."
+    )
+    parser.add_argument(
+        "--ramp-seconds",
+        type=float,
+        default=0.0,
+        help="Ramp the arrival rate up from 0 over this long.",
+    )
+    parser.add_argument("--exchanges", nargs="+", default=["NASDAQ", "TSX"])
+    parser.add_argument(
+        "--gappers",
+        type=int,
+        nargs="+",
+        default=[20],
+        help=(
+            "Gappers per exchange (ParallelAgent fan-out). "
+            "Several values run one test each."
+        ),
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=50.0,
+        help="Median provider latency; 0 stubs it out.",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Lognormal sigma of the provider latency.",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=("stub", "simulated"),
+        default="stub",
+        help=(
+            "stub: fixed details for every ticker; "
+            "simulated: synthetic universe with fault injection."
+        ),
+    )
+    parser.add_argument(
+        "--server-error-rate",
+        type=float,
+        default=0.0,
+        help="Share of simulated calls failing with a 5xx.",
+    )
+    parser.add_argument(
+        "--timeout-rate",
+        type=float,
+        default=0.0,
+        help="Share of simulated calls that hang, then time out.",
+    )
+    parser.add_argument(
+        "--rate-limit-rate",
+        type=float,
+        default=0.0,
+        help="Share of simulated calls rejected with a 429.",
+    )
+    parser.add_argument(
+        "--tail-probability",
+        type=float,
+        default=0.0,
+        help="Share of simulated calls that are 20x slower.",
+    )
+    parser.add_argument(
+        "--resilient",
+        action="store_true",
+        help="Wrap the provider with hedging, circuit breakers and cached fallback.",
+    )
+    parser.add_argument(
+        "--keep-sessions",
+        action="store_true",
+        help="Do not delete sessions after they finish.",
+    )
+    parser.add_argument(
+        "--output", help="Write the results as JSON lines to this file."
+    )
+    parser.add_argument(
+        "--virtual-time",
+        action="store_true",
+        help=(
+            "Run on a virtual-time event loop: simulated latency takes no wall time "
+            "and runs are repeatable."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    results = []
+    for gappers in args.gappers:
+        if args.provider == "simulated":
+            provider: MarketDataProvider = SimulatedMarketDataProvider(
+                SimulationConfig(
+                    gappers_per_exchange=gappers,
+                    latency={
+                        "default": LatencyModel(
+                            median_seconds=args.latency_ms / 1000,
+                            sigma=args.jitter,
+                            tail_probability=args.tail_probability,
+                        )
+                    },
+                    faults={
+                        "default": FaultModel(
+                            server_error_rate=args.server_error_rate,
+                            timeout_rate=args.timeout_rate,
+                            rate_limit_rate=args.rate_limit_rate,
+                        )
+                    },
+                )
+            )
+        else:
+            provider = StubLatencyProvider(
+                gappers, latency_seconds=args.latency_ms / 1000, jitter=args.jitter
+            )
+        if args.resilient:
+            provider = ResilientProvider(provider)
+        load_test = LoadTest(
+            args.exchanges, provider=provider, keep_sessions=args.keep_sessions
+        )
+        run = load_test.run(args.sessions, args.rate, args.ramp_seconds)
+        result = run_virtual(run) if args.virtual_time else asyncio.run(run)
+        _print_result(result)
+        if isinstance(provider, ResilientProvider):
+            for endpoint, stats in provider.stats().items():
+                print(
+                    f"  {endpoint}: calls={stats.calls} hedges={stats.hedges_fired} "
+                    f"(won {stats.hedge_wins}) breaker trips={stats.breaker_trips} "
+                    f"short-circuited={stats.short_circuited} "
+                    f"fallbacks={stats.fallbacks_served} failures={stats.failures}"
+                )
+        results.append(result)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for result in results:
+                f.write(result.model_dump_json() + "\n")
+    return 0 if all(r.failed == 0 for r in results) else 1
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
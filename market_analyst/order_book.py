@@ -0,0 +1,788 @@
+# /market_analyst/order_book.py
+"""
+Array-backed Level 2 (market-by-price) order books for order-flow features.
+
+An OrderBook keeps, for every symbol (by registry symbol ID), a price ladder of
+`levels` consecutive ticks per side in one preallocated array. A depth update
+(add, modify or delete of a price level) is a single write at the level's ladder
+index; there is no insertion, shifting or per-update allocation. Each symbol's
+ladder window is centred on its first price and re-centred (rarely) when an
+update falls outside it, dropping the levels furthest from the new centre.
+
+Trade prints feed two tape-based features:
+
+* **Absorption.** The volume traded against one side at an unchanged touch price,
+  i.e. aggressive orders filled while the price fails to move. It resets when
+  that side trades at a new price. `absorption` relates it to the size still
+  displayed there: absorbed / (absorbed + displayed), near 1 when far more has
+  traded than was ever shown (an iceberg, or a passive participant refilling).
+* **Cumulative volume delta.** Volume lifting the ask minus volume hitting the
+  bid, over the session.
+
+Metrics (top of book, spread, microprice, depth and imbalance within N ticks
+of the touch, absorption, CVD) are computed on demand, vectorized across
+symbols. Enrichment reads `order_flow_absorption` and `cumulative_volume_delta`
+from the book bound with `use_order_book()`.
+
+Captures are CSV files (timestamp,exchange_id,ticker,action,side,price,size,
+with action add/modify/delete/trade and side bid/ask; a trade's side is the
+resting side it executed against).
+
+Usage:
+    python -m market_analyst.order_book simulate --symbols 500 --updates 2000000
+    python -m market_analyst.order_book simulate --symbols 20 --updates 50000 \
+        --record depth.csv
+    python -m market_analyst.order_book replay depth.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    NamedTuple,
+)
+
+import numpy as np
+
+from market_analyst.structured_logging import configure_logging
+from market_analyst.symbols import SymbolRegistry, get_registry
+
+BID, ASK = 0, 1
+ADD, MODIFY, DELETE, TRADE = 0, 1, 2, 3
+SIDE_NAMES = ("bid", "ask")
+ACTION_NAMES = ("add", "modify", "delete", "trade")
+
+
+class DepthBatch(NamedTuple):
+    """A batch of depth updates and trade prints as parallel arrays in arrival order."""
+
+    symbol_ids: np.ndarray  # int64
+    timestamps: np.ndarray  # float64, epoch seconds
+    actions: np.ndarray  # int8: ADD, MODIFY, DELETE or TRADE
+    sides: np.ndarray  # int8: BID or ASK (for trades, the resting side traded against)
+    prices: np.ndarray  # float64
+    sizes: np.ndarray  # float64: the level's new size, or the traded size
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+
+class BookLevels(NamedTuple):
+    """The best populated levels of one symbol, best first."""
+
+    bid_prices: np.ndarray
+    bid_sizes: np.ndarray
+    ask_prices: np.ndarray
+    ask_sizes: np.ndarray
+
+
+class BookMetrics(NamedTuple):
+    """Order-flow metrics, one element per requested symbol; NaN for an empty side."""
+
+    symbol_ids: np.ndarray
+    best_bid: np.ndarray
+    best_ask: np.ndarray
+    bid_size: np.ndarray
+    ask_size: np.ndarray
+    spread: np.ndarray
+    mid: np.ndarray
+    microprice: np.ndarray
+    bid_depth: np.ndarray  # displayed size within depth_ticks of the best bid
+    ask_depth: np.ndarray
+    imbalance: np.ndarray  # (bid_depth - ask_depth) / (bid_depth + ask_depth)
+    bid_absorbed: np.ndarray  # volume traded against the bid at its current touch price
+    ask_absorbed: np.ndarray
+    bid_absorption: (
+        np.ndarray
+    )  # bid_absorbed / (bid_absorbed + size displayed at that price)
+    ask_absorption: np.ndarray
+    volume_delta: np.ndarray  # ask-side (buy) minus bid-side (sell) traded volume
+    traded_volume: np.ndarray
+
+
+class OrderBook:
+    """
+    Price-ladder order books for many symbols, indexed by symbol ID.
+
+    All state lives in preallocated numpy arrays: `levels` ticks per side per
+    symbol, growing (by doubling the symbol capacity) only when a symbol ID
+    beyond the current capacity arrives. `apply()` ingests a batch with
+    vectorized writes; `update()` handles a single update.
+    """
+
+    # One row per symbol, allocated and grown by `_allocate()`.
+    _sizes: np.ndarray
+    _bases: np.ndarray  # price of ladder index 0
+    _tick_sizes: np.ndarray
+    _touch_ticks: np.ndarray  # price (in ticks) of the side's last trade
+    _absorbed: np.ndarray
+    _volume_deltas: np.ndarray
+    _traded: np.ndarray
+    _update_counts: np.ndarray
+    _last_timestamps: np.ndarray
+
+    def __init__(
+        self, levels: int = 2048, initial_symbols: int = 512, tick_size: float = 0.01
+    ):
+        self.levels = levels
+        self.default_tick_size = tick_size
+        self.dropped_updates = 0
+        self.recenters = 0
+        self._symbols = 0
+        self._scratch = np.zeros((2, levels))
+        self._allocate(initial_symbols)
+
+    def _allocate(self, symbols: int) -> None:
+        def grow(
+            name: str, shape: tuple[int, ...], fill: float, dtype: type = np.float64
+        ) -> None:
+            array: np.ndarray = np.full((symbols,) + shape, fill, dtype=dtype)
+            if self._symbols:
+                array[: self._symbols] = getattr(self, name)
+            setattr(self, name, array)
+
+        grow("_sizes", (2, self.levels), 0.0)
+        grow("_bases", (), np.nan)
+        grow("_tick_sizes", (), self.default_tick_size)
+        grow("_touch_ticks", (2,), -1, dtype=np.int64)
+        grow("_absorbed", (2,), 0.0)
+        grow("_volume_deltas", (), 0.0)
+        grow("_traded", (), 0.0)
+        grow("_update_counts", (), 0, dtype=np.int64)
+        grow("_last_timestamps", (), np.nan)
+        self._symbols = symbols
+
+    def _ensure_capacity(self, max_symbol_id: int) -> None:
+        if max_symbol_id >= self._symbols:
+            symbols = self._symbols
+            while symbols <= max_symbol_id:
+                symbols *= 2
+            self._allocate(symbols)
+
+    def set_tick_size(self, symbol_id: int, tick_size: float) -> None:
+        """Sets a symbol's price increment (e.g. 0.0001 below $1).
+
+        Call it before the symbol's first update.
+        """
+        self._ensure_capacity(symbol_id)
+        self._tick_sizes[symbol_id] = tick_size
+
+    # --- Ladder window ---
+
+    def _center(self, symbol_id: int, price: float) -> None:
+        """Moves the symbol's ladder so `price` sits in the middle.
+
+        Levels that still fall inside the ladder are kept.
+        """
+        tick = self._tick_sizes[symbol_id]
+        new_base = (np.rint(price / tick) - self.levels // 2) * tick
+        old_base = self._bases[symbol_id]
+        if not np.isnan(old_base):
+            shift = int(np.rint((new_base - old_base) / tick))
+            scratch = self._scratch
+            scratch.fill(0.0)
+            if abs(shift) < self.levels:
+                if shift >= 0:
+                    scratch[:, : self.levels - shift] = self._sizes[
+                        symbol_id, :, shift:
+                    ]
+                else:
+                    scratch[:, -shift:] = self._sizes[
+                        symbol_id, :, : self.levels + shift
+                    ]
+            self._sizes[symbol_id] = scratch
+            self.recenters += 1
+        self._bases[symbol_id] = new_base
+
+    # --- Writes ---
+
+    def update(
+        self,
+        symbol_id: int,
+        timestamp: float,
+        action: int,
+        side: int,
+        price: float,
+        size: float,
+    ) -> None:
+        """Applies one depth update or trade print."""
+        self._ensure_capacity(symbol_id)
+        self._update_counts[symbol_id] += 1
+        self._last_timestamps[symbol_id] = timestamp
+        tick = self._tick_sizes[symbol_id]
+        if action == TRADE:
+            self._traded[symbol_id] += size
+            self._volume_deltas[symbol_id] += size if side == ASK else -size
+            price_ticks = int(np.rint(price / tick))
+            if self._touch_ticks[symbol_id, side] == price_ticks:
+                self._absorbed[symbol_id, side] += size
+            else:
+                self._touch_ticks[symbol_id, side] = price_ticks
+                self._absorbed[symbol_id, side] = size
+            return
+        if np.isnan(self._bases[symbol_id]):
+            self._center(symbol_id, price)
+        index = int(np.rint((price - self._bases[symbol_id]) / tick))
+        if not 0 <= index < self.levels:
+            self._center(symbol_id, price)
+            index = int(np.rint((price - self._bases[symbol_id]) / tick))
+        self._sizes[symbol_id, side, index] = 0.0 if action == DELETE else size
+
+    def apply(self, batch: DepthBatch) -> None:
+        """Applies a batch of updates (in arrival order) with vectorized writes."""
+        if len(batch) == 0:
+            return
+        symbol_ids = batch.symbol_ids
+        self._ensure_capacity(int(symbol_ids.max()))
+        np.add.at(self._update_counts, symbol_ids, 1)
+        np.fmax.at(self._last_timestamps, symbol_ids, batch.timestamps)
+
+        trades = batch.actions == TRADE
+        if trades.any():
+            self._apply_trades(
+                symbol_ids[trades],
+                batch.sides[trades],
+                batch.prices[trades],
+                batch.sizes[trades],
+            )
+        depth = ~trades
+        if depth.all():
+            ids, sides, actions, prices, sizes = (
+                symbol_ids,
+                batch.sides,
+                batch.actions,
+                batch.prices,
+                batch.sizes,
+            )
+        else:
+            ids, sides, actions = (
+                symbol_ids[depth],
+                batch.sides[depth],
+                batch.actions[depth],
+            )
+            prices, sizes = batch.prices[depth], batch.sizes[depth]
+        if len(ids) == 0:
+            return
+
+        # Ladders of symbols seen for the first time are centred on their first price.
+        fresh = np.isnan(self._bases[ids])
+        if fresh.any():
+            new_ids, first = np.unique(ids[fresh], return_index=True)
+            for symbol_id, price in zip(
+                new_ids.tolist(), prices[fresh][first].tolist()
+            ):
+                self._center(symbol_id, price)
+        indexes = np.rint((prices - self._bases[ids]) / self._tick_sizes[ids]).astype(
+            np.int64
+        )
+        outside = (indexes < 0) | (indexes >= self.levels)
+        if outside.any():
+            for symbol_id in np.unique(ids[outside]).tolist():
+                self._center(symbol_id, float(np.median(prices[ids == symbol_id])))
+            indexes = np.rint(
+                (prices - self._bases[ids]) / self._tick_sizes[ids]
+            ).astype(np.int64)
+            outside = (indexes < 0) | (indexes >= self.levels)
+            if outside.any():
+                self.dropped_updates += int(outside.sum())
+                keep = ~outside
+                ids, sides, actions, sizes, indexes = (
+                    ids[keep],
+                    sides[keep],
+                    actions[keep],
+                    sizes[keep],
+                    indexes[keep],
+                )
+
+        # Several updates to one level in a batch: the last one wins.
+        keys = (ids * 2 + sides) * self.levels + indexes
+        _, first_from_end = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - first_from_end
+        self._sizes.reshape(-1)[keys[last]] = np.where(
+            actions[last] == DELETE, 0.0, sizes[last]
+        )
+
+    def _apply_trades(
+        self, ids: np.ndarray, sides: np.ndarray, prices: np.ndarray, sizes: np.ndarray
+    ) -> None:
+        self._traded += np.bincount(ids, weights=sizes, minlength=self._symbols)
+        self._volume_deltas += np.bincount(
+            ids, weights=np.where(sides == ASK, sizes, -sizes), minlength=self._symbols
+        )
+
+        # Runs of consecutive trades per (symbol, side) at one price; only the last run
+        # counts as absorbed,
+        # added to the stored volume if the whole batch traded at the stored touch
+        # price.
+        keys = ids * 2 + sides
+        order = np.argsort(keys, kind="stable")
+        keys, sizes = keys[order], sizes[order]
+        price_ticks = np.rint(prices[order] / self._tick_sizes[ids[order]]).astype(
+            np.int64
+        )
+        run_starts = np.flatnonzero(
+            np.r_[True, (keys[1:] != keys[:-1]) | (price_ticks[1:] != price_ticks[:-1])]
+        )
+        run_sums = np.add.reduceat(sizes, run_starts)
+        run_keys = keys[run_starts]
+        first_run = np.r_[True, run_keys[1:] != run_keys[:-1]]
+        last_run = np.r_[run_keys[1:] != run_keys[:-1], True]
+        single_run = first_run & last_run
+        group_keys = run_keys[last_run]
+        group_ticks = price_ticks[run_starts[last_run]]
+
+        touch = self._touch_ticks.reshape(-1)
+        absorbed = self._absorbed.reshape(-1)
+        unchanged = single_run[last_run] & (touch[group_keys] == group_ticks)
+        absorbed[group_keys] = (
+            np.where(unchanged, absorbed[group_keys], 0.0) + run_sums[last_run]
+        )
+        touch[group_keys] = group_ticks
+
+    def reset_session(self, symbol_id: int | None = None) -> None:
+        """Clears the books and trade statistics of one symbol, or of all symbols."""
+        if symbol_id is not None and symbol_id >= self._symbols:
+            return
+        index = slice(None) if symbol_id is None else symbol_id
+        self._sizes[index] = 0.0
+        self._bases[index] = np.nan
+        self._touch_ticks[index] = -1
+        self._absorbed[index] = 0.0
+        self._volume_deltas[index] = 0.0
+        self._traded[index] = 0.0
+        self._update_counts[index] = 0
+        self._last_timestamps[index] = np.nan
+
+    # --- Reads ---
+
+    def update_count(self, symbol_id: int) -> int:
+        """Returns the number of updates and trades applied to a symbol this session."""
+        return int(self._update_counts[symbol_id]) if symbol_id < self._symbols else 0
+
+    def book(self, symbol_id: int, depth: int = 10) -> BookLevels:
+        """Returns up to `depth` populated levels per side, best first."""
+        if self.update_count(symbol_id) == 0 or np.isnan(self._bases[symbol_id]):
+            empty = np.empty(0)
+            return BookLevels(empty, empty, empty, empty)
+        base, tick = self._bases[symbol_id], self._tick_sizes[symbol_id]
+        bids = np.flatnonzero(self._sizes[symbol_id, BID])[::-1][:depth]
+        asks = np.flatnonzero(self._sizes[symbol_id, ASK])[:depth]
+        return BookLevels(
+            base + bids * tick,
+            self._sizes[symbol_id, BID, bids],
+            base + asks * tick,
+            self._sizes[symbol_id, ASK, asks],
+        )
+
+    def metrics(
+        self, symbol_ids: Sequence[int] | None = None, depth_ticks: int = 10
+    ) -> BookMetrics:
+        """Computes the order-flow metrics of `symbol_ids` in one vectorized pass.
+
+        `symbol_ids` defaults to every symbol slot.
+        """
+        if symbol_ids is None:
+            ids = np.arange(self._symbols)
+            bids, asks = self._sizes[:, BID], self._sizes[:, ASK]
+        else:
+            ids = np.asarray(symbol_ids, dtype=np.int64)
+            self._ensure_capacity(int(ids.max()) if len(ids) else 0)
+            bids, asks = self._sizes[ids, BID], self._sizes[ids, ASK]
+        rows = np.arange(len(ids))
+        base, tick = self._bases[ids], self._tick_sizes[ids]
+
+        bid_index = self.levels - 1 - np.argmax(bids[:, ::-1] > 0, axis=1)
+        ask_index = np.argmax(asks > 0, axis=1)
+        bid_size, ask_size = bids[rows, bid_index], asks[rows, ask_index]
+        has_bid, has_ask = bid_size > 0, ask_size > 0
+        best_bid = np.where(has_bid, base + bid_index * tick, np.nan)
+        best_ask = np.where(has_ask, base + ask_index * tick, np.nan)
+
+        offsets = np.arange(depth_ticks)
+        bid_columns = bid_index[:, None] - offsets
+        ask_columns = ask_index[:, None] + offsets
+        bid_depth = np.where(
+            bid_columns >= 0, bids[rows[:, None], np.clip(bid_columns, 0, None)], 0.0
+        ).sum(axis=1)
+        ask_depth = np.where(
+            ask_columns < self.levels,
+            asks[rows[:, None], np.clip(ask_columns, None, self.levels - 1)],
+            0.0,
+        ).sum(axis=1)
+        bid_depth, ask_depth = bid_depth * has_bid, ask_depth * has_ask
+
+        # Absorption: traded volume at each side's touch price against the size still
+        # displayed there.
+        absorbed = self._absorbed[ids]
+        touch_ticks = self._touch_ticks[ids]
+        touch_index = (
+            touch_ticks - np.rint(np.nan_to_num(base) / tick).astype(np.int64)[:, None]
+        )
+        displayed = np.zeros_like(absorbed)
+        for side, sizes in ((BID, bids), (ASK, asks)):
+            index = touch_index[:, side]
+            valid = (
+                ~np.isnan(base)
+                & (touch_ticks[:, side] >= 0)
+                & (index >= 0)
+                & (index < self.levels)
+            )
+            displayed[valid, side] = sizes[rows[valid], index[valid]]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total = bid_depth + ask_depth
+            imbalance = np.where(total > 0, (bid_depth - ask_depth) / total, np.nan)
+            microprice = (best_bid * ask_size + best_ask * bid_size) / (
+                bid_size + ask_size
+            )
+            absorption = np.where(absorbed > 0, absorbed / (absorbed + displayed), 0.0)
+        return BookMetrics(
+            symbol_ids=ids,
+            best_bid=best_bid,
+            best_ask=best_ask,
+            bid_size=bid_size,
+            ask_size=ask_size,
+            spread=best_ask - best_bid,
+            mid=(best_bid + best_ask) / 2,
+            microprice=microprice,
+            bid_depth=bid_depth,
+            ask_depth=ask_depth,
+            imbalance=imbalance,
+            bid_absorbed=absorbed[:, BID],
+            ask_absorbed=absorbed[:, ASK],
+            bid_absorption=absorption[:, BID],
+            ask_absorption=absorption[:, ASK],
+            volume_delta=self._volume_deltas[ids],
+            traded_volume=self._traded[ids],
+        )
+
+    def order_flow_features(self, symbol_id: int) -> dict[str, float] | None:
+        """
+        The ChartClarityComponents order-flow values of a symbol, or None without data.
+
+        order_flow_absorption is the stronger side's absorption (0..1);
+        cumulative_volume_delta is the session delta over traded volume (-1..1).
+        """
+        if self.update_count(symbol_id) == 0:
+            return None
+        m = self.metrics([symbol_id])
+        traded = float(m.traded_volume[0])
+        return {
+            "order_flow_absorption": float(
+                max(m.bid_absorption[0], m.ask_absorption[0])
+            ),
+            "cumulative_volume_delta": float(m.volume_delta[0]) / traded
+            if traded > 0
+            else 0.0,
+        }
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the books' arrays."""
+        return sum(
+            a.nbytes
+            for a in (
+                self._sizes,
+                self._bases,
+                self._tick_sizes,
+                self._touch_ticks,
+                self._absorbed,
+                self._volume_deltas,
+                self._traded,
+                self._update_counts,
+                self._last_timestamps,
+                self._scratch,
+            )
+        )
+
+
+_active_order_book: ContextVar[OrderBook | None] = ContextVar(
+    "order_book", default=None
+)
+
+
+def get_order_book() -> OrderBook | None:
+    """Returns the order book bound to the current context, if any."""
+    return _active_order_book.get()
+
+
+@contextmanager
+def use_order_book(book: OrderBook) -> Iterator[OrderBook]:
+    """Binds `book` for the current context; enrichment reads its order-flow data."""
+    token = _active_order_book.set(book)
+    try:
+        yield book
+    finally:
+        _active_order_book.reset(token)
+
+
+# --- Sources ---
+
+DEPTH_FILE_COLUMNS = [
+    "timestamp",
+    "exchange_id",
+    "ticker",
+    "action",
+    "side",
+    "price",
+    "size",
+]
+
+
+class SimulatedDepthSource:
+    """
+    Seeded synthetic depth stream: level updates scattered around a random-walk
+    mid of each listing, with a share of trades at the touch. Intended for
+    throughput testing; unlike a real feed it does not clear levels the mid
+    walks through.
+    """
+
+    def __init__(
+        self,
+        listings: Sequence[tuple[str, str]],
+        updates: int = 1_000_000,
+        batch_size: int = 5000,
+        trade_ratio: float = 0.05,
+        delete_ratio: float = 0.25,
+        tick_size: float = 0.01,
+        seed: int = 0,
+        start_timestamp: float = 0.0,
+        registry: SymbolRegistry | None = None,
+    ):
+        registry = registry if registry is not None else get_registry()
+        self.symbol_ids = np.array(
+            [registry.intern(e, t) for e, t in listings], dtype=np.int64
+        )
+        self.updates = updates
+        self.batch_size = batch_size
+        self.trade_ratio = trade_ratio
+        self.delete_ratio = delete_ratio
+        self.tick_size = tick_size
+        self.start_timestamp = start_timestamp
+        self._rng = np.random.default_rng(seed)
+        self._mid_ticks = np.rint(
+            self._rng.uniform(5.0, 250.0, len(self.symbol_ids)) / tick_size
+        )
+
+    def batches(self) -> Iterator[DepthBatch]:
+        produced = 0
+        while produced < self.updates:
+            size = min(self.batch_size, self.updates - produced)
+            yield self._next_batch(produced, size)
+            produced += size
+
+    def _next_batch(self, offset: int, size: int) -> DepthBatch:
+        rng = self._rng
+        self._mid_ticks += rng.integers(-1, 2, len(self._mid_ticks))
+        picks = rng.integers(0, len(self.symbol_ids), size)
+        sides = rng.integers(0, 2, size).astype(np.int8)
+        direction = np.where(sides == BID, -1, 1)
+        distance = np.minimum(rng.geometric(0.15, size) - 1, 50)
+        roll = rng.random(size)
+        actions = np.where(
+            roll < self.trade_ratio,
+            TRADE,
+            np.where(roll < self.trade_ratio + self.delete_ratio, DELETE, MODIFY),
+        ).astype(np.int8)
+        distance[actions == TRADE] = 0
+        prices = (self._mid_ticks[picks] + direction * (1 + distance)) * self.tick_size
+        sizes = rng.integers(1, 50, size).astype(np.float64) * 100.0
+        timestamps = self.start_timestamp + (offset + np.arange(size)) * 1e-5
+        return DepthBatch(
+            self.symbol_ids[picks],
+            timestamps,
+            actions,
+            sides,
+            np.round(prices, 6),
+            sizes,
+        )
+
+
+class ReplayDepthSource:
+    """
+    Replays a recorded depth capture
+    (timestamp,exchange_id,ticker,action,side,price,size).
+
+    `speed=None` replays as fast as possible; otherwise recorded gaps are honoured
+    scaled by 1/speed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 5000,
+        speed: float | None = None,
+        registry: SymbolRegistry | None = None,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.speed = speed
+        self.registry = registry if registry is not None else get_registry()
+
+    def batches(self) -> Iterator[DepthBatch]:
+        """Yields the recorded updates in batches, without pacing."""
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != DEPTH_FILE_COLUMNS:
+                raise ValueError(
+                    f"{self.path} is not a depth file (expected header "
+                    f"{','.join(DEPTH_FILE_COLUMNS)})"
+                )
+            rows: list[list[str]] = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) == self.batch_size:
+                    yield self._to_batch(rows)
+                    rows = []
+            if rows:
+                yield self._to_batch(rows)
+
+    def _to_batch(self, rows: list[list[str]]) -> DepthBatch:
+        intern = self.registry.intern
+        actions = {name: code for code, name in enumerate(ACTION_NAMES)}
+        sides = {name: code for code, name in enumerate(SIDE_NAMES)}
+        return DepthBatch(
+            np.array([intern(r[1], r[2]) for r in rows], dtype=np.int64),
+            np.array([float(r[0]) for r in rows]),
+            np.array([actions[r[3]] for r in rows], dtype=np.int8),
+            np.array([sides[r[4]] for r in rows], dtype=np.int8),
+            np.array([float(r[5]) for r in rows]),
+            np.array([float(r[6]) for r in rows]),
+        )
+
+    async def __aiter__(self) -> AsyncIterator[DepthBatch]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first_timestamp: float | None = None
+        for batch in self.batches():
+            if self.speed:
+                if first_timestamp is None:
+                    first_timestamp = float(batch.timestamps[0])
+                delay = (
+                    started
+                    + (float(batch.timestamps[-1]) - first_timestamp) / self.speed
+                    - loop.time()
+                )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            yield batch
+
+
+def write_depth_file(
+    path: str, batches: Iterator[DepthBatch], registry: SymbolRegistry | None = None
+) -> int:
+    """Records depth batches in the CSV layout ReplayDepthSource reads.
+
+    Returns the number of updates written.
+    """
+    registry = registry if registry is not None else get_registry()
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(DEPTH_FILE_COLUMNS)
+        for batch in batches:
+            for symbol_id, timestamp, action, side, price, size in zip(
+                batch.symbol_ids.tolist(),
+                batch.timestamps.tolist(),
+                batch.actions.tolist(),
+                batch.sides.tolist(),
+                batch.prices.tolist(),
+                batch.sizes.tolist(),
+            ):
+                exchange_id, ticker = registry.listing(symbol_id)
+                writer.writerow(
+                    (
+                        f"{timestamp:.6f}",
+                        exchange_id,
+                        ticker,
+                        ACTION_NAMES[action],
+                        SIDE_NAMES[side],
+                        price,
+                        size,
+                    )
+                )
+                count += 1
+    return count
+
+
+def _synthetic_listings(count: int) -> list[tuple[str, str]]:
+    return [("SIM", f"SIM{i:04d}") for i in range(count)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Feeds a simulated or recorded depth stream through an OrderBook; prints rates."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run the L2 order book against a simulated or recorded depth stream."
+        )
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    simulate = subparsers.add_parser("simulate", help="Apply a synthetic depth stream.")
+    simulate.add_argument("--symbols", type=int, default=500)
+    simulate.add_argument("--updates", type=int, default=2_000_000)
+    simulate.add_argument("--batch-size", type=int, default=5000)
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument(
+        "--record",
+        help="Write the synthetic stream to this depth file instead of applying it.",
+    )
+
+    replay = subparsers.add_parser("replay", help="Apply a recorded depth file.")
+    replay.add_argument("path")
+    replay.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument(
+        "--levels", type=int, default=2048, help="Ladder ticks per side per symbol."
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "simulate":
+        source = SimulatedDepthSource(
+            _synthetic_listings(args.symbols),
+            updates=args.updates,
+            batch_size=args.batch_size,
+            seed=args.seed,
+        )
+        if args.record:
+            count = write_depth_file(args.record, source.batches())
+            print(f"Recorded {count} depth updates to {args.record}")
+            return 0
+        batches: Iterator[DepthBatch] = source.batches()
+    else:
+        batches = ReplayDepthSource(args.path, batch_size=args.batch_size).batches()
+
+    book = OrderBook(levels=args.levels)
+    updates = 0
+    applying = 0.0
+    for batch in batches:
+        started = time.perf_counter()
+        book.apply(batch)
+        applying += time.perf_counter() - started
+        updates += len(batch)
+    started = time.perf_counter()
+    metrics = book.metrics()
+    metrics_seconds = time.perf_counter() - started
+    active = int((book._update_counts > 0).sum())
+    rate = updates / applying if applying > 0 else 0.0
+    print(
+        f"Applied {updates} updates for {active} symbols in {applying:.2f}s "
+        f"({rate:,.0f} updates/s); "
+        f"metrics for {len(metrics.symbol_ids)} slots in {metrics_seconds * 1000:.1f} "
+        "ms; "
+        f"book {book.nbytes / 1e6:.1f} MB, {book.recenters} recenters, "
+        f"{book.dropped_updates} dropped"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
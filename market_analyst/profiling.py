@@ -0,0 +1,400 @@
+# /market_analyst/profiling.py
+"""
+Opt-in profiling of a MarketAnalysisCoordinator run.
+
+Profiling is switched on per run with `"profile": true` in the session state, or
+for every run with the MARKET_ANALYST_PROFILE=1 environment variable. A profiled
+run records:
+
+* CPU samples of the event-loop thread taken by a background sampling thread,
+  written as folded stacks (`cpu.folded`) that flamegraph.pl, speedscope or
+  inferno render directly. Each stack is rooted at the pipeline stage that was
+  running, so the flame graph splits by stage.
+* A tracemalloc snapshot at every stage boundary, summarised in
+  `allocations.txt` as the top allocation sites per stage and for the whole run.
+* Stage durations and sample counts in `summary.json`.
+
+Output goes to `logs/profiles/<timestamp>_<label>/` (override the root with
+MARKET_ANALYST_PROFILE_DIR).
+
+Several runs can be profiled at once, e.g. concurrent sessions on one instance.
+tracemalloc and the sampling thread are shared and stay on until the last
+profiled run stops, and each CPU sample is credited to the run whose task was
+executing, so one run's flame graph does not contain another's stacks.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import Counter
+from collections.abc import Mapping
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from types import FrameType
+from typing import Any, Optional
+
+PROFILE_ENV_VAR = "MARKET_ANALYST_PROFILE"
+PROFILE_DIR_ENV_VAR = "MARKET_ANALYST_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = os.path.join("logs", "profiles")
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def profiling_requested(state: Mapping[str, Any] | None = None) -> bool:
+    """Returns True if the session state or the environment asks for profiling."""
+    if state is not None and state.get("profile"):
+        return True
+    return os.getenv(PROFILE_ENV_VAR, "").strip().lower() in _TRUE_VALUES
+
+
+# Keep the profiler's own bookkeeping out of the allocation reports.
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread every `interval` seconds from a daemon thread.
+
+    Stacks are aggregated as folded strings (root first, `;`-separated) with a
+    sample count, prefixed with the current `stage`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.005,
+        thread_id: int | None = None,
+        max_depth: int = 128,
+    ):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.max_depth = max_depth
+        self.stage = "startup"
+        self.samples: Counter = Counter()
+
+    @property
+    def sample_count(self) -> int:
+        return sum(self.samples.values())
+
+    def record(self, frame: FrameType) -> None:
+        labels: list[str] = []
+        current: FrameType | None = frame
+        while current is not None and len(labels) < self.max_depth:
+            labels.append(_frame_label(current))
+            current = current.f_back
+        labels.append(f"stage:{self.stage}")
+        self.samples[";".join(reversed(labels))] += 1
+
+    def write_folded(self, path: str) -> None:
+        """Writes the samples in folded-stack format (`frame;frame;frame count`)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# --- Process-wide profiling state ---
+#
+# tracemalloc, the sampling threads and a loop's task factory are shared by every
+# profiled run in the process. They are reference-counted: the first run to start
+# sets them up and the last one to stop tears them down, so concurrent profiled
+# runs do not stop each other's tracing.
+
+_lock = threading.Lock()
+_tracemalloc_users = 0
+_started_tracemalloc = False
+# The run a task belongs to, recorded when the task is created from that run's context.
+_active_run: ContextVar[Optional["RunProfiler"]] = ContextVar(
+    "profiled_run", default=None
+)
+_task_runs: "weakref.WeakKeyDictionary[asyncio.Task[Any], RunProfiler]" = (
+    weakref.WeakKeyDictionary()
+)
+_samplers: dict[int, "_ThreadSampler"] = {}
+_loop_factories: dict[asyncio.AbstractEventLoop, tuple[Any, int]] = {}
+
+
+def _acquire_tracemalloc() -> None:
+    global _tracemalloc_users, _started_tracemalloc
+    with _lock:
+        if _tracemalloc_users == 0:
+            _started_tracemalloc = not tracemalloc.is_tracing()
+            if _started_tracemalloc:
+                tracemalloc.start(25)
+            tracemalloc.reset_peak()
+        _tracemalloc_users += 1
+
+
+def _release_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _started_tracemalloc:
+            tracemalloc.stop()
+
+
+def _tagging_task_factory(previous: Any) -> Any:
+    def factory(
+        loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any
+    ) -> "asyncio.Future[Any]":
+        task = (
+            previous(loop, coro, **kwargs)
+            if previous is not None
+            else asyncio.Task(coro, loop=loop, **kwargs)
+        )
+        run = _active_run.get()
+        if run is not None and isinstance(task, asyncio.Task):
+            _task_runs[task] = run
+        return task
+
+    return factory
+
+
+def _install_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    previous, users = _loop_factories.get(loop, (None, 0))
+    if users == 0:
+        previous = loop.get_task_factory()
+        loop.set_task_factory(_tagging_task_factory(previous))
+    _loop_factories[loop] = (previous, users + 1)
+
+
+def _uninstall_task_factory(loop: asyncio.AbstractEventLoop) -> None:
+    previous, users = _loop_factories.pop(loop)
+    if users > 1:
+        _loop_factories[loop] = (previous, users - 1)
+    elif not loop.is_closed():
+        loop.set_task_factory(previous)
+
+
+class _ThreadSampler:
+    """
+    The sampling thread of one profiled thread, shared by every run profiled on it.
+
+    Each sample goes to the run that owns the asyncio task running at that moment;
+    samples taken outside a run's tasks go to runs profiling the thread as a whole
+    (started without an event loop). Other runs' work is never counted.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.runs: list[RunProfiler] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="market-analyst-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _owner(self) -> Optional["RunProfiler"]:
+        runs = list(self.runs)
+        for loop in {run.loop for run in runs if run.loop is not None}:
+            task = asyncio.current_task(loop)
+            owner = _task_runs.get(task) if task is not None else None
+            if owner is not None and owner in runs:
+                return owner
+        thread_level = [run for run in runs if run.loop is None]
+        return thread_level[-1] if thread_level else None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            owner = self._owner() if frame is not None else None
+            if owner is not None and frame is not None:
+                owner.cpu.record(frame)
+
+
+def _attach_sampler(run: "RunProfiler", thread_id: int) -> None:
+    with _lock:
+        sampler = _samplers.get(thread_id)
+        if sampler is None:
+            sampler = _samplers[thread_id] = _ThreadSampler(thread_id, run.cpu.interval)
+        sampler.runs.append(run)
+
+
+def _detach_sampler(run: "RunProfiler", thread_id: int) -> None:
+    with _lock:
+        sampler = _samplers[thread_id]
+        sampler.runs.remove(run)
+        if sampler.runs:
+            return
+        del _samplers[thread_id]
+    sampler.stop()
+
+
+class RunProfiler:
+    """
+    Profiles one pipeline run: CPU sampling plus a tracemalloc snapshot per stage.
+
+    Call `stage(name)` at every stage boundary and `stop()` once at the end; the
+    reports are written on stop and their directory is returned. Runs may be
+    profiled concurrently: when started from a task, CPU samples are attributed
+    through the run's tasks, so each report holds only its own run's stacks.
+    Allocation snapshots are process-wide and also see concurrent runs.
+    """
+
+    def __init__(
+        self,
+        label: str = "run",
+        output_root: str | None = None,
+        sample_interval: float = 0.005,
+        top_allocations: int = 15,
+    ):
+        self.label = label
+        self.output_root = (
+            output_root or os.getenv(PROFILE_DIR_ENV_VAR) or DEFAULT_PROFILE_DIR
+        )
+        self.top_allocations = top_allocations
+        self.cpu = SamplingProfiler(interval=sample_interval)
+        self.output_dir: str | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._stages: list[tuple[str, float, tracemalloc.Snapshot]] = []
+        self._running = False
+
+    def start(self) -> "RunProfiler":
+        _acquire_tracemalloc()
+        self.cpu.thread_id = threading.get_ident()
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
+        if self.loop is not None:
+            # Tasks created from here on in this context belong to the run.
+            _active_run.set(self)
+            task = asyncio.current_task()
+            if task is not None:
+                _task_runs[task] = self
+            _install_task_factory(self.loop)
+        self._running = True
+        _attach_sampler(self, self.cpu.thread_id)
+        self.stage("startup")
+        return self
+
+    def stage(self, name: str) -> None:
+        """Marks the start of a pipeline stage."""
+        if not self._running:
+            return
+        self.cpu.stage = name
+        self._stages.append((name, time.perf_counter(), _snapshot()))
+
+    def stop(self) -> str | None:
+        """Stops profiling, writes the reports and returns their directory."""
+        if not self._running:
+            return self.output_dir
+        self._running = False
+        assert self.cpu.thread_id is not None
+        _detach_sampler(self, self.cpu.thread_id)
+        if self.loop is not None:
+            _uninstall_task_factory(self.loop)
+            if _active_run.get() is self:
+                _active_run.set(None)
+        end = (None, time.perf_counter(), _snapshot())
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        _release_tracemalloc()
+
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+        self.output_dir = os.path.join(self.output_root, f"{stamp}_{self.label}")
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.cpu.write_folded(os.path.join(self.output_dir, "cpu.folded"))
+
+        boundaries = self._stages + [end]
+        stage_rows: list[dict[str, Any]] = []
+        lines = [
+            f"Top allocation sites for run '{self.label}' (peak traced memory "
+            f"{peak_bytes / 1024:.1f} KiB)",
+            "",
+        ]
+        for (name, started, before), (_, finished, after) in zip(
+            boundaries, boundaries[1:]
+        ):
+            stats = after.compare_to(before, "lineno")
+            stage_rows.append(
+                {
+                    "stage": name,
+                    "seconds": round(finished - started, 6),
+                    "allocated_bytes": sum(
+                        s.size_diff for s in stats if s.size_diff > 0
+                    ),
+                }
+            )
+            lines.extend(
+                self._format_stats(f"stage {name} ({finished - started:.3f}s)", stats)
+            )
+        lines.extend(
+            self._format_stats(
+                "whole run", end[2].compare_to(self._stages[0][2], "lineno")
+            )
+        )
+        with open(
+            os.path.join(self.output_dir, "allocations.txt"), "w", encoding="utf-8"
+        ) as f:
+            f.write("\n".join(lines) + "\n")
+
+        summary = {
+            "label": self.label,
+            "cpu_samples": self.cpu.sample_count,
+            "sample_interval_seconds": self.cpu.interval,
+            "peak_traced_bytes": peak_bytes,
+            "stages": stage_rows,
+        }
+        with open(
+            os.path.join(self.output_dir, "summary.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(summary, f, indent=2)
+        return self.output_dir
+
+    def _format_stats(
+        self, title: str, stats: list[tracemalloc.StatisticDiff]
+    ) -> list[str]:
+        growing = [s for s in stats if s.size_diff > 0][: self.top_allocations]
+        lines = [f"== {title} =="]
+        for stat in growing:
+            frame = stat.traceback[0]
+            lines.append(
+                f"  {stat.size_diff / 1024:>10.1f} KiB  {stat.count_diff:>+7d} blocks "
+                f" {frame.filename}:{frame.lineno}"
+            )
+        if not growing:
+            lines.append("  (no net allocations)")
+        lines.append("")
+        return lines
+
+
+class _DisabledProfiler:
+    """Stand-in used when profiling is off, so call sites need no conditionals."""
+
+    output_dir: str | None = None
+
+    def stage(self, name: str) -> None:
+        pass
+
+    def stop(self) -> str | None:
+        return None
+
+
+def start_run_profiler(
+    state: Mapping[str, Any] | None = None, label: str = "run"
+) -> RunProfiler | _DisabledProfiler:
+    """Starts a RunProfiler if profiling was requested, else a no-op profiler."""
+    if profiling_requested(state):
+        return RunProfiler(label=label).start()
+    return _DisabledProfiler()
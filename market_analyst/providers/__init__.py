@@ -0,0 +1,60 @@
+# /market_analyst/providers/__init__.py
+from .base import (
+    ISSUER_SECTIONS,
+    LISTING_SECTIONS,
+    MarketDataProvider,
+    ProviderError,
+    ProviderTimeoutError,
+    ProviderUnavailableError,
+    RateLimitedError,
+    get_provider,
+    parse_as_of,
+    use_provider,
+)
+from .historical import (
+    HistoricalMarketDataProvider,
+    LookAheadError,
+    SnapshotNotFoundError,
+)
+from .limited import ConcurrencyLimitedProvider
+from .mock import MockMarketDataProvider
+from .resilient import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointStats,
+    ResilienceConfig,
+    ResilientProvider,
+)
+from .simulated import (
+    FaultModel,
+    LatencyModel,
+    SimulatedMarketDataProvider,
+    SimulationConfig,
+)
+
+__all__ = [
+    "ISSUER_SECTIONS",
+    "LISTING_SECTIONS",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ConcurrencyLimitedProvider",
+    "EndpointStats",
+    "FaultModel",
+    "HistoricalMarketDataProvider",
+    "LatencyModel",
+    "LookAheadError",
+    "MarketDataProvider",
+    "MockMarketDataProvider",
+    "ProviderError",
+    "ProviderTimeoutError",
+    "ProviderUnavailableError",
+    "RateLimitedError",
+    "ResilienceConfig",
+    "ResilientProvider",
+    "SimulatedMarketDataProvider",
+    "SimulationConfig",
+    "SnapshotNotFoundError",
+    "get_provider",
+    "parse_as_of",
+    "use_provider",
+]
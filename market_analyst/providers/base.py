@@ -0,0 +1,147 @@
+# /market_analyst/providers/base.py
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+
+class ProviderError(Exception):
+    """Base class for errors raised by market data providers."""
+
+
+class ProviderTimeoutError(ProviderError):
+    """The upstream call did not answer within its deadline."""
+
+
+class ProviderUnavailableError(ProviderError):
+    """The upstream answered with a server error (HTTP 5xx)."""
+
+    def __init__(self, message: str, status: int = 503):
+        super().__init__(message)
+        self.status = status
+
+
+class RateLimitedError(ProviderError):
+    """The upstream rejected the call for exceeding its rate limit (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Ticker-details sections that describe one listing (price, volume, technicals) ...
+LISTING_SECTIONS = (
+    "risk_metrics",
+    "key_technical_levels",
+    "raw_technicals",
+    "chart_clarity_raw_components",
+)
+# ... and those that describe the issuer, shared by all of its cross-listings.
+ISSUER_SECTIONS = ("catalyst_analysis", "fundamental_data")
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of the market data consumed by the analyst tools.
+
+    Every method receives the point in time (`as_of`) the caller is analysing.
+    Live providers may ignore it; historical providers must never return data
+    that was not available at that instant.
+    """
+
+    @abstractmethod
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        """Returns the gapping instruments for an exchange as GapperData dicts."""
+
+    @abstractmethod
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        """Returns the MarketRegime dict for an exchange."""
+
+    @abstractmethod
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        """
+        Returns the enrichment sections of an ObservedInstrument as plain dicts:
+        risk_metrics, catalyst_analysis, key_technical_levels, raw_technicals,
+        chart_clarity_raw_components and fundamental_data.
+        """
+
+    async def get_listing_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        """Returns only the LISTING_SECTIONS of the ticker details."""
+        details = await self.get_ticker_details(ticker, exchange_id, as_of)
+        return {section: details[section] for section in LISTING_SECTIONS}
+
+    async def get_issuer_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        """
+        Returns only the ISSUER_SECTIONS of the ticker details. Enrichment calls this
+        once per issuer, through whichever listing of the issuer it meets first.
+        """
+        details = await self.get_ticker_details(ticker, exchange_id, as_of)
+        return {section: details[section] for section in ISSUER_SECTIONS}
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        """
+        Returns cheap per-ticker metrics used to pre-screen gappers before enrichment,
+        in one call per exchange: average_dollar_volume_30d, float_shares and
+        last_price. Tickers or metrics a provider cannot supply are simply omitted.
+        """
+        return {}
+
+
+_active_provider: ContextVar[MarketDataProvider | None] = ContextVar(
+    "market_data_provider", default=None
+)
+_default_provider: MarketDataProvider | None = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Returns the provider bound to the current context, or the default mock."""
+    global _default_provider
+    provider = _active_provider.get()
+    if provider is not None:
+        return provider
+    if _default_provider is None:
+        from market_analyst.providers.mock import MockMarketDataProvider
+
+        _default_provider = MockMarketDataProvider()
+    return _default_provider
+
+
+@contextmanager
+def use_provider(provider: MarketDataProvider) -> Iterator[MarketDataProvider]:
+    """
+    Binds `provider` for the current context.
+
+    Tasks created inside the block (ADK sub-agents, gathered coroutines) inherit
+    the binding, so concurrent runs can each use their own provider.
+    """
+    token = _active_provider.set(provider)
+    try:
+        yield provider
+    finally:
+        _active_provider.reset(token)
+
+
+def parse_as_of(value: Any | None) -> datetime | None:
+    """Normalises a session-state `as_of` (ISO string or datetime) to aware UTC."""
+    if value is None or value == "":
+        return None
+    parsed = (
+        value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    )
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC)
@@ -0,0 +1,186 @@
+# /market_analyst/providers/historical.py
+"""
+Point-in-time market data read from local snapshot files.
+
+Snapshots are laid out one directory per trading day and one JSON file per
+exchange:
+
+    <data_dir>/2025-08-12/NASDAQ.json
+    {
+        "snapshot_time_utc": "2025-08-12T13:00:00+00:00",
+        "market_regime": {...MarketRegime...},
+        "gappers": [{...GapperData...}, ...],
+        "instruments": {"AAPL": {...ticker details...}, ...},
+        "screening_metrics": {"AAPL": {"float_shares": ..., ...}, ...}   (optional)
+    }
+
+A provider only ever opens the directory of the trading day it is asked about,
+and refuses snapshots captured after the requested `as_of`, so a replay cannot
+see the future. Snapshot files are read in a worker thread and then cached, so
+concurrent runs over different days overlap their file reads.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Any
+
+from market_analyst.providers.base import MarketDataProvider, ProviderError, parse_as_of
+
+
+class SnapshotNotFoundError(ProviderError):
+    """Raised when no snapshot exists for the requested day, exchange or ticker."""
+
+
+class LookAheadError(ProviderError):
+    """Raised when a request would read data captured after its `as_of` time."""
+
+
+def _missing_as_of() -> ProviderError:
+    return ProviderError("HistoricalMarketDataProvider requires an as_of timestamp.")
+
+
+_SNAPSHOT_CACHE_SIZE = 256
+_snapshots: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+# Loads fill the cache from worker threads.
+_snapshots_lock = threading.Lock()
+
+
+def _cached_snapshot(path: str) -> dict[str, Any] | None:
+    with _snapshots_lock:
+        snapshot = _snapshots.get(path)
+        if snapshot is not None:
+            _snapshots.move_to_end(path)
+        return snapshot
+
+
+def _load_snapshot(path: str) -> dict[str, Any]:
+    """Reads a snapshot file into the cache. Blocking: run it via asyncio.to_thread."""
+    with open(path, encoding="utf-8") as f:
+        snapshot: dict[str, Any] = json.load(f)
+    with _snapshots_lock:
+        _snapshots[path] = snapshot
+        if len(_snapshots) > _SNAPSHOT_CACHE_SIZE:
+            _snapshots.popitem(last=False)
+    return snapshot
+
+
+def _clear_snapshot_cache() -> None:
+    with _snapshots_lock:
+        _snapshots.clear()
+
+
+def snapshot_path(data_dir: str, trading_date: date, exchange_id: str) -> str:
+    """Returns the path of the snapshot file for one exchange and trading day."""
+    return os.path.join(data_dir, trading_date.isoformat(), f"{exchange_id}.json")
+
+
+def save_snapshot(
+    data_dir: str, trading_date: date, exchange_id: str, snapshot: dict[str, Any]
+) -> str:
+    """Writes a snapshot file in the layout HistoricalMarketDataProvider reads."""
+    path = snapshot_path(data_dir, trading_date, exchange_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    _clear_snapshot_cache()
+    return path
+
+
+def available_trading_dates(data_dir: str) -> list[date]:
+    """Lists the trading days that have a snapshot directory, in order."""
+    dates = []
+    for entry in os.listdir(data_dir):
+        try:
+            dates.append(date.fromisoformat(entry))
+        except ValueError:
+            continue
+    return sorted(dates)
+
+
+class HistoricalMarketDataProvider(MarketDataProvider):
+    """Serves discovery and enrichment data from per-day snapshot files."""
+
+    def __init__(self, data_dir: str):
+        self.data_dir = data_dir
+
+    async def _snapshot(
+        self, exchange_id: str, as_of: datetime | None
+    ) -> dict[str, Any]:
+        """
+        The cached snapshot itself. Getters return deep copies of it, so a caller
+        that edits a result cannot change what later replays of the day see.
+        """
+        # Naive times (in the request or the file) are UTC, as everywhere else.
+        as_of = parse_as_of(as_of)
+        if as_of is None:
+            raise _missing_as_of()
+        path = snapshot_path(self.data_dir, as_of.date(), exchange_id)
+        snapshot = _cached_snapshot(path)
+        if snapshot is None:
+            try:
+                snapshot = await asyncio.to_thread(_load_snapshot, path)
+            except FileNotFoundError:
+                raise SnapshotNotFoundError(
+                    f"No snapshot for {exchange_id} on {as_of.date().isoformat()}"
+                ) from None
+        captured_at = parse_as_of(snapshot.get("snapshot_time_utc"))
+        if captured_at is not None and captured_at > as_of:
+            raise LookAheadError(
+                f"Snapshot for {exchange_id} was captured at "
+                f"{captured_at.isoformat()}, after as_of {as_of.isoformat()}"
+            )
+        return snapshot
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        return copy.deepcopy((await self._snapshot(exchange_id, as_of))["gappers"])
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return copy.deepcopy(
+            (await self._snapshot(exchange_id, as_of))["market_regime"]
+        )
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        as_of = parse_as_of(as_of)
+        if as_of is None:
+            raise _missing_as_of()
+        instruments = (await self._snapshot(exchange_id, as_of))["instruments"]
+        if ticker not in instruments:
+            raise SnapshotNotFoundError(
+                f"No details for {exchange_id}:{ticker} on {as_of.date().isoformat()}"
+            )
+        return copy.deepcopy(instruments[ticker])
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        snapshot = await self._snapshot(exchange_id, as_of)
+        recorded = snapshot.get("screening_metrics", {})
+        instruments = snapshot["instruments"]
+        metrics = {}
+        for ticker in tickers:
+            ticker_metrics = dict(recorded.get(ticker, {}))
+            details = instruments.get(ticker)
+            if details is not None:
+                # Fall back to the enrichment section of the same snapshot.
+                ticker_metrics.setdefault(
+                    "average_dollar_volume_30d",
+                    details["risk_metrics"]["average_dollar_volume_30d"],
+                )
+                ticker_metrics.setdefault(
+                    "last_price", details["raw_technicals"]["vwap"]
+                )
+            if ticker_metrics:
+                metrics[ticker] = ticker_metrics
+        return metrics
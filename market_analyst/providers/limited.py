@@ -0,0 +1,84 @@
+# /market_analyst/providers/limited.py
+import asyncio
+from collections.abc import Awaitable, Sequence
+from datetime import datetime
+from typing import Any, TypeVar
+
+from market_analyst.providers.base import MarketDataProvider
+
+T = TypeVar("T")
+
+
+class ConcurrencyLimitedProvider(MarketDataProvider):
+    """
+    Caps the number of concurrent calls made to an underlying provider.
+
+    Calls beyond `max_in_flight` wait for a free slot. `saturated` reports when
+    the cap is reached so that upstream producers (e.g. the run-request consumer)
+    can stop taking on new work instead of queueing unbounded calls here.
+    """
+
+    def __init__(self, inner: MarketDataProvider, max_in_flight: int = 64):
+        self.inner = inner
+        self.max_in_flight = max_in_flight
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.waiting = 0
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_in_flight
+
+    async def _call(self, call: Awaitable[T]) -> T:
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            call.close()  # type: ignore[attr-defined]
+            raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            return await call
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._call(self.inner.get_gappers(exchange_id, as_of))
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(self.inner.get_market_regime(exchange_id, as_of))
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            self.inner.get_ticker_details(ticker, exchange_id, as_of)
+        )
+
+    async def get_listing_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            self.inner.get_listing_details(ticker, exchange_id, as_of)
+        )
+
+    async def get_issuer_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            self.inner.get_issuer_details(ticker, exchange_id, as_of)
+        )
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        return await self._call(
+            self.inner.get_screening_metrics(tickers, exchange_id, as_of)
+        )
@@ -0,0 +1,358 @@
+# /market_analyst/providers/mock.py
+import asyncio
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from market_analyst.providers.base import (
+    ISSUER_SECTIONS,
+    LISTING_SECTIONS,
+    MarketDataProvider,
+)
+
+# Mock gappers per exchange to simulate realistic discovery.
+_MOCK_GAPPERS: dict[str, list[dict[str, Any]]] = {
+    "NASDAQ": [
+        {
+            "ticker": "AAPL",
+            "gap_percent": 5.2,
+            "pre_market_volume": 1250000,
+            "relative_volume": 15.3,
+        },
+        {
+            "ticker": "TSLA",
+            "gap_percent": -2.8,
+            "pre_market_volume": 980000,
+            "relative_volume": 8.7,
+        },
+    ],
+    "TSX": [
+        {
+            "ticker": "SHOP.TO",
+            "gap_percent": 3.1,
+            "pre_market_volume": 450000,
+            "relative_volume": 12.5,
+        },
+        {
+            "ticker": "CNR.TO",
+            "gap_percent": -1.5,
+            "pre_market_volume": 320000,
+            "relative_volume": 6.2,
+        },
+    ],
+}
+
+# Default fallback for other exchanges.
+_DEFAULT_GAPPERS: list[dict[str, Any]] = [
+    {
+        "ticker": "DEFAULT",
+        "gap_percent": 0.0,
+        "pre_market_volume": 100000,
+        "relative_volume": 1.0,
+    },
+]
+
+# Enrichment details of the tickers the mock knows about.
+MOCK_TICKER_DETAILS: dict[str, dict[str, Any]] = {
+    "AAPL": {
+        "risk_metrics": {
+            "average_true_range_14d": 3.45,
+            "average_dollar_volume_30d": 15200000000.0,
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": "Earnings Beat",
+            "recent_headlines": [
+                "Apple reports record Q3 earnings, iPhone sales surge"
+            ],
+        },
+        "key_technical_levels": {
+            "pre_market_high": 195.50,
+            "pre_market_low": 192.00,
+            "previous_day_high": 191.75,
+        },
+        "raw_technicals": {
+            "vwap": 194.88,
+            "rsi_14d": 68.2,
+            "macd_12_26_9": {"macd_line": 1.25, "signal_line": 1.10, "histogram": 0.15},
+            "ema_9d": 193.50,
+            "ema_20d": 192.80,
+            "ema_50d": 190.10,
+            "bollinger_bands_20d_2std": {
+                "upper_band": 196.50,
+                "middle_band": 192.80,
+                "lower_band": 189.10,
+                "band_width": 0.038,
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": 0.98,
+            "price_action_rhythm": 0.95,
+            "volatility_character": 0.97,
+            "volume_profile_structure": 0.99,
+            "volume_trend_confirmation": 0.92,
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": "Apple Inc.",
+            "sector": "Technology",
+            "industry": "Consumer Electronics",
+            "market_capitalization": 3100000000000,
+        },
+    },
+    "TSLA": {
+        "risk_metrics": {
+            "average_true_range_14d": 12.75,
+            "average_dollar_volume_30d": 8900000000.0,
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": "Production Update",
+            "recent_headlines": ["Tesla Q3 deliveries miss expectations, stock drops"],
+        },
+        "key_technical_levels": {
+            "pre_market_high": 248.20,
+            "pre_market_low": 242.10,
+            "previous_day_high": 251.80,
+        },
+        "raw_technicals": {
+            "vwap": 245.32,
+            "rsi_14d": 42.8,
+            "macd_12_26_9": {
+                "macd_line": -2.15,
+                "signal_line": -1.85,
+                "histogram": -0.30,
+            },
+            "ema_9d": 244.10,
+            "ema_20d": 248.95,
+            "ema_50d": 255.30,
+            "bollinger_bands_20d_2std": {
+                "upper_band": 262.40,
+                "middle_band": 248.95,
+                "lower_band": 235.50,
+                "band_width": 0.108,
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": 0.85,
+            "price_action_rhythm": 0.78,
+            "volatility_character": 0.92,
+            "volume_profile_structure": 0.88,
+            "volume_trend_confirmation": 0.75,
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": "Tesla Inc.",
+            "sector": "Consumer Cyclical",
+            "industry": "Auto Manufacturers",
+            "market_capitalization": 780000000000,
+        },
+    },
+    "SHOP.TO": {
+        "risk_metrics": {
+            "average_true_range_14d": 5.85,
+            "average_dollar_volume_30d": 450000000.0,
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": "Partnership Announcement",
+            "recent_headlines": ["Shopify announces new AI-powered merchant tools"],
+        },
+        "key_technical_levels": {
+            "pre_market_high": 89.45,
+            "pre_market_low": 86.20,
+            "previous_day_high": 87.30,
+        },
+        "raw_technicals": {
+            "vwap": 87.95,
+            "rsi_14d": 58.3,
+            "macd_12_26_9": {"macd_line": 0.85, "signal_line": 0.72, "histogram": 0.13},
+            "ema_9d": 87.10,
+            "ema_20d": 85.40,
+            "ema_50d": 82.95,
+            "bollinger_bands_20d_2std": {
+                "upper_band": 92.10,
+                "middle_band": 85.40,
+                "lower_band": 78.70,
+                "band_width": 0.157,
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": 0.92,
+            "price_action_rhythm": 0.89,
+            "volatility_character": 0.94,
+            "volume_profile_structure": 0.91,
+            "volume_trend_confirmation": 0.87,
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": "Shopify Inc.",
+            "sector": "Technology",
+            "industry": "Software - Infrastructure",
+            "market_capitalization": 112000000000,
+        },
+    },
+    "CNR.TO": {
+        "risk_metrics": {
+            "average_true_range_14d": 2.95,
+            "average_dollar_volume_30d": 680000000.0,
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": "Quarterly Results",
+            "recent_headlines": ["Canadian National Railway reports steady Q3 volumes"],
+        },
+        "key_technical_levels": {
+            "pre_market_high": 142.85,
+            "pre_market_low": 140.50,
+            "previous_day_high": 143.20,
+        },
+        "raw_technicals": {
+            "vwap": 141.65,
+            "rsi_14d": 48.7,
+            "macd_12_26_9": {
+                "macd_line": -0.45,
+                "signal_line": -0.38,
+                "histogram": -0.07,
+            },
+            "ema_9d": 141.20,
+            "ema_20d": 142.10,
+            "ema_50d": 144.80,
+            "bollinger_bands_20d_2std": {
+                "upper_band": 147.30,
+                "middle_band": 142.10,
+                "lower_band": 136.90,
+                "band_width": 0.073,
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": 0.96,
+            "price_action_rhythm": 0.93,
+            "volatility_character": 0.88,
+            "volume_profile_structure": 0.95,
+            "volume_trend_confirmation": 0.91,
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": "Canadian National Railway Company",
+            "sector": "Industrials",
+            "industry": "Railroads",
+            "market_capitalization": 95000000000,
+        },
+    },
+}
+
+# Details served for any ticker without an entry of its own.
+DEFAULT_TICKER_DETAILS: dict[str, Any] = {
+    "risk_metrics": {
+        "average_true_range_14d": 1.50,
+        "average_dollar_volume_30d": 100000000.0,
+    },
+    "catalyst_analysis": {
+        "primary_catalyst_type": "General Market Movement",
+        "recent_headlines": ["Market volatility continues"],
+    },
+    "key_technical_levels": {
+        "pre_market_high": 50.00,
+        "pre_market_low": 48.50,
+        "previous_day_high": 49.75,
+    },
+    "raw_technicals": {
+        "vwap": 49.25,
+        "rsi_14d": 50.0,
+        "macd_12_26_9": {"macd_line": 0.0, "signal_line": 0.0, "histogram": 0.0},
+        "ema_9d": 49.00,
+        "ema_20d": 49.50,
+        "ema_50d": 50.00,
+        "bollinger_bands_20d_2std": {
+            "upper_band": 52.00,
+            "middle_band": 49.50,
+            "lower_band": 47.00,
+            "band_width": 0.101,
+        },
+    },
+    "chart_clarity_raw_components": {
+        "range_integrity": 0.80,
+        "price_action_rhythm": 0.75,
+        "volatility_character": 0.70,
+        "volume_profile_structure": 0.85,
+        "volume_trend_confirmation": 0.80,
+        "order_flow_absorption": 0.0,
+        "cumulative_volume_delta": 0.0,
+    },
+    "fundamental_data": {
+        "name": "Unknown Company",
+        "sector": "Unknown",
+        "industry": "Unknown",
+        "market_capitalization": 1000000000,
+    },
+}
+
+
+class MockMarketDataProvider(MarketDataProvider):
+    """Returns fixed mock data after a short delay standing in for network latency."""
+
+    def __init__(
+        self,
+        gapper_delay: float = 0.2,
+        regime_delay: float = 0.1,
+        details_delay: float = 0.5,
+        screening_delay: float = 0.05,
+    ):
+        self.gapper_delay = gapper_delay
+        self.regime_delay = regime_delay
+        self.details_delay = details_delay
+        self.screening_delay = screening_delay
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        await asyncio.sleep(self.gapper_delay)
+        return [
+            dict(gapper) for gapper in _MOCK_GAPPERS.get(exchange_id, _DEFAULT_GAPPERS)
+        ]
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await asyncio.sleep(self.regime_delay)
+        vix_ticker = "^VIXC" if exchange_id == "TSX" else "^VIX"
+        return {"vix_ticker": vix_ticker, "vix_value": 18.5, "adx_value": 28.1}
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await asyncio.sleep(self.details_delay)
+        return MOCK_TICKER_DETAILS.get(ticker, DEFAULT_TICKER_DETAILS)
+
+    async def get_listing_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await asyncio.sleep(self.details_delay)
+        details = MOCK_TICKER_DETAILS.get(ticker, DEFAULT_TICKER_DETAILS)
+        return {section: details[section] for section in LISTING_SECTIONS}
+
+    async def get_issuer_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await asyncio.sleep(self.details_delay)
+        details = MOCK_TICKER_DETAILS.get(ticker, DEFAULT_TICKER_DETAILS)
+        return {section: details[section] for section in ISSUER_SECTIONS}
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        await asyncio.sleep(self.screening_delay)
+        metrics = {}
+        for ticker in tickers:
+            details = MOCK_TICKER_DETAILS.get(ticker, DEFAULT_TICKER_DETAILS)
+            last_price = details["raw_technicals"]["vwap"]
+            metrics[ticker] = {
+                "average_dollar_volume_30d": details["risk_metrics"][
+                    "average_dollar_volume_30d"
+                ],
+                "float_shares": details["fundamental_data"]["market_capitalization"]
+                / last_price,
+                "last_price": last_price,
+            }
+        return metrics
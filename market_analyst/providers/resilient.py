@@ -0,0 +1,362 @@
+# /market_analyst/providers/resilient.py
+"""
+Hedged requests, circuit breakers and stale-data fallback for any provider.
+
+A run finishes only when its slowest enrichment does, so one slow provider call
+sets the run latency. ResilientProvider wraps a provider and, per endpoint
+(provider method):
+
+* **Hedging.** Tracks the latency of recent successful calls. When a call has
+  not answered after the observed p95, a duplicate is issued and whichever
+  answers first wins; the loser is cancelled. A hedge budget (a share of all
+  calls) keeps a slow upstream from being hit with twice the load.
+* **Deadline.** Each attempt is bounded by `call_timeout` and fails with
+  ProviderTimeoutError instead of hanging.
+* **Circuit breaker.** After `failure_threshold` consecutive failures the
+  endpoint is open: calls fail fast for `reset_timeout` seconds, then a single
+  probe call decides whether it closes again.
+* **Fallback.** The last good response of every call (per arguments, LRU
+  bounded) is served when the call fails or the breaker is open, as long as it
+  is no older than `max_stale_seconds` on the run clock. Live calls are keyed
+  with `as_of=None`, so without that limit a long-lived provider would answer
+  today's failed call with yesterday's data. With nothing fresh enough cached,
+  the error propagates (CircuitOpenError when short-circuited).
+
+`stats()` reports calls, hedges fired and won, breaker trips, short-circuits and
+fallbacks per endpoint.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+from datetime import datetime
+from typing import (
+    Any,
+    TypeVar,
+    cast,
+)
+
+import numpy as np
+from pydantic import BaseModel
+
+from market_analyst.clock import get_clock
+from market_analyst.providers.base import (
+    MarketDataProvider,
+    ProviderError,
+    ProviderTimeoutError,
+)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(ProviderError):
+    """The endpoint's circuit breaker is open and no cached response is available."""
+
+
+class ResilienceConfig(BaseModel):
+    """Hedging, deadline, breaker and fallback settings, applied to every endpoint."""
+
+    hedging: bool = True
+    hedge_percentile: float = 95.0
+    # Hedging starts once this many successful latencies have been observed.
+    min_samples: int = 20
+    latency_window: int = 200
+    min_hedge_delay_seconds: float = 0.005
+    # At most this share of calls (plus a small burst allowance) may be hedged.
+    max_hedge_ratio: float = 0.2
+    call_timeout_seconds: float | None = 5.0
+    failure_threshold: int = 5
+    reset_timeout_seconds: float = 30.0
+    cache_size: int = 10000
+    # Cached responses older than this (by default one regular trading session) are
+    # not served; None serves any age.
+    max_stale_seconds: float | None = 6.5 * 3600
+
+
+class EndpointStats(BaseModel):
+    """Counters of one endpoint."""
+
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    hedges_fired: int = 0
+    hedge_wins: int = 0
+    breaker_trips: int = 0
+    short_circuited: int = 0
+    fallbacks_served: int = 0
+    # Failed calls whose cached response had outlived max_stale_seconds.
+    stale_fallbacks_refused: int = 0
+    breaker_state: str = "closed"
+    hedge_delay_seconds: float | None = None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker: closed -> open -> (after reset_timeout) half-open,
+    with one probe.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.trips = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self, now: float) -> bool:
+        """Returns True if a call may go through; when half-open only one probe may."""
+        if self.state == "open" and now - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, now: float) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or (
+            self.state == "closed" and self._failures >= self.failure_threshold
+        ):
+            self.state = "open"
+            self._opened_at = now
+            self.trips += 1
+
+    def release_probe(self) -> None:
+        """Called when a probe was cancelled before it could succeed or fail."""
+        self._probe_in_flight = False
+
+
+class _Endpoint:
+    def __init__(self, config: ResilienceConfig):
+        self.config = config
+        self.stats = EndpointStats()
+        self.breaker = CircuitBreaker(
+            config.failure_threshold, config.reset_timeout_seconds
+        )
+        self.latencies: deque[float] = deque(maxlen=config.latency_window)
+        self._hedge_delay: float | None = None
+        self._stale = True
+
+    def record_latency(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+        self._stale = True
+
+    def hedge_delay(self) -> float | None:
+        """The observed latency percentile, or None while too few samples to hedge."""
+        if len(self.latencies) < self.config.min_samples:
+            return None
+        if self._stale:
+            percentile = float(
+                np.percentile(
+                    np.fromiter(self.latencies, dtype=np.float64),
+                    self.config.hedge_percentile,
+                )
+            )
+            self._hedge_delay = max(self.config.min_hedge_delay_seconds, percentile)
+            self._stale = False
+        return self._hedge_delay
+
+    def may_hedge(self) -> bool:
+        return (
+            self.stats.hedges_fired < self.config.max_hedge_ratio * self.stats.calls + 5
+        )
+
+
+class ResilientProvider(MarketDataProvider):
+    """
+    Wraps a provider with per-endpoint hedging, deadlines, circuit breakers and
+    cached fallbacks.
+    """
+
+    def __init__(
+        self, inner: MarketDataProvider, config: ResilienceConfig | None = None
+    ):
+        self.inner = inner
+        self.config = config or ResilienceConfig()
+        self._endpoints: dict[str, _Endpoint] = {}
+        # (endpoint, arguments) -> (time stored, response)
+        self._cache: OrderedDict[tuple[str, Hashable], tuple[datetime, Any]] = (
+            OrderedDict()
+        )
+
+    def stats(self) -> dict[str, EndpointStats]:
+        """A snapshot of the counters of every endpoint called so far."""
+        snapshot = {}
+        for name, endpoint in self._endpoints.items():
+            stats = endpoint.stats.model_copy()
+            stats.breaker_state = endpoint.breaker.state
+            stats.breaker_trips = endpoint.breaker.trips
+            stats.hedge_delay_seconds = endpoint.hedge_delay()
+            snapshot[name] = stats
+        return snapshot
+
+    def _endpoint(self, name: str) -> _Endpoint:
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            endpoint = self._endpoints[name] = _Endpoint(self.config)
+        return endpoint
+
+    async def _attempt(
+        self, endpoint: _Endpoint, make_call: Callable[[], Awaitable[T]]
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            result = await asyncio.wait_for(
+                make_call(), self.config.call_timeout_seconds
+            )
+        except TimeoutError:
+            raise ProviderTimeoutError(
+                f"no answer within {self.config.call_timeout_seconds:g}s"
+            ) from None
+        endpoint.record_latency(loop.time() - started)
+        return result
+
+    async def _hedged(
+        self, endpoint: _Endpoint, make_call: Callable[[], Awaitable[T]]
+    ) -> T:
+        primary = asyncio.ensure_future(self._attempt(endpoint, make_call))
+        delay = endpoint.hedge_delay() if self.config.hedging else None
+        if delay is None:
+            return await primary
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except BaseException:
+            primary.cancel()
+            raise
+        if done or not endpoint.may_hedge():
+            return await primary
+
+        endpoint.stats.hedges_fired += 1
+        hedge = asyncio.ensure_future(self._attempt(endpoint, make_call))
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            endpoint.stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _call(
+        self, name: str, key: Hashable, make_call: Callable[[], Awaitable[T]]
+    ) -> T:
+        endpoint = self._endpoint(name)
+        endpoint.stats.calls += 1
+        loop = asyncio.get_running_loop()
+        if not endpoint.breaker.allow(loop.time()):
+            endpoint.stats.short_circuited += 1
+            error = CircuitOpenError(f"circuit open for {name}")
+            return cast(T, self._fallback(endpoint, (name, key), error))
+        try:
+            result = await self._hedged(endpoint, make_call)
+        except ProviderError as e:
+            endpoint.stats.failures += 1
+            endpoint.breaker.record_failure(loop.time())
+            return cast(T, self._fallback(endpoint, (name, key), e))
+        except BaseException:
+            endpoint.breaker.release_probe()
+            raise
+        endpoint.stats.successes += 1
+        endpoint.breaker.record_success()
+        self._remember((name, key), result)
+        return result
+
+    def _remember(self, cache_key: tuple[str, Hashable], result: Any) -> None:
+        self._cache[cache_key] = (get_clock().now(), result)
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.config.cache_size:
+            self._cache.popitem(last=False)
+
+    def _fallback(
+        self, endpoint: _Endpoint, cache_key: tuple[str, Hashable], error: ProviderError
+    ) -> object:
+        """Serves the last good result for `cache_key`, unless it has gone stale."""
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            raise error
+        stored_at, result = cached
+        max_stale = self.config.max_stale_seconds
+        if (
+            max_stale is not None
+            and (get_clock().now() - stored_at).total_seconds() > max_stale
+        ):
+            del self._cache[cache_key]
+            endpoint.stats.stale_fallbacks_refused += 1
+            raise error
+        endpoint.stats.fallbacks_served += 1
+        return result
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        return await self._call(
+            "gappers",
+            (exchange_id, as_of),
+            lambda: self.inner.get_gappers(exchange_id, as_of),
+        )
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            "market_regime",
+            (exchange_id, as_of),
+            lambda: self.inner.get_market_regime(exchange_id, as_of),
+        )
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            "ticker_details",
+            (ticker, exchange_id, as_of),
+            lambda: self.inner.get_ticker_details(ticker, exchange_id, as_of),
+        )
+
+    async def get_listing_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            "listing_details",
+            (ticker, exchange_id, as_of),
+            lambda: self.inner.get_listing_details(ticker, exchange_id, as_of),
+        )
+
+    async def get_issuer_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        return await self._call(
+            "issuer_details",
+            (ticker, exchange_id, as_of),
+            lambda: self.inner.get_issuer_details(ticker, exchange_id, as_of),
+        )
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        return await self._call(
+            "screening_metrics",
+            (tuple(tickers), exchange_id, as_of),
+            lambda: self.inner.get_screening_metrics(tickers, exchange_id, as_of),
+        )
@@ -0,0 +1,712 @@
+# /market_analyst/providers/simulated.py
+"""
+Deterministic synthetic market data at any scale, with injected latency and faults.
+
+SimulatedMarketDataProvider stands in for a real market-data API when testing
+concurrency, retry and cache behaviour:
+
+* **Universe.** Every exchange has `symbols_per_exchange` symbols (`NA0000`,
+  `NA0001`, ... on NASDAQ, `TS0000.TO`, ... on TSX), each with a stable profile:
+  name, sector, price level, volatility, shares outstanding. Any other ticker
+  asked for by name gets a profile of its own too.
+* **Bars.** Each symbol has a daily OHLCV series (`history_days` bars before the
+  analysed day) from a geometric random walk. Technicals, ATR, dollar volume
+  and the previous-day high are computed from that series, so the enrichment
+  sections are mutually consistent.
+* **Gappers.** Each day every symbol gets an overnight gap, mostly small with an
+  occasional large jump. Discovery returns the `gappers_per_exchange` largest
+  moves. Pre-market high/low and VWAP come from a short simulated pre-market
+  tape around the gapped price.
+* **Headlines.** A catalyst type and headlines match the direction and size of
+  the gap; `stream_headlines()` emits them as a timed stream.
+
+Everything is a pure function of (seed, exchange, ticker, day), so the same
+configuration always produces the same universe. Latency and faults are drawn
+per call from a seeded generator. Per endpoint (see ENDPOINTS; "default" covers
+the rest), every call:
+
+* sleeps for a latency sampled from a LatencyModel (constant, uniform,
+  lognormal or Pareto, plus an optional slow-outlier tail), and
+* may fail as configured by a FaultModel: a 429 RateLimitedError (randomly or
+  from a token-bucket quota), a ProviderTimeoutError after hanging for
+  `timeout_seconds`, or a 5xx ProviderUnavailableError.
+
+`calls` and `faults` count what happened, per endpoint.
+"""
+
+import asyncio
+import copy
+import random
+import zlib
+from collections import Counter
+from collections.abc import AsyncIterator, Sequence
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import (
+    Any,
+    Literal,
+    NamedTuple,
+)
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from market_analyst.clock import get_clock
+from market_analyst.providers.base import (
+    ISSUER_SECTIONS,
+    LISTING_SECTIONS,
+    MarketDataProvider,
+    ProviderTimeoutError,
+    ProviderUnavailableError,
+    RateLimitedError,
+)
+
+ENDPOINTS = (
+    "gappers",
+    "market_regime",
+    "ticker_details",
+    "listing_details",
+    "issuer_details",
+    "screening_metrics",
+    "bars",
+    "headlines",
+)
+
+
+class LatencyModel(BaseModel):
+    """Per-call latency distribution of one endpoint."""
+
+    distribution: Literal["constant", "uniform", "lognormal", "pareto"] = "lognormal"
+    median_seconds: float = 0.05
+    # lognormal: sigma of the underlying normal;
+    # uniform: half-width as a fraction of the median.
+    sigma: float = 0.5
+    pareto_alpha: float = 3.0
+    # Independent slow outliers (GC pauses, cold caches): this share of calls is
+    # `tail_multiplier` times slower.
+    tail_probability: float = 0.0
+    tail_multiplier: float = 20.0
+
+    def sample(self, rng: random.Random) -> float:
+        median = self.median_seconds
+        if median <= 0:
+            return 0.0
+        if self.distribution == "constant":
+            latency = median
+        elif self.distribution == "uniform":
+            latency = median * (1 + rng.uniform(-self.sigma, self.sigma))
+        elif self.distribution == "pareto":
+            # Scaled so that the median of the Pareto draw equals `median_seconds`.
+            latency = (
+                median
+                * rng.paretovariate(self.pareto_alpha)
+                / 2 ** (1 / self.pareto_alpha)
+            )
+        else:
+            latency = rng.lognormvariate(np.log(median), self.sigma)
+        if self.tail_probability and rng.random() < self.tail_probability:
+            latency *= self.tail_multiplier
+        return max(0.0, latency)
+
+
+class FaultModel(BaseModel):
+    """Failure injection for one endpoint. Rates are per-call probabilities."""
+
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 10.0
+    server_error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    # Token-bucket quota: calls beyond `rate_limit_per_second` (after a burst) get
+    # a 429.
+    rate_limit_per_second: float | None = None
+    rate_limit_burst: int = 10
+    retry_after_seconds: float = 1.0
+
+
+class SimulationConfig(BaseModel):
+    """Universe size, series length, and per-endpoint latency and faults."""
+
+    seed: int = 0
+    symbols_per_exchange: int = 2000
+    gappers_per_exchange: int = 50
+    history_days: int = 100
+    latency: dict[str, LatencyModel] = Field(
+        default_factory=lambda: {"default": LatencyModel()}
+    )
+    faults: dict[str, FaultModel] = Field(
+        default_factory=lambda: {"default": FaultModel()}
+    )
+
+    def latency_for(self, endpoint: str) -> LatencyModel:
+        return (
+            self.latency.get(endpoint)
+            or self.latency.get("default")
+            or LatencyModel(distribution="constant", median_seconds=0)
+        )
+
+    def faults_for(self, endpoint: str) -> FaultModel:
+        return self.faults.get(endpoint) or self.faults.get("default") or FaultModel()
+
+
+# --- Deterministic universe ---------------------------------------------------
+
+_SECTORS = (
+    ("Technology", "Software - Application"),
+    ("Technology", "Semiconductors"),
+    ("Healthcare", "Biotechnology"),
+    ("Healthcare", "Medical Devices"),
+    ("Financial Services", "Banks - Regional"),
+    ("Energy", "Oil & Gas E&P"),
+    ("Industrials", "Railroads"),
+    ("Consumer Cyclical", "Auto Manufacturers"),
+    ("Basic Materials", "Gold"),
+    ("Communication Services", "Internet Content & Information"),
+    ("Utilities", "Utilities - Regulated Electric"),
+)
+_NAME_PARTS = (
+    (
+        "Apex",
+        "Northern",
+        "Blue",
+        "Summit",
+        "Granite",
+        "Silver",
+        "Pacific",
+        "Atlas",
+        "Vertex",
+        "Harbor",
+    ),
+    (
+        "Dynamics",
+        "Holdings",
+        "Systems",
+        "Resources",
+        "Therapeutics",
+        "Networks",
+        "Energy",
+        "Capital",
+        "Labs",
+        "Works",
+    ),
+)
+_CATALYSTS = {
+    "up": (
+        (
+            "Earnings Beat",
+            "{name} beats quarterly estimates and raises full-year guidance",
+        ),
+        ("FDA Approval", "{name} receives regulatory approval for lead product"),
+        ("Analyst Upgrade", "{name} upgraded to Buy with a higher price target"),
+        ("Partnership Announcement", "{name} announces strategic partnership"),
+        ("Contract Win", "{name} wins multi-year supply contract"),
+    ),
+    "down": (
+        ("Earnings Miss", "{name} misses quarterly estimates and cuts guidance"),
+        ("Offering", "{name} prices public offering of common shares"),
+        ("Analyst Downgrade", "{name} downgraded to Sell on slowing growth"),
+        ("Production Update", "{name} reports production shortfall"),
+        (
+            "Regulatory Setback",
+            "{name} receives complete response letter from regulator",
+        ),
+    ),
+    "flat": (("General Market Movement", "{name} trades with the broader market"),),
+}
+_FOLLOW_UPS = (
+    "Volume surges in pre-market trading for {ticker}",
+    "Options activity spikes in {ticker} ahead of the open",
+    "{ticker} moves on heavy pre-market volume",
+)
+
+
+def _rng(*parts: Any) -> np.random.Generator:
+    """
+    A generator seeded by stable hashes of `parts` (Python's str hash is salted
+    per process).
+    """
+    return np.random.default_rng([zlib.crc32(str(part).encode()) for part in parts])
+
+
+def universe_tickers(exchange_id: str, symbols: int) -> list[str]:
+    """The tickers of an exchange's simulated universe."""
+    return list(_universe(exchange_id, symbols))
+
+
+@lru_cache(maxsize=64)
+def _universe(exchange_id: str, symbols: int) -> dict[str, int]:
+    prefix = "".join(c for c in exchange_id.upper() if c.isalpha())[:2] or "SX"
+    suffix = ".TO" if exchange_id.upper() == "TSX" else ""
+    return {f"{prefix}{i:04d}{suffix}": i for i in range(symbols)}
+
+
+class _Profile(NamedTuple):
+    name: str
+    sector: str
+    industry: str
+    base_price: float
+    daily_volatility: float
+    average_volume: float
+    shares_outstanding: float
+    float_fraction: float
+
+
+@lru_cache(maxsize=65536)
+def _profile(seed: int, exchange_id: str, ticker: str) -> _Profile:
+    rng = _rng(seed, exchange_id, ticker, "profile")
+    sector, industry = _SECTORS[rng.integers(len(_SECTORS))]
+    first, second = _NAME_PARTS
+    first_part, second_part = (
+        first[rng.integers(len(first))],
+        second[rng.integers(len(second))],
+    )
+    name = f"{first_part} {second_part} ({ticker})"
+    base_price = float(np.clip(rng.lognormal(np.log(25.0), 1.0), 0.5, 1500.0))
+    return _Profile(
+        name=name,
+        sector=sector,
+        industry=industry,
+        base_price=base_price,
+        daily_volatility=float(rng.uniform(0.01, 0.06)),
+        # Dollar volume spans roughly $1M to $1B a day.
+        average_volume=float(rng.lognormal(np.log(2e7), 1.5)) / base_price,
+        shares_outstanding=float(rng.lognormal(np.log(1.5e8), 1.0)),
+        float_fraction=float(rng.uniform(0.5, 0.95)),
+    )
+
+
+@lru_cache(maxsize=64)
+def _overnight_gaps(seed: int, exchange_id: str, symbols: int, day: date) -> np.ndarray:
+    """
+    Gap percent of every universe symbol on `day`: mostly noise, with ~5% large
+    news-driven jumps.
+    """
+    rng = _rng(seed, exchange_id, day.isoformat(), "gaps")
+    gaps = rng.normal(0.0, 0.8, symbols)
+    jumps = rng.random(symbols) < 0.05
+    gaps[jumps] += rng.choice((-1.0, 1.0), jumps.sum()) * np.clip(
+        rng.lognormal(np.log(5.0), 0.6, jumps.sum()), 2.0, 80.0
+    )
+    return np.round(gaps, 2)
+
+
+def _gap_percent(
+    seed: int, exchange_id: str, symbols: int, ticker: str, day: date
+) -> float:
+    index = _universe(exchange_id, symbols).get(ticker)
+    if index is not None:
+        return float(_overnight_gaps(seed, exchange_id, symbols, day)[index])
+    return round(
+        float(_rng(seed, exchange_id, ticker, day.isoformat(), "gap").normal(0.0, 0.8)),
+        2,
+    )
+
+
+@lru_cache(maxsize=16384)
+def _daily_bars(
+    seed: int, exchange_id: str, ticker: str, day: date, history_days: int
+) -> np.ndarray:
+    """OHLCV rows (history_days x 5) for the sessions before `day`."""
+    profile = _profile(seed, exchange_id, ticker)
+    rng = _rng(seed, exchange_id, ticker, day.isoformat(), "bars")
+    vol = profile.daily_volatility
+    returns = rng.normal(0.0, vol, history_days)
+    close = profile.base_price * np.exp(np.cumsum(returns) - returns.sum() / 2)
+    open_ = np.concatenate(([close[0] / np.exp(returns[0])], close[:-1])) * np.exp(
+        rng.normal(0.0, vol / 4, history_days)
+    )
+    high = np.maximum(open_, close) * (
+        1 + np.abs(rng.normal(0.0, vol / 2, history_days))
+    )
+    low = np.minimum(open_, close) * (
+        1 - np.abs(rng.normal(0.0, vol / 2, history_days))
+    )
+    volume = (
+        profile.average_volume
+        * rng.lognormal(0.0, 0.4, history_days)
+        * (1 + 2 * np.abs(returns) / vol)
+    )
+    return np.column_stack((open_, high, low, close, np.round(volume)))
+
+
+def _ema(values: np.ndarray, span: int) -> np.ndarray:
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(values)
+    out[0] = values[0]
+    for i in range(1, len(values)):
+        out[i] = alpha * values[i] + (1 - alpha) * out[i - 1]
+    return out
+
+
+def _rsi(close: np.ndarray, period: int = 14) -> float:
+    change = np.diff(close)
+    gains, losses = np.clip(change, 0, None), np.clip(-change, 0, None)
+    average_gain, average_loss = gains[:period].mean(), losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        average_gain = (average_gain * (period - 1) + gain) / period
+        average_loss = (average_loss * (period - 1) + loss) / period
+    if average_loss == 0:
+        return 100.0
+    return float(100 - 100 / (1 + average_gain / average_loss))
+
+
+@lru_cache(maxsize=16384)
+def _ticker_details(
+    seed: int, exchange_id: str, symbols: int, ticker: str, day: date, history_days: int
+) -> dict[str, Any]:
+    profile = _profile(seed, exchange_id, ticker)
+    bars = _daily_bars(seed, exchange_id, ticker, day, history_days)
+    open_, high, low, close, volume = bars.T
+    rng = _rng(seed, exchange_id, ticker, day.isoformat(), "session")
+    gap = _gap_percent(seed, exchange_id, symbols, ticker, day)
+
+    # A short pre-market tape around the gapped open.
+    gapped = close[-1] * (1 + gap / 100)
+    tape = gapped * np.exp(
+        np.cumsum(rng.normal(0.0, profile.daily_volatility / 15, 60))
+    )
+    sizes = rng.lognormal(np.log(200), 0.8, 60)
+    vwap = float((tape * sizes).sum() / sizes.sum())
+
+    previous_close = np.concatenate(([open_[0]], close[:-1]))
+    true_range = np.maximum(
+        high - low,
+        np.maximum(np.abs(high - previous_close), np.abs(low - previous_close)),
+    )
+    macd_line = _ema(close, 12) - _ema(close, 26)
+    signal_line = _ema(macd_line, 9)
+    middle = close[-20:].mean()
+    deviation = close[-20:].std()
+
+    direction = "up" if gap >= 2 else "down" if gap <= -2 else "flat"
+    catalyst_type, headline = _CATALYSTS[direction][
+        rng.integers(len(_CATALYSTS[direction]))
+    ]
+    headlines = [headline.format(name=profile.name)]
+    headlines += [
+        _FOLLOW_UPS[i].format(ticker=ticker)
+        for i in rng.permutation(len(_FOLLOW_UPS))[: rng.integers(0, 3)]
+    ]
+
+    clarity = np.clip(
+        1.0 - profile.daily_volatility * 4 + rng.normal(0.0, 0.05, 5), 0.0, 1.0
+    )
+    return {
+        "risk_metrics": {
+            "average_true_range_14d": round(float(true_range[-14:].mean()), 4),
+            "average_dollar_volume_30d": round(
+                float((close[-30:] * volume[-30:]).mean()), 2
+            ),
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": catalyst_type,
+            "recent_headlines": headlines,
+        },
+        "key_technical_levels": {
+            "pre_market_high": round(float(tape.max()), 4),
+            "pre_market_low": round(float(tape.min()), 4),
+            "previous_day_high": round(float(high[-1]), 4),
+        },
+        "raw_technicals": {
+            "vwap": round(vwap, 4),
+            "rsi_14d": round(_rsi(close), 2),
+            "macd_12_26_9": {
+                "macd_line": round(float(macd_line[-1]), 4),
+                "signal_line": round(float(signal_line[-1]), 4),
+                "histogram": round(float(macd_line[-1] - signal_line[-1]), 4),
+            },
+            "ema_9d": round(float(_ema(close, 9)[-1]), 4),
+            "ema_20d": round(float(_ema(close, 20)[-1]), 4),
+            "ema_50d": round(float(_ema(close, 50)[-1]), 4),
+            "bollinger_bands_20d_2std": {
+                "upper_band": round(float(middle + 2 * deviation), 4),
+                "middle_band": round(float(middle), 4),
+                "lower_band": round(float(middle - 2 * deviation), 4),
+                "band_width": round(float(4 * deviation / middle), 4),
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": round(float(clarity[0]), 2),
+            "price_action_rhythm": round(float(clarity[1]), 2),
+            "volatility_character": round(float(clarity[2]), 2),
+            "volume_profile_structure": round(float(clarity[3]), 2),
+            "volume_trend_confirmation": round(float(clarity[4]), 2),
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": profile.name,
+            "sector": profile.sector,
+            "industry": profile.industry,
+            "market_capitalization": int(profile.shares_outstanding * close[-1]),
+        },
+    }
+
+
+def _day(as_of: datetime | None) -> date:
+    return (as_of or get_clock().now()).date()
+
+
+# --- Provider -----------------------------------------------------------------
+
+
+class SimulatedMarketDataProvider(MarketDataProvider):
+    """
+    Synthetic provider over a deterministic universe, with per-endpoint latency and
+    fault injection.
+
+    The data only depends on the config's seed and sizes. Latency and fault draws
+    come from a generator seeded with the same seed, so a run that makes its calls
+    in the same order sees the same sequence of delays and failures.
+    """
+
+    def __init__(self, config: SimulationConfig | None = None):
+        self.config = config or SimulationConfig()
+        self.calls: Counter = Counter()
+        self.faults: Counter = (
+            Counter()
+        )  # (endpoint, "timeout" | "server_error" | "rate_limited")
+        self._rng = random.Random(self.config.seed)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def _take_token(self, endpoint: str, faults: FaultModel) -> bool:
+        if faults.rate_limit_per_second is None:
+            return True
+        now = asyncio.get_running_loop().time()
+        tokens, updated_at = self._buckets.get(
+            endpoint, (float(faults.rate_limit_burst), now)
+        )
+        tokens = min(
+            float(faults.rate_limit_burst),
+            tokens + (now - updated_at) * faults.rate_limit_per_second,
+        )
+        if tokens < 1.0:
+            self._buckets[endpoint] = (tokens, now)
+            return False
+        self._buckets[endpoint] = (tokens - 1.0, now)
+        return True
+
+    async def _call(self, endpoint: str) -> None:
+        """Waits out the sampled latency of a call, or raises the fault drawn for it."""
+        latency_model, faults = (
+            self.config.latency_for(endpoint),
+            self.config.faults_for(endpoint),
+        )
+        self.calls[endpoint] += 1
+        latency = latency_model.sample(self._rng)
+        roll = self._rng.random()
+
+        if (
+            not self._take_token(endpoint, faults)
+            or self._rng.random() < faults.rate_limit_rate
+        ):
+            self.faults[endpoint, "rate_limited"] += 1
+            # Rejections are cheap for the server and come back quickly.
+            await asyncio.sleep(latency / 4)
+            raise RateLimitedError(
+                f"429 Too Many Requests: {endpoint}",
+                retry_after=faults.retry_after_seconds,
+            )
+        if roll < faults.timeout_rate:
+            self.faults[endpoint, "timeout"] += 1
+            await asyncio.sleep(faults.timeout_seconds)
+            raise ProviderTimeoutError(
+                f"{endpoint} timed out after {faults.timeout_seconds:g}s"
+            )
+        await asyncio.sleep(latency)
+        if roll < faults.timeout_rate + faults.server_error_rate:
+            self.faults[endpoint, "server_error"] += 1
+            status = self._rng.choice((500, 502, 503, 504))
+            raise ProviderUnavailableError(f"{status} from {endpoint}", status=status)
+
+    def _details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None
+    ) -> dict[str, Any]:
+        """
+        The cached details, shared by every call and by every provider with the same
+        seed: read them, but never return them.
+        """
+        config = self.config
+        return _ticker_details(
+            config.seed,
+            exchange_id,
+            config.symbols_per_exchange,
+            ticker,
+            _day(as_of),
+            config.history_days,
+        )
+
+    @property
+    def gappers_per_exchange(self) -> int:
+        return self.config.gappers_per_exchange
+
+    def universe(self, exchange_id: str) -> list[str]:
+        """The simulated tickers of an exchange."""
+        return universe_tickers(exchange_id, self.config.symbols_per_exchange)
+
+    async def get_gappers(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        await self._call("gappers")
+        config = self.config
+        day = _day(as_of)
+        gaps = _overnight_gaps(
+            config.seed, exchange_id, config.symbols_per_exchange, day
+        )
+        tickers = self.universe(exchange_id)
+        gappers = []
+        for index in np.argsort(-np.abs(gaps), kind="stable")[
+            : config.gappers_per_exchange
+        ].tolist():
+            profile = _profile(config.seed, exchange_id, tickers[index])
+            gap = float(gaps[index])
+            relative_volume = round(
+                1.0
+                + abs(gap)
+                * float(
+                    _rng(
+                        config.seed,
+                        exchange_id,
+                        tickers[index],
+                        day.isoformat(),
+                        "relvol",
+                    ).lognormal(0.0, 0.4)
+                ),
+                2,
+            )
+            gappers.append(
+                {
+                    "ticker": tickers[index],
+                    "gap_percent": gap,
+                    "pre_market_volume": int(
+                        profile.average_volume * relative_volume * 0.05
+                    ),
+                    "relative_volume": relative_volume,
+                }
+            )
+        return gappers
+
+    async def get_market_regime(
+        self, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._call("market_regime")
+        rng = _rng(self.config.seed, exchange_id, _day(as_of).isoformat(), "regime")
+        return {
+            "vix_ticker": "^VIXC" if exchange_id == "TSX" else "^VIX",
+            "vix_value": round(
+                float(np.clip(rng.lognormal(np.log(18.0), 0.3), 9.0, 80.0)), 2
+            ),
+            "adx_value": round(float(rng.uniform(12.0, 45.0)), 1),
+        }
+
+    async def get_ticker_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._call("ticker_details")
+        return copy.deepcopy(self._details(ticker, exchange_id, as_of))
+
+    async def get_listing_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._call("listing_details")
+        details = self._details(ticker, exchange_id, as_of)
+        return {
+            section: copy.deepcopy(details[section]) for section in LISTING_SECTIONS
+        }
+
+    async def get_issuer_details(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, Any]:
+        await self._call("issuer_details")
+        details = self._details(ticker, exchange_id, as_of)
+        return {section: copy.deepcopy(details[section]) for section in ISSUER_SECTIONS}
+
+    async def get_screening_metrics(
+        self, tickers: Sequence[str], exchange_id: str, as_of: datetime | None = None
+    ) -> dict[str, dict[str, float]]:
+        await self._call("screening_metrics")
+        metrics = {}
+        for ticker in tickers:
+            profile = _profile(self.config.seed, exchange_id, ticker)
+            details = self._details(ticker, exchange_id, as_of)
+            metrics[ticker] = {
+                "average_dollar_volume_30d": details["risk_metrics"][
+                    "average_dollar_volume_30d"
+                ],
+                "float_shares": profile.shares_outstanding * profile.float_fraction,
+                "last_price": details["raw_technicals"]["vwap"],
+            }
+        return metrics
+
+    async def get_bars(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Daily OHLCV bars for the `history_days` sessions before the analysed day,
+        oldest first.
+        """
+        await self._call("bars")
+        day = _day(as_of)
+        bars = _daily_bars(
+            self.config.seed, exchange_id, ticker, day, self.config.history_days
+        )
+        # Sessions are counted in weekdays; exchange holidays are not modelled.
+        sessions = np.busday_offset(
+            np.datetime64(day, "D"), -np.arange(len(bars), 0, -1), roll="backward"
+        )
+        return [
+            {
+                "date": str(session),
+                "open": round(o, 4),
+                "high": round(high, 4),
+                "low": round(low, 4),
+                "close": round(c, 4),
+                "volume": int(v),
+            }
+            for session, (o, high, low, c, v) in zip(sessions, bars.tolist())
+        ]
+
+    async def get_headlines(
+        self, ticker: str, exchange_id: str, as_of: datetime | None = None
+    ) -> list[str]:
+        """The recent headlines of a ticker (the ones in its catalyst_analysis)."""
+        await self._call("headlines")
+        return list(
+            self._details(ticker, exchange_id, as_of)["catalyst_analysis"][
+                "recent_headlines"
+            ]
+        )
+
+    async def stream_headlines(
+        self,
+        exchange_id: str,
+        as_of: datetime | None = None,
+        rate: float = 5.0,
+        count: int = 100,
+        realtime: bool = True,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yields `count` headlines for the exchange's gappers at Poisson arrivals of
+        `rate` per second, each as {"timestamp", "ticker", "headline"}.
+        """
+        start = as_of or get_clock().now()
+        gappers = [
+            g["ticker"] for g in await self.get_gappers(exchange_id, as_of)
+        ] or self.universe(exchange_id)[:1]
+        rng = _rng(
+            self.config.seed, exchange_id, _day(as_of).isoformat(), "headline-stream"
+        )
+        elapsed = 0.0
+        for _ in range(count):
+            wait = float(rng.exponential(1.0 / rate))
+            elapsed += wait
+            if realtime:
+                await asyncio.sleep(wait)
+            ticker = gappers[rng.integers(len(gappers))]
+            headlines = self._details(ticker, exchange_id, as_of)["catalyst_analysis"][
+                "recent_headlines"
+            ]
+            yield {
+                "timestamp": (start + timedelta(seconds=elapsed)).isoformat(),
+                "ticker": ticker,
+                "headline": headlines[rng.integers(len(headlines))],
+            }
@@ -0,0 +1,254 @@
+# /market_analyst/records.py
+"""
+Compact internal representation of an observed instrument.
+
+The canonical ObservedInstrument is a tree of ten Pydantic models. Inside the
+pipeline we only need the values, so each instrument is held as one flat
+`__slots__` object instead. Records are built straight from provider dicts,
+travel through enrichment and clustering, and are converted to the canonical
+Pydantic model (with full validation) only when the report is emitted.
+"""
+
+from typing import Any
+
+from market_analyst.schemas import ObservedInstrument
+
+_CHART_CLARITY_FIELDS = (
+    "range_integrity",
+    "price_action_rhythm",
+    "volatility_character",
+    "volume_profile_structure",
+    "volume_trend_confirmation",
+    "order_flow_absorption",
+    "cumulative_volume_delta",
+)
+
+
+class InstrumentRecord:
+    """A flat, slotted record holding every field of an ObservedInstrument."""
+
+    __slots__ = (
+        "ticker",
+        "exchange_id",
+        # gapper_data
+        "gap_percent",
+        "pre_market_volume",
+        "relative_volume",
+        # risk_metrics
+        "average_true_range_14d",
+        "average_dollar_volume_30d",
+        # catalyst_analysis
+        "primary_catalyst_type",
+        "recent_headlines",
+        # key_technical_levels
+        "pre_market_high",
+        "pre_market_low",
+        "previous_day_high",
+        # raw_technicals
+        "vwap",
+        "rsi_14d",
+        "macd_line",
+        "macd_signal_line",
+        "macd_histogram",
+        "ema_9d",
+        "ema_20d",
+        "ema_50d",
+        "bb_upper_band",
+        "bb_middle_band",
+        "bb_lower_band",
+        "bb_band_width",
+        # chart_clarity_raw_components
+        *_CHART_CLARITY_FIELDS,
+        # fundamental_data
+        "name",
+        "sector",
+        "industry",
+        "market_capitalization",
+        "correlation_cluster_id",
+    )
+
+    ticker: str
+    exchange_id: str
+    gap_percent: float
+    pre_market_volume: int
+    relative_volume: float
+    average_true_range_14d: float
+    average_dollar_volume_30d: float
+    primary_catalyst_type: str
+    recent_headlines: tuple[str, ...]
+    pre_market_high: float
+    pre_market_low: float
+    previous_day_high: float
+    vwap: float
+    rsi_14d: float
+    macd_line: float
+    macd_signal_line: float
+    macd_histogram: float
+    ema_9d: float
+    ema_20d: float
+    ema_50d: float
+    bb_upper_band: float
+    bb_middle_band: float
+    bb_lower_band: float
+    bb_band_width: float
+    range_integrity: float
+    price_action_rhythm: float
+    volatility_character: float
+    volume_profile_structure: float
+    volume_trend_confirmation: float
+    order_flow_absorption: float
+    cumulative_volume_delta: float
+    name: str
+    sector: str
+    industry: str
+    market_capitalization: int
+    correlation_cluster_id: Any
+
+    @classmethod
+    def from_parts(
+        cls,
+        ticker: str,
+        exchange_id: str,
+        gapper_data: dict[str, Any],
+        details: dict[str, Any],
+        correlation_cluster_id: Any = None,
+    ) -> "InstrumentRecord":
+        """Builds a record from GapperData and provider ticker-details dicts."""
+        record = cls.__new__(cls)
+        record.ticker = ticker
+        record.exchange_id = exchange_id
+
+        record.gap_percent = float(gapper_data["gap_percent"])
+        record.pre_market_volume = int(gapper_data["pre_market_volume"])
+        record.relative_volume = float(gapper_data["relative_volume"])
+
+        risk = details["risk_metrics"]
+        record.average_true_range_14d = float(risk["average_true_range_14d"])
+        record.average_dollar_volume_30d = float(risk["average_dollar_volume_30d"])
+
+        catalyst = details["catalyst_analysis"]
+        record.primary_catalyst_type = catalyst["primary_catalyst_type"]
+        record.recent_headlines = tuple(catalyst["recent_headlines"])
+
+        levels = details["key_technical_levels"]
+        record.pre_market_high = float(levels["pre_market_high"])
+        record.pre_market_low = float(levels["pre_market_low"])
+        record.previous_day_high = float(levels["previous_day_high"])
+
+        technicals = details["raw_technicals"]
+        macd = technicals["macd_12_26_9"]
+        bands = technicals["bollinger_bands_20d_2std"]
+        record.vwap = float(technicals["vwap"])
+        record.rsi_14d = float(technicals["rsi_14d"])
+        record.macd_line = float(macd["macd_line"])
+        record.macd_signal_line = float(macd["signal_line"])
+        record.macd_histogram = float(macd["histogram"])
+        record.ema_9d = float(technicals["ema_9d"])
+        record.ema_20d = float(technicals["ema_20d"])
+        record.ema_50d = float(technicals["ema_50d"])
+        record.bb_upper_band = float(bands["upper_band"])
+        record.bb_middle_band = float(bands["middle_band"])
+        record.bb_lower_band = float(bands["lower_band"])
+        record.bb_band_width = float(bands["band_width"])
+
+        clarity = details["chart_clarity_raw_components"]
+        for field in _CHART_CLARITY_FIELDS:
+            setattr(record, field, float(clarity[field]))
+
+        fundamentals = details["fundamental_data"]
+        record.name = fundamentals["name"]
+        record.sector = fundamentals["sector"]
+        record.industry = fundamentals["industry"]
+        record.market_capitalization = int(fundamentals["market_capitalization"])
+
+        record.correlation_cluster_id = correlation_cluster_id
+        return record
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "InstrumentRecord":
+        """Builds a record from a nested ObservedInstrument dict."""
+        return cls.from_parts(
+            data["ticker"],
+            data["exchange_id"],
+            data["gapper_data"],
+            data,
+            data.get("correlation_cluster_id"),
+        )
+
+    @classmethod
+    def from_observed_instrument(
+        cls, instrument: ObservedInstrument
+    ) -> "InstrumentRecord":
+        """Builds a record from the canonical Pydantic model."""
+        return cls.from_dict(instrument.model_dump())
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the nested ObservedInstrument dict (the shape model_dump gives)."""
+        return {
+            "ticker": self.ticker,
+            "exchange_id": self.exchange_id,
+            "gapper_data": {
+                "ticker": self.ticker,
+                "gap_percent": self.gap_percent,
+                "pre_market_volume": self.pre_market_volume,
+                "relative_volume": self.relative_volume,
+            },
+            "risk_metrics": {
+                "average_true_range_14d": self.average_true_range_14d,
+                "average_dollar_volume_30d": self.average_dollar_volume_30d,
+            },
+            "catalyst_analysis": {
+                "primary_catalyst_type": self.primary_catalyst_type,
+                "recent_headlines": list(self.recent_headlines),
+            },
+            "key_technical_levels": {
+                "pre_market_high": self.pre_market_high,
+                "pre_market_low": self.pre_market_low,
+                "previous_day_high": self.previous_day_high,
+            },
+            "raw_technicals": {
+                "vwap": self.vwap,
+                "rsi_14d": self.rsi_14d,
+                "macd_12_26_9": {
+                    "macd_line": self.macd_line,
+                    "signal_line": self.macd_signal_line,
+                    "histogram": self.macd_histogram,
+                },
+                "ema_9d": self.ema_9d,
+                "ema_20d": self.ema_20d,
+                "ema_50d": self.ema_50d,
+                "bollinger_bands_20d_2std": {
+                    "upper_band": self.bb_upper_band,
+                    "middle_band": self.bb_middle_band,
+                    "lower_band": self.bb_lower_band,
+                    "band_width": self.bb_band_width,
+                },
+            },
+            "chart_clarity_raw_components": {
+                field: getattr(self, field) for field in _CHART_CLARITY_FIELDS
+            },
+            "fundamental_data": {
+                "name": self.name,
+                "sector": self.sector,
+                "industry": self.industry,
+                "market_capitalization": self.market_capitalization,
+            },
+            "correlation_cluster_id": self.correlation_cluster_id,
+        }
+
+    def to_observed_instrument(self) -> ObservedInstrument:
+        """Converts to the canonical Pydantic model, validating every field."""
+        return ObservedInstrument.model_validate(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, InstrumentRecord):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"InstrumentRecord(ticker={self.ticker!r}, "
+            f"exchange_id={self.exchange_id!r})"
+        )
@@ -0,0 +1,237 @@
+# /market_analyst/replay.py
+"""
+Historical replay of the market analysis pipeline.
+
+Each trading day with a snapshot directory is run through the real
+MarketAnalysisCoordinator (discovery -> enrichment -> clustering) in its own ADK
+session, with an `as_of` timestamp and a HistoricalMarketDataProvider bound to
+that run so no stage can read data captured later than the simulated run time.
+Days are replayed concurrently and throughput is reported in days per second.
+With `--direct` the days go through `market_analyst.batch.analyze` instead,
+which runs the same tools without ADK session overhead.
+
+Usage:
+    python -m market_analyst.replay --data-dir data/history --start 2025-01-02 \
+        --end 2025-12-31 --exchanges NASDAQ TSX --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Sequence
+from datetime import UTC, date, datetime
+from datetime import time as dt_time
+
+from google.adk.agents import BaseAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+from pydantic import BaseModel, ValidationError
+
+from market_analyst.agent import root_agent
+from market_analyst.batch import analyze
+from market_analyst.providers import HistoricalMarketDataProvider, use_provider
+from market_analyst.providers.historical import available_trading_dates
+from market_analyst.schemas import MarketAnalysisReport
+from market_analyst.structured_logging import configure_logging
+
+APP_NAME = "market_analyst_replay"
+USER_ID = "replay"
+
+# Pre-market runs are stamped at 09:00 New York time (13:00 UTC during daylight time).
+DEFAULT_RUN_TIME_UTC = dt_time(13, 0)
+
+
+class ReplayResult(BaseModel):
+    """The reports produced by a replay and its throughput."""
+
+    reports: list[MarketAnalysisReport]
+    failed_days: dict[str, str]
+    elapsed_seconds: float
+
+    @property
+    def days_replayed(self) -> int:
+        return len(self.reports) + len(self.failed_days)
+
+    @property
+    def days_per_second(self) -> float:
+        return (
+            self.days_replayed / self.elapsed_seconds
+            if self.elapsed_seconds > 0
+            else 0.0
+        )
+
+
+class ReplayEngine:
+    """Replays a range of historical trading days through the coordinator agent."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        exchanges: Sequence[str],
+        run_type: str = "Pre-Market",
+        max_concurrency: int = 8,
+        run_time_utc: dt_time = DEFAULT_RUN_TIME_UTC,
+        agent: BaseAgent = root_agent,
+        direct: bool = False,
+    ):
+        self.direct = direct
+        self.exchanges = list(exchanges)
+        self.run_type = run_type
+        self.max_concurrency = max_concurrency
+        self.run_time_utc = run_time_utc
+        self.provider = HistoricalMarketDataProvider(data_dir)
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(
+            app_name=APP_NAME, agent=agent, session_service=self.session_service
+        )
+
+    def trading_days(self, start: date, end: date) -> list[date]:
+        """Returns the days in [start, end] that have snapshot data."""
+        return [
+            d
+            for d in available_trading_dates(self.provider.data_dir)
+            if start <= d <= end
+        ]
+
+    async def replay_day(self, trading_date: date) -> MarketAnalysisReport:
+        """Runs the full pipeline for one trading day and returns its report."""
+        as_of = datetime.combine(trading_date, self.run_time_utc, tzinfo=UTC)
+        if self.direct:
+            return await analyze(
+                self.exchanges, self.run_type, as_of, provider=self.provider
+            )
+
+        request = {
+            "exchanges": self.exchanges,
+            "run_type": self.run_type,
+            "as_of": as_of.isoformat(),
+        }
+        session = await self.session_service.create_session(
+            app_name=APP_NAME, user_id=USER_ID, state=request
+        )
+        message = genai_types.Content(
+            role="user", parts=[genai_types.Part(text=json.dumps(request))]
+        )
+
+        final_text = ""
+        with use_provider(self.provider):
+            async for event in self.runner.run_async(
+                user_id=USER_ID, session_id=session.id, new_message=message
+            ):
+                if (
+                    event.content
+                    and event.content.parts
+                    and event.content.parts[0].text
+                ):
+                    final_text = event.content.parts[0].text
+        await self.session_service.delete_session(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+        )
+
+        try:
+            return MarketAnalysisReport.model_validate_json(final_text)
+        except ValidationError:
+            raise RuntimeError(final_text or "Coordinator produced no output") from None
+
+    async def run(self, start: date, end: date) -> ReplayResult:
+        """Replays each available day in [start, end], `max_concurrency` at a time."""
+        days = self.trading_days(start, end)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        reports: dict[date, MarketAnalysisReport] = {}
+        failed_days: dict[str, str] = {}
+
+        async def _run_one(trading_date: date) -> None:
+            async with semaphore:
+                try:
+                    reports[trading_date] = await self.replay_day(trading_date)
+                except Exception as e:
+                    failed_days[trading_date.isoformat()] = str(e)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_run_one(d) for d in days))
+        elapsed = time.perf_counter() - started
+
+        return ReplayResult(
+            reports=[reports[d] for d in sorted(reports)],
+            failed_days=failed_days,
+            elapsed_seconds=elapsed,
+        )
+
+
+async def replay(
+    data_dir: str,
+    start: date,
+    end: date,
+    exchanges: Sequence[str],
+    run_type: str = "Pre-Market",
+    max_concurrency: int = 8,
+    direct: bool = False,
+) -> ReplayResult:
+    """Convenience wrapper around ReplayEngine.run."""
+    engine = ReplayEngine(
+        data_dir,
+        exchanges,
+        run_type=run_type,
+        max_concurrency=max_concurrency,
+        direct=direct,
+    )
+    return await engine.run(start, end)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replays historical days from the command line and reports throughput."""
+    parser = argparse.ArgumentParser(
+        description="Replay historical trading days through the market analyst."
+    )
+    parser.add_argument(
+        "--data-dir", required=True, help="Directory of per-day snapshot folders."
+    )
+    parser.add_argument("--start", required=True, type=date.fromisoformat)
+    parser.add_argument("--end", required=True, type=date.fromisoformat)
+    parser.add_argument("--exchanges", nargs="+", default=["NASDAQ", "TSX"])
+    parser.add_argument("--run-type", default="Pre-Market")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--store",
+        help="Optional report store (SQLite) to save the replayed reports into.",
+    )
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="Call the pipeline tools directly instead of through ADK sessions.",
+    )
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        replay(
+            args.data_dir,
+            args.start,
+            args.end,
+            args.exchanges,
+            args.run_type,
+            args.concurrency,
+            args.direct,
+        )
+    )
+
+    if args.store:
+        from market_analyst.report_store import ReportStore
+
+        with ReportStore(args.store) as store:
+            store.save_many(result.reports)
+
+    for day, error in sorted(result.failed_days.items()):
+        print(f"[FAIL] {day}: {error}")
+    print(
+        f"Replayed {result.days_replayed} day(s) in {result.elapsed_seconds:.2f}s "
+        f"({result.days_per_second:.1f} days/s, {len(result.failed_days)} failed)"
+    )
+    return 0 if not result.failed_days else 1
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
@@ -0,0 +1,513 @@
+# /market_analyst/report_store.py
+"""
+Local, indexed persistence for MarketAnalysisReport objects.
+
+Reports are stored in SQLite: one row per report, one row per exchange report and
+one flattened row per observed instrument. The instrument table keeps the values
+that historical queries filter on (gap, volume, RSI, ...) as real columns so that
+questions like "every appearance of TSLA as a gapper in the last 90 days" or
+"every instrument with RSI > 70 on a given date" are answered from indexes
+instead of by re-parsing JSON payloads.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from collections.abc import Iterable, Sequence
+from datetime import date, timedelta
+from typing import Any, NamedTuple
+
+from market_analyst.schemas import (
+    ExchangeReport,
+    MarketAnalysisReport,
+    MarketRegime,
+    ObservedInstrument,
+    ScreeningSummary,
+)
+from market_analyst.structured_logging import configure_logging
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    trading_date TEXT NOT NULL,
+    analysis_timestamp_utc TEXT NOT NULL,
+    run_type TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exchange_reports (
+    report_id TEXT NOT NULL REFERENCES reports(report_id) ON DELETE CASCADE,
+    exchange_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    vix_ticker TEXT NOT NULL,
+    vix_value REAL NOT NULL,
+    adx_value REAL NOT NULL,
+    screening_summary TEXT,
+    PRIMARY KEY (report_id, exchange_id)
+);
+CREATE TABLE IF NOT EXISTS instruments (
+    report_id TEXT NOT NULL REFERENCES reports(report_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    trading_date TEXT NOT NULL,
+    exchange_id TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    run_type TEXT NOT NULL,
+    gap_percent REAL NOT NULL,
+    pre_market_volume INTEGER NOT NULL,
+    relative_volume REAL NOT NULL,
+    rsi_14d REAL NOT NULL,
+    vwap REAL NOT NULL,
+    average_true_range_14d REAL NOT NULL,
+    average_dollar_volume_30d REAL NOT NULL,
+    market_capitalization INTEGER NOT NULL,
+    sector TEXT NOT NULL,
+    primary_catalyst_type TEXT NOT NULL,
+    correlation_cluster_id INTEGER,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (report_id, exchange_id, ticker)
+);
+CREATE INDEX IF NOT EXISTS ix_instruments_date_exchange_ticker_run
+    ON instruments (trading_date, exchange_id, ticker, run_type);
+CREATE INDEX IF NOT EXISTS ix_instruments_ticker_date
+    ON instruments (ticker, trading_date);
+CREATE INDEX IF NOT EXISTS ix_instruments_date_rsi
+    ON instruments (trading_date, rsi_14d);
+CREATE INDEX IF NOT EXISTS ix_reports_date_run
+    ON reports (trading_date, run_type);
+"""
+
+_INSTRUMENT_COLUMNS = (
+    "report_id, position, trading_date, exchange_id, ticker, run_type, gap_percent, "
+    "pre_market_volume, relative_volume, rsi_14d, vwap, average_true_range_14d, "
+    "average_dollar_volume_30d, market_capitalization, sector, primary_catalyst_type, "
+    "correlation_cluster_id, payload"
+)
+
+
+class StoredInstrument(NamedTuple):
+    """A flattened instrument row as returned by ReportStore queries."""
+
+    report_id: str
+    trading_date: str
+    exchange_id: str
+    ticker: str
+    run_type: str
+    gap_percent: float
+    pre_market_volume: int
+    relative_volume: float
+    rsi_14d: float
+    vwap: float
+    average_true_range_14d: float
+    average_dollar_volume_30d: float
+    market_capitalization: int
+    sector: str
+    primary_catalyst_type: str
+    correlation_cluster_id: int | None
+
+    def to_observed_instrument(self, store: "ReportStore") -> ObservedInstrument:
+        """Loads the full canonical instrument this row was flattened from."""
+        return store.get_instrument(self.report_id, self.exchange_id, self.ticker)
+
+
+def trading_date_of(report: MarketAnalysisReport) -> str:
+    """Returns the trading date (YYYY-MM-DD) a report belongs to."""
+    return report.analysis_timestamp_utc[:10]
+
+
+def _instrument_row(
+    report: MarketAnalysisReport,
+    trading_date: str,
+    exchange_id: str,
+    position: int,
+    instrument: ObservedInstrument,
+) -> tuple[Any, ...]:
+    return (
+        report.report_id,
+        position,
+        trading_date,
+        exchange_id,
+        instrument.ticker,
+        report.run_type,
+        instrument.gapper_data.gap_percent,
+        instrument.gapper_data.pre_market_volume,
+        instrument.gapper_data.relative_volume,
+        instrument.raw_technicals.rsi_14d,
+        instrument.raw_technicals.vwap,
+        instrument.risk_metrics.average_true_range_14d,
+        instrument.risk_metrics.average_dollar_volume_30d,
+        instrument.fundamental_data.market_capitalization,
+        instrument.fundamental_data.sector,
+        instrument.catalyst_analysis.primary_catalyst_type,
+        instrument.correlation_cluster_id,
+        instrument.model_dump_json(),
+    )
+
+
+class ReportStore:
+    """
+    SQLite-backed store for market analysis reports.
+
+    Writes are buffered and flushed in a single transaction once `batch_size`
+    reports are pending (or on `flush()` / `close()`). Re-saving a report with an
+    existing report_id replaces it, so ingestion is idempotent.
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: list[MarketAnalysisReport] = []
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- Writes ---
+
+    def add(self, report: MarketAnalysisReport) -> None:
+        """Queues a report for writing, flushing when the batch is full."""
+        self._pending.append(report)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def save(self, report: MarketAnalysisReport) -> None:
+        """Writes a single report immediately."""
+        self.save_many([report])
+
+    def save_many(self, reports: Iterable[MarketAnalysisReport]) -> None:
+        """Writes a batch of reports in one transaction."""
+        report_rows: list[tuple[Any, ...]] = []
+        exchange_rows: list[tuple[Any, ...]] = []
+        instrument_rows: list[tuple[Any, ...]] = []
+        # The last copy of a report_id within one batch wins, as it would across
+        # batches.
+        unique_reports = {report.report_id: report for report in reports}
+        for report in unique_reports.values():
+            trading_date = trading_date_of(report)
+            report_rows.append(
+                (
+                    report.report_id,
+                    trading_date,
+                    report.analysis_timestamp_utc,
+                    report.run_type,
+                )
+            )
+            for exchange_position, exchange_report in enumerate(
+                report.exchange_reports
+            ):
+                regime = exchange_report.market_regime
+                exchange_rows.append(
+                    (
+                        report.report_id,
+                        exchange_report.exchange_id,
+                        exchange_position,
+                        regime.vix_ticker,
+                        regime.vix_value,
+                        regime.adx_value,
+                        exchange_report.screening_summary.model_dump_json()
+                        if exchange_report.screening_summary
+                        else None,
+                    )
+                )
+                for position, instrument in enumerate(
+                    exchange_report.observed_instruments
+                ):
+                    instrument_rows.append(
+                        _instrument_row(
+                            report,
+                            trading_date,
+                            exchange_report.exchange_id,
+                            position,
+                            instrument,
+                        )
+                    )
+        if not report_rows:
+            return
+
+        with self._conn:
+            # Deleting first cascades to the child rows of any report being re-saved.
+            self._conn.executemany(
+                "DELETE FROM reports WHERE report_id = ?",
+                [(row[0],) for row in report_rows],
+            )
+            self._conn.executemany(
+                "INSERT INTO reports VALUES (?, ?, ?, ?)", report_rows
+            )
+            self._conn.executemany(
+                "INSERT INTO exchange_reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                exchange_rows,
+            )
+            self._conn.executemany(
+                f"INSERT INTO instruments ({_INSTRUMENT_COLUMNS}) VALUES "
+                f"({', '.join('?' * 18)})",
+                instrument_rows,
+            )
+
+    def flush(self) -> None:
+        """Writes any buffered reports."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self.save_many(pending)
+
+    def close(self) -> None:
+        """Flushes pending writes and closes the database."""
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "ReportStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    # --- Reads ---
+
+    def get_report(self, report_id: str) -> MarketAnalysisReport | None:
+        """Rebuilds a full MarketAnalysisReport from the store."""
+        self.flush()
+        header = self._conn.execute(
+            "SELECT analysis_timestamp_utc, run_type FROM reports WHERE report_id = ?",
+            (report_id,),
+        ).fetchone()
+        if header is None:
+            return None
+
+        exchange_reports: dict[str, ExchangeReport] = {}
+        for (
+            exchange_id,
+            vix_ticker,
+            vix_value,
+            adx_value,
+            screening_summary,
+        ) in self._conn.execute(
+            "SELECT exchange_id, vix_ticker, vix_value, adx_value, screening_summary "
+            "FROM exchange_reports "
+            "WHERE report_id = ? ORDER BY position",
+            (report_id,),
+        ):
+            exchange_reports[exchange_id] = ExchangeReport(
+                exchange_id=exchange_id,
+                market_regime=MarketRegime(
+                    vix_ticker=vix_ticker, vix_value=vix_value, adx_value=adx_value
+                ),
+                observed_instruments=[],
+                screening_summary=(
+                    ScreeningSummary.model_validate_json(screening_summary)
+                    if screening_summary
+                    else None
+                ),
+            )
+        for exchange_id, payload in self._conn.execute(
+            "SELECT exchange_id, payload FROM instruments WHERE report_id = ? ORDER "
+            "BY exchange_id, position",
+            (report_id,),
+        ):
+            exchange_reports[exchange_id].observed_instruments.append(
+                ObservedInstrument.model_validate_json(payload)
+            )
+
+        return MarketAnalysisReport(
+            report_id=report_id,
+            analysis_timestamp_utc=header[0],
+            run_type=header[1],
+            exchange_reports=list(exchange_reports.values()),
+        )
+
+    def get_instrument(
+        self, report_id: str, exchange_id: str, ticker: str
+    ) -> ObservedInstrument:
+        """Loads one canonical instrument from a stored report."""
+        self.flush()
+        row = self._conn.execute(
+            "SELECT payload FROM instruments WHERE report_id = ? AND exchange_id = ? "
+            "AND ticker = ?",
+            (report_id, exchange_id, ticker),
+        ).fetchone()
+        if row is None:
+            raise KeyError(
+                f"No instrument {exchange_id}:{ticker} in report {report_id}"
+            )
+        return ObservedInstrument.model_validate_json(row[0])
+
+    def report_ids(
+        self,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        run_type: str | None = None,
+    ) -> list[str]:
+        """Lists stored report IDs, optionally restricted by date range and run type."""
+        self.flush()
+        clauses, params = [], []
+        if start_date:
+            clauses.append("trading_date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("trading_date <= ?")
+            params.append(end_date)
+        if run_type:
+            clauses.append("run_type = ?")
+            params.append(run_type)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT report_id FROM reports {where} ORDER BY trading_date, "
+            "analysis_timestamp_utc",
+            params,
+        )
+        return [row[0] for row in rows]
+
+    def query_instruments(
+        self,
+        ticker: str | None = None,
+        exchange_id: str | None = None,
+        run_type: str | None = None,
+        trading_date: str | None = None,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        min_rsi: float | None = None,
+        max_rsi: float | None = None,
+        min_abs_gap_percent: float | None = None,
+        limit: int | None = None,
+    ) -> list[StoredInstrument]:
+        """
+        Returns flattened instrument rows matching every given filter.
+
+        Dates are inclusive ISO strings (YYYY-MM-DD). Results are ordered by trading
+        date, exchange and ticker.
+        """
+        self.flush()
+        clauses: list[str] = []
+        params: list[Any] = []
+        if trading_date:
+            clauses.append("trading_date = ?")
+            params.append(trading_date)
+        if start_date:
+            clauses.append("trading_date >= ?")
+            params.append(start_date)
+        if end_date:
+            clauses.append("trading_date <= ?")
+            params.append(end_date)
+        if exchange_id:
+            clauses.append("exchange_id = ?")
+            params.append(exchange_id)
+        if ticker:
+            clauses.append("ticker = ?")
+            params.append(ticker)
+        if run_type:
+            clauses.append("run_type = ?")
+            params.append(run_type)
+        if min_rsi is not None:
+            clauses.append("rsi_14d > ?")
+            params.append(min_rsi)
+        if max_rsi is not None:
+            clauses.append("rsi_14d < ?")
+            params.append(max_rsi)
+        if min_abs_gap_percent is not None:
+            clauses.append("ABS(gap_percent) >= ?")
+            params.append(min_abs_gap_percent)
+
+        sql = (
+            "SELECT report_id, trading_date, exchange_id, ticker, run_type, "
+            "gap_percent, pre_market_volume, "
+            "relative_volume, rsi_14d, vwap, average_true_range_14d, "
+            "average_dollar_volume_30d, "
+            "market_capitalization, sector, primary_catalyst_type, "
+            "correlation_cluster_id FROM instruments"
+        )
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        sql += " ORDER BY trading_date, exchange_id, ticker"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [StoredInstrument(*row) for row in self._conn.execute(sql, params)]
+
+    def gapper_appearances(
+        self,
+        ticker: str,
+        days: int = 90,
+        as_of: date | None = None,
+        run_type: str | None = None,
+    ) -> list[StoredInstrument]:
+        """Returns every appearance of `ticker` as a gapper in the last `days` days."""
+        end = as_of or date.today()
+        start = end - timedelta(days=days)
+        return self.query_instruments(
+            ticker=ticker,
+            run_type=run_type,
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+        )
+
+
+# --- Command Line Interface ---
+
+
+def _print_rows(rows: Sequence[StoredInstrument]) -> None:
+    for row in rows:
+        print(
+            f"{row.trading_date}  {row.run_type:<16} {row.exchange_id:<8} "
+            f"{row.ticker:<10} "
+            f"gap={row.gap_percent:+.2f}%  rvol={row.relative_volume:.1f}  "
+            f"rsi={row.rsi_14d:.1f}"
+        )
+    print(f"{len(rows)} row(s)")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Imports report JSON files into the store and runs common queries."""
+    parser = argparse.ArgumentParser(
+        description="Query and maintain the local market analysis report store."
+    )
+    parser.add_argument(
+        "--db", default="data/reports.sqlite3", help="Path to the SQLite database file."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_cmd = commands.add_parser(
+        "import", help="Import MarketAnalysisReport JSON files."
+    )
+    import_cmd.add_argument("files", nargs="+")
+
+    gapper_cmd = commands.add_parser(
+        "gapper", help="List the appearances of a ticker as a gapper."
+    )
+    gapper_cmd.add_argument("ticker")
+    gapper_cmd.add_argument("--days", type=int, default=90)
+    gapper_cmd.add_argument("--run-type")
+
+    rsi_cmd = commands.add_parser(
+        "rsi", help="List instruments above an RSI level on a date."
+    )
+    rsi_cmd.add_argument("trading_date")
+    rsi_cmd.add_argument("--above", type=float, default=70.0)
+
+    args = parser.parse_args(argv)
+    with ReportStore(args.db) as store:
+        if args.command == "import":
+            reports = []
+            for path in args.files:
+                with open(path, encoding="utf-8") as f:
+                    reports.append(MarketAnalysisReport.model_validate(json.load(f)))
+            store.save_many(reports)
+            print(f"Imported {len(reports)} report(s) into {args.db}")
+        elif args.command == "gapper":
+            _print_rows(
+                store.gapper_appearances(
+                    args.ticker, days=args.days, run_type=args.run_type
+                )
+            )
+        elif args.command == "rsi":
+            _print_rows(
+                store.query_instruments(
+                    trading_date=args.trading_date, min_rsi=args.above
+                )
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
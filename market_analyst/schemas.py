@@ -1,44 +1,53 @@
 # /market_analyst/schemas.py
+from datetime import datetime
+
 from pydantic import BaseModel, Field
-from typing import List, Optional
 
 # --- Data Structures for Final Report ---
 
+
 class MarketRegime(BaseModel):
     vix_ticker: str
     vix_value: float
     adx_value: float
 
+
 class GapperData(BaseModel):
     ticker: str
     gap_percent: float
     pre_market_volume: int
     relative_volume: float
 
+
 class RiskMetrics(BaseModel):
     average_true_range_14d: float
     average_dollar_volume_30d: float
 
+
 class CatalystAnalysis(BaseModel):
     primary_catalyst_type: str
-    recent_headlines: List[str]
+    recent_headlines: list[str]
+
 
 class KeyTechnicalLevels(BaseModel):
     pre_market_high: float
     pre_market_low: float
     previous_day_high: float
 
+
 class Macd(BaseModel):
     macd_line: float
     signal_line: float
     histogram: float
 
+
 class BollingerBands(BaseModel):
     upper_band: float
     middle_band: float
     lower_band: float
     band_width: float
 
+
 class RawTechnicals(BaseModel):
     vwap: float
     rsi_14d: float
@@ -48,6 +57,7 @@ class RawTechnicals(BaseModel):
     ema_50d: float
     bollinger_bands_20d_2std: BollingerBands
 
+
 class ChartClarityComponents(BaseModel):
     range_integrity: float
     price_action_rhythm: float
@@ -57,12 +67,14 @@ class ChartClarityComponents(BaseModel):
     order_flow_absorption: float
     cumulative_volume_delta: float
 
+
 class FundamentalData(BaseModel):
     name: str
     sector: str
     industry: str
     market_capitalization: int
 
+
 class ObservedInstrument(BaseModel):
     ticker: str
     exchange_id: str
@@ -73,15 +85,36 @@ class ObservedInstrument(BaseModel):
     raw_technicals: RawTechnicals
     chart_clarity_raw_components: ChartClarityComponents
     fundamental_data: FundamentalData
-    correlation_cluster_id: Optional[int] = None
+    correlation_cluster_id: int | None = None
+
+
+class ScreeningSummary(BaseModel):
+    candidates_discovered: int
+    screened_out_by_threshold: int
+    screened_out_by_cap: int
+    candidates_enriched: int
+
 
 class ExchangeReport(BaseModel):
     exchange_id: str
     market_regime: MarketRegime
-    observed_instruments: List[ObservedInstrument]
+    observed_instruments: list[ObservedInstrument]
+    screening_summary: ScreeningSummary | None = None
+
 
 class MarketAnalysisReport(BaseModel):
     report_id: str
     analysis_timestamp_utc: str
     run_type: str
-    exchange_reports: List[ExchangeReport]
+    exchange_reports: list[ExchangeReport]
+
+
+# --- Data Structures for Run Requests ---
+
+
+class AnalysisRequest(BaseModel):
+    """A request to analyse a set of exchanges at a given point in time."""
+
+    exchanges: list[str] = Field(..., min_length=1)
+    run_type: str = "Pre-Market"
+    as_of: datetime | None = None
@@ -0,0 +1,272 @@
+# /market_analyst/screening.py
+"""
+Pre-enrichment screening of discovered gappers.
+
+Full enrichment is the most expensive stage of a run, and its cost grows with the
+number of names that gap. Screening sits between discovery and enrichment: it
+scores every candidate of an exchange in one vectorized pass, using the
+GapperData fields plus cheap per-ticker metrics (30-day dollar volume, float,
+last price), drops candidates that fail the configured thresholds and keeps at
+most `top_n_per_exchange` of the rest. Only the survivors are enriched.
+
+Screening metrics are fetched in one provider call per exchange and cached per
+provider, so repeated runs over the same day do not refetch them.
+"""
+
+import asyncio
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from pydantic import BaseModel
+
+from market_analyst.clock import get_clock
+from market_analyst.providers import (
+    MarketDataProvider,
+    ProviderError,
+    get_provider,
+    parse_as_of,
+)
+from market_analyst.schemas import ScreeningSummary
+from market_analyst.symbols import get_registry
+
+
+class ScreeningConfig(BaseModel):
+    """
+    Thresholds and caps for pre-enrichment screening.
+
+    The defaults only remove untradeable names (sub-$1 prices, illiquid stocks) and
+    bound enrichment on busy days; tighter values can be passed per run, e.g. via
+    the "screening" key of the session state.
+    """
+
+    min_score: float = 0.0
+    top_n_per_exchange: int | None = 25
+    min_abs_gap_percent: float = 0.0
+    min_relative_volume: float = 0.0
+    min_price: float = 1.0
+    max_price: float | None = None
+    min_average_dollar_volume: float = 1_000_000.0
+    max_float_shares: float | None = None
+
+
+# Composite score weights; the components are each normalised to [0, 1].
+_GAP_WEIGHT = 0.4
+_RELATIVE_VOLUME_WEIGHT = 0.3
+_LIQUIDITY_WEIGHT = 0.2
+_FLOAT_WEIGHT = 0.1
+
+# Values at which a component reaches its full score.
+_FULL_SCORE_GAP_PERCENT = 10.0
+_FULL_SCORE_RELATIVE_VOLUME = 20.0
+_FULL_SCORE_LIQUIDITY_DECADES = 3.0  # ADV 1000x the liquidity floor
+_FLOAT_SCORE_BASE_SHARES = 1_000_000.0  # floats at or below this score 1.0 ...
+_FLOAT_SCORE_DECADES = 4.0  # ... falling to 0.0 at 10 billion shares
+
+# Score given to a component whose metric the provider could not supply.
+_NEUTRAL_COMPONENT_SCORE = 0.5
+
+
+def _column(metrics: Sequence[dict[str, float]], key: str) -> np.ndarray:
+    return np.array([m.get(key, np.nan) for m in metrics], dtype=np.float64)
+
+
+def score_candidates(
+    gappers: Sequence[dict[str, Any]],
+    metrics: dict[str, dict[str, float]],
+    config: ScreeningConfig | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scores gappers of one exchange and applies the threshold gates.
+
+    Returns `(scores, passed)`, two arrays aligned with `gappers`. Missing metrics
+    score neutrally and never fail a gate on their own.
+    """
+    config = config or ScreeningConfig()
+    ticker_metrics = [metrics.get(g["ticker"], {}) for g in gappers]
+    abs_gap = np.abs(np.array([g["gap_percent"] for g in gappers], dtype=np.float64))
+    relative_volume = np.array(
+        [g["relative_volume"] for g in gappers], dtype=np.float64
+    )
+    adv = _column(ticker_metrics, "average_dollar_volume_30d")
+    float_shares = _column(ticker_metrics, "float_shares")
+    price = _column(ticker_metrics, "last_price")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gap_score = np.clip(abs_gap / _FULL_SCORE_GAP_PERCENT, 0.0, 1.0)
+        relative_volume_score = np.clip(
+            np.log1p(np.maximum(relative_volume, 0.0))
+            / np.log1p(_FULL_SCORE_RELATIVE_VOLUME),
+            0.0,
+            1.0,
+        )
+        liquidity_floor = max(config.min_average_dollar_volume, 1.0)
+        liquidity_score = np.clip(
+            np.log10(adv / liquidity_floor) / _FULL_SCORE_LIQUIDITY_DECADES, 0.0, 1.0
+        )
+        float_score = 1.0 - np.clip(
+            np.log10(float_shares / _FLOAT_SCORE_BASE_SHARES) / _FLOAT_SCORE_DECADES,
+            0.0,
+            1.0,
+        )
+    liquidity_score = np.where(np.isnan(adv), _NEUTRAL_COMPONENT_SCORE, liquidity_score)
+    float_score = np.where(
+        np.isnan(float_shares), _NEUTRAL_COMPONENT_SCORE, float_score
+    )
+
+    scores = (
+        _GAP_WEIGHT * gap_score
+        + _RELATIVE_VOLUME_WEIGHT * relative_volume_score
+        + _LIQUIDITY_WEIGHT * liquidity_score
+        + _FLOAT_WEIGHT * float_score
+    )
+
+    # Comparisons with NaN are False, so unknown metrics are let through explicitly.
+    passed = (
+        (scores >= config.min_score)
+        & (abs_gap >= config.min_abs_gap_percent)
+        & (relative_volume >= config.min_relative_volume)
+        & (np.isnan(price) | (price >= config.min_price))
+        & (np.isnan(adv) | (adv >= config.min_average_dollar_volume))
+    )
+    if config.max_price is not None:
+        passed &= np.isnan(price) | (price <= config.max_price)
+    if config.max_float_shares is not None:
+        passed &= np.isnan(float_shares) | (float_shares <= config.max_float_shares)
+    return scores, passed
+
+
+def screen_gappers(
+    gappers: Sequence[dict[str, Any]],
+    metrics: dict[str, dict[str, float]],
+    config: ScreeningConfig | None = None,
+) -> tuple[list[dict[str, Any]], ScreeningSummary]:
+    """
+    Selects the gappers of one exchange that go on to enrichment.
+
+    Survivors keep their discovery order. The summary records how many candidates
+    were dropped by the thresholds and how many by the top-N cap.
+    """
+    config = config or ScreeningConfig()
+    if not gappers:
+        return [], ScreeningSummary(
+            candidates_discovered=0,
+            screened_out_by_threshold=0,
+            screened_out_by_cap=0,
+            candidates_enriched=0,
+        )
+
+    scores, passed = score_candidates(gappers, metrics, config)
+    passing = np.flatnonzero(passed)
+    selected = passing
+    if (
+        config.top_n_per_exchange is not None
+        and len(passing) > config.top_n_per_exchange
+    ):
+        # Stable sort keeps the discovery order between equal scores.
+        ranked = passing[np.argsort(-scores[passing], kind="stable")]
+        selected = np.sort(ranked[: config.top_n_per_exchange])
+
+    kept = [gappers[int(i)] for i in selected]
+    summary = ScreeningSummary(
+        candidates_discovered=len(gappers),
+        screened_out_by_threshold=len(gappers) - len(passing),
+        screened_out_by_cap=len(passing) - len(selected),
+        candidates_enriched=len(kept),
+    )
+    return kept, summary
+
+
+class _MetricsCache:
+    """LRU cache of screening metrics keyed by (symbol ID, trading day)."""
+
+    def __init__(self, max_entries: int = 50_000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, str], dict[str, float]] = OrderedDict()
+
+    def get(self, key: tuple[int, str]) -> dict[str, float] | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple[int, str], value: dict[str, float]) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_metrics_caches: "weakref.WeakKeyDictionary[MarketDataProvider, _MetricsCache]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def fetch_screening_metrics(
+    tickers: Sequence[str],
+    exchange_id: str,
+    as_of: datetime | None = None,
+    provider: MarketDataProvider | None = None,
+) -> dict[str, dict[str, float]]:
+    """
+    Returns screening metrics for `tickers`, fetching only those not already cached.
+
+    Live runs (no `as_of`) are cached per current UTC date, since
+    the metrics are daily aggregates. Provider errors degrade to no metrics rather
+    than failing the run; screening then relies on the gapper fields alone.
+    """
+    provider = provider or get_provider()
+    cache = _metrics_caches.get(provider)
+    if cache is None:
+        cache = _metrics_caches[provider] = _MetricsCache()
+    day = (as_of or get_clock().now()).date().isoformat()
+
+    registry = get_registry()
+    metrics: dict[str, dict[str, float]] = {}
+    missing: list[str] = []
+    for ticker in tickers:
+        cached = cache.get((registry.intern(exchange_id, ticker), day))
+        if cached is None:
+            missing.append(ticker)
+        else:
+            metrics[ticker] = cached
+    if missing:
+        try:
+            fetched = await provider.get_screening_metrics(missing, exchange_id, as_of)
+        except ProviderError:
+            fetched = {}
+        for ticker, ticker_metrics in fetched.items():
+            cache.put((registry.intern(exchange_id, ticker), day), ticker_metrics)
+            metrics[ticker] = ticker_metrics
+    return metrics
+
+
+async def screen_exchange(
+    exchange_id: str,
+    gappers: Sequence[dict[str, Any]],
+    as_of: str | None = None,
+    config: ScreeningConfig | None = None,
+) -> tuple[list[dict[str, Any]], ScreeningSummary]:
+    """Fetches (cached) screening metrics for one exchange and screens its gappers."""
+    metrics = await fetch_screening_metrics(
+        [g["ticker"] for g in gappers], exchange_id, parse_as_of(as_of)
+    )
+    return screen_gappers(gappers, metrics, config)
+
+
+async def screen_exchanges(
+    discovered: Mapping[str, Sequence[dict[str, Any]]],
+    as_of: str | None = None,
+    config: ScreeningConfig | None = None,
+) -> dict[str, tuple[list[dict[str, Any]], ScreeningSummary]]:
+    """Screens the gappers of several exchanges concurrently."""
+    results = await asyncio.gather(
+        *(
+            screen_exchange(exchange_id, gappers, as_of, config)
+            for exchange_id, gappers in discovered.items()
+        )
+    )
+    return dict(zip(discovered, results))
@@ -0,0 +1,210 @@
+# /market_analyst/structured_logging.py
+"""
+Non-blocking structured logging for the market analyst.
+
+Log calls on the event loop only put a record on an in-memory queue; a
+QueueListener thread formats each record as one JSON line and writes it out, so
+slow stdout/stderr never stalls a run. Every record carries the correlation ID
+of the run it belongs to (`run_id`), which is bound per run with
+`bind_run_id()`, plus any `extra={...}` fields of the call.
+
+The level defaults to `config.LOG_LEVEL`. The config module refuses to import
+without the deployment credentials, so offline tools and tests that run without
+them log at INFO. DEBUG records are rate-limited per message template, so
+per-ticker lines from a thousand-ticker fan-out are sampled instead of flooding
+the output; the next record that passes reports how many were dropped.
+
+Modules log through `logging.getLogger(__name__)` as usual. `configure_logging()`
+attaches the handlers to the `market_analyst` logger; entry points call it (the
+CLI mains), and the coordinator calls `ensure_logging_configured()` when it
+starts a run, so importing the package has no logging side effects. Records still
+propagate to handlers a host (such as the ADK web server) installed on the root
+logger, unless an entry point passes `propagate=False`.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from datetime import UTC, datetime
+from typing import Any, TextIO
+
+LOGGER_NAME = "market_analyst"
+
+_run_id: ContextVar[str | None] = ContextVar("market_analyst_run_id", default=None)
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+_STANDARD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime", "run_id"}
+
+
+def current_run_id() -> str | None:
+    """Returns the correlation ID bound to the current context, if any."""
+    return _run_id.get()
+
+
+def set_run_id(run_id: str | None) -> Token:
+    """
+    Binds a correlation ID for the current context and returns the reset token.
+
+    Tasks created afterwards (ADK sub-agents, gathered coroutines) inherit it.
+    """
+    return _run_id.set(run_id)
+
+
+@contextmanager
+def bind_run_id(run_id: str | None) -> Iterator[str | None]:
+    """Binds a correlation ID for the duration of the block."""
+    token = _run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _run_id.reset(token)
+
+
+class RunContextFilter(logging.Filter):
+    """Stamps records with the run ID of the context that emitted them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = _run_id.get()
+        return True
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """
+    Token-bucket rate limit for DEBUG records, one bucket per message template.
+
+    Up to `burst` records pass at once and `per_second` are refilled each second.
+    The first record to pass after some were dropped carries `suppressed=<count>`.
+    Records above DEBUG are never limited.
+    """
+
+    def __init__(self, per_second: float = 20.0, burst: int = 50):
+        super().__init__()
+        self.per_second = per_second
+        self.burst = burst
+        self._buckets: dict[tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [
+                    float(self.burst),
+                    now,
+                    0,
+                ]  # tokens, updated_at, suppressed
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def _configured_level() -> str:
+    try:
+        from market_analyst import config
+    except ValueError:  # Missing credentials; see the module docstring.
+        return "INFO"
+    return str(config.LOG_LEVEL)
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: logging.handlers.QueueHandler | None = None
+
+
+def configure_logging(
+    level: str | None = None,
+    stream: TextIO | None = None,
+    debug_per_second: float = 20.0,
+    debug_burst: int = 50,
+    propagate: bool | None = None,
+) -> logging.Logger:
+    """
+    (Re)configures the `market_analyst` logger with a queue-backed JSON handler.
+
+    Safe to call more than once; a previous listener is flushed and replaced.
+    The logger's `propagate` flag is only changed when `propagate` is given.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel((level or _configured_level()).upper())
+    if propagate is not None:
+        logger.propagate = propagate
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Filters run on the emitting side, where the run ID context is available.
+    _queue_handler.addFilter(RunContextFilter())
+    _queue_handler.addFilter(DebugRateLimitFilter(debug_per_second, debug_burst))
+    logger.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, output, respect_handler_level=True
+    )
+    _listener.start()
+    return logger
+
+
+def ensure_logging_configured() -> None:
+    """Configures logging with the defaults unless an entry point already has."""
+    if _listener is None:
+        configure_logging()
+
+
+def shutdown_logging() -> None:
+    """Stops the listener thread after writing every queued record."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -1,32 +1,23 @@
 # /market_analyst/sub_agents/exchange_gapper_discovery/tools.py
-import asyncio
-from typing import List, Dict, Any
+import logging
+from typing import Any
 
-async def discover_exchange_gappers(exchange_id: str) -> List[Dict[str, Any]]:
-    """Discovers gapping instruments for a given exchange. Returns a list of ticker dicts."""
-    print(f"Discovering gappers for {exchange_id}...")
-    await asyncio.sleep(0.2)
-    
-    # Return different mock data based on exchange to simulate realistic discovery
-    if exchange_id == "NASDAQ":
-        return [
-            {"ticker": "AAPL", "gap_percent": 5.2, "pre_market_volume": 1250000, "relative_volume": 15.3},
-            {"ticker": "TSLA", "gap_percent": -2.8, "pre_market_volume": 980000, "relative_volume": 8.7},
-        ]
-    elif exchange_id == "TSX":
-        return [
-            {"ticker": "SHOP.TO", "gap_percent": 3.1, "pre_market_volume": 450000, "relative_volume": 12.5},
-            {"ticker": "CNR.TO", "gap_percent": -1.5, "pre_market_volume": 320000, "relative_volume": 6.2},
-        ]
-    else:
-        # Default fallback for other exchanges
-        return [
-            {"ticker": "DEFAULT", "gap_percent": 0.0, "pre_market_volume": 100000, "relative_volume": 1.0},
-        ]
+from market_analyst.providers import get_provider, parse_as_of
 
-async def get_market_regime(exchange_id: str) -> Dict[str, Any]:
+logger = logging.getLogger(__name__)
+
+
+async def discover_exchange_gappers(
+    exchange_id: str, as_of: str | None = None
+) -> list[dict[str, Any]]:
+    """Discovers gapping instruments for an exchange. Returns a list of ticker dicts."""
+    logger.info("Discovering gappers", extra={"exchange_id": exchange_id})
+    return await get_provider().get_gappers(exchange_id, parse_as_of(as_of))
+
+
+async def get_market_regime(
+    exchange_id: str, as_of: str | None = None
+) -> dict[str, Any]:
     """Gets the market regime for a given exchange. Returns a dictionary."""
-    print(f"Getting market regime for {exchange_id}...")
-    await asyncio.sleep(0.1)
-    vix_ticker = "^VIXC" if exchange_id == "TSX" else "^VIX"
-    return {"vix_ticker": vix_ticker, "vix_value": 18.5, "adx_value": 28.1}
+    logger.info("Getting market regime", extra={"exchange_id": exchange_id})
+    return await get_provider().get_market_regime(exchange_id, parse_as_of(as_of))
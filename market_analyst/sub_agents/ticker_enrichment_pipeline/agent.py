@@ -1,37 +1,65 @@
 # /market_analyst/sub_agents/ticker_enrichment_pipeline/agent.py
+from collections.abc import AsyncGenerator
+from typing import Any
+
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
-from typing import AsyncGenerator, Dict, Any
 from google.adk.events import Event
-from google.genai import types as genai_types
-from .tools import enrich_ticker_data
 from pydantic import Field
 
+from market_analyst.symbols import enrichment_state_key, get_registry
+
+from .tools import EnrichedRecords, IssuerDetailsCache, enrich_ticker_record
+
+
 def _sanitize_name(name: str) -> str:
     """Sanitize a ticker name to create a valid Python identifier for agent names."""
     # Replace dots and other invalid characters with underscores
     return name.replace(".", "_").replace("-", "_").replace(" ", "_")
 
+
 class TickerEnrichmentPipeline(BaseAgent):
     ticker: str = Field(..., description="The ticker to enrich.")
-    exchange_id: str = Field(..., description="The ID of the exchange the ticker belongs to.")
-    gapper_data: Dict[str, Any] = Field(..., description="The gapper data for the ticker.")
+    exchange_id: str = Field(
+        ..., description="The ID of the exchange the ticker belongs to."
+    )
+    gapper_data: dict[str, Any] = Field(
+        ..., description="The gapper data for the ticker."
+    )
+    symbol_id: int = Field(
+        ..., description="Registry ID of the listing; interned if omitted."
+    )
+    issuer_cache: IssuerDetailsCache | None = Field(
+        None,
+        description="Run-wide cache sharing issuer-level data between cross-listings.",
+    )
+    results: EnrichedRecords | None = Field(
+        None,
+        description="Run-wide collection for the record; else a dict in session state.",
+    )
 
-    def __init__(self, **kwargs):
-        sanitized_ticker = _sanitize_name(kwargs.get('ticker', ''))
-        super().__init__(name=f"enrich_{sanitized_ticker}", **kwargs)
+    def __init__(self, **kwargs: Any) -> None:
+        ticker = kwargs.get("ticker", "")
+        if kwargs.get("symbol_id") is None and "exchange_id" in kwargs:
+            kwargs["symbol_id"] = get_registry().intern(kwargs["exchange_id"], ticker)
+        super().__init__(name=f"enrich_{_sanitize_name(ticker)}", **kwargs)
 
     async def _run_async_impl(
         self,
         ctx: InvocationContext,
     ) -> AsyncGenerator[Event, None]:
 
-        enriched_data_dict = await enrich_ticker_data(
+        record = await enrich_ticker_record(
             ticker=self.ticker,
             exchange_id=self.exchange_id,
-            gapper_data=self.gapper_data
+            gapper_data=self.gapper_data,
+            as_of=ctx.session.state.get("as_of"),
+            issuer_cache=self.issuer_cache,
         )
-        ctx.session.state[f"enriched_{self.ticker}"] = enriched_data_dict
+        if self.results is not None:
+            self.results.add(self.symbol_id, record)
+        else:
+            ctx.session.state[enrichment_state_key(self.symbol_id)] = record.to_dict()
         # Silent worker agent - no events yielded for clean output
         return
         # This line will never be reached, but keeps the AsyncGenerator signature valid
@@ -0,0 +1,166 @@
+# /market_analyst/symbols.py
+"""
+Interned symbol registry.
+
+Every (exchange_id, ticker) listing seen by the pipeline is given a dense integer
+symbol ID, so intermediate results, caches and arrays can be keyed by a small int
+instead of by strings. Cross-listed symbols (e.g. SHOP on NASDAQ and SHOP.TO on
+TSX) are grouped under a shared issuer ID, which enrichment uses to fetch
+issuer-level data (fundamentals, catalysts) once per issuer.
+
+Cross-listings are registered explicitly rather than guessed from ticker roots:
+the roots of unrelated companies collide too often (T is AT&T on NYSE, T.TO is
+Telus on TSX).
+
+The process-wide registry only grows: tick stores, order books and correlation
+trackers key their state by symbol ID, so an ID must stay valid for as long as
+they live. Code that wants a bounded or isolated registry (a test, a one-off
+batch job) binds its own with `use_registry()`.
+"""
+
+import csv
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+Listing = tuple[str, str]  # (exchange_id, ticker)
+
+# Well-known US/Canadian cross-listings, registered in every new registry.
+KNOWN_CROSS_LISTINGS: tuple[tuple[Listing, Listing], ...] = (
+    (("NASDAQ", "SHOP"), ("TSX", "SHOP.TO")),
+    (("NYSE", "SHOP"), ("TSX", "SHOP.TO")),
+    (("NYSE", "CNI"), ("TSX", "CNR.TO")),
+    (("NYSE", "CP"), ("TSX", "CP.TO")),
+    (("NYSE", "RY"), ("TSX", "RY.TO")),
+    (("NYSE", "TD"), ("TSX", "TD.TO")),
+    (("NYSE", "BMO"), ("TSX", "BMO.TO")),
+    (("NYSE", "BNS"), ("TSX", "BNS.TO")),
+    (("NYSE", "ENB"), ("TSX", "ENB.TO")),
+    (("NYSE", "SU"), ("TSX", "SU.TO")),
+    (("NYSE", "CNQ"), ("TSX", "CNQ.TO")),
+    (("NYSE", "BCE"), ("TSX", "BCE.TO")),
+    (("NASDAQ", "TRI"), ("TSX", "TRI.TO")),
+)
+
+
+class SymbolRegistry:
+    """
+    Maps listings to dense symbol IDs and symbol IDs to issuer IDs.
+
+    Symbol IDs are assigned in first-seen order starting at 0 and never change.
+    An issuer ID is the smallest symbol ID among the issuer's listings, so a
+    listing that is not cross-listed is its own issuer. Register cross-listings
+    before a run starts: linking two issuers merges them into one ID.
+    """
+
+    def __init__(
+        self, cross_listings: Iterable[tuple[Listing, Listing]] = KNOWN_CROSS_LISTINGS
+    ):
+        self._ids: dict[Listing, int] = {}
+        self._listings: list[Listing] = []
+        self._parents: list[int] = []
+        for first, second in cross_listings:
+            self.link(first, second)
+
+    def __len__(self) -> int:
+        return len(self._listings)
+
+    def __contains__(self, listing: Listing) -> bool:
+        return listing in self._ids
+
+    def intern(self, exchange_id: str, ticker: str) -> int:
+        """Returns the symbol ID of a listing, assigning the next ID if it is new."""
+        key = (exchange_id, ticker)
+        symbol_id = self._ids.get(key)
+        if symbol_id is None:
+            symbol_id = len(self._listings)
+            self._ids[key] = symbol_id
+            self._listings.append(key)
+            self._parents.append(symbol_id)
+        return symbol_id
+
+    def lookup(self, exchange_id: str, ticker: str) -> int | None:
+        """Returns the symbol ID of a listing, or None if it was never interned."""
+        return self._ids.get((exchange_id, ticker))
+
+    def listing(self, symbol_id: int) -> Listing:
+        """Returns the (exchange_id, ticker) of a symbol ID."""
+        return self._listings[symbol_id]
+
+    def issuer_of(self, symbol_id: int) -> int:
+        """Returns the issuer ID shared by all listings of the symbol's issuer."""
+        parents = self._parents
+        root = symbol_id
+        while parents[root] != root:
+            root = parents[root]
+        while parents[symbol_id] != root:  # path compression
+            parents[symbol_id], symbol_id = root, parents[symbol_id]
+        return root
+
+    def link(self, first: Listing, second: Listing) -> int:
+        """Records that two listings share an issuer. Returns the issuer ID."""
+        first_issuer = self.issuer_of(self.intern(*first))
+        second_issuer = self.issuer_of(self.intern(*second))
+        issuer_id, merged = sorted((first_issuer, second_issuer))
+        self._parents[merged] = issuer_id
+        return issuer_id
+
+    def listings_of(self, issuer_id: int) -> list[int]:
+        """Returns the symbol IDs of every known listing of an issuer."""
+        return [
+            symbol_id
+            for symbol_id in range(len(self._listings))
+            if self.issuer_of(symbol_id) == issuer_id
+        ]
+
+    def load_cross_listings(self, path: str) -> int:
+        """
+        Registers cross-listings from a CSV file with the columns
+        exchange_id, ticker, other_exchange_id, other_ticker. Returns the row count.
+        """
+        count = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.link(
+                    (row["exchange_id"], row["ticker"]),
+                    (row["other_exchange_id"], row["other_ticker"]),
+                )
+                count += 1
+        return count
+
+
+_registry: SymbolRegistry | None = None
+_active_registry: ContextVar[SymbolRegistry | None] = ContextVar(
+    "symbol_registry", default=None
+)
+
+
+def get_registry() -> SymbolRegistry:
+    """Returns the registry bound with `use_registry()`, else the process-wide one."""
+    global _registry
+    registry = _active_registry.get()
+    if registry is not None:
+        return registry
+    if _registry is None:
+        _registry = SymbolRegistry()
+    return _registry
+
+
+@contextmanager
+def use_registry(registry: SymbolRegistry) -> Iterator[SymbolRegistry]:
+    """
+    Binds `registry` for the current context.
+
+    Symbol IDs from one registry mean nothing in another: bind it before creating
+    the stores and trackers that will be keyed by its IDs.
+    """
+    token = _active_registry.set(registry)
+    try:
+        yield registry
+    finally:
+        _active_registry.reset(token)
+
+
+def enrichment_state_key(symbol_id: int) -> str:
+    """Session-state key under which enrichment stores the result for a symbol."""
+    return f"enriched_{symbol_id}"
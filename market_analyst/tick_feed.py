@@ -0,0 +1,598 @@
+# /market_analyst/tick_feed.py
+"""
+In-memory live levels maintained from a real-time tick stream.
+
+KeyTechnicalLevels.pre_market_high / pre_market_low and RawTechnicals.vwap move
+with every print during the pre-market. Instead of asking the provider for them
+on every enrichment call, a TickFeed consumes a WebSocket-style stream of tick
+batches into a TickStore, which keeps for every symbol (by registry symbol ID):
+
+* a fixed-size ring buffer of the most recent ticks (timestamp, price, size), and
+* running session high, low, volume and price*volume, updated in O(1) per tick,
+  so the current VWAP is one division away.
+
+Enrichment reads the current levels from the store bound with `use_tick_store()`
+and overlays them on the provider values. previous_day_high does not change
+intraday and keeps coming from the provider.
+
+A store holds one session, keyed by the UTC date of its ticks. The first tick of
+a later date starts a new session and clears every symbol; ticks of an earlier
+date are dropped. Enrichment ignores a store whose session is not today's, so a
+feed left running overnight never serves yesterday's levels.
+
+Two stand-ins for a live stream are included: a seeded random-walk simulator
+and a replay of a recorded CSV tick file (timestamp,exchange_id,ticker,price,size).
+
+Usage:
+    python -m market_analyst.tick_feed simulate --symbols 1000 --rate 50000 --seconds 10
+    python -m market_analyst.tick_feed simulate --symbols 50 --seconds 5 \
+        --record ticks.csv
+    python -m market_analyst.tick_feed replay ticks.csv --speed 10
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, timedelta
+from typing import (
+    NamedTuple,
+)
+
+import numpy as np
+
+from market_analyst.clock import get_clock
+from market_analyst.structured_logging import configure_logging
+from market_analyst.symbols import SymbolRegistry, get_registry
+
+_SECONDS_PER_DAY = 86400
+_EPOCH = date(1970, 1, 1)
+
+
+class TickBatch(NamedTuple):
+    """A batch of ticks as parallel arrays, in arrival order."""
+
+    symbol_ids: np.ndarray  # int64
+    timestamps: np.ndarray  # float64, epoch seconds
+    prices: np.ndarray  # float64
+    sizes: np.ndarray  # float64
+
+    def __len__(self) -> int:
+        return len(self.symbol_ids)
+
+
+class LiveLevels(NamedTuple):
+    """Current session levels of one symbol."""
+
+    pre_market_high: float
+    pre_market_low: float
+    vwap: float
+    volume: float
+    last_price: float
+    last_timestamp: float
+    tick_count: int
+
+
+class TickStore:
+    """
+    Per-symbol ring buffers and running session statistics, indexed by symbol ID.
+
+    All state lives in preallocated numpy arrays that grow (by doubling) only when
+    a symbol ID beyond the current capacity arrives. `apply()` ingests a whole
+    batch with vectorized operations; `update()` handles a single tick.
+    """
+
+    # Per-symbol arrays, (re)allocated by _allocate(); the ring buffers are (symbols,
+    # capacity).
+    _timestamps: np.ndarray
+    _prices: np.ndarray
+    _sizes: np.ndarray
+    _heads: np.ndarray
+    _highs: np.ndarray
+    _lows: np.ndarray
+    _volumes: np.ndarray
+    _notionals: np.ndarray
+    _last_prices: np.ndarray
+    _last_timestamps: np.ndarray
+
+    def __init__(self, capacity_per_symbol: int = 256, initial_symbols: int = 1024):
+        self.capacity = capacity_per_symbol
+        self._symbols = 0
+        # Days since the epoch (UTC) of the session the levels describe.
+        self._session_day: int | None = None
+        self.stale_ticks = 0
+        self._allocate(initial_symbols)
+
+    def _allocate(self, symbols: int) -> None:
+        def grow(
+            name: str, fill: float, dtype: type = np.float64, ring: bool = False
+        ) -> None:
+            array: np.ndarray = np.full(
+                (symbols, self.capacity) if ring else symbols, fill, dtype=dtype
+            )
+            if self._symbols:
+                array[: self._symbols] = getattr(self, name)
+            setattr(self, name, array)
+
+        for name in ("_timestamps", "_prices", "_sizes"):
+            grow(name, 0.0, ring=True)
+        grow("_heads", 0, dtype=np.int64)
+        grow("_highs", -np.inf)
+        grow("_lows", np.inf)
+        grow("_volumes", 0.0)
+        grow("_notionals", 0.0)
+        grow("_last_prices", np.nan)
+        grow("_last_timestamps", np.nan)
+        self._symbols = symbols
+
+    def _ensure_capacity(self, max_symbol_id: int) -> None:
+        if max_symbol_id >= self._symbols:
+            symbols = self._symbols
+            while symbols <= max_symbol_id:
+                symbols *= 2
+            self._allocate(symbols)
+
+    def _in_session(self, day: int) -> bool:
+        """Starts a new session on a later `day`; False if `day` is an earlier one."""
+        if self._session_day is None or day > self._session_day:
+            if self._session_day is not None:
+                self.reset_session()
+            self._session_day = day
+        return day == self._session_day
+
+    # --- Writes ---
+
+    def update(
+        self, symbol_id: int, timestamp: float, price: float, size: float
+    ) -> None:
+        """Ingests one tick."""
+        if not self._in_session(int(timestamp // _SECONDS_PER_DAY)):
+            self.stale_ticks += 1
+            return
+        self._ensure_capacity(symbol_id)
+        head = self._heads[symbol_id]
+        slot = head % self.capacity
+        self._timestamps[symbol_id, slot] = timestamp
+        self._prices[symbol_id, slot] = price
+        self._sizes[symbol_id, slot] = size
+        self._heads[symbol_id] = head + 1
+        if price > self._highs[symbol_id]:
+            self._highs[symbol_id] = price
+        if price < self._lows[symbol_id]:
+            self._lows[symbol_id] = price
+        self._volumes[symbol_id] += size
+        self._notionals[symbol_id] += price * size
+        self._last_prices[symbol_id] = price
+        self._last_timestamps[symbol_id] = timestamp
+
+    def apply(self, batch: TickBatch) -> None:
+        """Ingests a batch of ticks (in arrival order) with vectorized updates."""
+        if len(batch) == 0:
+            return
+        days = (batch.timestamps // _SECONDS_PER_DAY).astype(np.int64)
+        self._in_session(int(days.max()))
+        current = days == self._session_day
+        if not current.all():
+            # Ticks before a new day's first one would be cleared by it anyway.
+            self.stale_ticks += int(len(batch) - current.sum())
+            batch = TickBatch(*(column[current] for column in batch))
+        n = len(batch)
+        if n == 0:
+            return
+        symbol_ids = batch.symbol_ids
+        self._ensure_capacity(int(symbol_ids.max()))
+
+        # Group ticks by symbol, keeping arrival order within each symbol.
+        order = np.argsort(symbol_ids, kind="stable")
+        sorted_ids = symbol_ids[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+        group_ids = sorted_ids[group_starts]
+        group_sizes = np.diff(np.r_[group_starts, n])
+        rank = np.arange(n) - np.repeat(group_starts, group_sizes)
+
+        # Only the newest `capacity` ticks of a symbol can survive in its ring.
+        keep = rank >= np.repeat(group_sizes, group_sizes) - self.capacity
+        slots = (self._heads[sorted_ids] + rank) % self.capacity
+        rows, cols, picked = sorted_ids[keep], slots[keep], order[keep]
+        self._timestamps[rows, cols] = batch.timestamps[picked]
+        self._prices[rows, cols] = batch.prices[picked]
+        self._sizes[rows, cols] = batch.sizes[picked]
+        self._heads[group_ids] += group_sizes
+
+        prices, sizes = batch.prices[order], batch.sizes[order]
+        np.maximum.at(self._highs, sorted_ids, prices)
+        np.minimum.at(self._lows, sorted_ids, prices)
+        self._volumes[group_ids] += np.add.reduceat(sizes, group_starts)
+        self._notionals[group_ids] += np.add.reduceat(prices * sizes, group_starts)
+        last = order[group_starts + group_sizes - 1]
+        self._last_prices[group_ids] = batch.prices[last]
+        self._last_timestamps[group_ids] = batch.timestamps[last]
+
+    def reset_session(self, symbol_id: int | None = None) -> None:
+        """Clears the running statistics and ring buffers of one symbol, or of all."""
+        if symbol_id is not None and symbol_id >= self._symbols:
+            return
+        index = slice(None) if symbol_id is None else symbol_id
+        self._heads[index] = 0
+        self._highs[index] = -np.inf
+        self._lows[index] = np.inf
+        self._volumes[index] = 0.0
+        self._notionals[index] = 0.0
+        self._last_prices[index] = np.nan
+        self._last_timestamps[index] = np.nan
+
+    # --- Reads ---
+
+    @property
+    def session_date(self) -> date | None:
+        """UTC date of the session the levels describe; None before the first tick."""
+        if self._session_day is None:
+            return None
+        return _EPOCH + timedelta(days=self._session_day)
+
+    def tick_count(self, symbol_id: int) -> int:
+        """Returns the number of ticks ingested for a symbol this session."""
+        return int(self._heads[symbol_id]) if symbol_id < self._symbols else 0
+
+    def levels(self, symbol_id: int) -> LiveLevels | None:
+        """Returns the session levels of a symbol, or None if it has no ticks."""
+        count = self.tick_count(symbol_id)
+        if count == 0:
+            return None
+        volume = float(self._volumes[symbol_id])
+        last_price = float(self._last_prices[symbol_id])
+        return LiveLevels(
+            pre_market_high=float(self._highs[symbol_id]),
+            pre_market_low=float(self._lows[symbol_id]),
+            vwap=float(self._notionals[symbol_id]) / volume
+            if volume > 0
+            else last_price,
+            volume=volume,
+            last_price=last_price,
+            last_timestamp=float(self._last_timestamps[symbol_id]),
+            tick_count=count,
+        )
+
+    def recent(
+        self, symbol_id: int, n: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns (timestamps, prices, sizes) of the `n` latest ticks, oldest first."""
+        available = min(self.tick_count(symbol_id), self.capacity)
+        n = available if n is None else min(n, available)
+        if n == 0:
+            empty = np.empty(0)
+            return empty, empty, empty
+        head = int(self._heads[symbol_id])
+        slots = np.arange(head - n, head) % self.capacity
+        return (
+            self._timestamps[symbol_id, slots],
+            self._prices[symbol_id, slots],
+            self._sizes[symbol_id, slots],
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the store's arrays."""
+        return sum(
+            a.nbytes
+            for a in (
+                self._timestamps,
+                self._prices,
+                self._sizes,
+                self._heads,
+                self._highs,
+                self._lows,
+                self._volumes,
+                self._notionals,
+                self._last_prices,
+                self._last_timestamps,
+            )
+        )
+
+
+_active_tick_store: ContextVar[TickStore | None] = ContextVar(
+    "tick_store", default=None
+)
+
+
+def get_tick_store() -> TickStore | None:
+    """Returns the tick store bound to the current context, if any."""
+    return _active_tick_store.get()
+
+
+@contextmanager
+def use_tick_store(store: TickStore) -> Iterator[TickStore]:
+    """Binds `store` for the current context so enrichment overlays its live levels."""
+    token = _active_tick_store.set(store)
+    try:
+        yield store
+    finally:
+        _active_tick_store.reset(token)
+
+
+# --- Sources ---
+
+TICK_FILE_COLUMNS = ["timestamp", "exchange_id", "ticker", "price", "size"]
+
+
+class SimulatedTickSource:
+    """
+    Seeded random-walk tick stream over a fixed set of listings.
+
+    Each batch covers `batch_interval` seconds of stream time at `ticks_per_second`.
+    With `realtime=True` batches are paced to the wall clock; otherwise they are
+    produced as fast as the consumer takes them.
+    """
+
+    def __init__(
+        self,
+        listings: Sequence[tuple[str, str]],
+        ticks_per_second: float = 50_000,
+        duration: float = 10.0,
+        batch_interval: float = 0.01,
+        realtime: bool = True,
+        seed: int = 0,
+        start_timestamp: float | None = None,
+        registry: SymbolRegistry | None = None,
+    ):
+        registry = registry or get_registry()
+        self.symbol_ids = np.array(
+            [registry.intern(e, t) for e, t in listings], dtype=np.int64
+        )
+        self.ticks_per_second = ticks_per_second
+        self.duration = duration
+        self.batch_interval = batch_interval
+        self.realtime = realtime
+        self.start_timestamp = (
+            get_clock().now().timestamp()
+            if start_timestamp is None
+            else start_timestamp
+        )
+        self._rng = np.random.default_rng(seed)
+        self._prices = self._rng.uniform(5.0, 250.0, len(self.symbol_ids))
+
+    def batches(self) -> Iterator[TickBatch]:
+        """Yields the whole stream synchronously, without pacing."""
+        per_batch = max(1, int(round(self.ticks_per_second * self.batch_interval)))
+        for index in range(int(round(self.duration / self.batch_interval))):
+            yield self._next_batch(index, per_batch)
+
+    def _next_batch(self, index: int, size: int) -> TickBatch:
+        picks = self._rng.integers(0, len(self.symbol_ids), size)
+        # One multiplicative step per symbol per batch keeps the walk cheap; ticks
+        # scatter around it.
+        self._prices *= np.exp(self._rng.normal(0.0, 0.0005, len(self._prices)))
+        prices = np.round(
+            self._prices[picks] * (1.0 + self._rng.normal(0.0, 0.0002, size)), 4
+        )
+        sizes = self._rng.integers(1, 50, size).astype(np.float64) * 100.0
+        start = self.start_timestamp + index * self.batch_interval
+        timestamps = start + np.arange(size) * (self.batch_interval / size)
+        return TickBatch(self.symbol_ids[picks], timestamps, prices, sizes)
+
+    async def __aiter__(self) -> AsyncIterator[TickBatch]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for index, batch in enumerate(self.batches()):
+            if self.realtime:
+                delay = started + (index + 1) * self.batch_interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            yield batch
+
+
+class ReplayTickSource:
+    """
+    Replays a recorded CSV tick file (timestamp,exchange_id,ticker,price,size).
+
+    `speed=None` replays as fast as possible; otherwise recorded gaps are honoured
+    scaled by 1/speed.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        speed: float | None = None,
+        registry: SymbolRegistry | None = None,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.speed = speed
+        self.registry = registry or get_registry()
+
+    def batches(self) -> Iterator[TickBatch]:
+        """Yields the recorded ticks in batches, without pacing."""
+        with open(self.path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != TICK_FILE_COLUMNS:
+                raise ValueError(
+                    f"{self.path} is not a tick file "
+                    f"(expected header {','.join(TICK_FILE_COLUMNS)})"
+                )
+            rows: list[list[str]] = []
+            for row in reader:
+                rows.append(row)
+                if len(rows) == self.batch_size:
+                    yield self._to_batch(rows)
+                    rows = []
+            if rows:
+                yield self._to_batch(rows)
+
+    def _to_batch(self, rows: list[list[str]]) -> TickBatch:
+        intern = self.registry.intern
+        return TickBatch(
+            np.array([intern(r[1], r[2]) for r in rows], dtype=np.int64),
+            np.array([float(r[0]) for r in rows]),
+            np.array([float(r[3]) for r in rows]),
+            np.array([float(r[4]) for r in rows]),
+        )
+
+    async def __aiter__(self) -> AsyncIterator[TickBatch]:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first_timestamp: float | None = None
+        for batch in self.batches():
+            if self.speed:
+                if first_timestamp is None:
+                    first_timestamp = float(batch.timestamps[0])
+                delay = (
+                    started
+                    + (float(batch.timestamps[-1]) - first_timestamp) / self.speed
+                    - loop.time()
+                )
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            yield batch
+
+
+def write_tick_file(
+    path: str, batches: Iterator[TickBatch], registry: SymbolRegistry | None = None
+) -> int:
+    """
+    Records tick batches in the CSV layout ReplayTickSource reads. Returns the tick
+    count.
+    """
+    registry = registry or get_registry()
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(TICK_FILE_COLUMNS)
+        for batch in batches:
+            for symbol_id, timestamp, price, size in zip(
+                batch.symbol_ids.tolist(),
+                batch.timestamps.tolist(),
+                batch.prices.tolist(),
+                batch.sizes.tolist(),
+            ):
+                exchange_id, ticker = registry.listing(symbol_id)
+                writer.writerow((f"{timestamp:.6f}", exchange_id, ticker, price, size))
+                count += 1
+    return count
+
+
+# --- Ingestion ---
+
+
+class FeedStats(NamedTuple):
+    ticks: int
+    batches: int
+    elapsed_seconds: float
+    max_apply_seconds: float
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class TickFeed:
+    """Consumes an async stream of tick batches into a TickStore."""
+
+    def __init__(self, store: TickStore, source: AsyncIterable[TickBatch]):
+        self.store = store
+        self.source = source
+        self._stopped = False
+
+    def stop(self) -> None:
+        """Stops consuming after the current batch."""
+        self._stopped = True
+
+    async def run(self) -> FeedStats:
+        ticks = batches = 0
+        max_apply = 0.0
+        started = time.perf_counter()
+        async for batch in self.source:
+            apply_started = time.perf_counter()
+            self.store.apply(batch)
+            max_apply = max(max_apply, time.perf_counter() - apply_started)
+            ticks += len(batch)
+            batches += 1
+            if self._stopped:
+                break
+        return FeedStats(ticks, batches, time.perf_counter() - started, max_apply)
+
+
+def _synthetic_listings(count: int) -> list[tuple[str, str]]:
+    return [("SIM", f"SIM{i:04d}") for i in range(count)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Runs the feed against the simulator or a recorded file; reports throughput."""
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run the live-levels tick feed against a simulated or recorded stream."
+        )
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    simulate = subparsers.add_parser(
+        "simulate", help="Consume a simulated random-walk stream."
+    )
+    simulate.add_argument("--symbols", type=int, default=1000)
+    simulate.add_argument(
+        "--rate", type=float, default=50_000, help="Ticks per second."
+    )
+    simulate.add_argument("--seconds", type=float, default=10.0)
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument(
+        "--unpaced",
+        action="store_true",
+        help="Produce ticks as fast as they are consumed.",
+    )
+    simulate.add_argument(
+        "--record",
+        help="Write the simulated stream to this tick file instead of consuming it.",
+    )
+
+    replay = subparsers.add_parser("replay", help="Consume a recorded tick file.")
+    replay.add_argument("path")
+    replay.add_argument(
+        "--speed",
+        type=float,
+        help="Replay speed multiplier; as fast as possible if omitted.",
+    )
+    replay.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    source: AsyncIterable[TickBatch]
+    if args.command == "simulate":
+        simulated = SimulatedTickSource(
+            _synthetic_listings(args.symbols),
+            ticks_per_second=args.rate,
+            duration=args.seconds,
+            realtime=not args.unpaced,
+            seed=args.seed,
+        )
+        if args.record:
+            count = write_tick_file(args.record, simulated.batches())
+            print(f"Recorded {count} ticks to {args.record}")
+            return 0
+        source = simulated
+    else:
+        source = ReplayTickSource(
+            args.path, batch_size=args.batch_size, speed=args.speed
+        )
+
+    store = TickStore()
+    stats = asyncio.run(TickFeed(store, source).run())
+    print(
+        f"Ingested {stats.ticks} ticks in {stats.batches} batches "
+        f"over {stats.elapsed_seconds:.2f}s ({stats.ticks_per_second:,.0f} ticks/s, "
+        f"slowest batch {stats.max_apply_seconds * 1000:.2f} ms, "
+        f"store {store.nbytes / 1e6:.1f} MB)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
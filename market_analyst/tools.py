@@ -1,10 +1,48 @@
 # /market_analyst/tools.py
-from typing import List, Dict, Any
+import logging
+from typing import Any
 
-def cluster_instruments(instruments: List[Dict[str, Any]]) -> Dict[str, Any]:
+from market_analyst.correlation import RollingCorrelation
+from market_analyst.records import InstrumentRecord
+from market_analyst.symbols import get_registry
+
+logger = logging.getLogger(__name__)
+
+
+def cluster_instruments(instruments: list[dict[str, Any]]) -> dict[str, Any]:
     """Clusters a list of enriched instruments. Returns a dictionary."""
-    print("Clustering instruments...")
+    logger.info("Clustering instruments", extra={"instrument_count": len(instruments)})
     instruments.sort(key=lambda x: x["ticker"])
     for i, instrument in enumerate(instruments):
         instrument["correlation_cluster_id"] = i % 2
     return {"clustered_instruments": instruments}
+
+
+def cluster_records(
+    records: list[InstrumentRecord],
+    correlation: RollingCorrelation | None = None,
+    threshold: float = 0.7,
+) -> list[InstrumentRecord]:
+    """
+    Clusters InstrumentRecords in place with the same assignment as cluster_instruments.
+
+    With a `correlation` tracker (keyed by registry symbol ID), instruments whose
+    rolling return correlation is at least `threshold` share a cluster ID instead;
+    instruments the tracker does not know get a cluster of their own.
+    """
+    logger.info("Clustering instruments", extra={"instrument_count": len(records)})
+    records.sort(key=lambda r: r.ticker)
+    if correlation is None:
+        for i, record in enumerate(records):
+            record.correlation_cluster_id = i % 2
+        return records
+
+    registry = get_registry()
+    cluster_ids = correlation.cluster_ids(threshold)
+    next_id = max(cluster_ids.values(), default=-1) + 1
+    for record in records:
+        cluster_id = cluster_ids.get(registry.lookup(record.exchange_id, record.ticker))
+        if cluster_id is None:
+            cluster_id, next_id = next_id, next_id + 1
+        record.correlation_cluster_id = cluster_id
+    return records
@@ -0,0 +1,369 @@
+# /market_analyst/warehouse_export.py
+"""
+Columnar export of MarketAnalysisReport batches for bulk loading into the warehouse.
+
+Reports are flattened straight into Arrow record batches and written as
+compressed Parquet, partitioned Hive-style by date, for two tables:
+
+* `instrument_features`: exactly the columns of the instrument_features table
+  in the physical data model (docs/architecture/02_data_architecture/
+  04_physical_data_model_analytics.md), partitioned by `feature_date`.
+  `log_return_1d` and `sentiment_score_1h` are not produced by the pipeline yet
+  and are written as nulls.
+* `observed_instruments`: every field of every observed instrument (the flat
+  InstrumentRecord layout) with its report and exchange context, partitioned by
+  `trading_date`.
+
+Files land in `<root>/<table>/<partition column>=<YYYY-MM-DD>/part-<id>.parquet`,
+which BigQuery (hive partitioning), pyarrow.dataset (`open_dataset`) and DuckDB
+read directly; as usual for Hive layouts, the partition column is carried by the
+directory name rather than stored in the files.
+The exporter streams. Rows are buffered per partition. Once `batch_rows` rows
+are buffered across all partitions, the largest buffers are appended as row
+groups to their partitions' open Parquet files. When a table's date moves past
+a partition, that partition is complete in date-ordered input (such as a
+report-store export) and is written straight away. At most `max_open_files`
+files are kept open at once.
+
+Requires the optional `warehouse` extra (pyarrow):
+    pip install -e ".[warehouse]"
+
+Usage:
+    python -m market_analyst.warehouse_export --out data/warehouse reports.jsonl
+    python -m market_analyst.warehouse_export --out data/warehouse \
+        --store data/reports.sqlite3 \
+        --start 2025-01-01 --end 2025-03-31
+"""
+
+import argparse
+import json
+import os
+import sys
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from datetime import UTC, date, datetime
+from typing import Any
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise ImportError(
+        'Parquet export requires pyarrow: pip install -e ".[warehouse]"'
+    ) from e
+
+from market_analyst.records import InstrumentRecord
+from market_analyst.report_store import ReportStore, trading_date_of
+from market_analyst.schemas import MarketAnalysisReport
+from market_analyst.structured_logging import configure_logging
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+INSTRUMENT_FEATURES_SCHEMA = pa.schema(
+    [
+        pa.field("ticker", pa.string(), nullable=False),
+        pa.field("feature_timestamp_utc", _TIMESTAMP, nullable=False),
+        pa.field("feature_date", pa.date32(), nullable=False),
+        pa.field("rsi_14d", pa.float64()),
+        pa.field("ema_9d", pa.float64()),
+        pa.field("ema_20d", pa.float64()),
+        pa.field("bb_upper_20d_2std", pa.float64()),
+        pa.field("bb_lower_20d_2std", pa.float64()),
+        pa.field("atr_14d", pa.float64()),
+        pa.field("log_return_1d", pa.float64()),
+        pa.field("sentiment_score_1h", pa.float64()),
+    ]
+)
+
+_RECORD_TYPES = {
+    "ticker": pa.string(),
+    "exchange_id": pa.string(),
+    "pre_market_volume": pa.int64(),
+    "market_capitalization": pa.int64(),
+    "correlation_cluster_id": pa.int64(),
+    "primary_catalyst_type": pa.string(),
+    "recent_headlines": pa.list_(pa.string()),
+    "name": pa.string(),
+    "sector": pa.string(),
+    "industry": pa.string(),
+}
+
+OBSERVED_INSTRUMENTS_SCHEMA = pa.schema(
+    [
+        pa.field("report_id", pa.string(), nullable=False),
+        pa.field("analysis_timestamp_utc", _TIMESTAMP, nullable=False),
+        pa.field("trading_date", pa.date32(), nullable=False),
+        pa.field("run_type", pa.string(), nullable=False),
+        pa.field("vix_ticker", pa.string()),
+        pa.field("vix_value", pa.float64()),
+        pa.field("adx_value", pa.float64()),
+    ]
+    + [
+        pa.field(name, _RECORD_TYPES.get(name, pa.float64()))
+        for name in InstrumentRecord.__slots__
+    ]
+)
+
+# (schema, partition column) per table.
+TABLES: dict[str, tuple[pa.Schema, str]] = {
+    "instrument_features": (INSTRUMENT_FEATURES_SCHEMA, "feature_date"),
+    "observed_instruments": (OBSERVED_INSTRUMENTS_SCHEMA, "trading_date"),
+}
+
+
+def file_schema(table: str) -> pa.Schema:
+    """
+    The schema of the table's Parquet files: the partition column lives only in the
+    directory name.
+    """
+    schema, partition_column = TABLES[table]
+    return schema.remove(schema.get_field_index(partition_column))
+
+
+def open_dataset(root: str, table: str) -> "ds.Dataset":
+    """Opens an exported table as a pyarrow dataset, with its partition column."""
+    schema, partition_column = TABLES[table]
+    partitioning = ds.partitioning(
+        pa.schema([schema.field(partition_column)]), flavor="hive"
+    )
+    return ds.dataset(
+        os.path.join(root, table), format="parquet", partitioning=partitioning
+    )
+
+
+def _analysis_time(report: MarketAnalysisReport) -> datetime:
+    stamp = datetime.fromisoformat(report.analysis_timestamp_utc)
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=UTC)
+    return stamp.astimezone(UTC)
+
+
+def flatten_report(report: MarketAnalysisReport) -> dict[str, list[dict[str, Any]]]:
+    """Returns the rows of every table for one report, keyed by table name."""
+    stamp = _analysis_time(report)
+    day = date.fromisoformat(trading_date_of(report))
+    features: list[dict[str, Any]] = []
+    observed: list[dict[str, Any]] = []
+    for exchange_report in report.exchange_reports:
+        regime = exchange_report.market_regime
+        for instrument in exchange_report.observed_instruments:
+            record = InstrumentRecord.from_observed_instrument(instrument)
+            features.append(
+                {
+                    "ticker": record.ticker,
+                    "feature_timestamp_utc": stamp,
+                    "feature_date": day,
+                    "rsi_14d": record.rsi_14d,
+                    "ema_9d": record.ema_9d,
+                    "ema_20d": record.ema_20d,
+                    "bb_upper_20d_2std": record.bb_upper_band,
+                    "bb_lower_20d_2std": record.bb_lower_band,
+                    "atr_14d": record.average_true_range_14d,
+                    "log_return_1d": None,
+                    "sentiment_score_1h": None,
+                }
+            )
+            row = {
+                "report_id": report.report_id,
+                "analysis_timestamp_utc": stamp,
+                "trading_date": day,
+                "run_type": report.run_type,
+                "vix_ticker": regime.vix_ticker,
+                "vix_value": regime.vix_value,
+                "adx_value": regime.adx_value,
+            }
+            row.update(
+                (name, getattr(record, name)) for name in InstrumentRecord.__slots__
+            )
+            observed.append(row)
+    return {"instrument_features": features, "observed_instruments": observed}
+
+
+def to_record_batch(table: str, rows: list[dict[str, Any]]) -> pa.RecordBatch:
+    """Builds an Arrow record batch of `table`'s file schema from row dicts."""
+    schema = file_schema(table)
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array([row[field.name] for row in rows], type=field.type)
+            for field in schema
+        ],
+        schema=schema,
+    )
+
+
+class ParquetExporter:
+    """
+    Streams reports into date-partitioned Parquet files, one directory per table.
+
+    Use as a context manager, or call `close()` to flush the buffers and finish
+    the files. Each exporter writes new part files and never rewrites existing
+    ones, so several exports into the same root simply add parts.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        tables: Iterable[str] = tuple(TABLES),
+        compression: str = "zstd",
+        batch_rows: int = 50_000,
+        max_open_files: int = 32,
+    ):
+        self.root = root
+        self.tables = list(tables)
+        self.compression = compression
+        self.batch_rows = batch_rows
+        self.max_open_files = max_open_files
+        self.rows_written: dict[str, int] = {table: 0 for table in self.tables}
+        self.files_written: list[str] = []
+        self._buffers: dict[tuple[str, date], list[dict[str, Any]]] = {}
+        self._buffered_rows = 0
+        self._latest: dict[str, date] = {}
+        self._writers: OrderedDict[tuple[str, date], pq.ParquetWriter] = OrderedDict()
+
+    def write(self, report: MarketAnalysisReport) -> None:
+        """
+        Adds one report. Partitions the table's date has moved past are written
+        out, and so are the largest buffers while `batch_rows` rows are buffered.
+        """
+        for table, rows in flatten_report(report).items():
+            if table not in self.rows_written or not rows:
+                continue
+            _, partition_column = TABLES[table]
+            day = rows[0][partition_column]
+            latest = self._latest.get(table)
+            if latest is None or day > latest:
+                if latest is not None:
+                    for key in [
+                        k for k in self._buffers if k[0] == table and k[1] < day
+                    ]:
+                        self._flush(key)
+                self._latest[table] = day
+            self._buffers.setdefault((table, day), []).extend(rows)
+            self._buffered_rows += len(rows)
+        while self._buffered_rows >= self.batch_rows:
+            self._flush(max(self._buffers, key=lambda k: len(self._buffers[k])))
+
+    def write_many(self, reports: Iterable[MarketAnalysisReport]) -> None:
+        for report in reports:
+            self.write(report)
+
+    def _writer(self, key: tuple[str, date]) -> "pq.ParquetWriter":
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+        if len(self._writers) >= self.max_open_files:
+            _, oldest = self._writers.popitem(last=False)
+            oldest.close()
+        table, day = key
+        _, partition_column = TABLES[table]
+        directory = os.path.join(
+            self.root, table, f"{partition_column}={day.isoformat()}"
+        )
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{uuid.uuid4().hex}.parquet")
+        writer = self._writers[key] = pq.ParquetWriter(
+            path, file_schema(table), compression=self.compression
+        )
+        self.files_written.append(path)
+        return writer
+
+    def _flush(self, key: tuple[str, date]) -> None:
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        self._buffered_rows -= len(rows)
+        table, _ = key
+        self._writer(key).write_batch(to_record_batch(table, rows))
+        self.rows_written[table] += len(rows)
+
+    def close(self) -> None:
+        """Writes every buffered row and closes all open files."""
+        for key in list(self._buffers):
+            self._flush(key)
+        while self._writers:
+            _, writer = self._writers.popitem(last=False)
+            writer.close()
+
+    def __enter__(self) -> "ParquetExporter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def export_reports(
+    reports: Iterable[MarketAnalysisReport], root: str, **options: Any
+) -> dict[str, int]:
+    """Exports `reports` under `root`; returns the number of rows written per table."""
+    with ParquetExporter(root, **options) as exporter:
+        exporter.write_many(reports)
+    return exporter.rows_written
+
+
+def _read_report_files(paths: Iterable[str]) -> Iterator[MarketAnalysisReport]:
+    """Yields reports from JSON-lines files (batch --output) or single-report files."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                for line in f:
+                    if line.strip():
+                        yield MarketAnalysisReport.model_validate_json(line)
+            else:
+                yield MarketAnalysisReport.model_validate(json.load(f))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Exports reports from JSON files or a report store to partitioned Parquet."""
+    parser = argparse.ArgumentParser(
+        description="Export market analysis reports to partitioned Parquet."
+    )
+    parser.add_argument("files", nargs="*", help="Report JSON or JSON-lines files.")
+    parser.add_argument(
+        "--out", required=True, help="Root directory of the exported tables."
+    )
+    parser.add_argument(
+        "--store", help="Export from this report store (SQLite) instead of files."
+    )
+    parser.add_argument(
+        "--start", help="First trading date (YYYY-MM-DD) to export from the store."
+    )
+    parser.add_argument(
+        "--end", help="Last trading date (YYYY-MM-DD) to export from the store."
+    )
+    parser.add_argument(
+        "--table",
+        action="append",
+        choices=tuple(TABLES),
+        help="Export only these tables.",
+    )
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--batch-rows", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    options = {
+        "tables": args.table or tuple(TABLES),
+        "compression": args.compression,
+        "batch_rows": args.batch_rows,
+    }
+    if args.store:
+        with ReportStore(args.store) as store:
+            reports = (
+                store.get_report(report_id)
+                for report_id in store.report_ids(args.start, args.end)
+            )
+            rows = export_reports(
+                (r for r in reports if r is not None), args.out, **options
+            )
+    else:
+        rows = export_reports(_read_report_files(args.files), args.out, **options)
+    for table, count in rows.items():
+        print(f"{table}: {count} row(s) written under {os.path.join(args.out, table)}")
+    return 0
+
+
+if __name__ == "__main__":
+    configure_logging(propagate=False)
+    sys.exit(main())
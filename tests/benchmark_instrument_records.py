@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Memory and construction-time benchmark: InstrumentRecord vs ObservedInstrument.
+
+Run from the project root:
+    python tests/benchmark_instrument_records.py [count]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from market_analyst.providers.mock import MOCK_TICKER_DETAILS
+from market_analyst.records import InstrumentRecord
+from market_analyst.schemas import ObservedInstrument
+
+
+def _inputs(count: int) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    details = MOCK_TICKER_DETAILS["AAPL"]
+    gappers = [
+        {
+            "ticker": f"T{i:05d}",
+            "gap_percent": 1.0 + i % 7,
+            "pre_market_volume": 1000 * i,
+            "relative_volume": 2.5,
+        }
+        for i in range(count)
+    ]
+    return gappers, details
+
+
+def _measure(
+    label: str, build: Callable[[], list[Any]], count: int
+) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    items = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(items) == count
+    per_item_bytes = current / count
+    per_item_us = elapsed / count * 1e6
+    print(
+        f"  {label:<22} {per_item_bytes:>8.0f} B/instrument  "
+        f"{per_item_us:>7.2f} us/instrument  ({elapsed * 1000:.0f} ms total)"
+    )
+    del items
+    return per_item_bytes, per_item_us
+
+
+def run_benchmark(count: int = 10_000) -> None:
+    """Builds `count` instruments both ways; prints memory and time per instrument."""
+    gappers, details = _inputs(count)
+    print(f"[BENCH] {count} instruments")
+
+    pydantic_bytes, pydantic_us = _measure(
+        "ObservedInstrument",
+        lambda: [
+            ObservedInstrument(
+                ticker=g["ticker"], exchange_id="NASDAQ", gapper_data=g, **details
+            )
+            for g in gappers
+        ],
+        count,
+    )
+    record_bytes, record_us = _measure(
+        "InstrumentRecord",
+        lambda: [
+            InstrumentRecord.from_parts(g["ticker"], "NASDAQ", g, details)
+            for g in gappers
+        ],
+        count,
+    )
+    print(
+        f"  memory: {pydantic_bytes / record_bytes:.1f}x smaller, "
+        f"construction: {pydantic_us / record_us:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build time, open time and per-query latency of the knowledge base index.
+
+Run from the project root:
+    python tests/benchmark_knowledge_index.py [queries]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from market_analyst.knowledge_index import KnowledgeIndex, build_index, current_version
+
+QUERIES = [
+    "opening range breakout stop placement",
+    "vwap reclaim entry criteria",
+    "position sizing one percent rule",
+    "pattern day trader rule",
+    "order flow imbalance scalping",
+    "wash sale tax treatment",
+    "circuit breaker trailing drawdown",
+    "relative volume gapper catalyst",
+]
+
+
+def run_benchmark(rounds: int = 2000) -> None:
+    """Builds the index in a temporary directory and times opening and querying it."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "kb_index.bin")
+        started = time.perf_counter()
+        stats = build_index(index_path=path)
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        build_index(index_path=path)
+        rebuild = time.perf_counter() - started
+        print(
+            f"[BENCH] {stats.files_indexed} files, {stats.passages} passages, "
+            f"{stats.terms} terms, "
+            f"{os.path.getsize(current_version(path) or path) / 1024:.0f} KiB"
+        )
+        print(f"  full build:                  {build * 1e3:8.1f} ms")
+        print(f"  no-change rebuild:           {rebuild * 1e3:8.1f} ms")
+
+        started = time.perf_counter()
+        index = KnowledgeIndex(path)
+        opened = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for query in QUERIES:
+                index.search(query, k=5)
+        per_query = (time.perf_counter() - started) / (rounds * len(QUERIES))
+        index.close()
+        print(f"  open (mmap):                 {opened * 1e3:8.2f} ms")
+        print(f"  search(k=5):                 {per_query * 1e6:8.1f} us/query")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Throughput and footprint of the array-backed L2 OrderBook.
+
+Feeds a synthetic depth stream (level updates plus 5% trades) for many symbols
+through `apply()` in batches and through `update()` one by one, then times a
+vectorized `metrics()` pass over every symbol. The book's arrays are sized up
+front; tracemalloc confirms that applying the stream does not grow them.
+
+Run from the project root:
+    python tests/benchmark_order_book.py [symbols] [updates]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from market_analyst.order_book import OrderBook, SimulatedDepthSource
+from market_analyst.symbols import SymbolRegistry
+
+
+def run_benchmark(symbols: int = 500, updates: int = 2_000_000) -> None:
+    """Applies `updates` synthetic depth updates across `symbols` symbols.
+
+    Prints the update rate and memory use.
+    """
+    registry = SymbolRegistry(cross_listings=())
+    listings = [("SIM", f"SIM{i:04d}") for i in range(symbols)]
+    batches = list(
+        SimulatedDepthSource(
+            listings, updates=updates, batch_size=5000, registry=registry
+        ).batches()
+    )
+    print(f"[BENCH] {symbols} symbols, {updates:,} updates in batches of 5,000")
+
+    book = OrderBook(initial_symbols=symbols)
+    tracemalloc.start()
+    started = time.perf_counter()
+    for batch in batches:
+        book.apply(batch)
+    applied = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  apply():                     {updates / applied:12,.0f} updates/s")
+    print(
+        f"  book arrays:                 {book.nbytes / 1e6:12.1f} MB (batch "
+        f"temporaries peak {peak / 1e6:.1f} MB)"
+    )
+
+    single = OrderBook(initial_symbols=symbols)
+    sample = batches[: max(1, len(batches) // 20)]
+    count = sum(len(b) for b in sample)
+    started = time.perf_counter()
+    for batch in sample:
+        for symbol_id, timestamp, action, side, price, size in zip(
+            batch.symbol_ids.tolist(),
+            batch.timestamps.tolist(),
+            batch.actions.tolist(),
+            batch.sides.tolist(),
+            batch.prices.tolist(),
+            batch.sizes.tolist(),
+        ):
+            single.update(symbol_id, timestamp, action, side, price, size)
+    print(
+        "  update():                    "
+        f"{count / (time.perf_counter() - started):12,.0f} updates/s"
+    )
+
+    started = time.perf_counter()
+    book.metrics()
+    print(
+        "  metrics() for all symbols:   "
+        f"{(time.perf_counter() - started) * 1e3:12.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Per-bar cost of the incremental RollingCorrelation versus recomputing the window.
+
+The recompute baseline rebuilds the same pairwise sums (which tolerate missing
+bars) from the whole window with four matrix products, then derives the matrix
+the same way; np.corrcoef, which assumes no missing bars, is shown for reference.
+
+Run from the project root:
+    python tests/benchmark_rolling_correlation.py [symbols] [window]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from market_analyst.correlation import RollingCorrelation
+
+
+def run_benchmark(symbols: int = 500, window: int = 60, bars: int = 200) -> None:
+    """Feeds `bars` one-minute bars for `symbols` symbols; prints time per bar."""
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(
+        np.cumsum(rng.normal(0, 0.001, size=(window + bars, symbols)), axis=0)
+    )
+    rows = [dict(enumerate(row.tolist())) for row in prices]
+    print(f"[BENCH] {symbols} symbols, {window}-bar window, {bars} bars")
+
+    tracker = RollingCorrelation(window=window, initial_symbols=symbols)
+    for row in rows[:window]:
+        tracker.update(row)
+    started = time.perf_counter()
+    for row in rows[window:]:
+        tracker.update(row)
+    update = (time.perf_counter() - started) / bars
+    started = time.perf_counter()
+    for _ in range(bars // 10):
+        tracker.matrix()
+    matrix = (time.perf_counter() - started) / (bars // 10)
+    print(f"  incremental update():        {update * 1e3:8.2f} ms/bar")
+    print(f"  matrix():                    {matrix * 1e3:8.2f} ms")
+
+    returns = np.diff(np.log(prices), axis=0)
+    present = np.isfinite(returns)
+    values, weights = np.where(present, returns, 0.0), present.astype(np.float64)
+    started = time.perf_counter()
+    for end in range(window, window + bars // 10):
+        x, m = values[end - window : end], weights[end - window : end]
+        tracker._count[:symbols, :symbols] = m.T @ m
+        tracker._sum[:symbols, :symbols] = x.T @ m
+        tracker._sum_sq[:symbols, :symbols] = (x * x).T @ m
+        tracker._sum_xy[:symbols, :symbols] = x.T @ x
+    rebuild = (time.perf_counter() - started) / (bars // 10)
+    print(f"  window recompute of the sums: {rebuild * 1e3:7.2f} ms/bar (+ matrix())")
+
+    started = time.perf_counter()
+    for end in range(window, window + bars // 10):
+        np.corrcoef(returns[end - window : end].T)
+    dense = (time.perf_counter() - started) / (bars // 10)
+    print(f"  np.corrcoef, dense only:     {dense * 1e3:8.2f} ms/bar")
+
+
+if __name__ == "__main__":
+    run_benchmark(*(int(arg) for arg in sys.argv[1:3]))
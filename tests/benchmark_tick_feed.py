@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the tick feed: TickStore ingestion and level reads.
+
+Run from the project root:
+    python tests/benchmark_tick_feed.py [symbols] [ticks]
+"""
+
+import sys
+import time
+
+from market_analyst.symbols import SymbolRegistry
+from market_analyst.tick_feed import SimulatedTickSource, TickStore
+
+
+def run_benchmark(symbols: int = 1000, ticks: int = 1_000_000) -> None:
+    """Ingests `ticks` simulated ticks over `symbols` symbols; prints rates, latency."""
+    listings = [("SIM", f"SIM{i:04d}") for i in range(symbols)]
+    source = SimulatedTickSource(
+        listings,
+        ticks_per_second=ticks,
+        duration=1.0,
+        batch_interval=0.001,
+        realtime=False,
+        registry=SymbolRegistry(cross_listings=()),
+    )
+    batches = list(source.batches())
+    print(f"[BENCH] {ticks} ticks across {symbols} symbols")
+
+    store = TickStore()
+    started = time.perf_counter()
+    for batch in batches:
+        store.apply(batch)
+    elapsed = time.perf_counter() - started
+    print(f"  apply() batches of {len(batches[0])}: {ticks / elapsed:>12,.0f} ticks/s")
+
+    store = TickStore()
+    single = batches[: max(1, len(batches) // 10)]
+    count = sum(len(b) for b in single)
+    started = time.perf_counter()
+    for batch in single:
+        for symbol_id, timestamp, price, size in zip(
+            batch.symbol_ids.tolist(),
+            batch.timestamps.tolist(),
+            batch.prices.tolist(),
+            batch.sizes.tolist(),
+        ):
+            store.update(symbol_id, timestamp, price, size)
+    elapsed = time.perf_counter() - started
+    print(f"  update() one tick at a time:   {count / elapsed:>12,.0f} ticks/s")
+
+    symbol_ids = source.symbol_ids.tolist()
+    started = time.perf_counter()
+    for symbol_id in symbol_ids * 10:
+        store.levels(symbol_id)
+    per_read_us = (time.perf_counter() - started) / (len(symbol_ids) * 10) * 1e6
+    print(
+        f"  levels() read: {per_read_us:.2f} us, store size {store.nbytes / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,119 @@
+# /tests/conftest.py
+import uuid
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+from market_analyst.schemas import MarketAnalysisReport
+from market_analyst.symbols import SymbolRegistry, use_registry
+
+
+@pytest.fixture(autouse=True)
+def _fresh_symbol_registry() -> Iterator[SymbolRegistry]:
+    """Gives each test its own registry instead of the ever-growing global one."""
+    with use_registry(SymbolRegistry()) as registry:
+        yield registry
+
+
+def make_instrument_dict(
+    ticker: str,
+    exchange_id: str,
+    gap_percent: float = 4.0,
+    rsi_14d: float = 55.0,
+    correlation_cluster_id: int | None = 0,
+) -> dict[str, Any]:
+    """Builds a complete ObservedInstrument dict with neutral values."""
+    return {
+        "ticker": ticker,
+        "exchange_id": exchange_id,
+        "gapper_data": {
+            "ticker": ticker,
+            "gap_percent": gap_percent,
+            "pre_market_volume": 500000,
+            "relative_volume": 6.0,
+        },
+        "risk_metrics": {
+            "average_true_range_14d": 2.5,
+            "average_dollar_volume_30d": 250000000.0,
+        },
+        "catalyst_analysis": {
+            "primary_catalyst_type": "Earnings Beat",
+            "recent_headlines": [f"{ticker} beats estimates"],
+        },
+        "key_technical_levels": {
+            "pre_market_high": 101.0,
+            "pre_market_low": 98.0,
+            "previous_day_high": 99.5,
+        },
+        "raw_technicals": {
+            "vwap": 100.0,
+            "rsi_14d": rsi_14d,
+            "macd_12_26_9": {"macd_line": 0.5, "signal_line": 0.4, "histogram": 0.1},
+            "ema_9d": 99.0,
+            "ema_20d": 98.0,
+            "ema_50d": 95.0,
+            "bollinger_bands_20d_2std": {
+                "upper_band": 104.0,
+                "middle_band": 98.0,
+                "lower_band": 92.0,
+                "band_width": 0.12,
+            },
+        },
+        "chart_clarity_raw_components": {
+            "range_integrity": 0.9,
+            "price_action_rhythm": 0.9,
+            "volatility_character": 0.9,
+            "volume_profile_structure": 0.9,
+            "volume_trend_confirmation": 0.9,
+            "order_flow_absorption": 0.0,
+            "cumulative_volume_delta": 0.0,
+        },
+        "fundamental_data": {
+            "name": f"{ticker} Corp.",
+            "sector": "Technology",
+            "industry": "Software",
+            "market_capitalization": 5000000000,
+        },
+        "correlation_cluster_id": correlation_cluster_id,
+    }
+
+
+@pytest.fixture
+def make_report() -> Callable[..., MarketAnalysisReport]:
+    """Returns a factory for small, valid MarketAnalysisReport objects."""
+
+    def _make_report(
+        trading_date: str = "2025-08-12",
+        run_type: str = "Pre-Market",
+        instruments: dict[str, list[dict[str, Any]]] | None = None,
+    ) -> MarketAnalysisReport:
+        instruments = (
+            instruments
+            if instruments is not None
+            else {
+                "NASDAQ": [
+                    make_instrument_dict("AAPL", "NASDAQ"),
+                    make_instrument_dict("TSLA", "NASDAQ"),
+                ]
+            }
+        )
+        return MarketAnalysisReport(
+            report_id=str(uuid.uuid4()),
+            analysis_timestamp_utc=f"{trading_date}T13:00:00+00:00",
+            run_type=run_type,
+            exchange_reports=[
+                {
+                    "exchange_id": exchange_id,
+                    "market_regime": {
+                        "vix_ticker": "^VIX",
+                        "vix_value": 18.5,
+                        "adx_value": 28.1,
+                    },
+                    "observed_instruments": exchange_instruments,
+                }
+                for exchange_id, exchange_instruments in instruments.items()
+            ],
+        )
+
+    return _make_report
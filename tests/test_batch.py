@@ -0,0 +1,80 @@
+# /tests/test_batch.py
+from datetime import UTC, date, datetime
+
+from market_analyst.batch import analyze, build_requests, run_batch
+from market_analyst.providers import MockMarketDataProvider, ProviderUnavailableError
+
+_INSTANT_MOCK = MockMarketDataProvider(
+    gapper_delay=0, regime_delay=0, details_delay=0, screening_delay=0
+)
+
+
+class _FailingProvider(MockMarketDataProvider):
+    """The instant mock, but discovery on `exchanges` and details of `tickers` fail."""
+
+    def __init__(self, exchanges=(), tickers=()):
+        super().__init__(
+            gapper_delay=0, regime_delay=0, details_delay=0, screening_delay=0
+        )
+        self.exchanges = set(exchanges)
+        self.tickers = set(tickers)
+
+    async def get_gappers(self, exchange_id, as_of=None):
+        if exchange_id in self.exchanges:
+            raise ProviderUnavailableError("503", status=503)
+        return await super().get_gappers(exchange_id, as_of)
+
+    async def get_listing_details(self, ticker, exchange_id, as_of=None):
+        if ticker in self.tickers:
+            raise ProviderUnavailableError("503", status=503)
+        return await super().get_listing_details(ticker, exchange_id, as_of)
+
+
+async def test_analyze_returns_report_without_session():
+    as_of = datetime(2025, 8, 12, 13, 0, tzinfo=UTC)
+    report = await analyze(["NASDAQ", "TSX"], as_of=as_of, provider=_INSTANT_MOCK)
+
+    assert report.analysis_timestamp_utc == as_of.isoformat()
+    assert [e.exchange_id for e in report.exchange_reports] == ["NASDAQ", "TSX"]
+    assert [i.ticker for i in report.exchange_reports[0].observed_instruments] == [
+        "AAPL",
+        "TSLA",
+    ]
+    assert report.exchange_reports[1].market_regime.vix_ticker == "^VIXC"
+    assert all(
+        i.correlation_cluster_id is not None
+        for e in report.exchange_reports
+        for i in e.observed_instruments
+    )
+
+
+async def test_run_batch_isolates_failed_jobs():
+    requests = build_requests(
+        date(2025, 8, 11), date(2025, 8, 17), [["NASDAQ"], ["TSX"], ["NASDAQ", "TSX"]]
+    )
+    assert len(requests) == 15  # five weekdays x three exchange sets
+
+    outcomes = await run_batch(requests, provider=_FailingProvider(exchanges=["TSX"]))
+
+    assert [o.request for o in outcomes] == requests
+    by_set = {}
+    for outcome in outcomes:
+        by_set.setdefault(tuple(outcome.request.exchanges), []).append(outcome)
+    assert all(o.report is not None and o.error is None for o in by_set[("NASDAQ",)])
+    assert all(
+        o.report is None and "ProviderUnavailableError" in o.error
+        for o in by_set[("TSX",)]
+    )
+    # A job that lost one exchange still reports the other.
+    assert all(
+        [e.exchange_id for e in o.report.exchange_reports] == ["NASDAQ"]
+        for o in by_set[("NASDAQ", "TSX")]
+    )
+
+
+async def test_failed_ticker_is_skipped_and_the_report_kept():
+    report = await analyze(["NASDAQ"], provider=_FailingProvider(tickers=["TSLA"]))
+
+    assert [i.ticker for i in report.exchange_reports[0].observed_instruments] == [
+        "AAPL"
+    ]
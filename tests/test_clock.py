@@ -0,0 +1,89 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from market_analyst.batch import analyze
+from market_analyst.clock import (
+    SystemClock,
+    VirtualClock,
+    get_clock,
+    run_virtual,
+    use_clock,
+)
+from market_analyst.providers import (
+    LatencyModel,
+    SimulatedMarketDataProvider,
+    SimulationConfig,
+)
+from market_analyst.screening import ScreeningConfig
+
+START = datetime(2025, 8, 11, 12, 0, tzinfo=UTC)
+_NO_SCREENING = ScreeningConfig(
+    top_n_per_exchange=None, min_price=0.0, min_average_dollar_volume=0.0
+)
+
+
+def test_timers_jump_and_the_clock_follows_the_loop():
+    async def _run():
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(3600)
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(asyncio.sleep(60), timeout=1.5)
+        # Work in a thread takes no virtual time, even with a timer pending meanwhile.
+        ticker = asyncio.ensure_future(asyncio.sleep(0.001))
+        await asyncio.to_thread(time.sleep, 0.05)
+        assert not ticker.done()
+        await ticker
+        return loop.time(), get_clock().now()
+
+    started = time.perf_counter()
+    elapsed, now = run_virtual(_run(), start=START)
+    assert time.perf_counter() - started < 1.0
+    assert elapsed == pytest.approx(3601.501)
+    assert now == START + timedelta(seconds=elapsed)
+    assert isinstance(get_clock(), SystemClock)
+
+
+def test_use_clock_stamps_live_runs():
+    frozen = VirtualClock(START)
+    with use_clock(frozen):
+        assert get_clock().now() == START
+    with pytest.raises(ValueError):
+        VirtualClock(datetime(2025, 8, 11))
+
+
+def test_large_simulated_run_is_fast_and_repeatable():
+    async def _analyze():
+        provider = SimulatedMarketDataProvider(
+            SimulationConfig(
+                gappers_per_exchange=300,
+                latency={
+                    "default": LatencyModel(
+                        median_seconds=0.08, sigma=0.5, tail_probability=0.02
+                    )
+                },
+            )
+        )
+        report = await analyze(
+            ["NASDAQ", "TSX"], provider=provider, screening=_NO_SCREENING
+        )
+        return report, get_clock().now()
+
+    started = time.perf_counter()
+    first, finished = run_virtual(_analyze(), start=START)
+    wall = time.perf_counter() - started
+    second, _ = run_virtual(_analyze(), start=START)
+
+    instruments = sum(len(r.observed_instruments) for r in first.exchange_reports)
+    assert instruments == 600
+    # The report is stamped when the run starts, like the coordinator's.
+    assert datetime.fromisoformat(first.analysis_timestamp_utc) == START
+    # 600 enrichments at ~80 ms each; the virtual clock accounts for the latency,
+    # not the wall clock.
+    assert finished > START + timedelta(seconds=0.08)
+    assert wall < 10
+    assert first.model_dump(exclude={"report_id"}) == second.model_dump(
+        exclude={"report_id"}
+    )
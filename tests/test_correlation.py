@@ -0,0 +1,156 @@
+import math
+
+import numpy as np
+from google.adk.runners import InMemoryRunner
+from google.genai import types as genai_types
+
+from market_analyst.agent import root_agent
+from market_analyst.batch import analyze
+from market_analyst.correlation import RollingCorrelation, use_correlation
+from market_analyst.providers import MockMarketDataProvider, use_provider
+from market_analyst.records import InstrumentRecord
+from market_analyst.schemas import MarketAnalysisReport
+from market_analyst.symbols import get_registry
+from market_analyst.tools import cluster_records
+from tests.conftest import make_instrument_dict
+
+
+def _random_walk(bars, symbols, seed=7):
+    """Prices where symbols 0-2 share a common factor and the rest are independent."""
+    rng = np.random.default_rng(seed)
+    factor = rng.normal(0, 0.01, size=(bars, 1))
+    returns = rng.normal(0, 0.01, size=(bars, symbols))
+    returns[:, :3] += 3 * factor
+    return 100 * np.exp(np.cumsum(returns, axis=0))
+
+
+def _brute_force(bars, window, min_periods, a, b):
+    """Pairwise-complete correlation of log returns over the last `window` bars."""
+    last, returns = {}, []
+    for bar in bars:
+        row = {
+            key: math.log(close / last[key])
+            for key, close in bar.items()
+            if key in last
+        }
+        last.update(bar)
+        returns.append(row)
+    shared = [(row[a], row[b]) for row in returns[-window:] if a in row and b in row]
+    if len(shared) < min_periods:
+        return float("nan")
+    return float(np.corrcoef(np.array(shared).T)[0, 1])
+
+
+def test_incremental_matrix_matches_full_recompute_with_joins_and_leaves():
+    prices = _random_walk(bars=120, symbols=6)
+    tracker = RollingCorrelation(window=20, min_periods=5, initial_symbols=2)
+    bars = []
+    for t, row in enumerate(prices):
+        # "LATE" joins at bar 70, "GONE" leaves at bar 40, "GAPPY" skips every 7th bar.
+        bar = {"A": row[0], "B": row[1], "C": row[2], "GAPPY": row[3], "IND": row[4]}
+        if t % 7 == 0:
+            del bar["GAPPY"]
+        if t < 40:
+            bar["GONE"] = row[5]
+        elif t == 40:
+            tracker.remove("GONE")
+        if t >= 70:
+            bar["LATE"] = row[5]
+        tracker.update(bar)
+        bars.append(bar)
+
+    keys, matrix = tracker.matrix()
+    assert "GONE" not in keys and "LATE" in keys
+    for i, a in enumerate(keys):
+        for j, b in enumerate(keys):
+            expected = _brute_force(bars, 20, 5, a, b)
+            assert np.isclose(matrix[i, j], expected, equal_nan=True, atol=1e-9), (a, b)
+    # LATE reused GONE's slot and only correlates over bars after it joined.
+    assert (
+        tracker.correlation("LATE", "A") == matrix[keys.index("LATE"), keys.index("A")]
+    )
+    assert math.isnan(tracker.correlation("GONE", "A"))
+
+
+def test_cluster_ids_group_correlated_symbols():
+    prices = _random_walk(bars=60, symbols=6)
+    tracker = RollingCorrelation(window=30)
+    for row in prices:
+        tracker.update({f"S{i}": close for i, close in enumerate(row)})
+
+    clusters = tracker.cluster_ids(threshold=0.7)
+    assert clusters["S0"] == clusters["S1"] == clusters["S2"] == 0
+    assert len({clusters[f"S{i}"] for i in range(3, 6)}) == 3
+
+
+def test_cluster_records_uses_tracker_and_isolates_unknown_symbols():
+    registry = get_registry()
+    tickers = ["CORA", "CORB", "CORC", "INDA"]
+    symbol_ids = [registry.intern("NASDAQ", ticker) for ticker in tickers]
+    tracker = RollingCorrelation(window=30)
+    for row in _random_walk(bars=40, symbols=4):
+        tracker.update(dict(zip(symbol_ids, row)))
+
+    records = [
+        InstrumentRecord.from_dict(make_instrument_dict(ticker, "NASDAQ"))
+        for ticker in tickers + ["UNTRACKED"]
+    ]
+    clustered = {
+        r.ticker: r.correlation_cluster_id for r in cluster_records(records, tracker)
+    }
+
+    assert clustered["CORA"] == clustered["CORB"] == clustered["CORC"]
+    assert len({clustered["CORA"], clustered["INDA"], clustered["UNTRACKED"]}) == 3
+
+
+async def test_coordinator_clusters_with_the_bound_tracker():
+    registry = get_registry()
+    symbol_ids = [registry.intern("NASDAQ", ticker) for ticker in ["AAPL", "TSLA"]]
+    tracker = RollingCorrelation(window=30)
+    for row in _random_walk(bars=40, symbols=2):
+        tracker.update(dict(zip(symbol_ids, row)))
+
+    runner = InMemoryRunner(agent=root_agent, app_name="correlation_test")
+    session = await runner.session_service.create_session(
+        app_name="correlation_test", user_id="test", state={"exchanges": ["NASDAQ"]}
+    )
+    message = genai_types.Content(
+        role="user", parts=[genai_types.Part(text="Run the analysis.")]
+    )
+    with use_provider(MockMarketDataProvider(0, 0, 0, 0)), use_correlation(tracker):
+        events = [
+            event
+            async for event in runner.run_async(
+                user_id="test", session_id=session.id, new_message=message
+            )
+        ]
+
+    report = MarketAnalysisReport.model_validate_json(events[-1].content.parts[0].text)
+    clusters = {
+        i.ticker: i.correlation_cluster_id
+        for i in report.exchange_reports[0].observed_instruments
+    }
+    # Without the tracker the two would alternate between clusters 0 and 1.
+    assert clusters == {"AAPL": 0, "TSLA": 0}
+
+
+async def test_analyze_prefers_an_empty_tracker_passed_in_over_the_bound_one():
+    registry = get_registry()
+    symbol_ids = [registry.intern("NASDAQ", ticker) for ticker in ["AAPL", "TSLA"]]
+    bound = RollingCorrelation(window=30)
+    for row in _random_walk(bars=40, symbols=2):
+        bound.update(dict(zip(symbol_ids, row)))
+
+    with use_correlation(bound):
+        report = await analyze(
+            ["NASDAQ"],
+            provider=MockMarketDataProvider(0, 0, 0, 0),
+            correlation=RollingCorrelation(),
+        )
+
+    clusters = {
+        i.ticker: i.correlation_cluster_id
+        for i in report.exchange_reports[0].observed_instruments
+    }
+    # The fresh tracker has seen no bars, so each symbol is its own cluster.
+    assert clusters["AAPL"] != clusters["TSLA"]
@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from datetime import date
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types as genai_types
+
+from market_analyst.agent import root_agent
+from market_analyst.batch import build_requests, run_batch
+from market_analyst.firestore_sink import (
+    FirestoreReportSink,
+    InMemoryFirestore,
+    default_client,
+    use_report_sink,
+)
+from market_analyst.providers import MockMarketDataProvider, use_provider
+from tests.conftest import make_instrument_dict
+
+
+def _large_report(make_report, count=1000):
+    return make_report(
+        instruments={
+            "NASDAQ": [
+                make_instrument_dict(f"T{i:04d}", "NASDAQ") for i in range(count)
+            ]
+        }
+    )
+
+
+def test_large_report_is_batched_in_the_background(make_report):
+    report = _large_report(make_report)
+    client = InMemoryFirestore(commit_latency=0.05)
+    sink = FirestoreReportSink(client, max_in_flight=2)
+
+    async def _run():
+        started = time.perf_counter()
+        sink.submit(report)
+        submitted = time.perf_counter() - started
+        await sink.flush()
+        return submitted
+
+    submitted = asyncio.run(_run())
+    assert submitted < 0.01
+    # 1 exchange + 1,000 instrument documents in three batches, then the report
+    # document.
+    assert client.commits == 4 and client.max_concurrent_commits == 2
+    assert len(client.documents) == 1002
+    root = f"market_analysis_reports/{report.report_id}"
+    assert client.documents[root]["instrument_count"] == 1000
+    instrument = client.documents[f"{root}/instruments/NASDAQ:T0042"]
+    assert (
+        instrument["position"] == 42 and instrument["gapper_data"]["ticker"] == "T0042"
+    )
+    assert sink.stats.reports_saved == 1 and sink.stats.documents_written == 1002
+
+
+def test_resaving_is_idempotent_and_failed_commits_are_retried(make_report):
+    report = make_report()
+    client = InMemoryFirestore(fail_commits=1)
+    sink = FirestoreReportSink(client, retry_backoff_seconds=0)
+
+    async def _run():
+        await sink.save(report)
+        await sink.save(report)
+
+    asyncio.run(_run())
+    assert (
+        len(client.documents) == 4
+    )  # report, exchange and two instruments, written once each
+    assert sink.stats.commit_retries == 1 and sink.stats.reports_saved == 2
+
+
+def test_report_document_is_not_written_when_a_batch_keeps_failing(make_report):
+    client = InMemoryFirestore(fail_commits=3)
+    sink = FirestoreReportSink(client, max_attempts=3, retry_backoff_seconds=0)
+
+    asyncio.run(sink.save(make_report()))
+
+    assert client.documents == {}
+    assert sink.stats.reports_failed == 1
+
+
+def test_run_batch_saves_every_report():
+    client = InMemoryFirestore()
+    sink = FirestoreReportSink(client)
+    requests = build_requests(date(2025, 8, 11), date(2025, 8, 12), [["NASDAQ"]])
+
+    outcomes = asyncio.run(
+        run_batch(requests, provider=MockMarketDataProvider(), sink=sink)
+    )
+
+    report_ids = {o.report.report_id for o in outcomes}
+    assert len(report_ids) == 2 and sink.stats.reports_saved == 2
+    assert {path.split("/")[1] for path in client.documents} == report_ids
+
+
+async def test_coordinator_run_ends_after_its_report_is_saved():
+    client = InMemoryFirestore(commit_latency=0.05)
+    sink = FirestoreReportSink(client)
+    runner = InMemoryRunner(agent=root_agent, app_name="sink_test")
+    session = await runner.session_service.create_session(
+        app_name="sink_test", user_id="test", state={"exchanges": ["NASDAQ"]}
+    )
+    message = genai_types.Content(
+        role="user", parts=[genai_types.Part(text="Run the analysis.")]
+    )
+    with use_provider(MockMarketDataProvider(0, 0, 0, 0)), use_report_sink(sink):
+        async for _ in runner.run_async(
+            user_id="test", session_id=session.id, new_message=message
+        ):
+            pass
+
+    # No flush(): the write finished within the run, so nothing is left to drop at loop
+    # shutdown.
+    assert sink.stats.reports_saved == 1
+    assert sum(path.count("/") == 1 for path in client.documents) == 1
+
+
+@pytest.mark.skipif(
+    not os.environ.get("FIRESTORE_EMULATOR_HOST"), reason="needs the Firestore emulator"
+)
+def test_emulator_round_trip(make_report):
+    report = make_report()
+    client = default_client("trade-weaver-test")
+
+    async def _run():
+        await FirestoreReportSink(client).save(report)
+        snapshot = (
+            await client.collection("market_analysis_reports")
+            .document(report.report_id)
+            .get()
+        )
+        return snapshot.to_dict()
+
+    assert asyncio.run(_run())["instrument_count"] == 2
@@ -0,0 +1,136 @@
+# /tests/test_ingestion.py
+import asyncio
+from datetime import UTC, datetime
+
+from market_analyst.ingestion import FileRunQueue, InMemoryRunQueue, RunRequestConsumer
+from market_analyst.schemas import AnalysisRequest
+
+_AS_OF = datetime(2025, 8, 12, 13, 0, tzinfo=UTC)
+
+
+def _request(*exchanges: str) -> AnalysisRequest:
+    return AnalysisRequest(exchanges=list(exchanges), as_of=_AS_OF)
+
+
+class _RecordingHandler:
+    def __init__(self, make_report, fail_times: int = 0, delay: float = 0.05):
+        self.make_report = make_report
+        self.fail_times = fail_times
+        self.delay = delay
+        self.calls = []
+        self.max_concurrent = 0
+        self._running = 0
+
+    async def __call__(self, request):
+        self.calls.append(request)
+        self._running += 1
+        self.max_concurrent = max(self.max_concurrent, self._running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_times:
+                self.fail_times -= 1
+                raise RuntimeError("provider unavailable")
+            return self.make_report()
+        finally:
+            self._running -= 1
+
+
+async def test_duplicates_are_merged_and_acked_after_report(make_report):
+    queue = InMemoryRunQueue()
+    for exchanges in (
+        ("NASDAQ", "TSX"),
+        ("TSX", "NASDAQ"),
+        ("NASDAQ", "TSX"),
+        ("NYSE",),
+    ):
+        await queue.publish(_request(*exchanges))
+    handler = _RecordingHandler(make_report)
+    reports = []
+    consumer = RunRequestConsumer(
+        queue,
+        handler=handler,
+        max_workers=4,
+        on_report=reports.append,
+        pull_timeout=0.05,
+    )
+
+    await consumer.run(stop_when_idle=True)
+
+    assert len(handler.calls) == 2
+    assert len(reports) == 2
+    assert consumer.stats.merged_duplicates == 2
+    assert queue.pending() == 0 and queue.in_flight == {}
+
+
+async def test_worker_pool_is_bounded(make_report):
+    queue = InMemoryRunQueue()
+    for hour in range(6):
+        await queue.publish(
+            AnalysisRequest(exchanges=["NASDAQ"], as_of=_AS_OF.replace(hour=hour))
+        )
+    handler = _RecordingHandler(make_report)
+    consumer = RunRequestConsumer(
+        queue, handler=handler, max_workers=2, pull_timeout=0.05
+    )
+
+    await consumer.run(stop_when_idle=True)
+
+    assert len(handler.calls) == 6
+    assert handler.max_concurrent == 2
+
+
+async def test_saturated_providers_pause_pulling(make_report):
+    queue = InMemoryRunQueue()
+    await queue.publish(_request("NASDAQ"))
+    saturated = True
+    consumer = RunRequestConsumer(
+        queue,
+        handler=_RecordingHandler(make_report),
+        is_saturated=lambda: saturated,
+        pull_timeout=0.05,
+    )
+    task = asyncio.create_task(consumer.run(stop_when_idle=True))
+    await asyncio.sleep(0.2)
+    assert queue.pending() == 1 and consumer.stats.backpressure_waits > 0
+
+    saturated = False
+    await asyncio.wait_for(task, timeout=2)
+    assert consumer.stats.runs_completed == 1
+
+
+async def test_failed_runs_are_redelivered_then_dead_lettered(make_report, tmp_path):
+    queue = FileRunQueue(str(tmp_path), poll_interval=0.01)
+    await queue.publish(_request("NASDAQ"))
+    await queue.publish(AnalysisRequest(exchanges=["TSX"], as_of=_AS_OF))
+    handler = _RecordingHandler(make_report, fail_times=4, delay=0)
+    consumer = RunRequestConsumer(
+        queue, handler=handler, max_workers=1, max_attempts=3, pull_timeout=0.05
+    )
+
+    await consumer.run(stop_when_idle=True)
+
+    assert consumer.stats.runs_completed == 1
+    assert consumer.stats.dead_lettered == 1
+    assert len(list((tmp_path / "dead").iterdir())) == 1
+    assert list((tmp_path / "pending").iterdir()) == []
+    assert list((tmp_path / "inflight").iterdir()) == []
+
+
+async def test_publishing_does_not_redeliver_messages_in_flight(tmp_path):
+    server = FileRunQueue(str(tmp_path))
+    await server.publish(_request("NASDAQ"))
+    (in_flight,) = await server.pull(max_messages=1, timeout=0)
+
+    # What `publish` does while `serve` is working on the first message.
+    published = await FileRunQueue(str(tmp_path)).publish(_request("TSX"))
+
+    assert [m.message_id for m in await server.pull(max_messages=10, timeout=0)] == [
+        published
+    ]
+    assert sorted(p.stem for p in (tmp_path / "inflight").iterdir()) == sorted(
+        [in_flight.message_id, published]
+    )
+    # Only claims older than the lease go back to pending at startup.
+    assert server.recover(min_age_seconds=60) == 0
+    assert server.recover() == 2
+    assert len(list((tmp_path / "pending").iterdir())) == 2
@@ -0,0 +1,129 @@
+import json
+
+from market_analyst import knowledge_index
+from market_analyst.knowledge_index import (
+    KnowledgeIndex,
+    build_index,
+    chunk_markdown,
+    get_knowledge_index,
+    tokenize,
+)
+
+_STRATEGY = """# Gap and Go
+
+Intro to the gap strategy.
+
+## Entry
+
+Buy the break of the pre-market high on strong relative volume.
+
+```
+# not a heading inside a code fence
+```
+
+## Risk
+
+Place the stop below the VWAP.
+"""
+
+_RULES = """# Pattern Day Trader Rule
+
+Accounts under $25,000 are limited to three day trades in five business days.
+"""
+
+
+def _write_kb(root):
+    (root / "strategies").mkdir(parents=True)
+    (root / "regulatory").mkdir()
+    (root / "strategies" / "gap_and_go.md").write_text(_STRATEGY)
+    (root / "regulatory" / "pdt.md").write_text(_RULES)
+    manifest = {"files": [{"path": "regulatory/pdt.md", "category": "regulation"}]}
+    (root / "manifest.json").write_text(json.dumps(manifest))
+
+
+def test_chunking_follows_headings():
+    passages = chunk_markdown(_STRATEGY)
+
+    assert [heading for heading, _ in passages] == [
+        "Gap and Go",
+        "Gap and Go > Entry",
+        "Gap and Go > Risk",
+    ]
+    assert "# not a heading" in passages[1][1]
+    assert tokenize("Stops placed below VWAPs and the strategies") == [
+        "stop",
+        "placed",
+        "below",
+        "vwap",
+        "strategy",
+    ]
+
+
+def test_search_ranks_passages_and_filters_by_category(tmp_path):
+    _write_kb(tmp_path / "kb")
+    index_path = str(tmp_path / "kb.bin")
+
+    stats = build_index(str(tmp_path / "kb"), index_path)
+
+    assert stats.written and stats.passages == 4
+    with KnowledgeIndex(index_path) as index:
+        best = index.search("where to place the stop", k=2)
+        assert (
+            best[0].heading == "Gap and Go > Risk" and best[0].category == "strategies"
+        )
+        assert best[0].text.startswith("## Risk")
+        assert index.search("pattern day trader", k=1)[0].category == "regulation"
+        assert index.search("pattern day trader", category="strategies") == []
+        assert index.search("unknownterm") == []
+
+
+def test_rebuild_only_rechunks_changed_files(tmp_path):
+    kb = tmp_path / "kb"
+    _write_kb(kb)
+    index_path = str(tmp_path / "kb.bin")
+    build_index(str(kb), index_path)
+
+    assert not build_index(str(kb), index_path).written
+    (kb / "regulatory" / "pdt.md").write_text(
+        _RULES
+        + "\n## Margin\n\nCash accounts avoid the rule but face settlement limits.\n"
+    )
+    stats = build_index(str(kb), index_path)
+
+    assert stats.written and (stats.files_reused, stats.files_rebuilt) == (1, 1)
+    with KnowledgeIndex(index_path) as index:
+        assert (
+            index.search("settlement", k=1)[0].heading
+            == "Pattern Day Trader Rule > Margin"
+        )
+        # Reused passages score exactly as after a full build.
+        incremental = index.search("stop below vwap", k=3)
+    build_index(str(kb), str(tmp_path / "full.bin"), full=True)
+    with KnowledgeIndex(str(tmp_path / "full.bin")) as index:
+        assert index.search("stop below vwap", k=3) == incremental
+
+
+def test_rebuilds_write_new_versions_that_readers_switch_to(tmp_path, monkeypatch):
+    kb = tmp_path / "kb"
+    _write_kb(kb)
+    index_path = tmp_path / "kb.bin"
+    monkeypatch.setenv(knowledge_index.INDEX_PATH_ENV, str(index_path))
+    monkeypatch.setattr(knowledge_index, "_default_index", None)
+    build_index(str(kb), str(index_path))
+    shared = get_knowledge_index()
+    assert shared.path == str(tmp_path / "kb.bin.v1")
+
+    (kb / "regulatory" / "pdt.md").write_text(
+        _RULES + "\n## Margin\n\nCash accounts face settlement limits.\n"
+    )
+    build_index(str(kb), str(index_path))
+
+    # The mapped version was never replaced in place, so the open reader still works.
+    assert shared.search("settlement") == []
+    assert (
+        get_knowledge_index().search("settlement", k=1)[0].heading
+        == "Pattern Day Trader Rule > Margin"
+    )
+    assert sorted(
+        p.name for p in tmp_path.iterdir() if p.name.startswith("kb.bin")
+    ) == ["kb.bin.v2"]
@@ -0,0 +1,33 @@
+# /tests/test_load_test.py
+from market_analyst.load_test import LoadTest, StubLatencyProvider, arrival_offsets
+
+
+def test_arrivals_ramp_up_then_hold_rate():
+    offsets = arrival_offsets(sessions=30, rate=10.0, ramp_seconds=2.0)
+
+    assert offsets[0] == 0.0
+    assert all(b > a for a, b in zip(offsets, offsets[1:]))
+    ramp_gaps = offsets[2] - offsets[1]
+    steady_gaps = [b - a for a, b in zip(offsets[20:], offsets[21:])]
+    assert ramp_gaps > 0.1
+    assert all(abs(gap - 0.1) < 1e-9 for gap in steady_gaps)
+
+
+async def test_concurrent_sessions_complete_and_are_measured():
+    load_test = LoadTest(
+        ["NASDAQ", "TSX"],
+        provider=StubLatencyProvider(gappers_per_exchange=5, latency_seconds=0.01),
+    )
+
+    result = await load_test.run(sessions=6, rate=50.0)
+
+    assert result.completed == 6 and result.failed == 0
+    assert result.gappers_per_exchange == 5
+    assert (
+        0
+        < result.latency_p50_seconds
+        <= result.latency_p95_seconds
+        <= result.latency_p99_seconds
+    )
+    assert result.peak_in_flight >= 2
+    assert result.loop_lag_max_ms >= 0
@@ -0,0 +1,181 @@
+# /tests/test_order_book.py
+import numpy as np
+import pytest
+
+from market_analyst.order_book import (
+    ADD,
+    ASK,
+    BID,
+    DELETE,
+    MODIFY,
+    TRADE,
+    DepthBatch,
+    OrderBook,
+    ReplayDepthSource,
+    SimulatedDepthSource,
+    use_order_book,
+    write_depth_file,
+)
+from market_analyst.providers import MockMarketDataProvider, use_provider
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (
+    enrich_ticker_record,
+)
+from market_analyst.symbols import SymbolRegistry, get_registry
+
+
+def _batch(rows):
+    """rows: (symbol_id, action, side, price, size) tuples."""
+    ids, actions, sides, prices, sizes = zip(*rows)
+    return DepthBatch(
+        np.array(ids, dtype=np.int64),
+        np.arange(len(rows), dtype=np.float64),
+        np.array(actions, dtype=np.int8),
+        np.array(sides, dtype=np.int8),
+        np.array(prices, float),
+        np.array(sizes, float),
+    )
+
+
+def test_batch_apply_matches_update_by_update():
+    registry = SymbolRegistry(cross_listings=())
+    listings = [("SIM", f"S{i}") for i in range(30)]
+    source = SimulatedDepthSource(
+        listings, updates=20_000, batch_size=1500, registry=registry
+    )
+    batched, single = OrderBook(levels=256, initial_symbols=4), OrderBook(levels=256)
+    for batch in source.batches():
+        batched.apply(batch)
+        for update in zip(*batch):
+            single.update(
+                int(update[0]),
+                float(update[1]),
+                int(update[2]),
+                int(update[3]),
+                *map(float, update[4:]),
+            )
+
+    ids = [registry.lookup("SIM", f"S{i}") for i in range(30)]
+    left, right = batched.metrics(ids), single.metrics(ids)
+    for name in left._fields:
+        np.testing.assert_allclose(
+            getattr(left, name), getattr(right, name), err_msg=name
+        )
+
+
+def test_ladder_recenters_when_prices_leave_the_window():
+    book = OrderBook(levels=16)
+    book.apply(_batch([(0, ADD, BID, 10.00, 100), (0, ADD, ASK, 10.05, 100)]))
+    # 10.09 is past the 16-tick window centred on 10.00: the ladder moves and keeps both
+    # levels.
+    book.update(0, 1.0, ADD, ASK, 10.09, 50)
+    assert book.recenters == 1
+    assert book.book(0).ask_prices == pytest.approx([10.05, 10.09])
+    # A jump far beyond the window leaves only the new level.
+    book.apply(_batch([(0, ADD, BID, 12.00, 300)]))
+    levels = book.book(0)
+    assert levels.bid_prices == pytest.approx([12.00]) and len(levels.ask_prices) == 0
+
+
+def test_levels_imbalance_and_microprice():
+    book = OrderBook(levels=64)
+    book.apply(
+        _batch(
+            [
+                (3, ADD, BID, 10.00, 500),
+                (3, ADD, BID, 9.99, 300),
+                (3, ADD, BID, 9.90, 900),
+                (3, ADD, ASK, 10.02, 200),
+                (3, ADD, ASK, 10.03, 100),
+                (3, MODIFY, BID, 9.99, 400),
+                (3, DELETE, BID, 9.90, 0),
+                # Two updates of one level in a batch: the later one wins.
+                (3, MODIFY, ASK, 10.03, 700),
+                (3, MODIFY, ASK, 10.03, 600),
+            ]
+        )
+    )
+
+    levels = book.book(3)
+    assert levels.bid_prices == pytest.approx(
+        [10.00, 9.99]
+    ) and levels.bid_sizes.tolist() == [500, 400]
+    assert levels.ask_prices == pytest.approx(
+        [10.02, 10.03]
+    ) and levels.ask_sizes.tolist() == [200, 600]
+    m = book.metrics([3], depth_ticks=2)
+    assert (m.best_bid[0], m.best_ask[0], m.spread[0]) == pytest.approx(
+        (10.00, 10.02, 0.02)
+    )
+    assert (m.bid_depth[0], m.ask_depth[0]) == (900, 800)
+    assert m.imbalance[0] == pytest.approx(100 / 1700)
+    assert m.microprice[0] == pytest.approx((10.00 * 200 + 10.02 * 500) / 700)
+    assert np.isnan(book.metrics([4]).best_bid[0])
+
+
+def test_absorption_and_volume_delta():
+    book = OrderBook(levels=64)
+    book.apply(_batch([(1, ADD, BID, 20.00, 300), (1, ADD, ASK, 20.01, 300)]))
+    # Sellers hit the bid at 20.00 for 2,700 shares while 300 stays displayed: heavy
+    # absorption.
+    book.apply(
+        _batch([(1, TRADE, BID, 20.00, 900)] * 2 + [(1, TRADE, ASK, 20.01, 100)])
+    )
+    book.apply(_batch([(1, TRADE, BID, 20.00, 900)]))
+
+    m = book.metrics([1])
+    assert m.bid_absorbed[0] == 2700 and m.bid_absorption[0] == pytest.approx(
+        2700 / 3000
+    )
+    assert m.ask_absorbed[0] == 100 and m.ask_absorption[0] == pytest.approx(100 / 400)
+    assert m.volume_delta[0] == -2600 and m.traded_volume[0] == 2800
+
+    # The bid gives way: trading at a lower price restarts the count.
+    book.apply(_batch([(1, TRADE, BID, 20.00, 50), (1, TRADE, BID, 19.99, 200)]))
+    assert book.metrics([1]).bid_absorbed[0] == 200
+    features = book.order_flow_features(1)
+    assert features == pytest.approx(
+        {"order_flow_absorption": 1.0, "cumulative_volume_delta": -2850 / 3050}
+    )
+
+
+async def test_replayed_capture_feeds_enrichment(tmp_path):
+    registry = SymbolRegistry(cross_listings=())
+    source = SimulatedDepthSource(
+        [("NASDAQ", "AAPL"), ("NASDAQ", "TSLA")],
+        updates=3000,
+        batch_size=500,
+        registry=registry,
+    )
+    path = str(tmp_path / "depth.csv")
+    assert write_depth_file(path, source.batches(), registry) == 3000
+
+    book = OrderBook(levels=512)
+    for batch in ReplayDepthSource(path, batch_size=256).batches():
+        book.apply(batch)
+    features = book.order_flow_features(get_registry().lookup("NASDAQ", "AAPL"))
+    assert features is not None and 0.0 < features["order_flow_absorption"] <= 1.0
+
+    gapper = {
+        "ticker": "AAPL",
+        "gap_percent": 5.2,
+        "pre_market_volume": 1250000,
+        "relative_volume": 15.3,
+    }
+    with use_provider(MockMarketDataProvider(details_delay=0)), use_order_book(book):
+        record = await enrich_ticker_record("AAPL", gapper, "NASDAQ")
+    assert record.order_flow_absorption == features["order_flow_absorption"]
+    assert record.cumulative_volume_delta == features["cumulative_volume_delta"]
+
+    # A historical run must not see today's order flow: the provider's point-in-time
+    # values stay.
+    as_of = "2025-08-11T12:00:00+00:00"
+    with use_provider(MockMarketDataProvider(details_delay=0)):
+        provider_only = await enrich_ticker_record(
+            "AAPL", gapper, "NASDAQ", as_of=as_of
+        )
+        with use_order_book(book):
+            historical = await enrich_ticker_record(
+                "AAPL", gapper, "NASDAQ", as_of=as_of
+            )
+    assert historical == provider_only
+    assert historical.order_flow_absorption != features["order_flow_absorption"]
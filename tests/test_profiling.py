@@ -0,0 +1,97 @@
+# /tests/test_profiling.py
+import asyncio
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from market_analyst.profiling import (
+    RunProfiler,
+    profiling_requested,
+    start_run_profiler,
+)
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_profiling_is_opt_in(monkeypatch):
+    monkeypatch.delenv("MARKET_ANALYST_PROFILE", raising=False)
+    assert not profiling_requested({"exchanges": ["NASDAQ"]})
+    assert profiling_requested({"profile": True})
+    assert start_run_profiler({}).stop() is None
+
+    monkeypatch.setenv("MARKET_ANALYST_PROFILE", "1")
+    assert profiling_requested({})
+
+
+def test_run_profiler_writes_stage_reports(tmp_path):
+    profiler = RunProfiler(
+        label="NASDAQ", output_root=str(tmp_path), sample_interval=0.001
+    ).start()
+    profiler.stage("discovery")
+    _busy(0.05)
+    profiler.stage("enrichment")
+    payload = [{"ticker": f"T{i}", "values": list(range(50))} for i in range(2000)]
+    _busy(0.05)
+    output_dir = Path(profiler.stop())
+
+    summary = json.loads((output_dir / "summary.json").read_text())
+    assert [s["stage"] for s in summary["stages"]] == [
+        "startup",
+        "discovery",
+        "enrichment",
+    ]
+    assert (
+        summary["stages"][2]["allocated_bytes"]
+        > summary["stages"][1]["allocated_bytes"]
+    )
+    assert summary["cpu_samples"] > 0
+
+    folded = (output_dir / "cpu.folded").read_text().splitlines()
+    assert any(
+        line.startswith("stage:discovery;") and "_busy" in line for line in folded
+    )
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert "test_profiling.py" in (output_dir / "allocations.txt").read_text()
+    assert payload
+
+
+def _busy_nasdaq(seconds):
+    return _busy(seconds)
+
+
+def _busy_tsx(seconds):
+    return _busy(seconds)
+
+
+async def test_concurrent_runs_keep_their_own_samples(tmp_path):
+    async def _run(label, busy, rounds):
+        profiler = RunProfiler(
+            label=label, output_root=str(tmp_path / label), sample_interval=0.001
+        ).start()
+        profiler.stage("work")
+        for _ in range(rounds):
+            busy(0.01)
+            await asyncio.sleep(0)
+        return Path(profiler.stop())
+
+    # The short run stops first; the long one keeps tracing and sampling until its own
+    # stop().
+    nasdaq, tsx = await asyncio.gather(
+        _run("NASDAQ", _busy_nasdaq, 5), _run("TSX", _busy_tsx, 15)
+    )
+    assert not tracemalloc.is_tracing()
+
+    nasdaq_stacks = (nasdaq / "cpu.folded").read_text()
+    tsx_stacks = (tsx / "cpu.folded").read_text()
+    assert "_busy_nasdaq" in nasdaq_stacks and "_busy_tsx" not in nasdaq_stacks
+    assert "_busy_tsx" in tsx_stacks and "_busy_nasdaq" not in tsx_stacks
+    assert (
+        json.loads((tsx / "summary.json").read_text())["stages"][-1]["stage"] == "work"
+    )
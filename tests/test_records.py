@@ -0,0 +1,16 @@
+# /tests/test_records.py
+from market_analyst.records import InstrumentRecord
+from market_analyst.schemas import ObservedInstrument
+from tests.conftest import make_instrument_dict
+
+
+def test_record_round_trips_canonical_model():
+    instrument = ObservedInstrument.model_validate(
+        make_instrument_dict("SHOP.TO", "TSX", rsi_14d=61.5)
+    )
+
+    record = InstrumentRecord.from_observed_instrument(instrument)
+
+    assert record.to_dict() == instrument.model_dump()
+    assert record.to_observed_instrument() == instrument
+    assert not hasattr(record, "__dict__")
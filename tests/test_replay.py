@@ -0,0 +1,106 @@
+# /tests/test_replay.py
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+
+from market_analyst.providers.historical import (
+    HistoricalMarketDataProvider,
+    LookAheadError,
+    save_snapshot,
+)
+from market_analyst.replay import ReplayEngine
+from tests.conftest import make_instrument_dict
+
+_SECTIONS = (
+    "risk_metrics",
+    "catalyst_analysis",
+    "key_technical_levels",
+    "raw_technicals",
+    "chart_clarity_raw_components",
+    "fundamental_data",
+)
+
+
+def _write_day(data_dir, trading_date, snapshot_time="13:00:00", utc_offset="+00:00"):
+    instrument = make_instrument_dict("AAPL", "NASDAQ", rsi_14d=60.0 + trading_date.day)
+    save_snapshot(
+        str(data_dir),
+        trading_date,
+        "NASDAQ",
+        {
+            "snapshot_time_utc": (
+                f"{trading_date.isoformat()}T{snapshot_time}{utc_offset}"
+            ),
+            "market_regime": {
+                "vix_ticker": "^VIX",
+                "vix_value": 15.0 + trading_date.day,
+                "adx_value": 25.0,
+            },
+            "gappers": [instrument["gapper_data"]],
+            "instruments": {"AAPL": {key: instrument[key] for key in _SECTIONS}},
+        },
+    )
+
+
+async def test_replays_each_day_with_its_own_snapshot(tmp_path):
+    start = date(2025, 3, 3)
+    for offset in range(5):
+        _write_day(tmp_path, start + timedelta(days=offset))
+
+    result = await ReplayEngine(str(tmp_path), ["NASDAQ"], max_concurrency=3).run(
+        start, start + timedelta(days=30)
+    )
+
+    assert result.failed_days == {}
+    assert [r.analysis_timestamp_utc[:10] for r in result.reports] == [
+        (start + timedelta(days=offset)).isoformat() for offset in range(5)
+    ]
+    for report in result.reports:
+        day = int(report.analysis_timestamp_utc[8:10])
+        exchange_report = report.exchange_reports[0]
+        assert exchange_report.market_regime.vix_value == 15.0 + day
+        assert (
+            exchange_report.observed_instruments[0].raw_technicals.rsi_14d == 60.0 + day
+        )
+    assert result.days_per_second > 0
+
+
+async def test_snapshot_captured_after_run_time_is_rejected(tmp_path):
+    trading_date = date(2025, 3, 3)
+    _write_day(tmp_path, trading_date, snapshot_time="20:00:00")
+
+    result = await ReplayEngine(str(tmp_path), ["NASDAQ"]).run(
+        trading_date, trading_date
+    )
+
+    assert result.reports == []
+    assert trading_date.isoformat() in result.failed_days
+
+
+async def test_snapshot_time_without_offset_is_read_as_utc(tmp_path):
+    trading_date = date(2025, 3, 3)
+    _write_day(tmp_path, trading_date, utc_offset="")
+    provider = HistoricalMarketDataProvider(str(tmp_path))
+
+    gappers = await provider.get_gappers(
+        "NASDAQ", datetime(2025, 3, 3, 14, 0, tzinfo=UTC)
+    )
+    assert gappers[0]["ticker"] == "AAPL"
+    with pytest.raises(LookAheadError):
+        await provider.get_gappers("NASDAQ", datetime(2025, 3, 3, 12, 0, tzinfo=UTC))
+
+
+async def test_callers_cannot_modify_the_cached_snapshot(tmp_path):
+    trading_date = date(2025, 3, 3)
+    _write_day(tmp_path, trading_date)
+    provider = HistoricalMarketDataProvider(str(tmp_path))
+    as_of = datetime(2025, 3, 3, 14, 0, tzinfo=UTC)
+
+    details = await provider.get_ticker_details("AAPL", "NASDAQ", as_of)
+    details["raw_technicals"]["rsi_14d"] = 0.0
+    (await provider.get_gappers("NASDAQ", as_of))[0]["ticker"] = "XXXX"
+
+    assert (await provider.get_ticker_details("AAPL", "NASDAQ", as_of))[
+        "raw_technicals"
+    ]["rsi_14d"] == 63.0
+    assert (await provider.get_gappers("NASDAQ", as_of))[0]["ticker"] == "AAPL"
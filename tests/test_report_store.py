@@ -0,0 +1,62 @@
+# /tests/test_report_store.py
+from datetime import date
+
+from market_analyst.report_store import ReportStore
+from tests.conftest import make_instrument_dict
+
+
+def test_round_trips_full_report(make_report):
+    report = make_report()
+    with ReportStore() as store:
+        store.save(report)
+        assert store.get_report(report.report_id) == report
+
+
+def test_gapper_appearances_are_limited_to_window(make_report):
+    with ReportStore(batch_size=10) as store:
+        for trading_date in ("2025-03-01", "2025-07-01", "2025-08-01"):
+            store.add(make_report(trading_date=trading_date))
+        rows = store.gapper_appearances("TSLA", days=90, as_of=date(2025, 8, 12))
+        assert [row.trading_date for row in rows] == ["2025-07-01", "2025-08-01"]
+        assert all(row.ticker == "TSLA" for row in rows)
+
+
+def test_rsi_query_filters_on_date_and_threshold(make_report):
+    instruments = {
+        "NASDAQ": [
+            make_instrument_dict("AAPL", "NASDAQ", rsi_14d=72.5),
+            make_instrument_dict("TSLA", "NASDAQ", rsi_14d=41.0),
+        ],
+        "TSX": [make_instrument_dict("SHOP.TO", "TSX", rsi_14d=80.1)],
+    }
+    with ReportStore() as store:
+        store.save_many(
+            [
+                make_report(trading_date="2025-08-12", instruments=instruments),
+                make_report(trading_date="2025-08-13", instruments=instruments),
+            ]
+        )
+        rows = store.query_instruments(trading_date="2025-08-12", min_rsi=70)
+        assert [(row.exchange_id, row.ticker) for row in rows] == [
+            ("NASDAQ", "AAPL"),
+            ("TSX", "SHOP.TO"),
+        ]
+        assert rows[0].to_observed_instrument(store).raw_technicals.rsi_14d == 72.5
+
+
+def test_resaving_report_replaces_rows(make_report):
+    report = make_report()
+    with ReportStore() as store:
+        store.save(report)
+        store.save(report)
+        assert len(store.query_instruments()) == 2
+        assert store.report_ids() == [report.report_id]
+
+
+def test_file_store_creates_its_directory(make_report, tmp_path):
+    path = str(tmp_path / "data" / "reports.sqlite3")
+    report = make_report()
+    with ReportStore(path) as store:
+        store.save(report)
+    with ReportStore(path) as store:
+        assert store.get_report(report.report_id) == report
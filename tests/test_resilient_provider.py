@@ -0,0 +1,130 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from market_analyst.clock import VirtualClock, use_clock
+from market_analyst.providers import (
+    CircuitOpenError,
+    MarketDataProvider,
+    ProviderTimeoutError,
+    ProviderUnavailableError,
+    ResilienceConfig,
+    ResilientProvider,
+)
+from market_analyst.providers.mock import DEFAULT_TICKER_DETAILS
+
+
+class _ScriptedProvider(MarketDataProvider):
+    """Ticker details whose per-call delay or failure comes from a script, in order."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.calls = 0
+
+    async def get_gappers(self, exchange_id, as_of=None):
+        return []
+
+    async def get_market_regime(self, exchange_id, as_of=None):
+        return {"vix_ticker": "^VIX", "vix_value": 18.5, "adx_value": 28.1}
+
+    async def get_ticker_details(self, ticker, exchange_id, as_of=None):
+        step = self.script[self.calls] if self.calls < len(self.script) else 0.001
+        self.calls += 1
+        if isinstance(step, Exception):
+            raise step
+        await asyncio.sleep(step)
+        return {**DEFAULT_TICKER_DETAILS, "call": self.calls}
+
+
+def test_slow_call_is_hedged_and_the_duplicate_wins():
+    # 20 fast calls establish the p95, then one call stalls for 2s while its hedge
+    # answers quickly.
+    inner = _ScriptedProvider([0.005] * 20 + [2.0, 0.005])
+    provider = ResilientProvider(inner, ResilienceConfig(min_samples=20))
+
+    async def _run():
+        for _ in range(20):
+            await provider.get_ticker_details("AAPL", "NASDAQ")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        details = await provider.get_ticker_details("AAPL", "NASDAQ")
+        return details, loop.time() - started
+
+    details, elapsed = asyncio.run(_run())
+    stats = provider.stats()["ticker_details"]
+    assert elapsed < 0.5
+    assert details["call"] == 22
+    assert (stats.hedges_fired, stats.hedge_wins) == (1, 1)
+
+
+def test_breaker_trips_serves_cached_data_and_recovers():
+    failure = ProviderUnavailableError("503", status=503)
+    inner = _ScriptedProvider([0.001] + [failure] * 3)
+    provider = ResilientProvider(
+        inner,
+        ResilienceConfig(
+            hedging=False, failure_threshold=3, reset_timeout_seconds=0.05
+        ),
+    )
+
+    async def _run():
+        first = await provider.get_ticker_details("AAPL", "NASDAQ")
+        # Three failures, each answered from the cache, open the breaker.
+        for _ in range(3):
+            assert await provider.get_ticker_details("AAPL", "NASDAQ") == first
+        calls_when_opened = inner.calls
+        assert await provider.get_ticker_details("AAPL", "NASDAQ") == first
+        with pytest.raises(CircuitOpenError):
+            await provider.get_ticker_details("TSLA", "NASDAQ")
+        assert inner.calls == calls_when_opened  # short-circuited, upstream untouched
+        await asyncio.sleep(0.06)
+        # The half-open probe succeeds and closes the breaker.
+        return await provider.get_ticker_details("TSLA", "NASDAQ")
+
+    probe = asyncio.run(_run())
+    stats = provider.stats()["ticker_details"]
+    assert probe["call"] == 5
+    assert stats.breaker_trips == 1 and stats.breaker_state == "closed"
+    assert (
+        stats.short_circuited == 2
+        and stats.fallbacks_served == 4
+        and stats.failures == 3
+    )
+
+
+def test_call_deadline_raises_timeout_without_cached_data():
+    provider = ResilientProvider(
+        _ScriptedProvider([5.0]), ResilienceConfig(call_timeout_seconds=0.05)
+    )
+
+    with pytest.raises(ProviderTimeoutError):
+        asyncio.run(provider.get_ticker_details("AAPL", "NASDAQ"))
+    assert provider.stats()["ticker_details"].failures == 1
+
+
+def test_fallback_refuses_responses_older_than_max_stale():
+    failure = ProviderUnavailableError("503", status=503)
+    inner = _ScriptedProvider([0.001, failure, failure])
+    provider = ResilientProvider(
+        inner, ResilienceConfig(hedging=False, max_stale_seconds=3600)
+    )
+    yesterday = datetime(2025, 8, 11, 20, 0, tzinfo=UTC)
+
+    async def _run():
+        with use_clock(VirtualClock(yesterday)):
+            first = await provider.get_ticker_details("AAPL", "NASDAQ")
+        with use_clock(VirtualClock(yesterday + timedelta(minutes=30))):
+            assert await provider.get_ticker_details("AAPL", "NASDAQ") == first
+        # The next morning the same live call must not get yesterday's details.
+        with use_clock(VirtualClock(yesterday + timedelta(hours=13))):
+            with pytest.raises(ProviderUnavailableError):
+                await provider.get_ticker_details("AAPL", "NASDAQ")
+
+    asyncio.run(_run())
+    stats = provider.stats()["ticker_details"]
+    assert (
+        stats.fallbacks_served == 1
+        and stats.stale_fallbacks_refused == 1
+        and stats.failures == 2
+    )
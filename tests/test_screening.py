@@ -0,0 +1,109 @@
+# /tests/test_screening.py
+from datetime import UTC, datetime
+
+from market_analyst.batch import analyze
+from market_analyst.providers import MockMarketDataProvider
+from market_analyst.report_store import ReportStore
+from market_analyst.screening import (
+    ScreeningConfig,
+    fetch_screening_metrics,
+    screen_gappers,
+)
+
+_AS_OF = datetime(2025, 8, 12, 13, 0, tzinfo=UTC)
+
+
+def _gapper(ticker, gap_percent, relative_volume=5.0):
+    return {
+        "ticker": ticker,
+        "gap_percent": gap_percent,
+        "pre_market_volume": 500000,
+        "relative_volume": relative_volume,
+    }
+
+
+def _metrics(price=20.0, adv=50_000_000.0, float_shares=40_000_000.0):
+    return {
+        "last_price": price,
+        "average_dollar_volume_30d": adv,
+        "float_shares": float_shares,
+    }
+
+
+def test_thresholds_then_top_n_cap():
+    gappers = [
+        _gapper("PENNY", 30.0),
+        _gapper("THIN", 12.0),
+        _gapper("A", 4.0),
+        _gapper("B", 9.0),
+        _gapper("C", 6.0),
+    ]
+    metrics = {
+        "PENNY": _metrics(price=0.40),
+        "THIN": _metrics(adv=200_000.0),
+        "A": _metrics(),
+        "B": _metrics(),
+        "C": _metrics(),
+    }
+
+    kept, summary = screen_gappers(
+        gappers, metrics, ScreeningConfig(top_n_per_exchange=2)
+    )
+
+    # Survivors keep discovery order; the weakest gap loses to the cap.
+    assert [g["ticker"] for g in kept] == ["B", "C"]
+    assert summary.candidates_discovered == 5
+    assert summary.screened_out_by_threshold == 2
+    assert summary.screened_out_by_cap == 1
+    assert summary.candidates_enriched == 2
+
+
+def test_missing_metrics_do_not_fail_gates():
+    kept, summary = screen_gappers(
+        [_gapper("NEW", 3.0)], {}, ScreeningConfig(max_float_shares=1e6)
+    )
+
+    assert [g["ticker"] for g in kept] == ["NEW"]
+    assert summary.screened_out_by_threshold == 0
+
+
+async def test_metrics_are_cached_per_provider():
+    provider = MockMarketDataProvider(screening_delay=0)
+    calls = []
+    fetch = provider.get_screening_metrics
+
+    async def counting_fetch(tickers, exchange_id, as_of=None):
+        calls.append(list(tickers))
+        return await fetch(tickers, exchange_id, as_of)
+
+    provider.get_screening_metrics = counting_fetch
+    await fetch_screening_metrics(["AAPL", "TSLA"], "NASDAQ", _AS_OF, provider)
+    metrics = await fetch_screening_metrics(
+        ["AAPL", "TSLA", "MSFT"], "NASDAQ", _AS_OF, provider
+    )
+
+    assert calls == [["AAPL", "TSLA"], ["MSFT"]]
+    assert set(metrics) == {"AAPL", "TSLA", "MSFT"}
+
+
+async def test_analyze_enriches_only_screened_candidates():
+    provider = MockMarketDataProvider(
+        gapper_delay=0, regime_delay=0, details_delay=0, screening_delay=0
+    )
+
+    report = await analyze(
+        ["NASDAQ", "TSX"],
+        as_of=_AS_OF,
+        provider=provider,
+        screening=ScreeningConfig(top_n_per_exchange=1),
+    )
+
+    nasdaq, tsx = report.exchange_reports
+    assert [i.ticker for i in nasdaq.observed_instruments] == ["AAPL"]
+    assert [i.ticker for i in tsx.observed_instruments] == ["SHOP.TO"]
+    assert nasdaq.screening_summary.candidates_discovered == 2
+    assert nasdaq.screening_summary.screened_out_by_cap == 1
+
+    with ReportStore() as store:
+        store.save(report)
+        assert store.get_report(report.report_id) == report
@@ -0,0 +1,173 @@
+import asyncio
+import random
+
+import pytest
+
+from market_analyst.batch import analyze
+from market_analyst.providers import (
+    FaultModel,
+    LatencyModel,
+    ProviderTimeoutError,
+    ProviderUnavailableError,
+    RateLimitedError,
+    SimulatedMarketDataProvider,
+    SimulationConfig,
+)
+from market_analyst.schemas import ObservedInstrument
+
+_NO_LATENCY = {"default": LatencyModel(median_seconds=0)}
+
+
+def _provider(**config):
+    return SimulatedMarketDataProvider(SimulationConfig(latency=_NO_LATENCY, **config))
+
+
+def test_universe_is_deterministic_and_scales():
+    async def _snapshot(provider):
+        gappers = await provider.get_gappers("NASDAQ")
+        details = await provider.get_ticker_details(gappers[0]["ticker"], "NASDAQ")
+        return gappers, details
+
+    first = asyncio.run(
+        _snapshot(
+            _provider(seed=1, symbols_per_exchange=5000, gappers_per_exchange=200)
+        )
+    )
+    again = asyncio.run(
+        _snapshot(
+            _provider(seed=1, symbols_per_exchange=5000, gappers_per_exchange=200)
+        )
+    )
+    other = asyncio.run(
+        _snapshot(
+            _provider(seed=2, symbols_per_exchange=5000, gappers_per_exchange=200)
+        )
+    )
+
+    gappers, details = first
+    assert first == again
+    assert gappers != other[0]
+    assert len(gappers) == 200 and len({g["ticker"] for g in gappers}) == 200
+    # Largest moves first, and the pre-market levels bracket the VWAP of the same tape.
+    assert abs(gappers[0]["gap_percent"]) >= abs(gappers[-1]["gap_percent"])
+    levels = details["key_technical_levels"]
+    assert (
+        levels["pre_market_low"]
+        <= details["raw_technicals"]["vwap"]
+        <= levels["pre_market_high"]
+    )
+    ObservedInstrument(
+        ticker=gappers[0]["ticker"],
+        exchange_id="NASDAQ",
+        gapper_data=gappers[0],
+        **details,
+    )
+
+
+def test_bars_and_headlines():
+    provider = _provider(history_days=30)
+
+    async def _fetch():
+        bars = await provider.get_bars("NA0007", "NASDAQ")
+        headlines = await provider.get_headlines("NA0007", "NASDAQ")
+        stream = [
+            h
+            async for h in provider.stream_headlines("NASDAQ", count=5, realtime=False)
+        ]
+        return bars, headlines, stream
+
+    bars, headlines, stream = asyncio.run(_fetch())
+    assert len(bars) == 30
+    assert all(
+        bar["low"]
+        <= min(bar["open"], bar["close"])
+        <= max(bar["open"], bar["close"])
+        <= bar["high"]
+        for bar in bars
+    )
+    assert [bar["date"] for bar in bars] == sorted(bar["date"] for bar in bars)
+    assert headlines and all(isinstance(h, str) for h in headlines)
+    assert len(stream) == 5 and [h["timestamp"] for h in stream] == sorted(
+        h["timestamp"] for h in stream
+    )
+
+
+def test_callers_cannot_modify_the_cached_details():
+    first, second = _provider(), _provider()
+
+    async def _fetch(provider):
+        details = await provider.get_ticker_details("NA0007", "NASDAQ")
+        listing = await provider.get_listing_details("NA0007", "NASDAQ")
+        return details, listing
+
+    details, listing = asyncio.run(_fetch(first))
+    original = details["risk_metrics"]["average_true_range_14d"]
+    details["risk_metrics"]["average_true_range_14d"] = -1
+    for section in listing.values():
+        section.clear()
+
+    # The details are cached per seed across instances: neither may see the edits.
+    for provider in (first, second):
+        again, listing_again = asyncio.run(_fetch(provider))
+        assert again is not details
+        assert again["risk_metrics"]["average_true_range_14d"] == original
+        assert all(listing_again.values())
+
+
+@pytest.mark.parametrize(
+    "faults, error",
+    [
+        (FaultModel(server_error_rate=1.0), ProviderUnavailableError),
+        (FaultModel(timeout_rate=1.0, timeout_seconds=0.01), ProviderTimeoutError),
+        (FaultModel(rate_limit_rate=1.0, retry_after_seconds=2.0), RateLimitedError),
+    ],
+)
+def test_fault_injection(faults, error):
+    provider = _provider(faults={"ticker_details": faults})
+
+    with pytest.raises(error):
+        asyncio.run(provider.get_ticker_details("NA0001", "NASDAQ"))
+    # Other endpoints fall back to the fault-free default.
+    asyncio.run(provider.get_market_regime("NASDAQ"))
+    assert provider.calls["ticker_details"] == 1
+    assert sum(provider.faults.values()) == 1
+
+
+def test_token_bucket_rate_limit_and_latency_distribution():
+    provider = SimulatedMarketDataProvider(
+        SimulationConfig(
+            latency={
+                "default": LatencyModel(distribution="constant", median_seconds=0.01)
+            },
+            faults={
+                "default": FaultModel(rate_limit_per_second=1.0, rate_limit_burst=5)
+            },
+        )
+    )
+
+    async def _burst():
+        return await asyncio.gather(
+            *(provider.get_market_regime("NASDAQ") for _ in range(20)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(_burst())
+    assert sum(isinstance(r, RateLimitedError) for r in results) == 15
+    assert provider.faults["market_regime", "rate_limited"] == 15
+
+    pareto = LatencyModel(distribution="pareto", median_seconds=0.1, pareto_alpha=2.0)
+    rng = random.Random(0)
+    samples = sorted(pareto.sample(rng) for _ in range(4000))
+    assert 0.09 < samples[2000] < 0.11
+    assert samples[-40] > 5 * samples[2000]  # heavy tail: p99 well above the median
+
+
+def test_batch_runs_end_to_end_on_simulated_universe():
+    provider = _provider(symbols_per_exchange=500, gappers_per_exchange=20)
+
+    report = asyncio.run(analyze(["NASDAQ", "TSX"], provider=provider))
+
+    instruments = [i for r in report.exchange_reports for i in r.observed_instruments]
+    assert instruments and all(
+        i.ticker.endswith(".TO") for i in instruments if i.exchange_id == "TSX"
+    )
@@ -0,0 +1,117 @@
+# /tests/test_structured_logging.py
+import io
+import json
+import logging
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types as genai_types
+
+from market_analyst.agent import root_agent
+from market_analyst.providers import MockMarketDataProvider, use_provider
+from market_analyst.structured_logging import (
+    LOGGER_NAME,
+    bind_run_id,
+    configure_logging,
+    current_run_id,
+    shutdown_logging,
+)
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    yield stream
+    configure_logging()
+
+
+def _lines(stream):
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_json_lines_with_run_id_and_extra_fields(log_stream):
+    configure_logging(level="INFO", stream=log_stream)
+    logger = logging.getLogger(f"{LOGGER_NAME}.test")
+
+    with bind_run_id("run-123"):
+        logger.info("Discovering gappers", extra={"exchange_id": "NASDAQ"})
+    logger.info("Outside a run")
+
+    first, second = _lines(log_stream)
+    assert first["message"] == "Discovering gappers"
+    assert first["level"] == "INFO"
+    assert first["logger"] == f"{LOGGER_NAME}.test"
+    assert first["run_id"] == "run-123"
+    assert first["exchange_id"] == "NASDAQ"
+    assert second["run_id"] is None
+
+
+def test_level_filtering(log_stream):
+    configure_logging(level="WARNING", stream=log_stream)
+    logger = logging.getLogger(f"{LOGGER_NAME}.test")
+
+    logger.info("dropped")
+    logger.warning("kept")
+
+    assert [line["message"] for line in _lines(log_stream)] == ["kept"]
+
+
+def test_records_reach_host_handlers_unless_the_entry_point_opts_out(
+    log_stream, caplog
+):
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.propagate = True  # As the host left it.
+
+    configure_logging(level="INFO", stream=log_stream)
+    logging.getLogger(f"{LOGGER_NAME}.test").info("Seen by the host")
+    configure_logging(level="INFO", stream=log_stream, propagate=False)
+    logging.getLogger(f"{LOGGER_NAME}.test").info("Kept to ourselves")
+    logger.propagate = True
+
+    assert [record.getMessage() for record in caplog.records] == ["Seen by the host"]
+    assert [line["message"] for line in _lines(log_stream)] == [
+        "Seen by the host",
+        "Kept to ourselves",
+    ]
+
+
+def test_debug_lines_are_rate_limited_per_template(log_stream):
+    configure_logging(
+        level="DEBUG", stream=log_stream, debug_per_second=0.001, debug_burst=3
+    )
+    logger = logging.getLogger(f"{LOGGER_NAME}.test")
+
+    for i in range(100):
+        logger.debug("Enriching ticker data", extra={"ticker": f"T{i}"})
+    logger.debug("Another template")
+    for _ in range(5):
+        logger.info("Never limited")
+
+    lines = _lines(log_stream)
+    assert [
+        line["ticker"] for line in lines if line["message"] == "Enriching ticker data"
+    ] == ["T0", "T1", "T2"]
+    assert sum(line["message"] == "Another template" for line in lines) == 1
+    assert sum(line["message"] == "Never limited" for line in lines) == 5
+
+
+async def test_coordinator_run_id_does_not_outlive_the_run(log_stream):
+    configure_logging(level="INFO", stream=log_stream)
+    runner = InMemoryRunner(agent=root_agent, app_name="logging_test")
+    session = await runner.session_service.create_session(
+        app_name="logging_test", user_id="test", state={"exchanges": ["NASDAQ"]}
+    )
+    message = genai_types.Content(
+        role="user", parts=[genai_types.Part(text="Run the analysis.")]
+    )
+    with use_provider(MockMarketDataProvider(0, 0, 0, 0)):
+        async for _ in runner.run_async(
+            user_id="test", session_id=session.id, new_message=message
+        ):
+            pass
+
+    assert current_run_id() is None
+    # Every line of the run, sub-agent tasks included, carries the one invocation ID.
+    run_ids = {line["run_id"] for line in _lines(log_stream)}
+    assert len(run_ids) == 1 and None not in run_ids
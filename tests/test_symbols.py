@@ -0,0 +1,99 @@
+# /tests/test_symbols.py
+from datetime import UTC, datetime
+
+from market_analyst.batch import analyze
+from market_analyst.providers import MockMarketDataProvider
+from market_analyst.screening import ScreeningConfig
+from market_analyst.sub_agents.ticker_enrichment_pipeline.agent import (
+    TickerEnrichmentPipeline,
+)
+from market_analyst.symbols import SymbolRegistry, get_registry, use_registry
+
+
+def test_symbol_ids_are_dense_and_stable():
+    registry = SymbolRegistry(cross_listings=())
+
+    first = registry.intern("NASDAQ", "AAPL")
+    second = registry.intern("NYSE", "AAPL")
+
+    assert (first, second) == (0, 1)
+    assert registry.intern("NASDAQ", "AAPL") == first
+    assert registry.listing(second) == ("NYSE", "AAPL")
+    assert registry.lookup("TSX", "AAPL") is None
+    assert registry.issuer_of(first) != registry.issuer_of(second)
+
+
+def test_cross_listings_share_an_issuer():
+    registry = SymbolRegistry()
+    shop_us = registry.intern("NASDAQ", "SHOP")
+    shop_ca = registry.intern("TSX", "SHOP.TO")
+    telus = registry.intern("TSX", "T.TO")
+    att = registry.intern("NYSE", "T")
+
+    assert registry.issuer_of(shop_us) == registry.issuer_of(shop_ca)
+    assert registry.issuer_of(telus) != registry.issuer_of(
+        att
+    )  # same root, different companies
+
+    issuer = registry.link(("TSX", "T.TO"), ("NYSE", "TU"))
+    assert registry.listings_of(issuer) == [telus, registry.lookup("NYSE", "TU")]
+
+
+def test_bound_registry_scopes_interning():
+    registry = SymbolRegistry(cross_listings=())
+    gapper = {
+        "ticker": "ZZZQ",
+        "gap_percent": 3.1,
+        "pre_market_volume": 1,
+        "relative_volume": 2.0,
+    }
+
+    with use_registry(registry):
+        pipeline = TickerEnrichmentPipeline(
+            ticker="ZZZQ", exchange_id="NASDAQ", gapper_data=gapper
+        )
+
+    assert pipeline.symbol_id == registry.lookup("NASDAQ", "ZZZQ") == 0
+    assert get_registry() is not registry
+    assert ("NASDAQ", "ZZZQ") not in get_registry()
+
+
+class _CrossListedProvider(MockMarketDataProvider):
+    def __init__(self):
+        super().__init__(
+            gapper_delay=0, regime_delay=0, details_delay=0, screening_delay=0
+        )
+        self.issuer_calls = []
+
+    async def get_gappers(self, exchange_id, as_of=None):
+        ticker = "SHOP" if exchange_id == "NASDAQ" else "SHOP.TO"
+        return [
+            {
+                "ticker": ticker,
+                "gap_percent": 3.1,
+                "pre_market_volume": 450000,
+                "relative_volume": 12.5,
+            }
+        ]
+
+    async def get_issuer_details(self, ticker, exchange_id, as_of=None):
+        self.issuer_calls.append((exchange_id, ticker))
+        return await super().get_issuer_details(ticker, exchange_id, as_of)
+
+
+async def test_issuer_details_are_fetched_once_per_issuer():
+    provider = _CrossListedProvider()
+    as_of = datetime(2025, 8, 12, 13, 0, tzinfo=UTC)
+
+    report = await analyze(
+        ["NASDAQ", "TSX"],
+        as_of=as_of,
+        provider=provider,
+        screening=ScreeningConfig(min_price=0),
+    )
+
+    assert len(provider.issuer_calls) == 1
+    nasdaq, tsx = (e.observed_instruments[0] for e in report.exchange_reports)
+    assert (nasdaq.ticker, tsx.ticker) == ("SHOP", "SHOP.TO")
+    assert nasdaq.fundamental_data == tsx.fundamental_data
+    assert nasdaq.raw_technicals != tsx.raw_technicals
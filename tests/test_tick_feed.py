@@ -0,0 +1,165 @@
+# /tests/test_tick_feed.py
+from datetime import UTC, date, datetime
+
+import numpy as np
+import pytest
+
+from market_analyst.clock import VirtualClock, use_clock
+from market_analyst.providers import MockMarketDataProvider, use_provider
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (
+    enrich_ticker_record,
+)
+from market_analyst.symbols import SymbolRegistry, get_registry
+from market_analyst.tick_feed import (
+    ReplayTickSource,
+    SimulatedTickSource,
+    TickBatch,
+    TickFeed,
+    TickStore,
+    use_tick_store,
+    write_tick_file,
+)
+
+
+def _batch(symbol_ids, prices, sizes):
+    n = len(symbol_ids)
+    return TickBatch(
+        np.array(symbol_ids),
+        np.arange(n, dtype=np.float64),
+        np.array(prices, float),
+        np.array(sizes, float),
+    )
+
+
+def test_batch_apply_matches_tick_by_tick_updates():
+    rng = np.random.default_rng(7)
+    n = 5000
+    batch = TickBatch(
+        rng.integers(0, 40, n),
+        np.arange(n, dtype=np.float64),
+        rng.uniform(10, 20, n),
+        rng.integers(1, 10, n) * 100.0,
+    )
+    batched, single = (
+        TickStore(capacity_per_symbol=64, initial_symbols=8),
+        TickStore(capacity_per_symbol=64),
+    )
+    for start in range(0, n, 700):
+        batched.apply(TickBatch(*(a[start : start + 700] for a in batch)))
+    for tick in zip(*batch):
+        single.update(int(tick[0]), *tick[1:])
+
+    for symbol_id in range(40):
+        assert batched.levels(symbol_id) == pytest.approx(single.levels(symbol_id))
+        for left, right in zip(batched.recent(symbol_id), single.recent(symbol_id)):
+            np.testing.assert_array_equal(left, right)
+
+
+def test_running_levels_and_ring_buffer():
+    store = TickStore(capacity_per_symbol=3)
+    store.apply(_batch([5, 5, 5, 5], [10.0, 12.0, 9.0, 11.0], [100, 100, 200, 100]))
+
+    levels = store.levels(5)
+    assert (levels.pre_market_high, levels.pre_market_low, levels.last_price) == (
+        12.0,
+        9.0,
+        11.0,
+    )
+    assert levels.vwap == pytest.approx((1000 + 1200 + 1800 + 1100) / 500)
+    assert levels.tick_count == 4
+    assert store.recent(5)[1].tolist() == [12.0, 9.0, 11.0]
+    assert store.levels(4) is None
+
+    store.reset_session(5)
+    assert store.levels(5) is None
+
+
+def test_a_new_utc_day_starts_a_new_session():
+    day = 86400.0
+    store = TickStore()
+    store.apply(_batch([1, 2], [10.0, 20.0], [100, 100]))
+    assert store.session_date == date(1970, 1, 1)
+
+    # A batch that crosses midnight keeps only the new day's ticks.
+    store.apply(
+        TickBatch(
+            np.array([1, 1]),
+            np.array([day - 1, day + 1]),
+            np.array([11.0, 12.0]),
+            np.array([1.0, 1.0]),
+        )
+    )
+    store.update(1, day - 2, 99.0, 1.0)  # Late tick of the previous session.
+
+    assert store.session_date == date(1970, 1, 2)
+    assert store.levels(2) is None
+    assert (store.levels(1).pre_market_high, store.levels(1).tick_count) == (12.0, 1)
+    assert store.stale_ticks == 2
+
+
+async def test_enrichment_ignores_levels_from_an_earlier_session():
+    symbol_id = get_registry().intern("NASDAQ", "AAPL")
+    yesterday = datetime(2025, 8, 11, 13, 0, tzinfo=UTC)
+    store = TickStore()
+    store.update(symbol_id, yesterday.timestamp(), 500.0, 100.0)
+    gapper = {
+        "ticker": "AAPL",
+        "gap_percent": 5.2,
+        "pre_market_volume": 1250000,
+        "relative_volume": 15.3,
+    }
+
+    with use_provider(MockMarketDataProvider(details_delay=0)), use_tick_store(store):
+        with use_clock(VirtualClock(yesterday)):
+            same_day = await enrich_ticker_record("AAPL", gapper, "NASDAQ")
+        with use_clock(VirtualClock(datetime(2025, 8, 12, 9, 0, tzinfo=UTC))):
+            next_day = await enrich_ticker_record("AAPL", gapper, "NASDAQ")
+
+    assert same_day.vwap == 500.0
+    assert next_day.vwap != 500.0
+
+
+async def test_replayed_ticks_override_enrichment_levels(tmp_path):
+    registry = SymbolRegistry(cross_listings=())
+    source = SimulatedTickSource(
+        [("NASDAQ", "AAPL"), ("NASDAQ", "TSLA")],
+        ticks_per_second=2000,
+        duration=0.5,
+        realtime=False,
+        registry=registry,
+    )
+    path = str(tmp_path / "ticks.csv")
+    assert write_tick_file(path, source.batches(), registry) == 1000
+
+    store = TickStore()
+    stats = await TickFeed(store, ReplayTickSource(path, batch_size=128)).run()
+    assert stats.ticks == 1000
+
+    live = store.levels(get_registry().lookup("NASDAQ", "AAPL"))
+    gapper = {
+        "ticker": "AAPL",
+        "gap_percent": 5.2,
+        "pre_market_volume": 1250000,
+        "relative_volume": 15.3,
+    }
+    with use_provider(MockMarketDataProvider(details_delay=0)), use_tick_store(store):
+        record = await enrich_ticker_record("AAPL", gapper, "NASDAQ")
+    assert (record.pre_market_high, record.pre_market_low, record.vwap) == (
+        live.pre_market_high,
+        live.pre_market_low,
+        live.vwap,
+    )
+    assert record.previous_day_high == 191.75
+
+    # A historical run must not see today's tape: the provider's point-in-time levels
+    # stay.
+    as_of = "2025-08-11T12:00:00+00:00"
+    with use_provider(MockMarketDataProvider(details_delay=0)):
+        provider_only = await enrich_ticker_record(
+            "AAPL", gapper, "NASDAQ", as_of=as_of
+        )
+        with use_tick_store(store):
+            historical = await enrich_ticker_record(
+                "AAPL", gapper, "NASDAQ", as_of=as_of
+            )
+    assert historical == provider_only and historical.vwap != live.vwap
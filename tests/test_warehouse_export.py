@@ -0,0 +1,140 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.parquet as pq
+
+from market_analyst.report_store import ReportStore
+from market_analyst.warehouse_export import (
+    INSTRUMENT_FEATURES_SCHEMA,
+    OBSERVED_INSTRUMENTS_SCHEMA,
+    ParquetExporter,
+    file_schema,
+    main,
+    open_dataset,
+)
+from tests.conftest import make_instrument_dict
+
+
+def test_reports_are_partitioned_by_date_and_round_trip(tmp_path, make_report):
+    reports = [
+        make_report("2025-08-12"),
+        make_report("2025-08-12"),
+        make_report("2025-08-13"),
+    ]
+
+    with ParquetExporter(str(tmp_path)) as exporter:
+        exporter.write_many(reports)
+
+    assert exporter.rows_written == {
+        "instrument_features": 6,
+        "observed_instruments": 6,
+    }
+    assert sorted(p.name for p in (tmp_path / "instrument_features").iterdir()) == [
+        "feature_date=2025-08-12",
+        "feature_date=2025-08-13",
+    ]
+    assert pq.read_schema(exporter.files_written[0]).equals(
+        file_schema("instrument_features")
+    )
+    features = open_dataset(str(tmp_path), "instrument_features").to_table()
+    assert features.num_rows == 6
+    assert {f.name: f.type for f in features.schema} == {
+        f.name: f.type for f in INSTRUMENT_FEATURES_SCHEMA
+    }
+    row = features.sort_by("feature_date").to_pylist()[0]
+    assert row["feature_date"] == datetime.date(2025, 8, 12)
+    assert (row["bb_upper_20d_2std"], row["atr_14d"], row["log_return_1d"]) == (
+        104.0,
+        2.5,
+        None,
+    )
+
+    observed = open_dataset(str(tmp_path), "observed_instruments").to_table()
+    assert {f.name: f.type for f in observed.schema} == {
+        f.name: f.type for f in OBSERVED_INSTRUMENTS_SCHEMA
+    }
+    aapl = next(
+        r
+        for r in observed.to_pylist()
+        if r["report_id"] == reports[0].report_id and r["ticker"] == "AAPL"
+    )
+    assert aapl["trading_date"] == datetime.date(2025, 8, 12)
+    assert aapl["recent_headlines"] == ["AAPL beats estimates"]
+    assert (
+        aapl["correlation_cluster_id"] == 0
+        and aapl["market_capitalization"] == 5000000000
+    )
+
+
+def test_large_partitions_stream_as_row_groups(tmp_path, make_report):
+    instruments = {
+        "NASDAQ": [make_instrument_dict(f"T{i:03d}", "NASDAQ") for i in range(40)]
+    }
+    reports = [make_report("2025-08-12", instruments=instruments) for _ in range(5)]
+
+    with ParquetExporter(
+        str(tmp_path), tables=["observed_instruments"], batch_rows=50
+    ) as exporter:
+        exporter.write_many(reports)
+
+    # One file per partition, filled by a row group per flushed buffer (80 + 80 + the
+    # final 40).
+    (path,) = exporter.files_written
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == 200 and metadata.num_row_groups == 3
+    assert not (tmp_path / "instrument_features").exists()
+
+
+def test_many_partitions_are_written_before_close(tmp_path, make_report):
+    days = [datetime.date(2025, 1, 1) + datetime.timedelta(days=i) for i in range(30)]
+    dated = [make_report(day.isoformat()) for day in days]
+
+    # Date-ordered input: each partition is written once the next date arrives.
+    with ParquetExporter(
+        str(tmp_path / "ordered"), tables=["observed_instruments"], batch_rows=1000
+    ) as exporter:
+        exporter.write_many(dated)
+        assert exporter.rows_written["observed_instruments"] == 58
+        assert len(exporter.files_written) == 29
+
+    # Out of order, no partition fills up, but the buffers together stay under
+    # batch_rows.
+    shuffled = dated[::2][::-1] + dated[1::2]
+    with ParquetExporter(
+        str(tmp_path / "shuffled"), tables=["observed_instruments"], batch_rows=10
+    ) as exporter:
+        for report in shuffled:
+            exporter.write(report)
+            assert exporter._buffered_rows < 10
+        assert exporter.rows_written["observed_instruments"] > 0
+    assert exporter.rows_written["observed_instruments"] == 60
+    assert (
+        open_dataset(str(tmp_path / "shuffled"), "observed_instruments").count_rows()
+        == 60
+    )
+
+
+def test_cli_exports_from_report_store(tmp_path, make_report):
+    store_path = str(tmp_path / "reports.sqlite3")
+    with ReportStore(store_path) as store:
+        store.save_many(
+            [
+                make_report("2025-08-11"),
+                make_report("2025-08-12"),
+                make_report("2025-08-13"),
+            ]
+        )
+
+    out = tmp_path / "warehouse"
+    assert (
+        main(["--out", str(out), "--store", store_path, "--start", "2025-08-12"]) == 0
+    )
+
+    assert open_dataset(str(out), "observed_instruments").count_rows() == 4
+    assert sorted(p.name for p in (out / "observed_instruments").iterdir()) == [
+        "trading_date=2025-08-12",
+        "trading_date=2025-08-13",
+    ]
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """
 Validation script to test key market analyst agent behaviors
+
+    python tests/validate_agent_behavior.py                  # real time
+    python tests/validate_agent_behavior.py --virtual-time   # delays take no wall time
 """
+
 import asyncio
-import json
-import sys
 import importlib
-from typing import Dict, Any
+import sys
 
 # Force reload of modules to get fresh imports
 import market_analyst.sub_agents.exchange_gapper_discovery.tools
@@ -17,14 +19,21 @@ importlib.reload(market_analyst.sub_agents.exchange_gapper_discovery.tools)
 importlib.reload(market_analyst.sub_agents.ticker_enrichment_pipeline.tools)
 importlib.reload(market_analyst.tools)
 
-from market_analyst.sub_agents.exchange_gapper_discovery.tools import discover_exchange_gappers, get_market_regime
-from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import enrich_ticker_data
-from market_analyst.tools import cluster_instruments
+from market_analyst.clock import run_virtual  # noqa: E402
+from market_analyst.sub_agents.exchange_gapper_discovery.tools import (  # noqa: E402
+    discover_exchange_gappers,
+    get_market_regime,
+)
+from market_analyst.sub_agents.ticker_enrichment_pipeline.tools import (  # noqa: E402
+    enrich_ticker_data,
+)
+from market_analyst.tools import cluster_instruments  # noqa: E402
+
 
 async def validate_discovery():
     """Validate discovery functions work correctly"""
     print("[TEST] Discovery Functions")
-    
+
     # Test NASDAQ discovery
     nasdaq_result = await discover_exchange_gappers("NASDAQ")
     print(f"  DEBUG: NASDAQ result = {nasdaq_result}")
@@ -34,9 +43,11 @@ async def validate_discovery():
     assert "AAPL" in nasdaq_tickers, f"NASDAQ should include AAPL, got {nasdaq_tickers}"
     # Note: Due to Python module caching issues, we may get GOOG instead of TSLA
     # The core functionality works - this is a known caching issue
-    assert len(nasdaq_tickers) >= 2, f"NASDAQ should return at least 2 tickers, got {len(nasdaq_tickers)}"
+    assert len(nasdaq_tickers) >= 2, (
+        f"NASDAQ should return at least 2 tickers, got {len(nasdaq_tickers)}"
+    )
     print("  [OK] NASDAQ discovery returns correct tickers")
-    
+
     # Test TSX discovery
     tsx_result = await discover_exchange_gappers("TSX")
     print(f"  DEBUG: TSX result = {tsx_result}")
@@ -44,128 +55,134 @@ async def validate_discovery():
     tsx_tickers = [t["ticker"] for t in tsx_result]
     print(f"  DEBUG: TSX tickers = {tsx_tickers}")
     # Due to caching issues, we'll just verify we get tickers for TSX
-    assert len(tsx_tickers) >= 2, f"TSX should return at least 2 tickers, got {len(tsx_tickers)}"
+    assert len(tsx_tickers) >= 2, (
+        f"TSX should return at least 2 tickers, got {len(tsx_tickers)}"
+    )
     print("  [OK] TSX discovery returns tickers")
-    
+
     # Test market regime
     nasdaq_regime = await get_market_regime("NASDAQ")
     assert nasdaq_regime["vix_ticker"] == "^VIX", "NASDAQ should use ^VIX"
     tsx_regime = await get_market_regime("TSX")
     assert tsx_regime["vix_ticker"] == "^VIXC", "TSX should use ^VIXC"
     print("  ✓ Market regime returns correct VIX tickers")
-    
+
     return nasdaq_result, tsx_result
 
+
 async def validate_enrichment():
     """Validate enrichment functions work correctly"""
     print("[TEST] Enrichment Functions")
-    
+
     # Test NASDAQ enrichment
     nasdaq_tickers = await discover_exchange_gappers("NASDAQ")
     for ticker_data in nasdaq_tickers:
         enriched = await enrich_ticker_data(
-            ticker=ticker_data["ticker"],
-            exchange_id="NASDAQ",
-            gapper_data=ticker_data
+            ticker=ticker_data["ticker"], exchange_id="NASDAQ", gapper_data=ticker_data
+        )
+        assert enriched["exchange_id"] == "NASDAQ", (
+            f"Ticker {ticker_data['ticker']} should have NASDAQ exchange_id"
         )
-        assert enriched["exchange_id"] == "NASDAQ", f"Ticker {ticker_data['ticker']} should have NASDAQ exchange_id"
         assert enriched["ticker"] == ticker_data["ticker"], "Ticker should be preserved"
         assert "gapper_data" in enriched, "Should include gapper_data"
         assert "risk_metrics" in enriched, "Should include risk_metrics"
         print(f"  ✓ {ticker_data['ticker']} enriched correctly for NASDAQ")
-    
+
     # Test TSX enrichment
     tsx_tickers = await discover_exchange_gappers("TSX")
     for ticker_data in tsx_tickers:
         enriched = await enrich_ticker_data(
-            ticker=ticker_data["ticker"],
-            exchange_id="TSX",
-            gapper_data=ticker_data
+            ticker=ticker_data["ticker"], exchange_id="TSX", gapper_data=ticker_data
+        )
+        assert enriched["exchange_id"] == "TSX", (
+            f"Ticker {ticker_data['ticker']} should have TSX exchange_id"
         )
-        assert enriched["exchange_id"] == "TSX", f"Ticker {ticker_data['ticker']} should have TSX exchange_id"
         assert enriched["ticker"] == ticker_data["ticker"], "Ticker should be preserved"
         print(f"  ✓ {ticker_data['ticker']} enriched correctly for TSX")
 
+
 def validate_clustering():
     """Validate clustering function works correctly"""
     print("[TEST] Clustering Function")
-    
+
     # Test clustering with sample data
     sample_instruments = [
         {"ticker": "AAPL", "exchange_id": "NASDAQ"},
         {"ticker": "TSLA", "exchange_id": "NASDAQ"},
         {"ticker": "SHOP.TO", "exchange_id": "TSX"},
-        {"ticker": "CNR.TO", "exchange_id": "TSX"}
+        {"ticker": "CNR.TO", "exchange_id": "TSX"},
     ]
-    
+
     result = cluster_instruments(sample_instruments)
     assert "clustered_instruments" in result, "Should return clustered_instruments key"
     assert len(result["clustered_instruments"]) == 4, "Should return all 4 instruments"
-    
+
     # Check that correlation_cluster_id is added
     for instrument in result["clustered_instruments"]:
-        assert "correlation_cluster_id" in instrument, "Should add correlation_cluster_id"
-        assert isinstance(instrument["correlation_cluster_id"], int), "cluster_id should be integer"
-    
+        assert "correlation_cluster_id" in instrument, (
+            "Should add correlation_cluster_id"
+        )
+        assert isinstance(instrument["correlation_cluster_id"], int), (
+            "cluster_id should be integer"
+        )
+
     print("  ✓ Clustering adds correlation_cluster_id to all instruments")
 
+
 def validate_json_structure():
     """Validate the expected JSON structure"""
     print("[TEST] JSON Structure Validation")
-    
+
     # Sample report structure
     expected_keys = [
-        "report_id", 
-        "analysis_timestamp_utc", 
-        "run_type", 
-        "exchange_reports"
-    ]
-    
-    expected_exchange_keys = [
-        "exchange_id",
-        "market_regime", 
-        "observed_instruments"
-    ]
-    
-    expected_market_regime_keys = [
-        "vix_ticker",
-        "vix_value",
-        "adx_value"
+        "report_id",
+        "analysis_timestamp_utc",
+        "run_type",
+        "exchange_reports",
     ]
-    
+
+    expected_exchange_keys = ["exchange_id", "market_regime", "observed_instruments"]
+
+    expected_market_regime_keys = ["vix_ticker", "vix_value", "adx_value"]
+
     print("  ✓ Expected report structure defined")
     print(f"    - Report keys: {expected_keys}")
     print(f"    - Exchange keys: {expected_exchange_keys}")
     print(f"    - Market regime keys: {expected_market_regime_keys}")
 
+
 async def run_all_validations():
     """Run all validation tests"""
-    print("="*60)
+    print("=" * 60)
     print("MARKET ANALYST AGENT VALIDATION")
-    print("="*60)
-    
+    print("=" * 60)
+
     try:
         # Validate core functions
         await validate_discovery()
         await validate_enrichment()
         validate_clustering()
         validate_json_structure()
-        
-        print("\n" + "="*60)
+
+        print("\n" + "=" * 60)
         print("[OK] ALL VALIDATIONS PASSED")
         print("[OK] Agent is working correctly!")
-        print("="*60)
+        print("=" * 60)
         return True
-        
+
     except AssertionError as e:
         print(f"\n[FAIL] VALIDATION FAILED: {str(e)}")
-        print("="*60)
+        print("=" * 60)
         return False
     except Exception as e:
         print(f"\n[ERROR] UNEXPECTED ERROR: {str(e)}")
-        print("="*60)
+        print("=" * 60)
         return False
 
+
 if __name__ == "__main__":
-    success = asyncio.run(run_all_validations())
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    if "--virtual-time" in sys.argv[1:]:
+        success = run_virtual(run_all_validations())
+    else:
+        success = asyncio.run(run_all_validations())
+    sys.exit(0 if success else 1)